@@ -0,0 +1,52 @@
+"""Enforce one active ticket per seat and trip with a unique index
+
+Revision ID: a7c4e2d9b815
+Revises: f2b8d4a6c013
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "a7c4e2d9b815"
+down_revision: Union[str, Sequence[str], None] = "f2b8d4a6c013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT trip_id, seat_id, COUNT(*) FROM tickets "
+        "WHERE state IN ('pending', 'confirmed') "
+        "GROUP BY trip_id, seat_id HAVING COUNT(*) > 1"
+    )).fetchall()
+    if duplicates:
+        listed = ", ".join(f"trip {trip_id} seat {seat_id} ({n})" for trip_id, seat_id, n in duplicates[:20])
+        raise RuntimeError(
+            f"Cannot add uq_tickets_trip_active_seat: {len(duplicates)} seats have more than one "
+            f"active ticket. Cancel the extra tickets first: {listed}"
+        )
+
+    op.add_column(
+        "tickets",
+        sa.Column(
+            "active_seat_id",
+            sa.Integer(),
+            sa.Computed("CASE WHEN state IN ('pending', 'confirmed') THEN seat_id END", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index("uq_tickets_trip_active_seat", "tickets", ["trip_id", "active_seat_id"], unique=True)
+
+
+def downgrade() -> None:
+    # MySQL drops the trip_id foreign key's implicit index once this one covers
+    # the column, and refuses to drop the last one; restore it first.
+    if op.get_bind().dialect.name == "mysql":
+        op.create_index("trip_id", "tickets", ["trip_id"], unique=False)
+    op.drop_index("uq_tickets_trip_active_seat", table_name="tickets")
+    op.drop_column("tickets", "active_seat_id")
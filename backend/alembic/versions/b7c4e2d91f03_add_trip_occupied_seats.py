@@ -0,0 +1,39 @@
+"""Add denormalized occupied_seats counter to trips
+
+Revision ID: b7c4e2d91f03
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "b7c4e2d91f03"
+down_revision: Union[str, Sequence[str], None] = "a1b2c3d4e5f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.add_column(
+            sa.Column("occupied_seats", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    op.execute(
+        """
+        UPDATE trips SET occupied_seats = (
+            SELECT COUNT(*) FROM tickets
+            WHERE tickets.trip_id = trips.id AND tickets.state <> 'cancelled'
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.drop_column("occupied_seats")
@@ -0,0 +1,43 @@
+"""Add indexes for the date-range predicates of the dashboard stats
+
+Revision ID: c41d7e9a2b58
+Revises: b7c4e2d91f03
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "c41d7e9a2b58"
+down_revision: Union[str, Sequence[str], None] = "b7c4e2d91f03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_ticket_state_history_state_changed_at",
+        "ticket_state_history",
+        ["new_state", "changed_at", "ticket_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_package_state_history_state_changed_at",
+        "package_state_history",
+        ["new_state", "changed_at", "package_id"],
+        unique=False,
+    )
+    op.create_index("ix_tickets_state_created_at", "tickets", ["state", "created_at"], unique=False)
+    op.create_index("ix_packages_created_at", "packages", ["created_at"], unique=False)
+    op.create_index("ix_trips_trip_datetime", "trips", ["trip_datetime"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trips_trip_datetime", table_name="trips")
+    op.drop_index("ix_packages_created_at", table_name="packages")
+    op.drop_index("ix_tickets_state_created_at", table_name="tickets")
+    op.drop_index("ix_package_state_history_state_changed_at", table_name="package_state_history")
+    op.drop_index("ix_ticket_state_history_state_changed_at", table_name="ticket_state_history")
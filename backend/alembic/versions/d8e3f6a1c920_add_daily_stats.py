@@ -0,0 +1,39 @@
+"""Add daily_stats rollup table
+
+Revision ID: d8e3f6a1c920
+Revises: c41d7e9a2b58
+Create Date: 2026-10-18 15:00:00.000000
+
+Run ``make db-rebuild-daily-stats`` after upgrading to backfill the rollup.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "d8e3f6a1c920"
+down_revision: Union[str, Sequence[str], None] = "c41d7e9a2b58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_stats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("office_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("metric", sa.String(length=50), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("amount", sa.Numeric(precision=14, scale=2), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("day", "office_id", "metric", name="uq_daily_stats_day_office_metric"),
+    )
+    op.create_index("ix_daily_stats_metric_day", "daily_stats", ["metric", "day"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_daily_stats_metric_day", table_name="daily_stats")
+    op.drop_table("daily_stats")
@@ -0,0 +1,43 @@
+"""Add (sort key, id) indexes for keyset pagination of the list endpoints
+
+Revision ID: e5a9c3f17b42
+Revises: d8e3f6a1c920
+Create Date: 2026-10-18 18:00:00.000000
+
+The composite indexes replace the single-column ones on the same sort key;
+date-range queries keep using them through the leading column. Cursor pages
+skip rows whose sort key is NULL, so old rows without created_at are backfilled.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "e5a9c3f17b42"
+down_revision: Union[str, Sequence[str], None] = "d8e3f6a1c920"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE tickets SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+    op.execute("UPDATE packages SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+    op.execute("UPDATE activities SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.create_index("ix_trips_trip_datetime_id", "trips", ["trip_datetime", "id"], unique=False)
+    op.drop_index("ix_trips_trip_datetime", table_name="trips")
+    op.create_index("ix_packages_created_at_id", "packages", ["created_at", "id"], unique=False)
+    op.drop_index("ix_packages_created_at", table_name="packages")
+    op.create_index("ix_tickets_created_at_id", "tickets", ["created_at", "id"], unique=False)
+    op.create_index("ix_activities_created_at_id", "activities", ["created_at", "id"], unique=False)
+    op.drop_index("ix_activities_created_at", table_name="activities")
+
+
+def downgrade() -> None:
+    op.create_index("ix_activities_created_at", "activities", ["created_at"], unique=False)
+    op.drop_index("ix_activities_created_at_id", table_name="activities")
+    op.drop_index("ix_tickets_created_at_id", table_name="tickets")
+    op.create_index("ix_packages_created_at", "packages", ["created_at"], unique=False)
+    op.drop_index("ix_packages_created_at_id", table_name="packages")
+    op.create_index("ix_trips_trip_datetime", "trips", ["trip_datetime"], unique=False)
+    op.drop_index("ix_trips_trip_datetime_id", table_name="trips")
@@ -0,0 +1,34 @@
+"""Add (resource, trip_datetime) indexes for trip schedule conflict checks
+
+Revision ID: f2b8d4a6c013
+Revises: e5a9c3f17b42
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "f2b8d4a6c013"
+down_revision: Union[str, Sequence[str], None] = "e5a9c3f17b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_trips_driver_id_trip_datetime", "trips", ["driver_id", "trip_datetime"], unique=False)
+    op.create_index("ix_trips_bus_id_trip_datetime", "trips", ["bus_id", "trip_datetime"], unique=False)
+    op.create_index("ix_trips_assistant_id_trip_datetime", "trips", ["assistant_id", "trip_datetime"], unique=False)
+
+
+def downgrade() -> None:
+    # MySQL drops a foreign key's implicit index once another index covers the
+    # column, and refuses to drop the last one; restore the implicit ones first.
+    if op.get_bind().dialect.name == "mysql":
+        for column in ("driver_id", "bus_id", "assistant_id"):
+            op.create_index(column, "trips", [column], unique=False)
+    op.drop_index("ix_trips_assistant_id_trip_datetime", table_name="trips")
+    op.drop_index("ix_trips_bus_id_trip_datetime", table_name="trips")
+    op.drop_index("ix_trips_driver_id_trip_datetime", table_name="trips")
@@ -23,6 +23,7 @@ from routes import (
     report,
     financial,
     owner,
+    metrics,
 )
 
 api_router = APIRouter()
@@ -50,3 +51,4 @@ api_router.include_router(cash_register.router)
 api_router.include_router(report.router, prefix="/reports")
 api_router.include_router(financial.router)
 api_router.include_router(owner.router)
+api_router.include_router(metrics.router)
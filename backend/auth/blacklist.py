@@ -1,70 +1,262 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import hashlib
+import json
 import logging
-from typing import Optional
+import math
+import threading
+import time
+from typing import Iterable, Optional
 from core.redis import redis_client
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Canal por el que cada worker anuncia sus revocaciones a los demás
+REVOKED_CHANNEL = "blacklist:revoked"
+# Índice de revocaciones vigentes (jti -> expiración en epoch) para sincronizar filtros
+EXPIRY_INDEX_KEY = "blacklist:expiries"
+
+_CLEAR_BATCH_SIZE = 500
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre JTIs: sin falsos negativos y con una tasa de falsos
+    positivos ``fp_rate`` mientras no supere ``capacity`` elementos.
+
+    No admite borrados; la lista negra lo reconstruye en cada sincronización
+    completa, lo que descarta los tokens ya expirados.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Doble hashing (Kirsch-Mitzenmacher) a partir de un único digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
 class TokenBlacklist:
     """
     Clase para manejar la lista negra de tokens JWT usando Redis para persistencia.
-    
+
     Utiliza Redis como backend de almacenamiento para mantener la blacklist
     de tokens incluso después de reinicios del servidor.
+
+    En modo ``local`` (``JWT_BLACKLIST_MODE``) cada worker responde sin red:
+
+    - Un filtro de Bloom con todas las revocaciones vigentes. Si dice "no está",
+      el token no está revocado (el caso de casi todas las peticiones).
+    - Un LRU exacto de las revocaciones recientes. Si el JTI está ahí, está
+      revocado sin más consultas.
+    - Si el filtro dice "puede estar" y el JTI no está en el LRU, es un posible
+      falso positivo: se confirma con un GET a Redis
+      (``JWT_BLACKLIST_FP_FALLBACK``) o se trata como revocado.
+
+    Las revocaciones llegan a los demás workers por pub/sub (``REVOKED_CHANNEL``)
+    y el filtro se reconstruye cada ``JWT_BLACKLIST_SYNC_SECONDS`` desde el
+    índice ``EXPIRY_INDEX_KEY``. Hasta la primera sincronización, o si se
+    pierde la suscripción, las comprobaciones vuelven a ir a Redis.
     """
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        mode: str = settings.JWT_BLACKLIST_MODE,
+        filter_capacity: int = settings.JWT_BLACKLIST_FILTER_CAPACITY,
+        filter_fp_rate: float = settings.JWT_BLACKLIST_FILTER_FP_RATE,
+        recent_size: int = settings.JWT_BLACKLIST_RECENT_SIZE,
+        fp_fallback: bool = settings.JWT_BLACKLIST_FP_FALLBACK,
+        sync_seconds: float = settings.JWT_BLACKLIST_SYNC_SECONDS,
+    ):
         self.redis_key_prefix = "blacklist:token:"
         self.fallback_blacklist = {}  # Fallback en memoria si Redis falla
-        
+
+        self.mode = mode
+        self.filter_capacity = filter_capacity
+        self.filter_fp_rate = filter_fp_rate
+        self.recent_size = recent_size
+        self.fp_fallback = fp_fallback
+        self.sync_seconds = sync_seconds
+
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(filter_capacity, filter_fp_rate)
+        self._recent: OrderedDict[str, float] = OrderedDict()  # jti -> expiración (epoch)
+        self._synced = False
+        self._sync_thread: Optional[threading.Thread] = None
+
+        self.local_answers = 0
+        self.redis_checks = 0
+        self.false_positives = 0
+
     def add_token_to_blacklist(self, token: str, expires_delta: Optional[timedelta] = None):
         """
         Agrega un token a la lista negra.
-        
+
         Args:
             token: Token JWT a agregar a la lista negra
             expires_delta: Tiempo de expiración opcional
         """
+        if expires_delta:
+            expire_seconds = int(expires_delta.total_seconds())
+        else:
+            expire_seconds = settings.JWT_BLACKLIST_EXPIRE_SECONDS
+        expires_at = time.time() + expire_seconds
+
+        if self.mode == "local":
+            self._ensure_sync()
+            self.remember(token, expires_at)
+
         try:
-            if expires_delta:
-                expire_seconds = int(expires_delta.total_seconds())
-            else:
-                expire_seconds = settings.JWT_BLACKLIST_EXPIRE_SECONDS
-            
             redis_key = f"{self.redis_key_prefix}{token}"
-            redis_client.client.setex(redis_key, expire_seconds, "blacklisted")
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.setex(redis_key, expire_seconds, "blacklisted")
+            pipe.zadd(EXPIRY_INDEX_KEY, {token: expires_at})
+            pipe.zremrangebyscore(EXPIRY_INDEX_KEY, "-inf", time.time())
+            pipe.publish(REVOKED_CHANNEL, json.dumps({"jti": token, "exp": expires_at}))
+            redis_client.call(pipe.execute)
             logger.info(f"Token added to blacklist with {expire_seconds}s expiration")
-            
+
         except Exception as e:
             logger.error(f"Failed to add token to Redis blacklist: {e}")
             # Fallback a memoria
             expire = datetime.now() + (expires_delta or timedelta(hours=24))
             self.fallback_blacklist[token] = expire
-            
+
     def is_token_blacklisted(self, token: str) -> bool:
         """
         Verifica si un token está en la lista negra.
-        
+
         Args:
             token: Token JWT a verificar
-            
+
         Returns:
             True si el token está en la lista negra, False en caso contrario
         """
+        if self.mode == "local":
+            self._ensure_sync()
+            if self._synced:
+                with self._lock:
+                    maybe = token in self._filter
+                    recent = self._recent.get(token)
+                if not maybe:
+                    self.local_answers += 1
+                    return False
+                if recent is not None and recent > time.time():
+                    self.local_answers += 1
+                    return True
+                if not self.fp_fallback:
+                    self.local_answers += 1
+                    return True
+
         try:
+            self.redis_checks += 1
             redis_key = f"{self.redis_key_prefix}{token}"
-            result = redis_client.client.get(redis_key)
+            result = redis_client.call(redis_client.client.get, redis_key)
             if result is not None:
                 return True
-                
+            if self.mode == "local" and self._synced:
+                self.false_positives += 1
+
         except Exception as e:
             logger.error(f"Failed to check token in Redis blacklist: {e}")
-        
+
         # Fallback: verificar en memoria y limpiar expirados
         self._clean_expired_tokens()
         return token in self.fallback_blacklist
-            
+
+    def remember(self, token: str, expires_at: float) -> None:
+        """Registra una revocación en el filtro y en el LRU de recientes de este worker."""
+        with self._lock:
+            self._filter.add(token)
+            self._recent[token] = expires_at
+            self._recent.move_to_end(token)
+            while len(self._recent) > self.recent_size:
+                self._recent.popitem(last=False)
+
+    def sync(self, entries: list[tuple[str, float]]) -> None:
+        """
+        Reconstruye el filtro con las revocaciones vigentes (``entries``) más las
+        recientes de este worker, que pueden no estar aún en el índice leído.
+        """
+        capacity = max(self.filter_capacity, 2 * (len(entries) + len(self._recent)))
+        rebuilt = BloomFilter(capacity, self.filter_fp_rate)
+        for token, _ in entries:
+            rebuilt.add(token)
+        with self._lock:
+            now = time.time()
+            for token, expires_at in list(self._recent.items()):
+                if expires_at <= now:
+                    del self._recent[token]
+                else:
+                    rebuilt.add(token)
+            self._filter = rebuilt
+            self._synced = True
+
+    def _ensure_sync(self) -> None:
+        if self._sync_thread is None or not self._sync_thread.is_alive():
+            with self._lock:
+                if self._sync_thread is None or not self._sync_thread.is_alive():
+                    self._sync_thread = threading.Thread(
+                        target=self._sync_loop, name="token-blacklist-sync", daemon=True
+                    )
+                    self._sync_thread.start()
+
+    def _sync_loop(self) -> None:
+        while True:
+            if not redis_client.is_available():
+                time.sleep(settings.REDIS_BREAKER_BACKOFF_SECONDS)
+                continue
+            pubsub = None
+            try:
+                client = redis_client.client
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                # Suscribirse antes de leer el índice: nada cae entre ambos
+                pubsub.subscribe(REVOKED_CHANNEL)
+                while True:
+                    self.sync(client.zrangebyscore(EXPIRY_INDEX_KEY, time.time(), "+inf", withscores=True))
+                    next_sync = time.monotonic() + self.sync_seconds
+                    while time.monotonic() < next_sync:
+                        message = pubsub.get_message(timeout=1.0)
+                        if message:
+                            self.handle_message(message)
+            except Exception as e:
+                # Sin suscripción el filtro puede quedar incompleto: volver a Redis
+                self._synced = False
+                logger.warning("Token blacklist sync lost Redis, retrying: %s", e)
+                time.sleep(settings.REDIS_BREAKER_BACKOFF_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def handle_message(self, message: dict) -> None:
+        """Aplica una revocación anunciada por otro worker (o por este mismo)."""
+        if message.get("type") != "message":
+            return
+        try:
+            data = json.loads(message["data"])
+            self.remember(data["jti"], float(data["exp"]))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed blacklist message: %r", message.get("data"))
+
     def _clean_expired_tokens(self):
         """
         Limpia los tokens expirados de la lista negra en memoria (fallback).
@@ -72,31 +264,53 @@ class TokenBlacklist:
         """
         now = datetime.now()
         expired_tokens = [
-            token for token, expire in self.fallback_blacklist.items() 
+            token for token, expire in self.fallback_blacklist.items()
             if expire < now
         ]
-        
+
         for token in expired_tokens:
             del self.fallback_blacklist[token]
-    
+
     def clear_blacklist(self):
         """
         Limpia toda la blacklist. Usado principalmente para testing.
         """
         try:
-            # Limpiar tokens en Redis
-            pattern = f"{self.redis_key_prefix}*"
-            keys = redis_client.client.keys(pattern)
-            if keys:
-                redis_client.client.delete(*keys)
-            logger.info(f"Cleared {len(keys)} tokens from Redis blacklist")
+            # Limpiar tokens en Redis recorriendo con SCAN (KEYS bloquea Redis)
+            client = redis_client.client
+            removed = 0
+            cursor = 0
+            while True:
+                cursor, keys = redis_client.call(
+                    client.scan, cursor, match=f"{self.redis_key_prefix}*", count=_CLEAR_BATCH_SIZE
+                )
+                if keys:
+                    removed += redis_client.call(client.unlink, *keys)
+                if cursor == 0:
+                    break
+            redis_client.call(client.unlink, EXPIRY_INDEX_KEY)
+            logger.info(f"Cleared {removed} tokens from Redis blacklist")
         except Exception as e:
             logger.error(f"Failed to clear Redis blacklist: {e}")
-        
+
         # Limpiar fallback en memoria
         self.fallback_blacklist.clear()
+        with self._lock:
+            self._filter = BloomFilter(self.filter_capacity, self.filter_fp_rate)
+            self._recent.clear()
         logger.info("Cleared fallback blacklist")
-    
+
+    def metrics(self) -> dict:
+        return {
+            "mode": self.mode,
+            "synced": self._synced,
+            "filter_entries": self._filter.count,
+            "recent_entries": len(self._recent),
+            "local_answers": self.local_answers,
+            "redis_checks": self.redis_checks,
+            "false_positives": self.false_positives,
+        }
+
 
 # Instancia global de la lista negra de tokens
 token_blacklist = TokenBlacklist()
@@ -7,6 +7,7 @@ from db.session import get_db
 from models.user import User
 from schemas.auth import TokenData
 from auth.blacklist import token_blacklist
+from auth.principal_cache import principal_cache
 from core.config import settings
 import uuid
 
@@ -147,7 +148,8 @@ def get_current_user_with_token_data(token: str = Depends(get_token), db: Sessio
         headers={"WWW-Authenticate": "Bearer"},
     )
     token_data = verify_token(token, credentials_exception)
-    user = db.query(User).filter(User.email == token_data.email).first()
+    # Hot path: a cached principal is attached to the session without a SELECT
+    user = principal_cache.load_user(db, token_data.email)
     if user is None:
         raise credentials_exception
     if not user.is_active:
@@ -241,7 +243,7 @@ def get_user_from_refresh_token(token: str = Depends(get_refresh_token), db: Ses
     if token_data.token_type != "refresh":
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == token_data.email).first()
+    user = principal_cache.load_user(db, token_data.email)
     if user is None:
         raise credentials_exception
     if not user.is_active:
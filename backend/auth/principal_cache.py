@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from core.config import settings
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Columns kept in memory; the password hash stays in the database and is
+# loaded on first access by the few code paths that need it.
+_CACHED_COLUMNS = tuple(c.key for c in User.__table__.columns if c.key != "hashed_password")
+
+
+class PrincipalCache:
+    """
+    Caché en memoria de los usuarios autenticados, por email (``sub`` del JWT).
+
+    Guarda una copia de las columnas del usuario durante ``ttl_seconds``; en
+    un acierto el usuario se adjunta a la sesión de la petición con
+    ``Session.merge(load=False)``, sin SELECT. Las relaciones y las
+    modificaciones siguen funcionando como con una fila recién leída.
+
+    Los cambios de usuario hechos en este proceso se invalidan explícitamente
+    (``invalidate``); en otros workers la copia vive como mucho el TTL.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._emails_by_id: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, email: str) -> Optional[dict]:
+        """Columnas cacheadas del usuario, o None si no hay copia vigente."""
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user: User) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        snapshot = {key: getattr(user, key) for key in _CACHED_COLUMNS}
+        with self._lock:
+            self._entries[user.email] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(user.email)
+            self._emails_by_id[user.id] = user.email
+            while len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._emails_by_id.pop(evicted["id"], None)
+
+    def invalidate(self, user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+        """Descarta la copia de un usuario (por id, email o ambos)."""
+        with self._lock:
+            if user_id is not None:
+                email = self._emails_by_id.pop(user_id, None) or email
+            if email is not None:
+                entry = self._entries.pop(email, None)
+                if entry is not None:
+                    self._emails_by_id.pop(entry[1]["id"], None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._emails_by_id.clear()
+
+    def load_user(self, db: Session, email: str) -> Optional[User]:
+        """
+        Usuario con ese email, ligado a ``db``: desde la caché si hay copia
+        vigente, si no con una consulta (y la copia se guarda).
+        """
+        snapshot = self.get(email)
+        if snapshot is not None:
+            user = User(**snapshot)
+            make_transient_to_detached(user)
+            return db.merge(user, load=False)
+
+        user = db.query(User).filter(User.email == email).first()
+        if user is not None:
+            self.put(user)
+        return user
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# Instancia global de la caché de usuarios autenticados
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: trip dispatch and finish latency with a full load.
+
+Seeds ``--trips`` scheduled trips, each with ``--packages`` packages assigned
+to it and ``--tickets`` confirmed tickets, then calls TripService directly (no
+HTTP): ``dispatch_trip`` moves the packages to in transit, ``finish_trip``
+completes the tickets. Reports latency and SQL statements per call.
+``--compare-legacy`` runs the same on a second set of trips with the old
+row-by-row transitions (one UPDATE and one history INSERT per row).
+
+    DATABASE_URL=... SECRET_KEY=... python benchmarks/dispatch_latency.py \\
+        --trips 20 --packages 200 --tickets 45 --compare-legacy
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from benchmarks.fixtures import create_dispatch_fixture, latency_summary
+from core.state_machines import TICKET_TRANSITIONS, validate_transition
+from db.session import SessionLocal, engine
+from repositories.package_repository import PackageRepository
+from repositories.ticket_repository import TicketRepository, occupies_seat
+from services.trip_service import TripService
+
+
+class _LegacyTripService(TripService):
+    """TripService with the row-by-row transitions it used before."""
+
+    def _bulk_transition_packages(self, trip_id: int, from_status: str, to_status: str) -> None:
+        package_repo = PackageRepository(self.db)
+        packages = self.repo.get_packages_by_trip_and_status(trip_id, from_status)
+
+        with self.stats.track(*packages):
+            for pkg in packages:
+                old_status = pkg.status
+                pkg.status = to_status
+                package_repo.log_state_change(package_id=pkg.id, old_state=old_status, new_state=to_status)
+
+    def _bulk_transition_tickets(self, trip_id: int, from_state: str, to_state: str) -> None:
+        ticket_repo = TicketRepository(self.db)
+        matching = [t for t in ticket_repo.get_active_by_trip(trip_id) if t.state == from_state]
+
+        with self.stats.track(*matching):
+            for t in matching:
+                validate_transition("ticket", TICKET_TRANSITIONS, t.state, to_state)
+                old_state = t.state
+                t.state = to_state
+                ticket_repo.log_state_change(ticket_id=t.id, old_state=old_state, new_state=to_state)
+
+        per_ticket = int(occupies_seat(to_state)) - int(occupies_seat(from_state))
+        ticket_repo.adjust_trip_occupied_seats(trip_id, per_ticket * len(matching))
+
+
+def _measure(label: str, service_cls, method: str, trip_ids: list[int]) -> None:
+    statements = []
+    counter = lambda *args: statements.append(1)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", counter)
+    samples = []
+    try:
+        for trip_id in trip_ids:
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                getattr(service_cls(db), method)(trip_id)
+                samples.append((time.perf_counter() - started) * 1000)
+            finally:
+                db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    print(f"{latency_summary(label, samples)}  queries/call={len(statements) // len(trip_ids)}")
+
+
+def run(trips: int, packages: int, tickets: int, compare_legacy: bool) -> None:
+    db = SessionLocal()
+    try:
+        trip_ids = create_dispatch_fixture(db, trips=trips, packages_per_trip=packages, tickets_per_trip=tickets)
+        legacy_ids = (
+            create_dispatch_fixture(db, trips=trips, packages_per_trip=packages, tickets_per_trip=tickets)
+            if compare_legacy else []
+        )
+    finally:
+        db.close()
+    print(f"{trips} trips, {packages} packages and {tickets} tickets each")
+
+    _measure("dispatch", TripService, "dispatch_trip", trip_ids)
+    _measure("finish", TripService, "finish_trip", trip_ids)
+    if compare_legacy:
+        _measure("legacy dispatch", _LegacyTripService, "dispatch_trip", legacy_ids)
+        _measure("legacy finish", _LegacyTripService, "finish_trip", legacy_ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trips", type=int, default=20)
+    parser.add_argument("--packages", type=int, default=200, help="Packages assigned to each trip")
+    parser.add_argument("--tickets", type=int, default=45, help="Confirmed tickets (and seats) per trip")
+    parser.add_argument("--compare-legacy", action="store_true", help="Also run the row-by-row transitions")
+    args = parser.parse_args()
+    run(args.trips, args.packages, args.tickets, args.compare_legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Shared fixture data for the benchmark scripts.
+
+Creates a self-contained, disposable world (office, route, bus with seats,
+secretary, client, trip and an open cash register) in the database pointed to
+by DATABASE_URL. Never run it against production data.
+"""
+
+import math
+import os
+import sys
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.enums import CashRegisterStatus
+from models.bus import Bus
+from models.cash_register import CashRegister
+from models.client import Client
+from models.location import Location
+from models.office import Office
+from models.route import Route
+from models.route_schedule import RouteSchedule  # noqa: F401 - registers Route.schedules
+from models.seat import Seat
+from models.secretary import Secretary
+from models.trip import Trip
+from models.user import User, UserRole
+
+
+@dataclass
+class SaleFixture:
+    """Ids needed to sell tickets on a freshly created trip."""
+
+    trip_id: int
+    bus_id: int
+    route_id: int
+    client_id: int
+    secretary_id: int
+    operator_user_id: int
+    operator_email: str
+    office_id: int
+    seat_ids: list[int]
+
+
+def _user(db: Session, role: UserRole, tag: str) -> User:
+    user = User(
+        username=f"bench_{role.value}_{tag}",
+        email=f"bench_{role.value}_{tag}@{settings.EMAIL_DOMAIN}",
+        # Benchmarks mint tokens directly; the hash is never verified.
+        hashed_password="!",
+        role=role,
+        is_active=True,
+        is_admin=False,
+    )
+    db.add(user)
+    db.flush()
+    return user
+
+
+def create_sale_fixture(db: Session, *, seats: int = 45, trips: int = 1) -> list[SaleFixture]:
+    """Create ``trips`` departures on a ``seats``-seat bus and return their ids.
+
+    All trips share one office, route, secretary (with an open register) and client.
+    Each trip gets its own bus so seat ids never collide across trips.
+    """
+    tag = uuid.uuid4().hex[:8]
+
+    origin = Location(name=f"Bench Origin {tag}", latitude=-17.78, longitude=-63.18)
+    destination = Location(name=f"Bench Destination {tag}", latitude=-17.91, longitude=-64.53)
+    db.add_all([origin, destination])
+    db.flush()
+
+    office = Office(name=f"Bench Office {tag}", location_id=origin.id)
+    route = Route(
+        origin_location_id=origin.id,
+        destination_location_id=destination.id,
+        distance=240.0,
+        duration=5.0,
+        price=50.0,
+    )
+    db.add_all([office, route])
+    db.flush()
+
+    secretary_user = _user(db, UserRole.SECRETARY, tag)
+    secretary = Secretary(user_id=secretary_user.id, firstname="Bench", lastname="Secretary", office_id=office.id)
+    client_user = _user(db, UserRole.CLIENT, tag)
+    client = Client(user_id=client_user.id, firstname="Bench", lastname="Client")
+    db.add_all([secretary, client])
+    db.flush()
+
+    db.add(CashRegister(
+        office_id=office.id,
+        date=date.today(),
+        opened_by_id=secretary_user.id,
+        initial_balance=0.0,
+        status=CashRegisterStatus.OPEN,
+    ))
+
+    fixtures = []
+    departure = datetime.now() + timedelta(days=1)
+    for n in range(trips):
+        bus = Bus(license_plate=f"B{tag[:5]}{n:04d}"[:10], capacity=seats, model="Bench", brand="Bench", floors=1)
+        db.add(bus)
+        db.flush()
+        seat_objs = [
+            Seat(bus_id=bus.id, seat_number=i + 1, deck="FIRST", row=i // 4 + 1, column=i % 4 + 1)
+            for i in range(seats)
+        ]
+        db.add_all(seat_objs)
+        trip = Trip(
+            trip_datetime=departure + timedelta(hours=n),
+            status="scheduled",
+            bus_id=bus.id,
+            route_id=route.id,
+            secretary_id=secretary.id,
+        )
+        db.add(trip)
+        db.flush()
+        fixtures.append(SaleFixture(
+            trip_id=trip.id,
+            bus_id=bus.id,
+            route_id=route.id,
+            client_id=client.id,
+            secretary_id=secretary.id,
+            operator_user_id=secretary_user.id,
+            operator_email=secretary_user.email,
+            office_id=office.id,
+            seat_ids=[s.id for s in seat_objs],
+        ))
+
+    db.commit()
+    return fixtures
+
+
+def create_owner_fixture(
+    db: Session, *, buses: int, trips_per_bus: int, tickets_per_trip: int, packages_per_trip: int
+) -> int:
+    """Create an owner whose buses ran ``buses * trips_per_bus`` past trips; return its id.
+
+    Every trip gets tickets in mixed states, packages with mixed payment
+    terms sent to a second office, and every third trip an owner withdrawal.
+    """
+    from core.enums import CashTransactionType, PaymentMethod
+    from models.cash_transaction import CashTransaction
+    from models.owner import Owner
+    from models.owner_withdrawal import OwnerWithdrawal
+    from models.package import Package
+    from models.package_item import PackageItem
+    from models.ticket import Ticket
+
+    sales = create_sale_fixture(db, seats=tickets_per_trip, trips=buses)
+    base = sales[0]
+    tag = uuid.uuid4().hex[:8]
+
+    owner = Owner(user_id=_user(db, UserRole.OWNER, tag).id, firstname="Bench", lastname="Owner")
+    destination = Office(name=f"Bench Destination Office {tag}")
+    db.add_all([owner, destination])
+    db.flush()
+    register = db.query(CashRegister).filter(CashRegister.office_id == base.office_id).one()
+
+    ticket_states = ("confirmed", "completed", "pending", "cancelled")
+    package_terms = (
+        ("paid_on_send", "delivered"),
+        ("collect_on_delivery", "delivered"),
+        ("collect_on_delivery", "in_transit"),
+        ("paid_on_send", "in_transit"),
+    )
+    first_departure = datetime.now() - timedelta(days=trips_per_bus + 1)
+    n = 0
+    for sale in sales:
+        db.get(Bus, sale.bus_id).owner_id = owner.id
+        trip_ids = [sale.trip_id]
+        for day in range(1, trips_per_bus):
+            trip = Trip(
+                trip_datetime=first_departure + timedelta(days=day, hours=n % 24),
+                status="completed",
+                bus_id=sale.bus_id,
+                route_id=sale.route_id,
+                secretary_id=sale.secretary_id,
+            )
+            db.add(trip)
+            db.flush()
+            trip_ids.append(trip.id)
+
+        for trip_id in trip_ids:
+            n += 1
+            db.add_all(
+                Ticket(
+                    state=ticket_states[i % len(ticket_states)], seat_id=seat_id, client_id=sale.client_id,
+                    trip_id=trip_id, secretary_id=sale.secretary_id, price=50 + i % 7, payment_method="cash",
+                )
+                for i, seat_id in enumerate(sale.seat_ids)
+            )
+            for i in range(packages_per_trip):
+                payment_status, status = package_terms[i % len(package_terms)]
+                package = Package(
+                    tracking_number=f"BO{tag}{n:05d}{i:03d}"[:20], status=status, payment_status=payment_status,
+                    sender_id=sale.client_id, recipient_id=sale.client_id, secretary_id=sale.secretary_id,
+                    trip_id=trip_id, origin_office_id=sale.office_id, destination_office_id=destination.id,
+                )
+                db.add(package)
+                db.flush()
+                db.add_all(
+                    PackageItem(package_id=package.id, quantity=1, description="Bench", unit_price=price, total_price=price)
+                    for price in (10.0, 12.5)
+                )
+            if n % 3 == 0:
+                transaction = CashTransaction(
+                    cash_register_id=register.id, type=CashTransactionType.WITHDRAWAL,
+                    amount=25.0, payment_method=PaymentMethod.CASH,
+                )
+                db.add(transaction)
+                db.flush()
+                db.add(OwnerWithdrawal(
+                    owner_id=owner.id, trip_id=trip_id, cash_transaction_id=transaction.id,
+                    secretary_id=sale.secretary_id,
+                ))
+    db.commit()
+    return owner.id
+
+
+def create_dispatch_fixture(db: Session, *, trips: int, packages_per_trip: int, tickets_per_trip: int) -> list[int]:
+    """Create ``trips`` scheduled trips loaded for departure; return their ids.
+
+    Every trip gets ``packages_per_trip`` packages assigned to it and
+    ``tickets_per_trip`` confirmed tickets, ready for dispatch and finish.
+    """
+    from models.package import Package
+    from models.package_item import PackageItem
+    from models.ticket import Ticket
+
+    sales = create_sale_fixture(db, seats=tickets_per_trip, trips=trips)
+    tag = uuid.uuid4().hex[:8]
+    for n, sale in enumerate(sales):
+        db.add_all(
+            Ticket(
+                state="confirmed", seat_id=seat_id, client_id=sale.client_id, trip_id=sale.trip_id,
+                secretary_id=sale.secretary_id, price=50, payment_method="cash",
+            )
+            for seat_id in sale.seat_ids
+        )
+        db.get(Trip, sale.trip_id).occupied_seats = len(sale.seat_ids)
+        for i in range(packages_per_trip):
+            package = Package(
+                tracking_number=f"BD{tag}{n:04d}{i:04d}"[:20], status="assigned_to_trip",
+                payment_status="paid_on_send", sender_id=sale.client_id, recipient_id=sale.client_id,
+                secretary_id=sale.secretary_id, trip_id=sale.trip_id, origin_office_id=sale.office_id,
+            )
+            db.add(package)
+            db.flush()
+            db.add(PackageItem(package_id=package.id, quantity=1, description="Bench", unit_price=10.0, total_price=10.0))
+    db.commit()
+    return [sale.trip_id for sale in sales]
+
+
+def create_login_users(db: Session, *, count: int, password: str) -> list[str]:
+    """Create ``count`` active secretary users sharing ``password``; return their emails.
+
+    The hash is computed once, inline, with the server's current cost settings.
+    """
+    from core.security import _hash
+
+    tag = uuid.uuid4().hex[:8]
+    hashed = _hash(password)
+    users = [
+        User(
+            username=f"bench_login_{tag}_{n}",
+            email=f"bench_login_{tag}_{n}@{settings.EMAIL_DOMAIN}",
+            hashed_password=hashed,
+            role=UserRole.SECRETARY,
+            is_active=True,
+            is_admin=False,
+        )
+        for n in range(count)
+    ]
+    db.add_all(users)
+    db.commit()
+    return [u.email for u in users]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 for an empty list)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(label: str, samples_ms: list[float]) -> str:
+    """Format a one-line latency summary in milliseconds."""
+    return (
+        f"{label:<14} n={len(samples_ms):<5} "
+        f"p50={percentile(samples_ms, 50):8.1f}  "
+        f"p95={percentile(samples_ms, 95):8.1f}  "
+        f"p99={percentile(samples_ms, 99):8.1f}  "
+        f"max={max(samples_ms, default=0):8.1f} ms"
+    )
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: successful logins per second, per core.
+
+Keeps ``--concurrency`` parallel ``POST /api/v1/auth/login`` calls going for
+``--duration`` seconds against freshly seeded users, while a probe keeps
+hitting ``GET /health``. Password hashing is CPU bound, so the figure that
+matters is logins/s divided by the cores the server may use (``--cores``);
+the probe shows whether hashing still starves every other request.
+
+Login is rate limited per IP outside of tests; lift the limit for the run:
+
+    RATE_LIMIT_AUTH_LOGIN=1000000/minute DATABASE_URL=... SECRET_KEY=... uvicorn main:app --port 8000 &
+    DATABASE_URL=... SECRET_KEY=... python benchmarks/login_throughput.py --concurrency 8 --duration 20
+
+Compare builds, or cost settings (``PASSWORD_HASH_ROUNDS``, ``PASSWORD_HASH_WORKERS``)
+on the same build; seed and server must use the same rounds.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.fixtures import create_login_users, latency_summary
+
+PASSWORD = "bench-password-123"
+
+
+def _seed(users: int) -> list[str]:
+    from db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return create_login_users(db, count=users, password=PASSWORD)
+    finally:
+        db.close()
+
+
+async def _login_loop(client: httpx.AsyncClient, emails, deadline: float, out: list[float], statuses: list[int]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/v1/auth/login", data={"username": next(emails), "password": PASSWORD}
+        )
+        out.append((time.perf_counter() - started) * 1000)
+        statuses.append(response.status_code)
+
+
+async def _probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float, out: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        out.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def run(base_url: str, users: int, concurrency: int, duration: float, cores: int, probe_interval: float) -> None:
+    emails = itertools.cycle(_seed(users))
+    login_ms: list[float] = []
+    probe_ms: list[float] = []
+    statuses: list[int] = []
+    stop = asyncio.Event()
+
+    limits = httpx.Limits(max_connections=concurrency + 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        probe_task = asyncio.create_task(_probe(client, stop, probe_interval, probe_ms))
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(_login_loop(client, emails, deadline, login_ms, statuses) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    ok = sum(1 for s in statuses if s == 200)
+    rate = ok / elapsed
+    print(
+        f"logins ok={ok}/{len(statuses)} in {elapsed:.1f}s: "
+        f"{rate:.1f} logins/s, {rate / cores:.1f} logins/s/core ({cores} cores)"
+    )
+    rejected = sum(1 for s in statuses if s == 503)
+    if rejected:
+        print(f"rejected by the hashing queue (503): {rejected}")
+    print(latency_summary("POST /login", login_ms))
+    print(latency_summary("GET /health", probe_ms))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of sustained logins")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1, help="Cores available to the server")
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="Seconds between health probes")
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.users, args.concurrency, args.duration, args.cores, args.probe_interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark: owner financials (``GET /owners/{id}/financials``) at fleet scale.
+
+Seeds one owner with ``--buses`` buses that ran ``--trips-per-bus`` trips each,
+then calls OwnerFinancialService directly (no HTTP) and reports latency and
+SQL statements per call. ``--compare-legacy`` also runs the old per-trip
+computation (tickets, packages with items and every withdrawal's cash
+transaction loaded trip by trip) and checks both return the same figures.
+
+    DATABASE_URL=... SECRET_KEY=... python benchmarks/owner_financials.py \\
+        --buses 10 --trips-per-bus 50 --compare-legacy
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from benchmarks.fixtures import create_owner_fixture, latency_summary
+from db.session import SessionLocal, engine
+from models.owner import Owner
+from models.owner_withdrawal import OwnerWithdrawal
+from models.package import Package
+from models.ticket import Ticket
+from models.trip import Trip
+from services.owner_financial_service import OwnerFinancialService
+
+
+def _legacy_financials(db, owner_id: int) -> list[dict]:
+    """The pre-aggregate computation: a handful of queries per trip."""
+    owner = db.get(Owner, owner_id)
+    trips = db.query(Trip).filter(Trip.bus_id.in_([b.id for b in owner.buses])).all()
+    result = []
+    for trip in trips:
+        totals = defaultdict(float)
+        offices = defaultdict(lambda: defaultdict(float))
+        names = {}
+
+        def add(office, field, amount, fallback_id=None):
+            totals[field] += amount
+            office_id = office.id if office else fallback_id
+            if office_id:
+                names.setdefault(office_id, office.name if office else f"Oficina {office_id}")
+                offices[office_id][field] += amount
+
+        for t in db.query(Ticket).filter(Ticket.trip_id == trip.id).all():
+            if t.state.lower() in ("confirmed", "completed"):
+                secretary = t.secretary if t.secretary and t.secretary.office_id else None
+                add(secretary.office if secretary else None, "tickets_amount", float(t.price),
+                    secretary.office_id if secretary else None)
+
+        for p in db.query(Package).filter(Package.trip_id == trip.id).all():
+            amount = float(p.total_amount or 0)
+            if amount <= 0:
+                continue
+            origin, origin_id = p.origin_office, p.origin_office_id
+            if not origin_id and p.secretary and p.secretary.office_id:
+                origin, origin_id = p.secretary.office, p.secretary.office_id
+            status = (p.status or "").lower()
+            if p.payment_status == "paid_on_send" or (
+                p.payment_status != "collect_on_delivery" and status in ("delivered", "paid", "pagado")
+            ):
+                add(origin, "packages_paid_amount", amount, origin_id)
+            elif p.payment_status == "collect_on_delivery" and status == "delivered":
+                add(p.destination_office, "packages_collected_amount", amount, p.destination_office_id)
+            elif p.payment_status == "collect_on_delivery" or p.destination_office_id:
+                add(p.destination_office, "packages_pending_amount", amount, p.destination_office_id)
+            else:
+                add(origin, "packages_pending_amount", amount, origin_id)
+
+        withdrawals = db.query(OwnerWithdrawal).filter(
+            OwnerWithdrawal.owner_id == owner_id, OwnerWithdrawal.trip_id == trip.id
+        ).all()
+        for w in withdrawals:
+            ct = w.cash_transaction
+            register = ct.cash_register
+            add(register.office if register else None, "withdrawn_amount", float(ct.amount),
+                register.office_id if register else None)
+
+        result.append({
+            "trip_id": trip.id,
+            "totals": {k: round(v, 2) for k, v in totals.items() if v},
+            "offices": {
+                oid: (names[oid], {k: round(v, 2) for k, v in d.items() if v})
+                for oid, d in offices.items()
+            },
+        })
+    return result
+
+
+def _comparable(financials: list[dict]) -> dict:
+    fields = (
+        "tickets_amount", "packages_paid_amount", "packages_collected_amount",
+        "packages_pending_amount", "withdrawn_amount",
+    )
+    out = {}
+    for f in financials:
+        totals = {k: f[k] for k in fields[:-1]}
+        totals["withdrawn_amount"] = f["total_withdrawn"]
+        out[f["trip_id"]] = (
+            {k: v for k, v in totals.items() if v},
+            {
+                o["office_id"]: (o["office_name"], {k: o[k] for k in fields if o[k]})
+                for o in f["office_breakdown"]
+            },
+        )
+    return out
+
+
+def _measure(label: str, fn, repeat: int):
+    statements = []
+    counter = lambda *args: statements.append(1)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", counter)
+    samples, result = [], None
+    try:
+        for _ in range(repeat):
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                result = fn(db)
+                samples.append((time.perf_counter() - started) * 1000)
+            finally:
+                db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    print(f"{latency_summary(label, samples)}  queries/call={len(statements) // repeat}")
+    return result
+
+
+def run(buses: int, trips_per_bus: int, tickets: int, packages: int, repeat: int, page_size: int, compare_legacy: bool) -> None:
+    db = SessionLocal()
+    try:
+        owner_id = create_owner_fixture(
+            db, buses=buses, trips_per_bus=trips_per_bus, tickets_per_trip=tickets, packages_per_trip=packages
+        )
+    finally:
+        db.close()
+    print(f"owner {owner_id}: {buses * trips_per_bus} trips, {tickets} tickets and {packages} packages each")
+
+    current = _measure("financials", lambda db: OwnerFinancialService(db).get_owner_trips_financials(owner_id), repeat)
+    _measure(
+        f"page({page_size})",
+        lambda db: OwnerFinancialService(db).get_owner_trips_financials(owner_id, limit=page_size),
+        repeat,
+    )
+    if compare_legacy:
+        legacy = _measure("legacy", lambda db: _legacy_financials(db, owner_id), repeat)
+        expected = {r["trip_id"]: (r["totals"], r["offices"]) for r in legacy}
+        same = _comparable(current) == expected
+        print(f"output matches old computation: {same}")
+        if not same:
+            sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--buses", type=int, default=10)
+    parser.add_argument("--trips-per-bus", type=int, default=50)
+    parser.add_argument("--tickets", type=int, default=20, help="Tickets (and seats) per trip")
+    parser.add_argument("--packages", type=int, default=4, help="Packages per trip")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--compare-legacy", action="store_true", help="Also run and diff the per-trip computation")
+    args = parser.parse_args()
+    run(args.buses, args.trips_per_bus, args.tickets, args.packages, args.repeat, args.page_size, args.compare_legacy)
+
+
+if __name__ == "__main__":
+    main()
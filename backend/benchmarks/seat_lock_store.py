@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: seat lock store at 10k concurrent locks across 200 trips.
+
+Drives SeatLockService directly against REDIS_URL (no HTTP, no database):
+locks every seat of every trip from ``--workers`` threads (``--users``
+holders per trip), then takes a full snapshot of each trip (what a new
+viewer or a resyncing client costs) and finally has each holder bulk-unlock
+its seats. With ``--compare-legacy`` the same locks are also written as one
+``SET EX`` key per seat and snapshotted the old way (``SCAN`` + ``GET`` +
+``TTL`` per key) for a side-by-side number.
+
+Keys live under a ``bench_seat_lock`` prefix and are removed afterwards, but
+still point REDIS_URL at a disposable instance:
+
+    REDIS_URL=redis://localhost:6379 DATABASE_URL=... SECRET_KEY=... \\
+        python benchmarks/seat_lock_store.py --trips 200 --seats 50 --workers 32
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import latency_summary
+from core.redis import redis_client
+from services.seat_lock_service import SeatLockService
+
+PREFIX = "bench_seat_lock"
+LEGACY_PREFIX = "bench_seat_lock_legacy"
+
+
+class BenchSeatLockService(SeatLockService):
+    KEY_PREFIX = PREFIX
+
+
+def _timed(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def _legacy_snapshot(trip_id: int) -> list[dict]:
+    """The pre-hash layout: SCAN the keyspace, then GET and TTL every match."""
+    client = redis_client.client
+    locked = []
+    for key in client.scan_iter(match=f"{LEGACY_PREFIX}:{trip_id}:*", count=100):
+        locked.append({
+            "seat_id": int(key.rsplit(":", 1)[1]),
+            "user_id": int(client.get(key) or 0),
+            "ttl": client.ttl(key),
+        })
+    return locked
+
+
+def _cleanup() -> None:
+    client = redis_client.client
+    for pattern in (f"{PREFIX}:*", f"{LEGACY_PREFIX}:*"):
+        batch = []
+        for key in client.scan_iter(match=pattern, count=1000):
+            batch.append(key)
+            if len(batch) == 1000:
+                client.unlink(*batch)
+                batch = []
+        if batch:
+            client.unlink(*batch)
+
+
+def _holder(seat: int, users: int) -> int:
+    return seat % users + 1
+
+
+def run(trips: int, seats: int, users: int, workers: int, compare_legacy: bool) -> None:
+    service = BenchSeatLockService()
+    jobs = [(trip, seat) for trip in range(1, trips + 1) for seat in range(1, seats + 1)]
+    seats_by_user = {
+        user: [seat for seat in range(1, seats + 1) if _holder(seat, users) == user]
+        for user in range(1, users + 1)
+    }
+    _cleanup()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        started = time.perf_counter()
+        lock_ms = list(pool.map(
+            lambda job: _timed(service.lock_seat, job[0], job[1], _holder(job[1], users)), jobs
+        ))
+        lock_elapsed = time.perf_counter() - started
+
+        locked = sum(len(service.get_locked_seats(trip)) for trip in range(1, trips + 1))
+        snapshot_ms = list(pool.map(lambda trip: _timed(service.get_locked_seats, trip), range(1, trips + 1)))
+
+        legacy_ms: list[float] = []
+        if compare_legacy:
+            client = redis_client.client
+            for trip in range(1, trips + 1):
+                pipe = client.pipeline(transaction=False)
+                for seat in range(1, seats + 1):
+                    pipe.set(f"{LEGACY_PREFIX}:{trip}:{seat}", seat, ex=300)
+                pipe.execute()
+            legacy_ms = list(pool.map(lambda trip: _timed(_legacy_snapshot, trip), range(1, trips + 1)))
+
+        # What a disconnect does: each holder releases all of its seats on the trip.
+        unlock_ms = list(pool.map(
+            lambda job: _timed(service.unlock_seats_bulk, job[0], seats_by_user[job[1]], job[1]),
+            [(trip, user) for trip in range(1, trips + 1) for user in seats_by_user],
+        ))
+
+    _cleanup()
+
+    print(f"locks={len(jobs)} trips={trips} seats/trip={seats} workers={workers} "
+          f"held={locked} in {lock_elapsed:.2f}s ({len(jobs) / lock_elapsed:.0f} locks/s)")
+    print(latency_summary("lock_seat", lock_ms))
+    print(latency_summary("snapshot", snapshot_ms))
+    if legacy_ms:
+        print(latency_summary("snapshot(old)", legacy_ms))
+    print(latency_summary("bulk unlock", unlock_ms))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trips", type=int, default=200)
+    parser.add_argument("--seats", type=int, default=50)
+    parser.add_argument("--users", type=int, default=5, help="Lock holders per trip")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--compare-legacy", action="store_true", help="Also time the SCAN-based snapshot")
+    args = parser.parse_args()
+    run(args.trips, args.seats, args.users, args.workers, args.compare_legacy)
+
+
+if __name__ == "__main__":
+    main()
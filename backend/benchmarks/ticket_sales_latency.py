@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: p99 latency under concurrent ticket sales.
+
+Sells every seat of a freshly seeded trip with ``--concurrency`` parallel
+``POST /api/v1/tickets`` calls while a probe keeps hitting ``GET /health``.
+If sync work runs on the event loop, the probe latency tracks the slowest sale;
+with route handlers served from the thread pool it stays flat.
+
+Run it against a disposable database, once per build you want to compare:
+
+    DATABASE_URL=... SECRET_KEY=... uvicorn main:app --port 8000 &
+    DATABASE_URL=... SECRET_KEY=... python benchmarks/ticket_sales_latency.py --seats 45 --concurrency 15
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.fixtures import create_sale_fixture, latency_summary
+
+
+def _seed(seats: int):
+    from auth.jwt import create_access_token
+    from db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        fixture = create_sale_fixture(db, seats=seats)[0]
+    finally:
+        db.close()
+    token = create_access_token(data={"sub": fixture.operator_email, "role": "secretary"})
+    return fixture, token
+
+
+async def _sell(client: httpx.AsyncClient, fixture, seat_id: int, sem: asyncio.Semaphore, out: list[float]) -> int:
+    async with sem:
+        started = time.perf_counter()
+        response = await client.post("/api/v1/tickets", json={
+            "state": "confirmed",
+            "seat_id": seat_id,
+            "client_id": fixture.client_id,
+            "trip_id": fixture.trip_id,
+            "price": 50.0,
+            "payment_method": "cash",
+            "operator_user_id": fixture.operator_user_id,
+        })
+        out.append((time.perf_counter() - started) * 1000)
+        return response.status_code
+
+
+async def _probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float, out: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        out.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def run(base_url: str, seats: int, concurrency: int, probe_interval: float) -> None:
+    fixture, token = _seed(seats)
+    sales_ms: list[float] = []
+    probe_ms: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+
+    limits = httpx.Limits(max_connections=concurrency + 2)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        probe_task = asyncio.create_task(_probe(client, stop, probe_interval, probe_ms))
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(_sell(client, fixture, sid, sem, sales_ms) for sid in fixture.seat_ids))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    ok = sum(1 for s in statuses if s == 201)
+    print(f"trip={fixture.trip_id} sold={ok}/{len(statuses)} in {elapsed:.2f}s ({ok / elapsed:.1f} sales/s)")
+    print(latency_summary("POST /tickets", sales_ms))
+    print(latency_summary("GET /health", probe_ms))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--seats", type=int, default=45)
+    parser.add_argument("--concurrency", type=int, default=15)
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="Seconds between health probes")
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.seats, args.concurrency, args.probe_interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ticket sales per second through TicketService.
+
+Seeds ``--trips`` trips of ``--seats`` seats and sells every seat with
+``--workers`` threads, each selling its own trips with a fresh session per
+sale (no HTTP). Reports sales/s, latency and SQL statements per sale.
+``--compare-legacy`` repeats it on a second set of trips with the old sale path
+(one lookup per checked row, a read-then-write seat check and a second commit
+for the cash transaction). Seat locks go to ``REDIS_URL`` as in production.
+
+    DATABASE_URL=... SECRET_KEY=... python benchmarks/ticket_sales_throughput.py \\
+        --trips 8 --seats 45 --workers 4 --compare-legacy
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from benchmarks.fixtures import create_sale_fixture, latency_summary
+from core.exceptions import ConflictException, NotFoundException, ValidationException
+from db.session import SessionLocal, engine
+from models.ticket import Ticket
+from repositories.ticket_repository import occupies_seat
+from schemas.ticket import TicketCreate
+from services.ticket_service import TicketService
+
+
+class _LegacyTicketService(TicketService):
+    """TicketService with the sale path it used before."""
+
+    def create_ticket(self, data: TicketCreate) -> Ticket:
+        from services.cash_register_service import CashRegisterService
+        from schemas.cash_register import CashTransactionCreate
+        from core.enums import CashTransactionType, PaymentMethod
+
+        seat = self.repo.get_seat_by_id(data.seat_id)
+        if not seat:
+            raise NotFoundException(f"Seat with id {data.seat_id} not found")
+        if not self.repo.get_client_by_id(data.client_id):
+            raise NotFoundException(f"Client with id {data.client_id} not found")
+        trip = self.repo.get_trip_by_id(data.trip_id)
+        if not trip:
+            raise NotFoundException(f"Trip with id {data.trip_id} not found")
+        actual_secretary_id = self._resolve_secretary(data.operator_user_id)
+        if trip.trip_datetime < datetime.now() or seat.bus_id != trip.bus_id:
+            raise ValidationException("Seat and trip do not match")
+        if self.lock_service.get_lock_holder(data.trip_id, data.seat_id) not in (None, data.operator_user_id):
+            raise ConflictException("El asiento está temporalmente bloqueado por otro usuario.")
+        if self.repo.get_active_by_seat_and_trip(data.seat_id, data.trip_id):
+            raise ConflictException(f"Seat with id {data.seat_id} is already booked for trip {data.trip_id}")
+
+        cash_service = CashRegisterService(self.db)
+        secretary = self.repo.get_secretary_by_id(actual_secretary_id)
+        office_id = secretary.office_id if secretary and secretary.office_id else 1
+        current_register = cash_service.get_current_register(office_id)
+        if not current_register:
+            raise ValidationException("No hay caja abierta para su oficina.")
+
+        new_ticket = Ticket(
+            state=data.state.lower(),
+            seat_id=data.seat_id,
+            client_id=data.client_id,
+            trip_id=data.trip_id,
+            destination=data.destination,
+            secretary_id=actual_secretary_id,
+            price=data.price,
+            payment_method=data.payment_method.lower(),
+        )
+        with self.stats.track(new_ticket):
+            self.repo.create_ticket(new_ticket)
+            if occupies_seat(new_ticket.state):
+                self.repo.adjust_trip_occupied_seats(new_ticket.trip_id, 1)
+            self.repo.log_state_change(
+                ticket_id=new_ticket.id, new_state=new_ticket.state, changed_by_user_id=data.operator_user_id
+            )
+        self.db.commit()
+        self.db.refresh(new_ticket)
+
+        if new_ticket.state in ["completed", "confirmed"] and new_ticket.price > 0:
+            cash_service.record_transaction(
+                CashTransactionCreate(
+                    cash_register_id=current_register.id,
+                    type=CashTransactionType.TICKET_SALE,
+                    amount=new_ticket.price,
+                    payment_method=PaymentMethod(data.payment_method.lower()),
+                    reference_id=new_ticket.id,
+                    reference_type="ticket",
+                    description=f"Venta de boleto {new_ticket.id} para viaje {data.trip_id}",
+                )
+            )
+        self.lock_service.mark_sold(data.trip_id, [data.seat_id])
+        return new_ticket
+
+
+def _sell_all(service_cls, fixtures, samples: list[float]) -> None:
+    for fixture in fixtures:
+        for seat_id in fixture.seat_ids:
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                service_cls(db).create_ticket(TicketCreate(
+                    state="confirmed",
+                    seat_id=seat_id,
+                    client_id=fixture.client_id,
+                    trip_id=fixture.trip_id,
+                    price=50.0,
+                    payment_method="cash",
+                    operator_user_id=fixture.operator_user_id,
+                ))
+                samples.append((time.perf_counter() - started) * 1000)
+            finally:
+                db.close()
+
+
+def _measure(label: str, service_cls, fixtures, workers: int) -> None:
+    statements = []
+    counter = lambda *args: statements.append(1)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", counter)
+    samples: list[float] = []
+    threads = [
+        threading.Thread(target=_sell_all, args=(service_cls, fixtures[n::workers], samples))
+        for n in range(workers)
+    ]
+    try:
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    sales = len(samples)
+    print(
+        f"{latency_summary(label, samples)}  sales/s={sales / elapsed:7.1f}  "
+        f"queries/sale={len(statements) / max(sales, 1):.1f}"
+    )
+
+
+def run(trips: int, seats: int, workers: int, compare_legacy: bool) -> None:
+    db = SessionLocal()
+    try:
+        fixtures = create_sale_fixture(db, seats=seats, trips=trips)
+        legacy = create_sale_fixture(db, seats=seats, trips=trips) if compare_legacy else []
+    finally:
+        db.close()
+    print(f"{trips} trips of {seats} seats, {workers} workers")
+
+    _measure("sale", TicketService, fixtures, workers)
+    if compare_legacy:
+        _measure("legacy sale", _LegacyTicketService, legacy, workers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trips", type=int, default=8)
+    parser.add_argument("--seats", type=int, default=45, help="Seats sold on each trip")
+    parser.add_argument("--workers", type=int, default=4, help="Threads selling in parallel, one trip at a time")
+    parser.add_argument("--compare-legacy", action="store_true", help="Also run the old sale path")
+    args = parser.parse_args()
+    run(args.trips, args.seats, args.workers, args.compare_legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,58 @@ class Settings:
     DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
     DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
 
+    # Worker threads for sync route handlers and run_in_threadpool calls.
+    # Defaults to the DB pool capacity so every thread can hold a connection.
+    API_THREADPOOL_SIZE: int = int(os.getenv("API_THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
+    # Redis circuit breaker: open after N consecutive connection errors, then
+    # re-probe in the background with exponential backoff.
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", "2"))
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("REDIS_BREAKER_FAILURE_THRESHOLD", "3"))
+    REDIS_BREAKER_BACKOFF_SECONDS: float = float(os.getenv("REDIS_BREAKER_BACKOFF_SECONDS", "1"))
+    REDIS_BREAKER_BACKOFF_MAX_SECONDS: float = float(os.getenv("REDIS_BREAKER_BACKOFF_MAX_SECONDS", "30"))
+
+    # Seat lock WebSockets: each connection gets a bounded outbound queue drained
+    # by its own writer task; a send slower than the timeout drops the viewer.
+    WS_SEND_QUEUE_SIZE: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "64"))
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+    # "redis" fans events out to every worker; "memory" keeps them in-process
+    WS_BACKPLANE: str = os.getenv("WS_BACKPLANE", "redis")
+
+    # Authenticated users are cached per worker for this long (0 disables the cache)
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "1000"))
+
+    # "local" answers revocation checks from a per-worker Bloom filter kept in
+    # sync over pub/sub; "redis" asks Redis on every request
+    JWT_BLACKLIST_MODE: str = os.getenv("JWT_BLACKLIST_MODE", "local")
+    JWT_BLACKLIST_FILTER_CAPACITY: int = int(os.getenv("JWT_BLACKLIST_FILTER_CAPACITY", "100000"))
+    JWT_BLACKLIST_FILTER_FP_RATE: float = float(os.getenv("JWT_BLACKLIST_FILTER_FP_RATE", "0.001"))
+    JWT_BLACKLIST_RECENT_SIZE: int = int(os.getenv("JWT_BLACKLIST_RECENT_SIZE", "10000"))
+    # Confirm filter hits with Redis; when false a false positive rejects the token
+    JWT_BLACKLIST_FP_FALLBACK: bool = os.getenv("JWT_BLACKLIST_FP_FALLBACK", "true").lower() == "true"
+    JWT_BLACKLIST_SYNC_SECONDS: float = float(os.getenv("JWT_BLACKLIST_SYNC_SECONDS", "30"))
+
+    # Password hashing cost (sha256_crypt rounds). Stored hashes outside
+    # [MIN, MAX] are rehashed with PASSWORD_HASH_ROUNDS on the next login.
+    PASSWORD_HASH_ROUNDS: int = int(os.getenv("PASSWORD_HASH_ROUNDS", "80000"))
+    PASSWORD_HASH_MIN_ROUNDS: int = int(os.getenv("PASSWORD_HASH_MIN_ROUNDS", "29000"))
+    PASSWORD_HASH_MAX_ROUNDS: int = int(os.getenv("PASSWORD_HASH_MAX_ROUNDS", "200000"))
+    # Hashing processes per API worker (0 hashes inline in the request thread)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS", "10"))
+
+    # /stats responses are cached this long (0 disables); the last EARLY_REFRESH
+    # seconds are recomputed by one request while the rest get the cached copy
+    STATS_CACHE_TTL_SECONDS: float = float(os.getenv("STATS_CACHE_TTL_SECONDS", "30"))
+    STATS_CACHE_EARLY_REFRESH_SECONDS: float = float(os.getenv("STATS_CACHE_EARLY_REFRESH_SECONDS", "5"))
+    STATS_CACHE_LOCK_SECONDS: float = float(os.getenv("STATS_CACHE_LOCK_SECONDS", "5"))
+    STATS_CACHE_MAX_ENTRIES: int = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "512"))
+
     SEAT_LOCK_TTL_SECONDS: int = int(os.getenv("SEAT_LOCK_TTL_SECONDS", "300"))
+    # How often each worker releases lapsed locks of the trips its sockets watch
+    SEAT_LOCK_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("SEAT_LOCK_SWEEP_INTERVAL_SECONDS", "1"))
     TRIP_MIN_DEPARTURE_BUFFER_MINUTES: int = int(os.getenv("TRIP_MIN_DEPARTURE_BUFFER_MINUTES", "30"))
     TRIP_CONFLICT_BUFFER_HOURS: int = int(os.getenv("TRIP_CONFLICT_BUFFER_HOURS", "2"))
     CASH_REGISTER_HISTORY_DAYS: int = int(os.getenv("CASH_REGISTER_HISTORY_DAYS", "7"))
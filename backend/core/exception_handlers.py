@@ -23,6 +23,7 @@ _CODE_TO_STATUS: dict[str, int] = {
     "FORBIDDEN": 403,
     "UNAUTHORIZED": 401,
     "INVALID_STATE_TRANSITION": 400,
+    "SERVICE_UNAVAILABLE": 503,
     "APP_ERROR": 500,
 }
 
@@ -50,6 +50,13 @@ class UnauthorizedException(AppException):
         super().__init__(message=message, code="UNAUTHORIZED")
 
 
+class ServiceUnavailableException(AppException):
+    """Raised when the server is temporarily overloaded and the client should retry."""
+
+    def __init__(self, message: str = "Servicio no disponible temporalmente"):
+        super().__init__(message=message, code="SERVICE_UNAVAILABLE")
+
+
 class InvalidStateTransitionException(AppException):
     """Raised when an entity state transition is not allowed.
 
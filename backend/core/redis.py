@@ -1,6 +1,119 @@
+import logging
+import threading
+import time
 import redis
 import os
-from typing import Optional
+from typing import Any, Callable, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisUnavailableError(redis.exceptions.ConnectionError):
+    """Se lanza sin tocar la red mientras el circuit breaker está abierto."""
+
+
+class RedisHealth:
+    """
+    Circuit breaker que sigue la salud de Redis a partir de las llamadas reales.
+
+    - Cerrado: las llamadas pasan; ``failure_threshold`` errores de conexión
+      consecutivos lo abren (detección pasiva, sin PING previo).
+    - Abierto: ``allow_request()`` responde desde memoria y los llamadores usan
+      su fallback. Un hilo en segundo plano re-sondea con backoff exponencial
+      y cierra el circuito en cuanto Redis responde.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(
+        self,
+        probe: Callable[[], Any],
+        *,
+        failure_threshold: int = 3,
+        backoff_seconds: float = 1.0,
+        backoff_max_seconds: float = 30.0,
+    ):
+        self._probe = probe
+        self._failure_threshold = max(1, failure_threshold)
+        self._backoff_seconds = backoff_seconds
+        self._backoff_max_seconds = backoff_max_seconds
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_total = 0
+        self.closed_total = 0
+        self.probe_failures_total = 0
+        self.last_error: Optional[str] = None
+        self.last_transition_at: Optional[float] = None
+
+    def allow_request(self) -> bool:
+        return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        if self.consecutive_failures:
+            with self._lock:
+                self.consecutive_failures = 0
+
+    def record_failure(self, error: BaseException) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            if self.state == self.CLOSED and self.consecutive_failures >= self._failure_threshold:
+                self._open_locked()
+
+    def trip(self, error: BaseException) -> None:
+        """Abre el circuito de inmediato (p. ej. Redis caído al arrancar)."""
+        with self._lock:
+            self.last_error = str(error)
+            if self.state == self.CLOSED:
+                self._open_locked()
+
+    def _open_locked(self) -> None:
+        self.state = self.OPEN
+        self.opened_total += 1
+        self.last_transition_at = time.time()
+        logger.warning("Redis circuit opened: %s", self.last_error)
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe_loop, name="redis-health-probe", daemon=True)
+            self._prober.start()
+
+    def _close(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.closed_total += 1
+            self.last_transition_at = time.time()
+        logger.info("Redis circuit closed, connection restored")
+
+    def _probe_loop(self) -> None:
+        delay = self._backoff_seconds
+        while True:
+            time.sleep(delay)
+            try:
+                self._probe()
+            except Exception as e:
+                self.probe_failures_total += 1
+                self.last_error = str(e)
+                delay = min(delay * 2, self._backoff_max_seconds)
+                continue
+            self._close()
+            return
+
+    def metrics(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_total": self.opened_total,
+            "closed_total": self.closed_total,
+            "probe_failures_total": self.probe_failures_total,
+            "last_transition_at": self.last_transition_at,
+        }
+
 
 class RedisClient:
     """
@@ -8,39 +121,74 @@ class RedisClient:
     """
     _instance = None
     _redis_client = None
-    
+    health: Optional[RedisHealth] = None
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(RedisClient, cls).__new__(cls)
         return cls._instance
-    
+
     def __init__(self):
+        if self.health is None:
+            self.health = RedisHealth(
+                self._ping,
+                failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+                backoff_seconds=settings.REDIS_BREAKER_BACKOFF_SECONDS,
+                backoff_max_seconds=settings.REDIS_BREAKER_BACKOFF_MAX_SECONDS,
+            )
         if self._redis_client is None:
             self._connect()
-    
+
     def _connect(self):
-        """Establece la conexión con Redis."""
+        """Establece la conexión con Redis; si no responde, arranca con el circuito abierto."""
         redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+        self._redis_client = redis.from_url(
+            redis_url,
+            decode_responses=True,
+            health_check_interval=30,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        )
         try:
-            self._redis_client = redis.from_url(
-                redis_url,
-                decode_responses=True,
-                health_check_interval=30
-            )
             # Prueba la conexión
             self._redis_client.ping()
         except Exception as e:
-            raise ConnectionError(f"Failed to connect to Redis at {redis_url}: {str(e)}")
-    
+            logger.warning("Failed to connect to Redis at %s: %s", redis_url, e)
+            self.health.trip(e)
+
+    def _ping(self) -> None:
+        self._redis_client.ping()
+
     @property
     def client(self) -> redis.Redis:
         """Retorna el cliente Redis."""
         if self._redis_client is None:
             self._connect()
         return self._redis_client
-    
+
+    def is_available(self) -> bool:
+        """Disponibilidad según el circuit breaker, sin ida y vuelta a Redis."""
+        return self.health.allow_request()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Ejecuta ``fn`` (un comando o script de Redis) a través del circuit breaker.
+
+        Falla de inmediato con ``RedisUnavailableError`` si el circuito está
+        abierto; los errores de conexión/timeout cuentan como fallos.
+        """
+        if not self.health.allow_request():
+            raise RedisUnavailableError("Redis circuit is open")
+        try:
+            result = fn(*args, **kwargs)
+        except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
+            self.health.record_failure(e)
+            raise
+        self.health.record_success()
+        return result
+
     def is_connected(self) -> bool:
-        """Verifica si la conexión a Redis está activa."""
+        """Verifica si la conexión a Redis está activa (PING explícito)."""
         try:
             self._redis_client.ping()
             return True
@@ -48,4 +196,4 @@ class RedisClient:
             return False
 
 # Instancia global del cliente Redis
-redis_client = RedisClient()
\ No newline at end of file
+redis_client = RedisClient()
@@ -3,21 +3,39 @@ Security utilities - password hashing/verification extracted from models/user.py
 
 Following SRP: models should only define data structure + relationships,
 not contain cryptographic logic.
+
+sha256_crypt runs as pure Python here and holds the GIL for the whole hash
+(~50 ms at 80k rounds), so hashing and verification run in a dedicated,
+bounded process pool instead of the request thread. Cost is tuned with the
+PASSWORD_HASH_* settings; stored hashes outside the min/max rounds are
+upgraded transparently on the next successful login.
 """
 
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, TypeVar
+
 from passlib.context import CryptContext
 
+from core.config import settings
+from core.exceptions import ServiceUnavailableException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
 _pwd_context = CryptContext(
     schemes=["sha256_crypt"],
     deprecated="auto",
-    sha256_crypt__min_rounds=29000,
-    sha256_crypt__max_rounds=200000,
-    sha256_crypt__default_rounds=80000,
+    sha256_crypt__min_rounds=settings.PASSWORD_HASH_MIN_ROUNDS,
+    sha256_crypt__max_rounds=settings.PASSWORD_HASH_MAX_ROUNDS,
+    sha256_crypt__default_rounds=settings.PASSWORD_HASH_ROUNDS,
 )
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a plain-text password using sha256_crypt."""
+def _hash(password: str) -> str:
     if isinstance(password, str):
         password_bytes = password.encode("utf-8")
         if len(password_bytes) > 72:
@@ -25,11 +43,80 @@ def get_password_hash(password: str) -> str:
     return _pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain-text password against a stored hash."""
+def _verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
     try:
-        return _pwd_context.verify(plain_password, hashed_password)
+        return _pwd_context.verify_and_update(plain_password, hashed_password)
     except Exception as exc:
-        import logging
-        logging.getLogger(__name__).error("Error verificando contraseña: %s", exc)
-        return False
+        logger.error("Error verificando contraseña: %s", exc)
+        return False, None
+
+
+class PasswordHasher:
+    """
+    Bounded executor for password hashing.
+
+    ``workers`` processes do the hashing (0 runs it inline, in the calling
+    thread). At most ``max_pending`` calls may be queued or running; a caller
+    that cannot get a slot within ``queue_timeout`` seconds gets a 503 instead
+    of pinning an API thread behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int, queue_timeout: float):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.rejected_total = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # spawn: forking a process that already runs threads is unsafe
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._pool
+
+    def run(self, fn: Callable[..., T], *args) -> T:
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.rejected_total += 1
+            raise ServiceUnavailableException("Servidor ocupado, intente iniciar sesión nuevamente")
+        try:
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+def get_password_hash(password: str) -> str:
+    """Hash a plain-text password using sha256_crypt."""
+    return password_hasher.run(_hash, password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain-text password against a stored hash."""
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password and, when the stored hash no longer matches the current
+    cost settings, also return a fresh hash to store (else None).
+    """
+    return password_hasher.run(_verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,234 @@
+"""
+Pub/sub backplane for seat lock WebSocket events.
+
+With several uvicorn workers (or containers) each process only holds its own
+sockets. Events are published to a per-trip channel and every subscribed
+worker hands them to its local SeatLockWSManager, including the one that
+published them.
+
+- ``RedisBackplane``: ``PUBLISH seat_lock_events:<trip_id>``; one listener
+  thread per worker pattern-subscribes to every trip channel and to Redis
+  ``expired`` keyspace events. When a trip's lock hash expires as a whole its
+  viewers get a ``seat_locks_stale`` hint and resync.
+- ``InMemoryBackplane``: same interface inside one process (tests, single
+  worker setups).
+
+The backplane also counts each user's sockets per trip across workers
+(``join``/``leave``), so a socket closing on one worker can tell whether the
+user is still connected on another one, e.g. after a page refresh.
+
+Payloads are already-encoded JSON strings. If Redis is unavailable, publishing
+falls back to local delivery so viewers on the same worker still get updates.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Callable, Optional
+
+from core.config import settings
+from core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[int, str], None]
+
+CHANNEL_PREFIX = "seat_lock_events"
+PRESENCE_PREFIX = "seat_lock_presence"
+# Refreshed on every join; bounds what a crashed worker leaves behind
+PRESENCE_TTL_SECONDS = 24 * 3600
+EXPIRED_EVENTS_PATTERN = "__keyevent@*__:expired"
+# Lock hash layout from services.seat_lock_service (seat_lock:{<trip_id>})
+_LOCK_HASH_KEY = re.compile(r"seat_lock:\{(\d+)\}")
+
+# Decrement a user's socket count and drop the field at zero, atomically
+_LEAVE_SCRIPT = """
+local remaining = redis.call('HINCRBY', KEYS[1], ARGV[1], -1)
+if remaining <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return remaining
+"""
+
+
+class _Subscribers:
+    """Local deliver callbacks, each bound to the event loop it must run on."""
+
+    def __init__(self):
+        self._subscribers: list[tuple[asyncio.AbstractEventLoop, Deliver]] = []
+
+    def add(self, loop: asyncio.AbstractEventLoop, deliver: Deliver) -> None:
+        self._subscribers.append((loop, deliver))
+
+    def remove(self, deliver: Deliver) -> None:
+        self._subscribers = [(l, d) for l, d in self._subscribers if d != deliver]
+
+    def __bool__(self) -> bool:
+        return bool(self._subscribers)
+
+    def dispatch(self, trip_id: int, payload: str) -> None:
+        for loop, deliver in list(self._subscribers):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(deliver, trip_id, payload)
+
+
+class InMemoryBackplane:
+    """Process-local backplane: delivers straight to the subscribed managers."""
+
+    def __init__(self):
+        self._subscribers = _Subscribers()
+        self._presence: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop, deliver: Deliver) -> None:
+        self._subscribers.add(loop, deliver)
+
+    def unsubscribe(self, deliver: Deliver) -> None:
+        self._subscribers.remove(deliver)
+
+    def publish(self, trip_id: int, payload: str) -> None:
+        self._subscribers.dispatch(trip_id, payload)
+
+    def join(self, trip_id: int, user_id: int) -> None:
+        with self._lock:
+            self._presence[trip_id, user_id] += 1
+
+    def leave(self, trip_id: int, user_id: int) -> bool:
+        """Drop one of the user's sockets; True while others remain."""
+        with self._lock:
+            self._presence[trip_id, user_id] -= 1
+            if self._presence[trip_id, user_id] > 0:
+                return True
+            del self._presence[trip_id, user_id]
+            return False
+
+
+class RedisBackplane:
+    """Redis pub/sub backplane shared by every worker."""
+
+    def __init__(self, reconnect_seconds: float = settings.REDIS_BREAKER_BACKOFF_SECONDS):
+        self._subscribers = _Subscribers()
+        self._reconnect_seconds = reconnect_seconds
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def channel(trip_id: int) -> str:
+        return f"{CHANNEL_PREFIX}:{trip_id}"
+
+    @staticmethod
+    def presence_key(trip_id: int) -> str:
+        return f"{PRESENCE_PREFIX}:{trip_id}"
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop, deliver: Deliver) -> None:
+        self._subscribers.add(loop, deliver)
+        if self._listener is None or not self._listener.is_alive():
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen, name="ws-backplane", daemon=True)
+            self._listener.start()
+
+    def unsubscribe(self, deliver: Deliver) -> None:
+        self._subscribers.remove(deliver)
+        if not self._subscribers:
+            self._stop.set()
+
+    def publish(self, trip_id: int, payload: str) -> None:
+        try:
+            redis_client.call(redis_client.client.publish, self.channel(trip_id), payload)
+        except Exception as e:
+            logger.warning("Backplane publish failed, delivering locally only: %s", e)
+            self._subscribers.dispatch(trip_id, payload)
+
+    def join(self, trip_id: int, user_id: int) -> None:
+        def _join(client):
+            pipe = client.pipeline()
+            pipe.hincrby(self.presence_key(trip_id), user_id, 1)
+            pipe.expire(self.presence_key(trip_id), PRESENCE_TTL_SECONDS)
+            pipe.execute()
+
+        try:
+            redis_client.call(_join, redis_client.client)
+        except Exception as e:
+            logger.warning("Could not record WS presence for trip %d, user %d: %s", trip_id, user_id, e)
+
+    def leave(self, trip_id: int, user_id: int) -> bool:
+        """Drop one of the user's sockets; True while others remain on any worker.
+
+        Also True when Redis cannot tell: the locks are then left to their
+        TTL and the expiry sweeper instead of being released early.
+        """
+        try:
+            remaining = redis_client.call(
+                redis_client.client.eval, _LEAVE_SCRIPT, 1, self.presence_key(trip_id), user_id
+            )
+        except Exception as e:
+            logger.warning("Could not read WS presence for trip %d, user %d: %s", trip_id, user_id, e)
+            return True
+        return int(remaining) > 0
+
+    def _enable_expiry_events(self, client) -> None:
+        """Make sure Redis emits ``expired`` keyevents (E + x flags); managed Redis may refuse."""
+        try:
+            flags = client.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+            missing = ""
+            if "E" not in flags:
+                missing += "E"
+            if "x" not in flags and "A" not in flags:  # "A" already includes "x"
+                missing += "x"
+            if missing:
+                client.config_set("notify-keyspace-events", flags + missing)
+        except Exception as e:
+            logger.warning("Could not enable Redis keyspace notifications: %s", e)
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            if not redis_client.is_available():
+                self._stop.wait(self._reconnect_seconds)
+                continue
+            pubsub = None
+            try:
+                client = redis_client.client
+                self._enable_expiry_events(client)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{CHANNEL_PREFIX}:*", EXPIRED_EVENTS_PATTERN)
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message:
+                        self.handle_message(message)
+            except Exception as e:
+                logger.warning("Backplane listener lost Redis, retrying: %s", e)
+                self._stop.wait(self._reconnect_seconds)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def handle_message(self, message: dict) -> None:
+        """Route one pub/sub message (a trip event or an ``expired`` keyevent) to local viewers."""
+        if message.get("type") != "pmessage":
+            return
+        if message["pattern"] == EXPIRED_EVENTS_PATTERN:
+            match = _LOCK_HASH_KEY.fullmatch(message["data"])
+            if match:
+                trip_id = int(match.group(1))
+                self._subscribers.dispatch(
+                    trip_id, json.dumps({"type": "seat_locks_stale", "trip_id": trip_id})
+                )
+            return
+        try:
+            trip_id = int(message["channel"].rsplit(":", 1)[1])
+        except (ValueError, IndexError):
+            return
+        self._subscribers.dispatch(trip_id, message["data"])
+
+
+def create_backplane():
+    """Backplane selected by ``WS_BACKPLANE`` ("redis" or "memory")."""
+    if settings.WS_BACKPLANE == "memory":
+        return InMemoryBackplane()
+    return RedisBackplane()
@@ -2,33 +2,98 @@
 WebSocket connection manager for real-time seat lock notifications.
 
 Manages per-trip connection groups so lock/unlock events are broadcast
-only to users viewing the same trip. When a connection disconnects,
-automatically releases all seat locks held by that user for the trip.
+only to users viewing the same trip. When a user's last connection to a trip
+closes, on any worker, all seat locks they hold for the trip are released.
+
+Seat changes travel as small delta events (``seat_locked``, ``seat_released``,
+``seat_sold``) stamped with the trip's sequence number. Each event is JSON
+encoded once and the same text frame is sent to every viewer; clients that
+notice a gap in the sequence ask for a fresh snapshot over the socket.
+Events go out through a backplane (core.ws_backplane) so viewers connected
+to other workers receive them too.
+
+Delivery never waits on a socket: every connection has a bounded outbound
+queue drained by its own writer task, so one slow office link cannot delay
+the other viewers or the request that published the event.
+
+- Queue full: the backlog is discarded (counted as dropped) and replaced by a
+  ``seat_locks_stale`` hint, so the client resyncs instead of replaying it.
+- Send slower than ``WS_SEND_TIMEOUT_SECONDS``: the viewer is a slow consumer
+  and is disconnected; the client reconnects and starts from a snapshot.
 """
 
+import asyncio
+import json
 import logging
+from typing import Callable, Optional
+
+import anyio.to_thread
+
 from fastapi import WebSocket
 
+from core.config import settings
+from core.ws_backplane import create_backplane
+
 logger = logging.getLogger(__name__)
 
+# Close code for slow consumers ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
 
 class WSConnection:
-    __slots__ = ('ws', 'user_id')
+    __slots__ = ('ws', 'user_id', 'trip_id', 'queue', 'writer', 'dropped')
 
-    def __init__(self, ws: WebSocket, user_id: int):
+    def __init__(self, ws: WebSocket, user_id: int, trip_id: int, queue_size: int):
         self.ws = ws
         self.user_id = user_id
+        self.trip_id = trip_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max(2, queue_size))
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped = 0
 
 
 class SeatLockWSManager:
     """Manages WebSocket connections grouped by trip_id."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS,
+        backplane=None,
+    ):
         self._connections: dict[int, list[WSConnection]] = {}
+        self._backplane = backplane if backplane is not None else create_backplane()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue_size = queue_size
+        self._send_timeout = send_timeout
+
+        self.sent_total = 0
+        self.dropped_total = 0
+        self.stale_hints_total = 0
+        self.slow_consumers_total = 0
+
+    def _subscribe(self) -> None:
+        """Start receiving backplane events on the running loop (first viewer on this worker)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            self._backplane.unsubscribe(self.broadcast_text)
+        self._loop = loop
+        self._backplane.subscribe(loop, self.broadcast_text)
+
+    def close(self) -> None:
+        """Stop receiving backplane events (application shutdown)."""
+        if self._loop is not None:
+            self._backplane.unsubscribe(self.broadcast_text)
+            self._loop = None
 
     async def connect(self, trip_id: int, ws: WebSocket, user_id: int) -> WSConnection:
+        self._subscribe()
         await ws.accept()
-        conn = WSConnection(ws=ws, user_id=user_id)
+        conn = WSConnection(ws=ws, user_id=user_id, trip_id=trip_id, queue_size=self._queue_size)
+        conn.writer = asyncio.create_task(self._write_loop(conn))
+        await anyio.to_thread.run_sync(self._backplane.join, trip_id, user_id)
         if trip_id not in self._connections:
             self._connections[trip_id] = []
         self._connections[trip_id].append(conn)
@@ -36,15 +101,20 @@ class SeatLockWSManager:
         return conn
 
     def disconnect(self, trip_id: int, conn: WSConnection):
-        conns = self._connections.get(trip_id)
+        self._forget(conn)
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+        logger.debug("WS disconnected for trip %d, user %d", trip_id, conn.user_id)
+
+    def _forget(self, conn: WSConnection) -> None:
+        conns = self._connections.get(conn.trip_id)
         if conns:
             try:
                 conns.remove(conn)
             except ValueError:
                 pass
             if not conns:
-                del self._connections[trip_id]
-        logger.debug("WS disconnected for trip %d, user %d", trip_id, conn.user_id)
+                del self._connections[conn.trip_id]
 
     def user_has_other_connections(self, trip_id: int, user_id: int) -> bool:
         """Check if a user still has active connections for a trip (after disconnect)."""
@@ -53,26 +123,98 @@ class SeatLockWSManager:
             return False
         return any(c.user_id == user_id for c in conns)
 
-    async def broadcast(self, trip_id: int, data: dict):
-        """Send data to all connections watching a trip."""
-        conns = self._connections.get(trip_id)
-        if not conns:
+    async def leave(self, conn: WSConnection) -> bool:
+        """Count ``conn`` out of its user's presence; True while the user is
+        still connected to the trip on this or another worker."""
+        return await anyio.to_thread.run_sync(self._backplane.leave, conn.trip_id, conn.user_id)
+
+    def publish(self, trip_id: int, event: dict) -> None:
+        """
+        Send an event to every connection watching a trip, on any worker.
+
+        Safe to call from worker threads (services run there): the payload is
+        encoded here, once, and the backplane hands it to each worker's event
+        loop in publish order.
+        """
+        self._backplane.publish(trip_id, json.dumps(event, separators=(",", ":")))
+
+    def broadcast_text(self, trip_id: int, payload: str) -> None:
+        """Enqueue an already-encoded message on every connection of a trip (event loop only)."""
+        for conn in self._connections.get(trip_id, ()):
+            self.send(conn, payload)
+
+    def send(self, conn: WSConnection, payload: str) -> None:
+        """Enqueue a message for one connection without waiting on the socket."""
+        try:
+            conn.queue.put_nowait(payload)
             return
-
-        dead = []
-        for conn in conns:
+        except asyncio.QueueFull:
+            pass
+
+        # The viewer is too far behind for deltas to be useful: drop the
+        # backlog and tell it to resync from a snapshot.
+        dropped = 1
+        while not conn.queue.empty():
+            conn.queue.get_nowait()
+            dropped += 1
+        conn.dropped += dropped
+        self.dropped_total += dropped
+        self.stale_hints_total += 1
+        conn.queue.put_nowait(json.dumps({"type": "seat_locks_stale", "trip_id": conn.trip_id}))
+        logger.warning(
+            "WS queue full for trip %d, user %d: dropped %d messages", conn.trip_id, conn.user_id, dropped
+        )
+
+    async def _write_loop(self, conn: WSConnection) -> None:
+        while True:
+            payload = await conn.queue.get()
             try:
-                await conn.ws.send_json(data)
+                await asyncio.wait_for(conn.ws.send_text(payload), timeout=self._send_timeout)
+            except asyncio.TimeoutError:
+                self.slow_consumers_total += 1
+                logger.warning(
+                    "WS slow consumer on trip %d, user %d: send exceeded %.1fs, disconnecting",
+                    conn.trip_id, conn.user_id, self._send_timeout,
+                )
+                self._forget(conn)
+                try:
+                    await asyncio.wait_for(conn.ws.close(code=SLOW_CONSUMER_CLOSE_CODE), timeout=1)
+                except Exception:
+                    pass
+                return
             except Exception:
-                dead.append(conn)
-
-        for conn in dead:
+                self._forget(conn)
+                return
+            self.sent_total += 1
+
+    async def sweep_expired_locks(self, sweep: Callable[[list[int]], object], interval: float) -> None:
+        """
+        Every ``interval`` seconds let ``sweep`` release lapsed locks of the trips
+        viewed on this worker (SeatLockService.sweep_expired). The resulting
+        ``seat_released`` events go through the backplane like any other change.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            trip_ids = list(self._connections)
+            if not trip_ids:
+                continue
             try:
-                conns.remove(conn)
-            except ValueError:
-                pass
-        if not conns:
-            self._connections.pop(trip_id, None)
+                await anyio.to_thread.run_sync(sweep, trip_ids)
+            except Exception:
+                logger.exception("Seat lock expiry sweep failed")
+
+    def metrics(self) -> dict:
+        depths = [c.queue.qsize() for conns in self._connections.values() for c in conns]
+        return {
+            "trips": len(self._connections),
+            "connections": len(depths),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "sent_total": self.sent_total,
+            "dropped_total": self.dropped_total,
+            "stale_hints_total": self.stale_hints_total,
+            "slow_consumers_total": self.slow_consumers_total,
+        }
 
 
 # Global singleton
@@ -0,0 +1,48 @@
+"""
+Genera los viajes de los horarios activos (route_schedules) para un rango de
+fechas, en una sola transacción.
+
+Las salidas que ya tienen viaje en esa ruta se saltan, así que volver a
+ejecutarlo sobre el mismo rango no crea nada nuevo. Cada viaje hereda el bus,
+conductor y ayudante del último viaje con la misma ruta y hora de salida; los
+que quedarían con doble asignación se dejan sin asignar y se listan.
+
+    PYTHONPATH=. uv run python db/materialize_schedules.py --from AAAA-MM-DD --to AAAA-MM-DD \\
+        --secretary-id N [--no-carry-over] [--dry-run]
+"""
+
+import argparse
+from datetime import date
+
+from db.session import SessionLocal
+from models.route_schedule import RouteSchedule  # noqa: F401 - registra Route.schedules
+from services.trip_service import TripService
+
+
+def materialize(date_from: date, date_to: date, secretary_id: int, carry_over: bool = True, dry_run: bool = False) -> dict:
+    db = SessionLocal()
+    try:
+        result = TripService(db).materialize_schedules(
+            date_from, date_to, secretary_id, carry_over=carry_over, dry_run=dry_run
+        )
+        for item in result["unassigned"]:
+            print(
+                f"ruta {item['route_id']} {item['trip_datetime']:%Y-%m-%d %H:%M}: "
+                f"{item['resource']} {item['resource_id']} ocupado, queda sin asignar"
+            )
+        verb = "se crearían" if dry_run else "creados"
+        print(f"{result['created']} viajes {verb}, {result['existing']} salidas ya existían")
+        return result
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the trips of the active route schedules for a date range")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, required=True, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, required=True, help="Last day, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--secretary-id", type=int, required=True, help="Secretary recorded as the trips' creator")
+    parser.add_argument("--no-carry-over", action="store_true", help="Leave bus, driver and assistant unassigned")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be created without writing")
+    args = parser.parse_args()
+    materialize(args.date_from, args.date_to, args.secretary_id, carry_over=not args.no_carry_over, dry_run=args.dry_run)
@@ -0,0 +1,53 @@
+"""
+Reconstruye la tabla daily_stats (resumen diario de las estadísticas) a partir
+de boletos, encomiendas y movimientos de caja.
+
+Las ventas, cambios de estado y movimientos de caja actualizan el resumen al
+escribir; este script lo carga por primera vez después de la migración y
+corrige la deriva que dejen escrituras directas en la base.
+
+    PYTHONPATH=. uv run python db/rebuild_daily_stats.py [--since AAAA-MM-DD] [--dry-run]
+"""
+
+import argparse
+from datetime import date
+
+from db.session import SessionLocal
+from models.route_schedule import RouteSchedule  # noqa: F401 - registra Route.schedules
+from repositories.daily_stats_repository import DailyStatsRepository
+
+
+def rebuild(since: date | None = None, dry_run: bool = False) -> int:
+    db = SessionLocal()
+    try:
+        repo = DailyStatsRepository(db)
+        start = since or date.min
+        stored = repo.totals(start, date.max)
+        written = repo.rebuild(since)
+        rebuilt = repo.totals(start, date.max)
+
+        drifted = 0
+        for metric in sorted(stored.keys() | rebuilt.keys()):
+            before = stored.get(metric, (0, 0.0))
+            after = rebuilt.get(metric, (0, 0.0))
+            if before[0] != after[0] or abs(before[1] - after[1]) >= 0.01:
+                drifted += 1
+                print(f"{metric}: count {before[0]} -> {after[0]}, amount {before[1]:.2f} -> {after[1]:.2f}")
+
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        verb = "would be written" if dry_run else "written"
+        print(f"{written} rows {verb}, {drifted} metrics drifted")
+        return drifted
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily_stats rollup from the raw tables")
+    parser.add_argument("--since", type=date.fromisoformat, help="Only rebuild days from this date (YYYY-MM-DD)")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without writing")
+    args = parser.parse_args()
+    rebuild(since=args.since, dry_run=args.dry_run)
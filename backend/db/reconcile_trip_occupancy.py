@@ -0,0 +1,38 @@
+"""
+Recalcula trips.occupied_seats a partir de la tabla de boletos.
+
+El contador se mantiene en cada venta/cancelación; este script corrige la
+deriva que dejen escrituras directas en la base (cargas masivas, SQL manual).
+
+    PYTHONPATH=. uv run python db/reconcile_trip_occupancy.py [--dry-run]
+"""
+
+import argparse
+
+from db.session import SessionLocal
+from models.route_schedule import RouteSchedule  # noqa: F401 - registra Route.schedules
+from repositories.trip_repository import TripRepository
+
+
+def reconcile(dry_run: bool = False) -> int:
+    db = SessionLocal()
+    try:
+        drifted = TripRepository(db).reconcile_occupied_seats()
+        for trip_id, stored, actual in drifted:
+            print(f"trip {trip_id}: occupied_seats {stored} -> {actual}")
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        verb = "would be corrected" if dry_run else "corrected"
+        print(f"{len(drifted)} trips {verb}")
+        return len(drifted)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile trips.occupied_seats with tickets")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without writing")
+    args = parser.parse_args()
+    reconcile(dry_run=args.dry_run)
@@ -27,6 +27,7 @@ from models.owner_withdrawal import OwnerWithdrawal
 from models.route_schedule import RouteSchedule
 from models.cash_register import CashRegister
 from models.cash_transaction import CashTransaction
+from repositories.trip_repository import TripRepository
 from core.enums import CashRegisterStatus, CashTransactionType, PaymentMethod
 from db.base import Base
 from db.session import get_db
@@ -599,6 +600,10 @@ def seed_db():
         db.commit()
         print(f"{len(tickets_batch)} tickets created with history")
 
+        # Tickets were inserted directly, so bring the denormalized counter in line.
+        TripRepository(db).reconcile_occupied_seats()
+        db.commit()
+
         # ── Packages + History + Items ──
         location_to_office = {off.location_id: off.id for off in offices.values()}
         office_ids = [off.id for off in offices.values()]
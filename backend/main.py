@@ -8,6 +8,10 @@ if str(BASE_DIR) not in sys.path:
 from core.logging_config import setup_logging
 setup_logging()
 
+import asyncio
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI, Request
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
@@ -19,6 +23,9 @@ from db.session import engine
 from api.v1.api import api_router as api_router_v1
 from core.exception_handlers import register_exception_handlers
 from core.config import settings
+from core.security import password_hasher
+from core.ws_manager import seat_lock_ws
+from services.seat_lock_service import SeatLockService
 
 # pylint: disable=unused-import
 from models.driver import Driver
@@ -40,6 +47,7 @@ from models.ticket_state_history import TicketStateHistory
 from models.route_schedule import RouteSchedule
 from models.owner import Owner
 from models.owner_withdrawal import OwnerWithdrawal
+from models.daily_stat import DailyStat
 # pylint: enable=unused-import
 
 
@@ -56,6 +64,22 @@ def get_rate_limiter():
 
 limiter = get_rate_limiter()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync route handlers, sync dependencies and run_in_threadpool all share
+    # anyio's default limiter; size it to the DB pool instead of anyio's 40.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+    # Announce lapsed seat locks as soon as they expire, instead of on the next change
+    sweeper = asyncio.create_task(seat_lock_ws.sweep_expired_locks(
+        SeatLockService().sweep_expired, settings.SEAT_LOCK_SWEEP_INTERVAL_SECONDS
+    ))
+    yield
+    sweeper.cancel()
+    seat_lock_ws.close()
+    password_hasher.shutdown()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     description="API para la gestión de boletos, paquetes y viajes de Trans Comarapa.",
@@ -63,7 +87,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan,
 )
 
 if not settings.TESTING:
@@ -78,6 +103,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "Accept"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
 # Incluir el router de la versión 1 con el prefijo /api/v1
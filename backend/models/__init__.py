@@ -20,6 +20,7 @@ from .cash_register import CashRegister
 from .cash_transaction import CashTransaction
 from .owner import Owner
 from .owner_withdrawal import OwnerWithdrawal
+from .daily_stat import DailyStat
 
 __all__ = [
     "User",
@@ -43,5 +44,6 @@ __all__ = [
     "CashRegister",
     "CashTransaction",
     "Owner",
-    "OwnerWithdrawal"
+    "OwnerWithdrawal",
+    "DailyStat",
 ]
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Date, Numeric, UniqueConstraint, Index
+
+from db.base import Base
+
+
+class DailyStat(Base):
+    """
+    Rollup of the dashboard metrics: one row per (day, office, metric).
+
+    Maintained incrementally by the ticket, package and cash write paths
+    (repositories/daily_stats_repository.py) and rebuilt from the raw tables
+    with db/rebuild_daily_stats.py. ``office_id`` 0 means "no office".
+    """
+    __tablename__ = 'daily_stats'
+    __table_args__ = (
+        UniqueConstraint('day', 'office_id', 'metric', name='uq_daily_stats_day_office_metric'),
+        Index('ix_daily_stats_metric_day', 'metric', 'day'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    office_id = Column(Integer, nullable=False, default=0)
+    metric = Column(String(50), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyStat(day={self.day}, office_id={self.office_id}, metric='{self.metric}', count={self.count}, amount={self.amount})>"
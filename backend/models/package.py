@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy import ForeignKey
@@ -7,6 +7,9 @@ from db.base import Base
 
 class Package(Base):
     __tablename__ = "packages"
+    __table_args__ = (
+        Index('ix_packages_created_at_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True)
     tracking_number = Column(String(20), unique=True, nullable=False)
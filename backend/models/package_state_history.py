@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func # For server_default=func.now() if needed, or use datetime
 from datetime import datetime, timezone
@@ -8,6 +8,9 @@ from db.base import Base # Assuming your Base is in db.base
 
 class PackageStateHistory(Base):
     __tablename__ = "package_state_history"
+    __table_args__ = (
+        Index('ix_package_state_history_state_changed_at', 'new_state', 'changed_at', 'package_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     package_id = Column(Integer, ForeignKey("packages.id"), nullable=False, index=True)
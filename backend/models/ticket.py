@@ -1,15 +1,25 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, Computed, Integer, String, DateTime, ForeignKey, Numeric, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from db.base import Base
 
 class Ticket(Base):
     __tablename__ = 'tickets'
+    __table_args__ = (
+        Index('ix_tickets_state_created_at', 'state', 'created_at'),
+        Index('ix_tickets_created_at_id', 'created_at', 'id'),
+        # One active ticket per seat and trip; NULLs (inactive tickets) never collide
+        Index('uq_tickets_trip_active_seat', 'trip_id', 'active_seat_id', unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     state = Column(String(255), nullable=False)
     seat_id = Column(Integer, ForeignKey('seats.id'), nullable=False)
     seat = relationship('Seat', back_populates='tickets')
+    active_seat_id = Column(
+        Integer,
+        Computed("CASE WHEN state IN ('pending', 'confirmed') THEN seat_id END", persisted=True),
+    )
     client_id = Column(Integer, ForeignKey('clients.id'), nullable=False)
     client = relationship('Client', back_populates='tickets')
     trip_id = Column(Integer, ForeignKey('trips.id'), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from db.base import Base # Assuming your Base is in db.base
@@ -6,6 +6,10 @@ from models.user import User # Assuming User model for changed_by_user_id
 
 class TicketStateHistory(Base):
     __tablename__ = "ticket_state_history"
+    __table_args__ = (
+        # Stats: "tickets that reached <state> between two dates"
+        Index('ix_ticket_state_history_state_changed_at', 'new_state', 'changed_at', 'ticket_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False, index=True)
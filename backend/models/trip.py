@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -6,10 +6,20 @@ from db.base import Base
 
 class Trip(Base):
     __tablename__ = 'trips'
+    __table_args__ = (
+        Index('ix_trips_trip_datetime_id', 'trip_datetime', 'id'),
+        # Schedule conflict checks: one range per resource (TripRepository.get_trips_sharing_resources)
+        Index('ix_trips_driver_id_trip_datetime', 'driver_id', 'trip_datetime'),
+        Index('ix_trips_bus_id_trip_datetime', 'bus_id', 'trip_datetime'),
+        Index('ix_trips_assistant_id_trip_datetime', 'assistant_id', 'trip_datetime'),
+    )
 
     id = Column(Integer, primary_key=True)
     trip_datetime = Column(DateTime, nullable=False)
     status = Column(String(50), nullable=False, default='scheduled', index=True)
+    # Denormalized count of non-cancelled tickets, maintained in the same
+    # transaction as every ticket write (see TicketRepository.adjust_trip_occupied_seats).
+    occupied_seats = Column(Integer, nullable=False, default=0, server_default="0")
     
     driver_id = Column(Integer, ForeignKey('drivers.id'))
     driver = relationship("Driver", back_populates="trips")
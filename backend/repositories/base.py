@@ -4,16 +4,85 @@ Generic base repository providing common CRUD operations.
 All specific repositories inherit from BaseRepository and add
 domain-specific query methods. The base uses `flush()` instead of
 `commit()` so the calling service controls the transaction boundary.
+
+Listings can also be paged by keyset: the client passes back an opaque
+cursor holding the sort key of the last row it got, and the next page starts
+right after it, so deep pages cost the same as the first one. The total is
+optional (``count``): exact, estimated from the query plan, or skipped.
 """
 
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Generic, TypeVar, Type, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
 
-from core.exceptions import NotFoundException
+from core.exceptions import NotFoundException, ValidationException
 
 ModelType = TypeVar("ModelType")
 
+COUNT_MODES = ("exact", "estimated", "none")
+MAX_PAGE_SIZE = 500
+
+
+@dataclass
+class Page(Generic[ModelType]):
+    """One keyset page: its rows, the total (None if not counted) and the next cursor."""
+
+    items: list[ModelType]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: tuple) -> str:
+    """Opaque, URL-safe cursor for a row's sort key."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> tuple:
+    """Sort key stored in ``cursor``, typed after ``columns``."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError("wrong key length")
+        return tuple(
+            datetime.fromisoformat(v) if column.type.python_type is datetime else column.type.python_type(v)
+            for column, v in zip(columns, raw)
+        )
+    except (ValueError, TypeError, NotImplementedError):
+        raise ValidationException("Cursor de paginación inválido")
+
+
+def _after(columns: list, values: tuple, descending: bool):
+    """Rows past ``values`` in the ``columns`` order.
+
+    Spelled as ``a <= x AND (a < x OR (b, ...) past (y, ...))`` rather than a
+    row-value comparison, which MySQL does not turn into an index range.
+    """
+    first, value = columns[0], values[0]
+    if len(columns) == 1:
+        return first < value if descending else first > value
+    strictly = first < value if descending else first > value
+    bound = first <= value if descending else first >= value
+    return and_(bound, or_(strictly, _after(columns[1:], values[1:], descending)))
+
+
+def explain_statement(query: Query, dialect) -> tuple[str, tuple | dict]:
+    """``EXPLAIN`` of ``query`` and its parameters, shaped for the driver.
+
+    Positional drivers (pymysql renders ``%s``) take a tuple in
+    ``positiontup`` order; named ones take the dict.
+    """
+    compiled = query.statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    return "EXPLAIN " + str(compiled), params
+
 
 class BaseRepository(Generic[ModelType]):
     """Generic CRUD repository for SQLAlchemy models."""
@@ -43,6 +112,74 @@ class BaseRepository(Generic[ModelType]):
             .all()
         )
 
+    def get_page(self, *, cursor: Optional[str] = None, limit: int = 100, count: str = "none") -> Page[ModelType]:
+        """Keyset page of records, newest first (by ``created_at`` when the model has it)."""
+        return self.keyset_page(
+            self.db.query(self.model), self.keyset_columns(), cursor=cursor, limit=limit, count=count
+        )
+
+    def keyset_columns(self) -> list:
+        """Sort key of ``get_page``; it must end with the primary key so it is unique."""
+        created_at = getattr(self.model, "created_at", None)
+        return [created_at, self.model.id] if created_at is not None else [self.model.id]
+
+    def keyset_page(
+        self,
+        query: Query,
+        columns: list,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        count: str = "none",
+        descending: bool = True,
+    ) -> Page:
+        """Page of ``query`` ordered by ``columns``, starting after ``cursor``.
+
+        The key columns must end with a unique one; with an index on them, the
+        page is a range scan whatever its depth. Rows with a NULL in a key
+        column have no position in the order and are left out (migration
+        e5a9c3f17b42 backfills the ``created_at`` keys). The count covers the
+        whole filtered query, not just what follows the cursor.
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValidationException(f"El límite por página debe estar entre 1 y {MAX_PAGE_SIZE}")
+        query = query.filter(*(c.isnot(None) for c in columns if c.nullable))
+        total = self.count_rows(query, count)
+        if cursor:
+            query = query.filter(_after(columns, decode_cursor(cursor, columns), descending))
+        query = query.order_by(*(c.desc() if descending else c.asc() for c in columns))
+
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(tuple(getattr(rows[-1], c.key) for c in columns))
+        return Page(items=rows, total=total, next_cursor=next_cursor)
+
+    def count_rows(self, query: Query, mode: str = "exact") -> Optional[int]:
+        """Rows matched by ``query``: counted, estimated by the planner, or None."""
+        if mode not in COUNT_MODES:
+            raise ValidationException(f"Modo de conteo inválido: {mode}")
+        if mode == "none":
+            return None
+        query = query.order_by(None)
+        if mode == "estimated":
+            estimate = self._estimated_count(query)
+            if estimate is not None:
+                return estimate
+        return query.count()
+
+    def _estimated_count(self, query: Query) -> Optional[int]:
+        """MySQL's row estimate for the driving table of ``query`` (None elsewhere)."""
+        dialect = self.db.get_bind().dialect
+        if dialect.name != "mysql":
+            return None
+        sql, params = explain_statement(query, dialect)
+        plan = self.db.connection().exec_driver_sql(sql, params).mappings().first()
+        if not plan or plan.get("rows") is None:
+            return None
+        return int(plan["rows"] * float(plan.get("filtered") or 100) / 100)
+
     def create(self, obj: ModelType) -> ModelType:
         """Add a new record and flush (without committing)."""
         self.db.add(obj)
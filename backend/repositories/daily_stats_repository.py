@@ -0,0 +1,426 @@
+"""
+Daily rollup of the dashboard metrics (``daily_stats``).
+
+Each ticket and package contributes a fixed set of ``(day, office, metric)``
+cells, computed from its current state and its state history exactly like
+the original aggregate queries did (e.g. a confirmation counts on the day it
+happened, but only while the ticket is still confirmed or completed).
+Write paths wrap their changes in ``track(obj)``: the object's contribution
+is taken before and after, and only the difference is added to the rollup,
+with atomic ``count = count + n`` upserts so concurrent sales never lose
+increments. Cash transactions are append-only and just add one cell.
+
+``rebuild`` recomputes the same cells from the raw tables with GROUP BY
+queries (backfill, or repair after direct writes to the database).
+"""
+
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Iterator, Optional
+
+from sqlalchemy import Integer, cast, delete, extract, func, insert, inspect
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models.cash_register import CashRegister
+from models.cash_transaction import CashTransaction
+from models.daily_stat import DailyStat
+from models.package import Package
+from models.package_item import PackageItem
+from models.package_state_history import PackageStateHistory
+from models.secretary import Secretary
+from models.ticket import Ticket
+from models.ticket_state_history import TicketStateHistory
+
+# Tickets, by creation day
+TICKETS_CREATED = "tickets_created"
+TICKETS_CREATED_CANCELLED = "tickets_created_cancelled"  # currently cancelled
+TICKETS_PENDING = "tickets_pending"  # currently pending
+# Tickets, by state change day
+TICKETS_CONFIRMED = "tickets_confirmed"  # while confirmed/completed; amount = price
+TICKETS_CANCELLED = "tickets_cancelled"  # while cancelled
+TICKETS_RESERVED = "tickets_reserved"  # tickets that went to pending that day
+# Packages
+PACKAGES_CREATED = "packages_created"  # by creation day; amount = items total
+PACKAGES_REVENUE = "packages_revenue"  # items of packages in PACKAGE_REVENUE_STATUSES
+PACKAGES_IN_TRANSIT = "packages_in_transit"  # packages that went in_transit that day
+PACKAGES_DELIVERED = "packages_delivered"  # packages delivered that day
+# Cash: one metric per transaction type, e.g. "cash_ticket_sale"
+CASH_PREFIX = "cash_"
+
+TICKET_REVENUE_STATES = ("confirmed", "completed")
+PACKAGE_REVENUE_STATUSES = ("registered", "in_transit", "delivered")
+_PACKAGE_HISTORY_METRICS = {"in_transit": PACKAGES_IN_TRANSIT, "delivered": PACKAGES_DELIVERED}
+
+NO_OFFICE = 0
+
+Cell = tuple[date, int, str]
+Contribution = dict[Cell, list]  # cell -> [count, amount]
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):  # SQLite returns DATE() as text
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _add(contribution: Contribution, day, office_id: Optional[int], metric: str, count: int, amount=0) -> None:
+    cell = contribution.setdefault((_as_date(day), office_id or NO_OFFICE, metric), [0, 0.0])
+    cell[0] += count
+    cell[1] += float(amount or 0)
+
+
+class DailyStatsRepository:
+    def __init__(self, db: Session):
+        self.db = db
+        self._secretary_offices: dict[int, Optional[int]] = {}
+
+    # -- Incremental maintenance --------------------------------------------
+
+    @contextmanager
+    def track(self, *objs) -> Iterator[None]:
+        """Add to the rollup whatever the wrapped changes did to these tickets/packages.
+
+        Works for creations (no contribution before) and deletions (none after).
+        Flushes on exit; the caller commits.
+        """
+        before = self._contributions(objs)
+        yield
+        self.db.flush()
+        self.apply(before, self._contributions(objs))
+
+    @contextmanager
+    def track_rows(self, model, ids: list[int]) -> Iterator[None]:
+        """``track`` for set-based writes to many tickets or packages, given by id.
+
+        Takes the rows' contribution with the same grouped queries ``rebuild``
+        uses, so the cost does not grow with the number of rows.
+        """
+        if not ids:
+            yield
+            return
+        before = self._stored_contributions(model, ids)
+        yield
+        self.db.flush()
+        self.apply(before, self._stored_contributions(model, ids))
+
+    def _stored_contributions(self, model, ids: list[int]) -> Contribution:
+        queries = self._ticket_queries if model is Ticket else self._package_queries
+        total: Contribution = {}
+        for metric, query in queries(None, ids):
+            for day, office_id, count, amount in query.all():
+                if day is not None and count:
+                    _add(total, day, office_id, metric, int(count), amount)
+        return total
+
+    def _contributions(self, objs) -> Contribution:
+        total: Contribution = {}
+        for obj in objs:
+            if isinstance(obj, Ticket):
+                contribution = self.ticket_contribution(obj)
+            elif isinstance(obj, Package):
+                contribution = self.package_contribution(obj)
+            else:
+                continue
+            for (day, office_id, metric), (count, amount) in contribution.items():
+                _add(total, day, office_id, metric, count, amount)
+        return total
+
+    @staticmethod
+    def _is_stored(obj) -> bool:
+        state = inspect(obj, raiseerr=False)
+        return state is not None and state.persistent and obj.id is not None
+
+    def _secretary_office(self, secretary_id: Optional[int]) -> Optional[int]:
+        if secretary_id not in self._secretary_offices:
+            self._secretary_offices[secretary_id] = (
+                self.db.query(Secretary.office_id).filter(Secretary.id == secretary_id).scalar()
+                if secretary_id else None
+            )
+        return self._secretary_offices[secretary_id]
+
+    def ticket_contribution(self, ticket: Ticket) -> Contribution:
+        contribution: Contribution = {}
+        if not self._is_stored(ticket):
+            return contribution
+        office_id = self._secretary_office(ticket.secretary_id)
+        price = ticket.price or 0
+
+        if ticket.created_at is not None:
+            _add(contribution, ticket.created_at, office_id, TICKETS_CREATED, 1, price)
+            if ticket.state == "cancelled":
+                _add(contribution, ticket.created_at, office_id, TICKETS_CREATED_CANCELLED, 1, price)
+            elif ticket.state == "pending":
+                _add(contribution, ticket.created_at, office_id, TICKETS_PENDING, 1, price)
+
+        history = (
+            self.db.query(TicketStateHistory.new_state, TicketStateHistory.changed_at)
+            .filter(
+                TicketStateHistory.ticket_id == ticket.id,
+                TicketStateHistory.new_state.in_(("confirmed", "cancelled", "pending")),
+            )
+            .all()
+        )
+        reserved_days = set()
+        for new_state, changed_at in history:
+            if new_state == "confirmed" and ticket.state in TICKET_REVENUE_STATES:
+                _add(contribution, changed_at, office_id, TICKETS_CONFIRMED, 1, price)
+            elif new_state == "cancelled" and ticket.state == "cancelled":
+                _add(contribution, changed_at, office_id, TICKETS_CANCELLED, 1, price)
+            elif new_state == "pending":
+                reserved_days.add(changed_at.date())
+        for day in reserved_days:
+            _add(contribution, day, office_id, TICKETS_RESERVED, 1)
+        return contribution
+
+    def package_contribution(self, package: Package) -> Contribution:
+        contribution: Contribution = {}
+        if not self._is_stored(package):
+            return contribution
+        office_id = package.origin_office_id
+
+        if package.created_at is not None:
+            item_count, items_total = (
+                self.db.query(func.count(PackageItem.id), func.sum(PackageItem.total_price))
+                .filter(PackageItem.package_id == package.id)
+                .one()
+            )
+            _add(contribution, package.created_at, office_id, PACKAGES_CREATED, 1, items_total)
+            if item_count and package.status in PACKAGE_REVENUE_STATUSES:
+                _add(contribution, package.created_at, office_id, PACKAGES_REVENUE, item_count, items_total)
+
+        history = (
+            self.db.query(PackageStateHistory.new_state, PackageStateHistory.changed_at)
+            .filter(
+                PackageStateHistory.package_id == package.id,
+                PackageStateHistory.new_state.in_(tuple(_PACKAGE_HISTORY_METRICS)),
+            )
+            .all()
+        )
+        for new_state, day in {(s, changed_at.date()) for s, changed_at in history}:
+            _add(contribution, day, office_id, _PACKAGE_HISTORY_METRICS[new_state], 1)
+        return contribution
+
+    def record_cash_transaction(self, transaction: CashTransaction) -> None:
+        """Add a new cash transaction to the rollup. Flushes; the caller commits."""
+        self.db.flush()
+        if not self._is_stored(transaction):
+            return
+        office_id = (
+            self.db.query(CashRegister.office_id)
+            .filter(CashRegister.id == transaction.cash_register_id)
+            .scalar()
+        )
+        tx_type = getattr(transaction.type, "value", transaction.type)
+        contribution: Contribution = {}
+        _add(contribution, transaction.created_at, office_id, CASH_PREFIX + tx_type, 1, transaction.amount)
+        self.apply({}, contribution)
+
+    def apply(self, before: Contribution, after: Contribution) -> None:
+        """Add ``after - before`` to the stored cells."""
+        rows = []
+        for cell in sorted(before.keys() | after.keys()):  # fixed order: fewer lock waits
+            count_before, amount_before = before.get(cell, (0, 0.0))
+            count_after, amount_after = after.get(cell, (0, 0.0))
+            count = count_after - count_before
+            amount = round(amount_after - amount_before, 2)
+            if count or amount:
+                day, office_id, metric = cell
+                rows.append({
+                    "day": day, "office_id": office_id, "metric": metric,
+                    "count": count, "amount": Decimal(str(amount)),
+                })
+        if rows:
+            self._increment(rows)
+
+    def _increment(self, rows: list[dict]) -> None:
+        if self.db.get_bind().dialect.name == "mysql":
+            stmt = mysql_insert(DailyStat).values(rows)
+            stmt = stmt.on_duplicate_key_update(
+                count=DailyStat.count + stmt.inserted.count,
+                amount=DailyStat.amount + stmt.inserted.amount,
+            )
+        else:
+            stmt = sqlite_insert(DailyStat).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day", "office_id", "metric"],
+                set_={
+                    "count": DailyStat.count + stmt.excluded.count,
+                    "amount": DailyStat.amount + stmt.excluded.amount,
+                },
+            )
+        self.db.execute(stmt)
+
+    # -- Reads ----------------------------------------------------------------
+
+    def totals(
+        self, start_date: date, end_date: date, metrics: Optional[list[str]] = None
+    ) -> dict[str, tuple[int, float]]:
+        """``{metric: (count, amount)}`` over ``[start_date, end_date]``, all offices.
+
+        Requested metrics with no rows come back as ``(0, 0.0)``; without
+        ``metrics`` every stored metric is returned.
+        """
+        query = (
+            self.db.query(
+                DailyStat.metric,
+                func.coalesce(func.sum(DailyStat.count), 0),
+                func.coalesce(func.sum(DailyStat.amount), 0),
+            )
+            .filter(DailyStat.day >= start_date, DailyStat.day <= end_date)
+        )
+        if metrics is not None:
+            query = query.filter(DailyStat.metric.in_(metrics))
+        result = {metric: (0, 0.0) for metric in metrics or ()}
+        for metric, count, amount in query.group_by(DailyStat.metric).all():
+            result[metric] = (int(count), float(amount))
+        return result
+
+    def monthly(self, start_date: date, metric: str):
+        """Rows of ``(year, month, count, amount)`` from ``start_date`` on."""
+        return (
+            self.db.query(
+                extract("year", DailyStat.day).label("year"),
+                extract("month", DailyStat.day).label("month"),
+                cast(func.coalesce(func.sum(DailyStat.count), 0), Integer).label("count"),
+                func.coalesce(func.sum(DailyStat.amount), 0).label("amount"),
+            )
+            .filter(DailyStat.metric == metric, DailyStat.day >= start_date)
+            .group_by(extract("year", DailyStat.day), extract("month", DailyStat.day))
+            .order_by(extract("year", DailyStat.day), extract("month", DailyStat.day))
+            .all()
+        )
+
+    # -- Rebuild ----------------------------------------------------------------
+
+    def rebuild(self, start_date: Optional[date] = None) -> int:
+        """Recompute every cell from ``start_date`` on (all history if None).
+
+        Returns the number of rows written. Flushes; the caller commits.
+        """
+        since = datetime.combine(start_date, time.min) if start_date else None
+        clear = delete(DailyStat)
+        if start_date:
+            clear = clear.where(DailyStat.day >= start_date)
+        self.db.execute(clear)
+
+        rows = []
+        for metric, query in self._rebuild_queries(since):
+            for day, office_id, count, amount in query.all():
+                rows.append({
+                    "day": _as_date(day), "office_id": office_id or NO_OFFICE, "metric": metric,
+                    "count": int(count), "amount": Decimal(str(round(float(amount or 0), 2))),
+                })
+        cash = self._cash_rebuild_query(since)
+        for day, office_id, tx_type, count, amount in cash.all():
+            rows.append({
+                "day": _as_date(day), "office_id": office_id or NO_OFFICE,
+                "metric": CASH_PREFIX + getattr(tx_type, "value", tx_type),
+                "count": int(count), "amount": Decimal(str(round(float(amount or 0), 2))),
+            })
+
+        for i in range(0, len(rows), 1000):
+            self.db.execute(insert(DailyStat), rows[i:i + 1000])
+        self.db.flush()
+        return len(rows)
+
+    def _rebuild_queries(self, since: Optional[datetime]):
+        yield from self._ticket_queries(since)
+        yield from self._package_queries(since)
+
+    def _ticket_queries(self, since: Optional[datetime], ids: Optional[list[int]] = None):
+        """``(metric, query)`` pairs over all tickets, or only ``ids``."""
+        office = func.coalesce(Secretary.office_id, NO_OFFICE)
+
+        def tickets_by(column, *criteria, count=func.count(Ticket.id), amount=func.sum(Ticket.price)):
+            day = func.date(column)
+            query = self.db.query(day, office, count, amount).select_from(Ticket)
+            if column.class_ is TicketStateHistory:
+                query = query.join(TicketStateHistory, TicketStateHistory.ticket_id == Ticket.id)
+            query = query.outerjoin(Secretary, Secretary.id == Ticket.secretary_id).filter(*criteria)
+            if since is not None:
+                query = query.filter(column >= since)
+            if ids is not None:
+                query = query.filter(Ticket.id.in_(ids))
+            return query.group_by(day, office)
+
+        yield TICKETS_CREATED, tickets_by(Ticket.created_at)
+        yield TICKETS_CREATED_CANCELLED, tickets_by(Ticket.created_at, Ticket.state == "cancelled")
+        yield TICKETS_PENDING, tickets_by(Ticket.created_at, Ticket.state == "pending")
+        yield TICKETS_CONFIRMED, tickets_by(
+            TicketStateHistory.changed_at,
+            TicketStateHistory.new_state == "confirmed",
+            Ticket.state.in_(TICKET_REVENUE_STATES),
+        )
+        yield TICKETS_CANCELLED, tickets_by(
+            TicketStateHistory.changed_at,
+            TicketStateHistory.new_state == "cancelled",
+            Ticket.state == "cancelled",
+        )
+        yield TICKETS_RESERVED, tickets_by(
+            TicketStateHistory.changed_at,
+            TicketStateHistory.new_state == "pending",
+            count=func.count(Ticket.id.distinct()),
+            amount=func.sum(0),
+        )
+
+    def _package_queries(self, since: Optional[datetime], ids: Optional[list[int]] = None):
+        """``(metric, query)`` pairs over all packages, or only ``ids``."""
+        package_office = func.coalesce(Package.origin_office_id, NO_OFFICE)
+        package_day = func.date(Package.created_at)
+        items = self.db.query(
+            PackageItem.package_id,
+            func.count(PackageItem.id).label("count"),
+            func.sum(PackageItem.total_price).label("total"),
+        )
+        if ids is not None:
+            items = items.filter(PackageItem.package_id.in_(ids))
+        items = items.group_by(PackageItem.package_id).subquery()
+        created = (
+            self.db.query(package_day, package_office, func.count(Package.id), func.sum(items.c.total))
+            .outerjoin(items, items.c.package_id == Package.id)
+        )
+        revenue = (
+            self.db.query(package_day, package_office, func.sum(items.c.count), func.sum(items.c.total))
+            .join(items, items.c.package_id == Package.id)
+            .filter(Package.status.in_(PACKAGE_REVENUE_STATUSES))
+        )
+        if since is not None:
+            created = created.filter(Package.created_at >= since)
+            revenue = revenue.filter(Package.created_at >= since)
+        if ids is not None:
+            created = created.filter(Package.id.in_(ids))
+            revenue = revenue.filter(Package.id.in_(ids))
+        yield PACKAGES_CREATED, created.group_by(package_day, package_office)
+        yield PACKAGES_REVENUE, revenue.group_by(package_day, package_office)
+
+        history_day = func.date(PackageStateHistory.changed_at)
+        for state, metric in _PACKAGE_HISTORY_METRICS.items():
+            query = (
+                self.db.query(history_day, package_office, func.count(Package.id.distinct()), func.sum(0))
+                .select_from(PackageStateHistory)
+                .join(Package, Package.id == PackageStateHistory.package_id)
+                .filter(PackageStateHistory.new_state == state)
+            )
+            if since is not None:
+                query = query.filter(PackageStateHistory.changed_at >= since)
+            if ids is not None:
+                query = query.filter(Package.id.in_(ids))
+            yield metric, query.group_by(history_day, package_office)
+
+    def _cash_rebuild_query(self, since: Optional[datetime]):
+        day = func.date(CashTransaction.created_at)
+        query = (
+            self.db.query(
+                day, CashRegister.office_id, CashTransaction.type,
+                func.count(CashTransaction.id), func.sum(CashTransaction.amount),
+            )
+            .join(CashRegister, CashRegister.id == CashTransaction.cash_register_id)
+        )
+        if since is not None:
+            query = query.filter(CashTransaction.created_at >= since)
+        return query.group_by(day, CashRegister.office_id, CashTransaction.type)
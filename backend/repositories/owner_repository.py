@@ -1,13 +1,25 @@
+from datetime import date, datetime, time, timedelta
 from typing import Optional, List
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 
+from models.cash_register import CashRegister
 from models.owner import Owner
 from models.owner_withdrawal import OwnerWithdrawal
 from models.cash_transaction import CashTransaction
+from models.office import Office
+from models.package import Package
+from models.package_item import PackageItem
+from models.route import Route
+from models.secretary import Secretary
+from models.ticket import Ticket
 from models.trip import Trip
 from repositories.base import BaseRepository
 
+# Ticket states that count as money collected for the bus owner
+OWNER_REVENUE_TICKET_STATES = ("confirmed", "completed")
+
 
 class OwnerRepository(BaseRepository[Owner]):
     def __init__(self, db: Session):
@@ -22,6 +34,115 @@ class OwnerRepository(BaseRepository[Owner]):
     def get_trips_by_bus_ids(self, bus_ids: List[int]) -> List[Trip]:
         return self.db.query(Trip).filter(Trip.bus_id.in_(bus_ids)).all()
 
+    def get_trips_for_financials(
+        self,
+        bus_ids: List[int],
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Trip]:
+        """Trips of ``bus_ids``, newest first, with route locations and bus loaded."""
+        query = (
+            self.db.query(Trip)
+            .options(
+                joinedload(Trip.route).joinedload(Route.origin_location),
+                joinedload(Trip.route).joinedload(Route.destination_location),
+                joinedload(Trip.bus),
+            )
+            .filter(Trip.bus_id.in_(bus_ids))
+        )
+        # Half-open by calendar day, like stats_repository.in_date_range
+        if date_from:
+            query = query.filter(Trip.trip_datetime >= datetime.combine(date_from, time.min))
+        if date_to:
+            query = query.filter(
+                Trip.trip_datetime < datetime.combine(date_to + timedelta(days=1), time.min)
+            )
+        query = query.order_by(Trip.trip_datetime.desc(), Trip.id.desc()).offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    # -- Per (trip, office) aggregates for the owner financials ----------------
+
+    def get_ticket_amounts_by_trip_office(self, trip_ids: List[int]) -> list:
+        """``(trip_id, office_id, amount)`` of collected tickets, by selling office."""
+        return (
+            self.db.query(Ticket.trip_id, Secretary.office_id, func.sum(Ticket.price))
+            .outerjoin(Secretary, Secretary.id == Ticket.secretary_id)
+            .filter(
+                Ticket.trip_id.in_(trip_ids),
+                func.lower(Ticket.state).in_(OWNER_REVENUE_TICKET_STATES),
+            )
+            .group_by(Ticket.trip_id, Secretary.office_id)
+            .all()
+        )
+
+    def get_package_amounts_by_trip(self, trip_ids: List[int]) -> list:
+        """
+        ``(trip_id, origin_office_id, destination_office_id, payment_status,
+        status, amount)`` over packages with a positive items total. The origin
+        falls back to the registering secretary's office.
+        """
+        items = (
+            self.db.query(
+                PackageItem.package_id,
+                func.sum(PackageItem.total_price).label("total"),
+            )
+            .group_by(PackageItem.package_id)
+            .subquery()
+        )
+        origin = func.coalesce(Package.origin_office_id, Secretary.office_id)
+        return (
+            self.db.query(
+                Package.trip_id,
+                origin,
+                Package.destination_office_id,
+                Package.payment_status,
+                Package.status,
+                func.sum(items.c.total),
+            )
+            .join(items, items.c.package_id == Package.id)
+            .outerjoin(Secretary, Secretary.id == Package.secretary_id)
+            .filter(Package.trip_id.in_(trip_ids), items.c.total > 0)
+            .group_by(
+                Package.trip_id,
+                origin,
+                Package.destination_office_id,
+                Package.payment_status,
+                Package.status,
+            )
+            .all()
+        )
+
+    def get_withdrawal_amounts_by_trip_office(
+        self, owner_id: int, trip_ids: List[int]
+    ) -> list:
+        """``(trip_id, office_id, amount)`` withdrawn by ``owner_id``, by register office."""
+        return (
+            self.db.query(
+                OwnerWithdrawal.trip_id,
+                CashRegister.office_id,
+                func.sum(CashTransaction.amount),
+            )
+            .join(CashTransaction, CashTransaction.id == OwnerWithdrawal.cash_transaction_id)
+            .outerjoin(CashRegister, CashRegister.id == CashTransaction.cash_register_id)
+            .filter(
+                OwnerWithdrawal.owner_id == owner_id,
+                OwnerWithdrawal.trip_id.in_(trip_ids),
+            )
+            .group_by(OwnerWithdrawal.trip_id, CashRegister.office_id)
+            .all()
+        )
+
+    def get_office_names(self, office_ids) -> dict:
+        if not office_ids:
+            return {}
+        return dict(
+            self.db.query(Office.id, Office.name).filter(Office.id.in_(office_ids)).all()
+        )
+
     def get_withdrawals_by_owner(
         self, owner_id: int, trip_ids: Optional[List[int]] = None
     ) -> List[OwnerWithdrawal]:
@@ -1,5 +1,7 @@
+from datetime import datetime, timezone
 from typing import Optional
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session, joinedload
 
 from models.package import Package
@@ -12,7 +14,7 @@ from models.route import Route
 from models.client import Client
 from sqlalchemy import or_
 from sqlalchemy.orm import aliased
-from repositories.base import BaseRepository
+from repositories.base import BaseRepository, Page
 
 
 class PackageRepository(BaseRepository[Package]):
@@ -86,6 +88,51 @@ class PackageRepository(BaseRepository[Package]):
         self.db.flush()
         return entry
 
+    def lock_statuses_by_trip(
+        self, trip_id: int, status: Optional[str] = None
+    ) -> list[tuple[int, str]]:
+        """``(id, status)`` of the trip's packages (only ``status`` if given), locked
+        until the transaction ends."""
+        query = self.db.query(Package.id, Package.status).filter(Package.trip_id == trip_id)
+        if status is not None:
+            query = query.filter(Package.status == status)
+        return [tuple(row) for row in query.order_by(Package.id).with_for_update().all()]
+
+    def bulk_change_status(
+        self,
+        trip_id: int,
+        packages: list[tuple[int, str]],
+        new_status: str,
+        changed_by_user_id: Optional[int] = None,
+        values: Optional[dict] = None,
+    ) -> None:
+        """Move ``packages`` (``(id, current status)`` pairs) to ``new_status``.
+
+        One UPDATE, also setting any other ``values`` (column name -> value),
+        and one multi-row INSERT for the history. Callers validate and commit.
+        """
+        if not packages:
+            return
+        ids = [package_id for package_id, _ in packages]
+        updates = {Package.status: new_status}
+        updates.update({getattr(Package, column): value for column, value in (values or {}).items()})
+        self.db.query(Package).filter(
+            Package.trip_id == trip_id,
+            Package.status.in_({status for _, status in packages}),
+            Package.id.in_(ids),
+        ).update(updates, synchronize_session="evaluate")
+        changed_at = datetime.now(timezone.utc)
+        self.db.execute(insert(PackageStateHistory), [
+            {
+                "package_id": package_id,
+                "old_state": old_status,
+                "new_state": new_status,
+                "changed_at": changed_at,
+                "changed_by_user_id": changed_by_user_id,
+            }
+            for package_id, old_status in packages
+        ])
+
     def get_pending_collections(
         self, office_id: int, skip: int = 0, limit: int = 100
     ) -> list[Package]:
@@ -104,6 +151,21 @@ class PackageRepository(BaseRepository[Package]):
     def get_all_with_filters(
         self, skip: int = 0, limit: int = 100, status: Optional[str] = None
     ) -> list[Package]:
+        query = self._filtered_query(status)
+        return query.order_by(Package.created_at.desc()).offset(skip).limit(limit).all()
+
+    def get_page_with_filters(
+        self, status: Optional[str] = None, *, cursor: Optional[str] = None, limit: int = 100, count: str = "none"
+    ) -> Page[Package]:
+        """Keyset page of ``get_all_with_filters``, newest first by ``(created_at, id)``."""
+        return self.keyset_page(
+            self._filtered_query(status), [Package.created_at, Package.id], cursor=cursor, limit=limit, count=count
+        )
+
+    def count_with_filters(self, status: Optional[str] = None, count: str = "exact") -> Optional[int]:
+        return self.count_rows(self._filtered_query(status), count)
+
+    def _filtered_query(self, status: Optional[str]):
         query = self.db.query(Package).options(
             joinedload(Package.sender),
             joinedload(Package.recipient),
@@ -111,7 +173,7 @@ class PackageRepository(BaseRepository[Package]):
         )
         if status and status.lower() != "all":
             query = query.filter(Package.status == status)
-        return query.order_by(Package.created_at.desc()).offset(skip).limit(limit).all()
+        return query
 
     def get_secretary_by_id(self, secretary_id: int) -> Optional[Secretary]:
         return self.db.query(Secretary).filter(Secretary.id == secretary_id).first()
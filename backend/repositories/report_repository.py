@@ -1,14 +1,19 @@
 from typing import Optional, List
 from datetime import date
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Query, Session, aliased
+from sqlalchemy import case, func, select
 
 from models.cash_register import CashRegister
 from models.cash_transaction import CashTransaction
+from models.client import Client
+from models.location import Location
 from models.office import Office
+from models.route import Route
 from models.ticket import Ticket
+from models.trip import Trip
 from models.package import Package
+from models.package_item import PackageItem
 from models.secretary import Secretary
 from core.enums import CashRegisterStatus, CashTransactionType
 
@@ -178,19 +183,165 @@ class ReportRepository:
                 query = query.filter(False)
         return query.all()
 
+    def _registers_in_range(self, start, end, office_id: Optional[int], *entities) -> Query:
+        query = self.db.query(*entities).select_from(CashRegister).filter(
+            CashRegister.opened_at >= start,
+            CashRegister.opened_at <= end,
+        )
+        if office_id:
+            query = query.filter(CashRegister.office_id == office_id)
+        return query
+
     def get_registers_in_range(
         self,
         start,
         end,
         office_id: Optional[int] = None,
     ) -> List[CashRegister]:
-        query = self.db.query(CashRegister).filter(
-            CashRegister.opened_at >= start,
-            CashRegister.opened_at <= end,
+        return (
+            self._registers_in_range(start, end, office_id, CashRegister)
+            .order_by(CashRegister.opened_at)
+            .all()
+        )
+
+    def count_registers_in_range(self, start, end, office_id: Optional[int] = None) -> int:
+        return self._registers_in_range(start, end, office_id, func.count(CashRegister.id)).scalar()
+
+    def get_transaction_totals_by_register_and_type(
+        self,
+        start,
+        end,
+        office_id: Optional[int] = None,
+    ) -> List:
+        """``(register_id, type, count, total)`` for the registers of get_registers_in_range."""
+        return (
+            self._registers_in_range(
+                start,
+                end,
+                office_id,
+                CashTransaction.cash_register_id,
+                CashTransaction.type,
+                func.count(CashTransaction.id),
+                func.sum(CashTransaction.amount),
+            )
+            .join(CashTransaction, CashTransaction.cash_register_id == CashRegister.id)
+            .group_by(CashTransaction.cash_register_id, CashTransaction.type)
+            .all()
+        )
+
+    # -- Row streams for the CSV exports ------------------------------------------
+    #
+    # Plain column rows (no ORM objects, nothing left to lazy-load) read with
+    # yield_per, so the driver fetches ``batch_size`` rows at a time from a
+    # server-side cursor instead of buffering the whole month.
+
+    def _office_secretary_ids(self, office_id: int):
+        return select(Secretary.id).where(Secretary.office_id == office_id)
+
+    def stream_ticket_rows(self, start, end, office_id: Optional[int], batch_size: int) -> Query:
+        """Same tickets as get_tickets_in_range, oldest first, with client and route names."""
+        origin = aliased(Location)
+        destination = aliased(Location)
+        query = (
+            self.db.query(
+                Ticket.id,
+                Ticket.created_at,
+                Client.firstname,
+                Client.lastname,
+                Route.id.label("route_id"),
+                origin.name.label("origin"),
+                destination.name.label("destination"),
+                Ticket.state,
+                Ticket.payment_method,
+                Ticket.price,
+            )
+            .outerjoin(Client, Client.id == Ticket.client_id)
+            .outerjoin(Trip, Trip.id == Ticket.trip_id)
+            .outerjoin(Route, Route.id == Trip.route_id)
+            .outerjoin(origin, origin.id == Route.origin_location_id)
+            .outerjoin(destination, destination.id == Route.destination_location_id)
+            .filter(
+                Ticket.created_at >= start,
+                Ticket.created_at <= end,
+                Ticket.state != "cancelled",
+            )
         )
         if office_id:
-            query = query.filter(CashRegister.office_id == office_id)
-        return query.order_by(CashRegister.opened_at).all()
+            query = query.filter(Ticket.secretary_id.in_(self._office_secretary_ids(office_id)))
+        return query.order_by(Ticket.created_at, Ticket.id).yield_per(batch_size)
+
+    def stream_package_rows(self, start, end, office_id: Optional[int], batch_size: int) -> Query:
+        """Same packages as get_packages_in_range, oldest first, with item totals."""
+        sender = aliased(Client, flat=True)
+        recipient = aliased(Client, flat=True)
+        items = (
+            self.db.query(
+                PackageItem.package_id,
+                func.sum(PackageItem.quantity).label("count"),
+                func.sum(PackageItem.total_price).label("total"),
+            )
+            .group_by(PackageItem.package_id)
+            .subquery()
+        )
+        query = (
+            self.db.query(
+                Package.id,
+                Package.tracking_number,
+                Package.created_at,
+                sender.firstname.label("sender_firstname"),
+                sender.lastname.label("sender_lastname"),
+                recipient.firstname.label("recipient_firstname"),
+                recipient.lastname.label("recipient_lastname"),
+                Package.status,
+                Package.payment_status,
+                func.coalesce(items.c.count, 0).label("items_count"),
+                func.coalesce(items.c.total, 0.0).label("amount"),
+            )
+            .outerjoin(sender, sender.id == Package.sender_id)
+            .outerjoin(recipient, recipient.id == Package.recipient_id)
+            .outerjoin(items, items.c.package_id == Package.id)
+            .filter(Package.created_at >= start, Package.created_at <= end)
+        )
+        if office_id:
+            query = query.filter(Package.secretary_id.in_(self._office_secretary_ids(office_id)))
+        return query.order_by(Package.created_at, Package.id).yield_per(batch_size)
+
+    def stream_register_rows(self, start, end, office_id: Optional[int], batch_size: int) -> Query:
+        """Registers of get_registers_in_range with income, withdrawals and transaction count."""
+        is_withdrawal = CashTransaction.type == CashTransactionType.WITHDRAWAL
+        totals = (
+            self._registers_in_range(
+                start,
+                end,
+                office_id,
+                CashTransaction.cash_register_id,
+                func.sum(case((is_withdrawal, 0.0), else_=CashTransaction.amount)).label("income"),
+                func.sum(case((is_withdrawal, CashTransaction.amount), else_=0.0)).label("withdrawals"),
+                func.count(CashTransaction.id).label("transaction_count"),
+            )
+            .join(CashTransaction, CashTransaction.cash_register_id == CashRegister.id)
+            .group_by(CashTransaction.cash_register_id)
+            .subquery()
+        )
+        query = (
+            self._registers_in_range(
+                start,
+                end,
+                office_id,
+                CashRegister.id,
+                CashRegister.date,
+                CashRegister.opened_at,
+                CashRegister.closed_at,
+                CashRegister.status,
+                CashRegister.initial_balance,
+                CashRegister.final_balance,
+                func.coalesce(totals.c.income, 0.0).label("income"),
+                func.coalesce(totals.c.withdrawals, 0.0).label("withdrawals"),
+                func.coalesce(totals.c.transaction_count, 0).label("transaction_count"),
+            )
+            .outerjoin(totals, totals.c.cash_register_id == CashRegister.id)
+        )
+        return query.order_by(CashRegister.opened_at, CashRegister.id).yield_per(batch_size)
 
     def get_secretary_by_id(self, secretary_id: int) -> Optional[Secretary]:
         return self.db.query(Secretary).filter(Secretary.id == secretary_id).first()
@@ -92,6 +92,17 @@ class RouteRepository(BaseRepository[Route]):
             .all()
         )
 
+    def lock_active_schedules(self) -> List[RouteSchedule]:
+        """Active schedules of every route, locked so concurrent runs of the
+        schedule materializer take turns."""
+        return (
+            self.db.query(RouteSchedule)
+            .filter(RouteSchedule.is_active.is_(True))
+            .order_by(RouteSchedule.route_id, RouteSchedule.departure_time)
+            .with_for_update()
+            .all()
+        )
+
     def find_schedule_by_departure_time(
         self, route_id: int, departure_time, exclude_id: Optional[int] = None
     ) -> Optional[RouteSchedule]:
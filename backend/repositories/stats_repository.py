@@ -1,16 +1,16 @@
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import Optional
 
-from sqlalchemy import func, and_, or_, desc, cast, Date, extract, case
+from sqlalchemy import func, and_, or_, desc, extract, case
 from sqlalchemy.orm import Session
 
+from models.daily_stat import DailyStat as DailyStatModel
 from models.ticket import Ticket as TicketModel
 from models.package import Package as PackageModel
 from models.trip import Trip as TripModel
 from models.client import Client as ClientModel
-from models.package_item import PackageItem as PackageItemModel
 from models.ticket_state_history import TicketStateHistory as TicketStateHistoryModel
-from models.package_state_history import PackageStateHistory as PackageStateHistoryModel
+from repositories.daily_stats_repository import PACKAGES_CREATED, TICKETS_CONFIRMED
 
 
 MONTH_NAMES = [
@@ -125,138 +125,77 @@ def compute_monthly_trend(result_data: list[dict], field: str = "count") -> floa
     return round(trend, 2)
 
 
+def in_date_range(column, start_date: date, end_date: date):
+    """
+    ``start_date <= column <= end_date`` by calendar day, as the half-open
+    range ``[start_date 00:00, end_date + 1 day 00:00)``. Unlike
+    ``cast(column, Date)`` this leaves the column bare, so its index is usable.
+    """
+    return and_(
+        column >= datetime.combine(start_date, time.min),
+        column < datetime.combine(end_date + timedelta(days=1), time.min),
+    )
+
+
 class StatsRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def _confirmed_ticket_count_amount(self, start_date, end_date):
-        return (
-            self.db.query(
-                func.count(TicketModel.id).label("count"),
-                func.coalesce(func.sum(TicketModel.price), 0).label("amount"),
-            )
-            .join(
-                TicketStateHistoryModel,
-                and_(
-                    TicketStateHistoryModel.ticket_id == TicketModel.id,
-                    TicketStateHistoryModel.new_state == "confirmed",
-                ),
-            )
-            .filter(
-                cast(TicketStateHistoryModel.changed_at, Date) >= start_date,
-                cast(TicketStateHistoryModel.changed_at, Date) <= end_date,
-                TicketModel.state.in_(["confirmed", "completed"]),
-            )
-            .first()
-        )
-
-    def _package_count_amount(self, start_date, end_date):
-        return (
-            self.db.query(
-                func.count(PackageModel.id).label("count"),
-                func.coalesce(
-                    func.sum(
-                        self.db.query(func.sum(PackageItemModel.total_price))
-                        .filter(PackageItemModel.package_id == PackageModel.id)
-                        .scalar_subquery()
-                    ),
-                    0,
-                ).label("amount"),
-            )
-            .filter(
-                cast(PackageModel.created_at, Date) >= start_date,
-                cast(PackageModel.created_at, Date) <= end_date,
-            )
-            .first()
-        )
-
     def _trip_count(self, start_date, end_date):
         return (
             self.db.query(func.count(TripModel.id).label("count"))
             .filter(
-                cast(TripModel.trip_datetime, Date) >= start_date,
-                cast(TripModel.trip_datetime, Date) <= end_date,
+                in_date_range(TripModel.trip_datetime, start_date, end_date),
             )
             .first()
         )
 
-    def _pending_ticket_count(self, start_date, end_date):
-        return (
-            self.db.query(func.count(TicketModel.id))
-            .filter(
-                cast(TicketModel.created_at, Date) >= start_date,
-                cast(TicketModel.created_at, Date) <= end_date,
-                TicketModel.state == "pending",
-            )
-            .scalar() or 0
-        )
-
-    def _cancelled_ticket_count(self, start_date, end_date):
-        return (
-            self.db.query(func.count(TicketModel.id))
-            .join(
-                TicketStateHistoryModel,
-                and_(
-                    TicketStateHistoryModel.ticket_id == TicketModel.id,
-                    TicketStateHistoryModel.new_state == "cancelled",
-                ),
-            )
-            .filter(
-                cast(TicketStateHistoryModel.changed_at, Date) >= start_date,
-                cast(TicketStateHistoryModel.changed_at, Date) <= end_date,
-                TicketModel.state == "cancelled",
-            )
-            .scalar() or 0
-        )
-
-    def _confirmed_ticket_revenue(self, start_date, end_date):
-        return (
-            self.db.query(func.coalesce(func.sum(TicketModel.price), 0))
-            .join(
-                TicketStateHistoryModel,
-                and_(
-                    TicketStateHistoryModel.ticket_id == TicketModel.id,
-                    TicketStateHistoryModel.new_state == "confirmed",
-                ),
-            )
-            .filter(
-                cast(TicketStateHistoryModel.changed_at, Date) >= start_date,
-                cast(TicketStateHistoryModel.changed_at, Date) <= end_date,
-                TicketModel.state.in_(["confirmed", "completed"]),
-            )
-            .scalar() or 0
-        )
-
-    def get_ticket_stats(self, start_date, end_date):
-        return self._confirmed_ticket_count_amount(start_date, end_date)
-
-    def get_package_stats(self, start_date, end_date):
-        return self._package_count_amount(start_date, end_date)
-
     def get_trip_stats(self, start_date, end_date):
         return self._trip_count(start_date, end_date)
 
-    def get_tickets_summary(self, start_date, end_date):
-        confirmed = (
-            self.db.query(func.count(TicketModel.id))
-            .join(
-                TicketStateHistoryModel,
-                and_(
-                    TicketStateHistoryModel.ticket_id == TicketModel.id,
-                    TicketStateHistoryModel.new_state == "confirmed",
-                ),
-            )
+    def get_dashboard_totals(self, start_date, end_date, prev_start, prev_end) -> dict:
+        """
+        Ticket, package and trip figures for the current and the previous
+        period in two statements: one conditional aggregation over the
+        daily_stats rollup and one over trips, each scanning both windows once.
+        """
+        windows = {"": (start_date, end_date), "previous_": (prev_start, prev_end)}
+        rollup_columns = []
+        trip_columns = []
+        for prefix, (start, end) in windows.items():
+            in_window = DailyStatModel.day.between(start, end)
+            for name, metric in (("ticket", TICKETS_CONFIRMED), ("package", PACKAGES_CREATED)):
+                selected = and_(DailyStatModel.metric == metric, in_window)
+                rollup_columns += [
+                    func.coalesce(func.sum(case((selected, DailyStatModel.count), else_=0)), 0)
+                    .label(f"{prefix}{name}_count"),
+                    func.coalesce(func.sum(case((selected, DailyStatModel.amount), else_=0)), 0)
+                    .label(f"{prefix}{name}_amount"),
+                ]
+            trip_columns.append(
+                func.coalesce(func.sum(case((in_date_range(TripModel.trip_datetime, start, end), 1), else_=0)), 0)
+                .label(f"{prefix}trip_count")
+            )
+
+        first, last = min(start_date, prev_start), max(end_date, prev_end)
+        rollup = (
+            self.db.query(*rollup_columns)
             .filter(
-                cast(TicketStateHistoryModel.changed_at, Date) >= start_date,
-                cast(TicketStateHistoryModel.changed_at, Date) <= end_date,
-                TicketModel.state.in_(["confirmed", "completed"]),
+                DailyStatModel.metric.in_([TICKETS_CONFIRMED, PACKAGES_CREATED]),
+                DailyStatModel.day.between(first, last),
             )
-            .scalar() or 0
+            .one()
         )
-        pending = self._pending_ticket_count(start_date, end_date)
-        cancelled = self._cancelled_ticket_count(start_date, end_date)
-        total_revenue = float(self._confirmed_ticket_revenue(start_date, end_date))
-        return confirmed, pending, cancelled, total_revenue
+        trips = (
+            self.db.query(*trip_columns)
+            .filter(in_date_range(TripModel.trip_datetime, first, last))
+            .one()
+        )
+        totals = {**rollup._asdict(), **trips._asdict()}
+        return {
+            key: float(value) if key.endswith("_amount") else int(value)
+            for key, value in totals.items()
+        }
 
     def get_upcoming_trips(self, limit: int):
         now = datetime.now()
@@ -271,16 +210,6 @@ class StatsRepository:
             .all()
         )
 
-    def get_occupied_seats_for_trip(self, trip_id: int):
-        return (
-            self.db.query(func.count(TicketModel.id))
-            .filter(
-                TicketModel.trip_id == trip_id,
-                TicketModel.state.in_(["pending", "confirmed", "completed"]),
-            )
-            .scalar()
-        )
-
     def get_recent_tickets_with_client(self, limit: int):
         return (
             self.db.query(
@@ -326,82 +255,6 @@ class StatsRepository:
     def get_package_by_id(self, package_id: int):
         return self.db.query(PackageModel).filter(PackageModel.id == package_id).first()
 
-    def get_monthly_confirmed_tickets(self, start_date: date):
-        return (
-            self.db.query(
-                extract("year", TicketStateHistoryModel.changed_at).label("year"),
-                extract("month", TicketStateHistoryModel.changed_at).label("month"),
-                func.count(TicketModel.id).label("count"),
-                func.coalesce(func.sum(TicketModel.price), 0).label("amount"),
-            )
-            .join(
-                TicketStateHistoryModel,
-                and_(
-                    TicketStateHistoryModel.ticket_id == TicketModel.id,
-                    TicketStateHistoryModel.new_state == "confirmed",
-                ),
-            )
-            .filter(
-                TicketStateHistoryModel.changed_at >= start_date,
-                TicketModel.state.in_(["confirmed", "completed"]),
-            )
-            .group_by(
-                extract("year", TicketStateHistoryModel.changed_at),
-                extract("month", TicketStateHistoryModel.changed_at),
-            )
-            .order_by(
-                extract("year", TicketStateHistoryModel.changed_at),
-                extract("month", TicketStateHistoryModel.changed_at),
-            )
-            .all()
-        )
-
-    def get_monthly_pending_tickets(self, start_date: date):
-        return (
-            self.db.query(
-                extract("year", TicketStateHistoryModel.changed_at).label("year"),
-                extract("month", TicketStateHistoryModel.changed_at).label("month"),
-                func.count(TicketStateHistoryModel.ticket_id.distinct()).label("count"),
-            )
-            .select_from(TicketStateHistoryModel)
-            .filter(
-                TicketStateHistoryModel.changed_at >= start_date,
-                TicketStateHistoryModel.new_state == "pending",
-            )
-            .group_by(
-                extract("year", TicketStateHistoryModel.changed_at),
-                extract("month", TicketStateHistoryModel.changed_at),
-            )
-            .order_by(
-                extract("year", TicketStateHistoryModel.changed_at),
-                extract("month", TicketStateHistoryModel.changed_at),
-            )
-            .all()
-        )
-
-    def get_monthly_packages_by_state(self, start_date: date, state: str):
-        return (
-            self.db.query(
-                extract("year", PackageStateHistoryModel.changed_at).label("year"),
-                extract("month", PackageStateHistoryModel.changed_at).label("month"),
-                func.count(PackageStateHistoryModel.package_id.distinct()).label("count"),
-            )
-            .join(PackageModel, PackageStateHistoryModel.package_id == PackageModel.id)
-            .filter(
-                PackageStateHistoryModel.changed_at >= start_date,
-                PackageStateHistoryModel.new_state == state,
-            )
-            .group_by(
-                extract("year", PackageStateHistoryModel.changed_at),
-                extract("month", PackageStateHistoryModel.changed_at),
-            )
-            .order_by(
-                extract("year", PackageStateHistoryModel.changed_at),
-                extract("month", PackageStateHistoryModel.changed_at),
-            )
-            .all()
-        )
-
     def get_monthly_trips_by_status(self, start_date: date, statuses: list[str]):
         return (
             self.db.query(
@@ -424,76 +277,6 @@ class StatsRepository:
             .all()
         )
 
-    def get_monthly_ticket_revenue(self, start_date: date):
-        return self.get_monthly_confirmed_tickets(start_date)
-
-    def get_monthly_package_revenue(self, start_date: date):
-        return (
-            self.db.query(
-                extract("year", PackageModel.created_at).label("year"),
-                extract("month", PackageModel.created_at).label("month"),
-                func.count(PackageModel.id).label("count"),
-                func.coalesce(func.sum(PackageItemModel.total_price), 0).label("amount"),
-            )
-            .join(PackageItemModel, PackageModel.id == PackageItemModel.package_id)
-            .filter(
-                PackageModel.created_at >= start_date,
-                PackageModel.status.in_(["registered", "in_transit", "delivered"]),
-            )
-            .group_by(
-                extract("year", PackageModel.created_at),
-                extract("month", PackageModel.created_at),
-            )
-            .order_by(
-                extract("year", PackageModel.created_at),
-                extract("month", PackageModel.created_at),
-            )
-            .all()
-        )
-
-    def get_monthly_tickets_by_state(self, start_date: date, state: str):
-        return (
-            self.db.query(
-                extract("year", TicketModel.created_at).label("year"),
-                extract("month", TicketModel.created_at).label("month"),
-                func.count(TicketModel.id).label("count"),
-                func.coalesce(func.sum(TicketModel.price), 0).label("amount"),
-            )
-            .filter(
-                TicketModel.created_at >= start_date,
-                TicketModel.state == state,
-            )
-            .group_by(
-                extract("year", TicketModel.created_at),
-                extract("month", TicketModel.created_at),
-            )
-            .order_by(
-                extract("year", TicketModel.created_at),
-                extract("month", TicketModel.created_at),
-            )
-            .all()
-        )
-
-    def get_monthly_client_feedback(self, start_date: date):
-        return (
-            self.db.query(
-                extract("year", TicketModel.created_at).label("year"),
-                extract("month", TicketModel.created_at).label("month"),
-                func.count(case((TicketModel.state != "cancelled", 1))).label("successful_tickets"),
-                func.count(TicketModel.id).label("total_tickets"),
-            )
-            .filter(TicketModel.created_at >= start_date)
-            .group_by(
-                extract("year", TicketModel.created_at),
-                extract("month", TicketModel.created_at),
-            )
-            .order_by(
-                extract("year", TicketModel.created_at),
-                extract("month", TicketModel.created_at),
-            )
-            .all()
-        )
-
     def get_monthly_registered_clients(self, start_date: date):
         return (
             self.db.query(
@@ -1,5 +1,8 @@
+from datetime import datetime, timezone
 from typing import Optional
 
+from sqlalchemy import Row, func, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
 from models.ticket import Ticket
@@ -9,8 +12,23 @@ from models.client import Client
 from models.trip import Trip
 from models.secretary import Secretary
 from models.user import User
+from models.cash_register import CashRegister
 from models.cash_transaction import CashTransaction
 from repositories.base import BaseRepository
+from core.enums import CashRegisterStatus, TicketState
+
+ACTIVE_SEAT_INDEX = "uq_tickets_trip_active_seat"
+
+
+def occupies_seat(state: Optional[str]) -> bool:
+    """Whether a ticket in ``state`` counts towards ``Trip.occupied_seats``."""
+    return state is not None and state != TicketState.CANCELLED
+
+
+def seat_already_booked(error: IntegrityError) -> bool:
+    """Whether ``error`` comes from the one-active-ticket-per-seat index."""
+    message = str(error.orig)
+    return ACTIVE_SEAT_INDEX in message or "active_seat_id" in message
 
 
 class TicketRepository(BaseRepository[Ticket]):
@@ -75,6 +93,19 @@ class TicketRepository(BaseRepository[Ticket]):
             .count()
         )
 
+    def adjust_trip_occupied_seats(self, trip_id: int, delta: int) -> None:
+        """Atomically add ``delta`` to the trip's occupied-seat counter.
+
+        Runs as ``UPDATE ... SET occupied_seats = occupied_seats + :delta`` so
+        concurrent sales never lose increments. Callers commit.
+        """
+        if not delta:
+            return
+        self.db.query(Trip).filter(Trip.id == trip_id).update(
+            {Trip.occupied_seats: Trip.occupied_seats + delta},
+            synchronize_session="evaluate",
+        )
+
     def log_state_change(
         self,
         ticket_id: int,
@@ -92,6 +123,49 @@ class TicketRepository(BaseRepository[Ticket]):
         self.db.flush()
         return entry
 
+    def lock_ids_by_trip_and_state(self, trip_id: int, state: str) -> list[int]:
+        """Ids of the trip's tickets in ``state``, locked until the transaction ends."""
+        rows = (
+            self.db.query(Ticket.id)
+            .filter(Ticket.trip_id == trip_id, Ticket.state == state)
+            .order_by(Ticket.id)
+            .with_for_update()
+            .all()
+        )
+        return [ticket_id for ticket_id, in rows]
+
+    def bulk_change_state(
+        self,
+        trip_id: int,
+        ticket_ids: list[int],
+        old_state: str,
+        new_state: str,
+        changed_by_user_id: Optional[int] = None,
+    ) -> None:
+        """Move ``ticket_ids`` from ``old_state`` to ``new_state``.
+
+        One UPDATE for the tickets and one multi-row INSERT for their history,
+        instead of a flush per ticket. Callers validate and commit.
+        """
+        if not ticket_ids:
+            return
+        self.db.query(Ticket).filter(
+            Ticket.trip_id == trip_id,
+            Ticket.state == old_state,
+            Ticket.id.in_(ticket_ids),
+        ).update({Ticket.state: new_state}, synchronize_session="evaluate")
+        changed_at = datetime.now(timezone.utc)
+        self.db.execute(insert(TicketStateHistory), [
+            {
+                "ticket_id": ticket_id,
+                "old_state": old_state,
+                "new_state": new_state,
+                "changed_at": changed_at,
+                "changed_by_user_id": changed_by_user_id,
+            }
+            for ticket_id in ticket_ids
+        ])
+
     def search(self, term: str, limit: int = 20) -> list[Ticket]:
         from sqlalchemy import or_
 
@@ -115,6 +189,37 @@ class TicketRepository(BaseRepository[Ticket]):
         )
         return query.limit(limit).all()
 
+    def get_sale_context(
+        self, seat_id: int, trip_id: int, client_id: int, operator_user_id: int
+    ) -> Row:
+        """Read everything a sale checks in a single SELECT of scalar subqueries.
+
+        Columns: ``seat_bus_id``, ``trip_datetime``, ``trip_bus_id``,
+        ``client_id``, ``booked_ticket_id`` (an active ticket already holding
+        the seat), ``secretary_id``, ``office_id`` and ``register_id`` (the
+        open cash register of the operator's office, office 1 when the
+        secretary has none). A missing row comes back as None.
+        """
+        office_id = func.coalesce(
+            select(Secretary.office_id).where(Secretary.user_id == operator_user_id).limit(1).scalar_subquery(),
+            1,
+        )
+        return self.db.execute(select(
+            select(Seat.bus_id).where(Seat.id == seat_id).scalar_subquery().label("seat_bus_id"),
+            select(Trip.trip_datetime).where(Trip.id == trip_id).scalar_subquery().label("trip_datetime"),
+            select(Trip.bus_id).where(Trip.id == trip_id).scalar_subquery().label("trip_bus_id"),
+            select(Client.id).where(Client.id == client_id).scalar_subquery().label("client_id"),
+            select(Ticket.id).where(Ticket.trip_id == trip_id, Ticket.active_seat_id == seat_id).limit(1)
+            .scalar_subquery().label("booked_ticket_id"),
+            select(Secretary.id).where(Secretary.user_id == operator_user_id).limit(1)
+            .scalar_subquery().label("secretary_id"),
+            office_id.label("office_id"),
+            select(CashRegister.id)
+            .where(CashRegister.office_id == office_id, CashRegister.status == CashRegisterStatus.OPEN)
+            .limit(1)
+            .scalar_subquery().label("register_id"),
+        )).one()
+
     def get_seat_by_id(self, seat_id: int) -> Optional[Seat]:
         return self.db.query(Seat).filter(Seat.id == seat_id).first()
 
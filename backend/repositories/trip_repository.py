@@ -1,8 +1,8 @@
-from typing import Optional
+from typing import Iterable, Optional
 from datetime import datetime
 
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func, desc, asc
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, or_, func, desc, asc, insert
 
 from models.trip import Trip
 from models.route import Route
@@ -15,8 +15,7 @@ from models.assistant import Assistant
 from models.secretary import Secretary
 from models.package import Package
 from models.person import Person
-from repositories.base import BaseRepository
-from core.config import settings
+from repositories.base import BaseRepository, Page
 
 
 class TripRepository(BaseRepository[Trip]):
@@ -24,50 +23,31 @@ class TripRepository(BaseRepository[Trip]):
     def __init__(self, db: Session):
         super().__init__(Trip, db)
 
-    def find_driver_conflict(
-        self, driver_id: int, trip_datetime, exclude_trip_id: int | None = None, buffer_hours: int | None = None
-    ) -> Optional[Trip]:
-        from datetime import timedelta
-        buffer = buffer_hours if buffer_hours is not None else settings.TRIP_CONFLICT_BUFFER_HOURS
-        start = trip_datetime - timedelta(hours=buffer)
-        end = trip_datetime + timedelta(hours=buffer)
-        query = self.db.query(Trip).filter(
-            Trip.driver_id == driver_id,
-            Trip.trip_datetime.between(start, end),
-        )
-        if exclude_trip_id:
-            query = query.filter(Trip.id != exclude_trip_id)
-        return query.first()
-
-    def find_bus_conflict(
-        self, bus_id: int, trip_datetime, exclude_trip_id: int | None = None, buffer_hours: int | None = None
-    ) -> Optional[Trip]:
-        from datetime import timedelta
-        buffer = buffer_hours if buffer_hours is not None else settings.TRIP_CONFLICT_BUFFER_HOURS
-        start = trip_datetime - timedelta(hours=buffer)
-        end = trip_datetime + timedelta(hours=buffer)
-        query = self.db.query(Trip).filter(
-            Trip.bus_id == bus_id,
-            Trip.trip_datetime.between(start, end),
-        )
-        if exclude_trip_id:
-            query = query.filter(Trip.id != exclude_trip_id)
-        return query.first()
-
-    def find_assistant_conflict(
-        self, assistant_id: int, trip_datetime, exclude_trip_id: int | None = None, buffer_hours: int | None = None
-    ) -> Optional[Trip]:
-        from datetime import timedelta
-        buffer = buffer_hours if buffer_hours is not None else settings.TRIP_CONFLICT_BUFFER_HOURS
-        start = trip_datetime - timedelta(hours=buffer)
-        end = trip_datetime + timedelta(hours=buffer)
-        query = self.db.query(Trip).filter(
-            Trip.assistant_id == assistant_id,
-            Trip.trip_datetime.between(start, end),
-        )
-        if exclude_trip_id:
-            query = query.filter(Trip.id != exclude_trip_id)
-        return query.first()
+    def get_trips_sharing_resources(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        driver_ids: Iterable[int] = (),
+        bus_ids: Iterable[int] = (),
+        assistant_ids: Iterable[int] = (),
+    ) -> list[Trip]:
+        """Trips departing between ``start`` and ``end`` (inclusive) that use any
+        of the given drivers, buses or assistants, in one statement.
+
+        Each branch is a range on its ``(resource_id, trip_datetime)`` index.
+        """
+        branches = []
+        for column, ids in (
+            (Trip.driver_id, set(driver_ids)),
+            (Trip.bus_id, set(bus_ids)),
+            (Trip.assistant_id, set(assistant_ids)),
+        ):
+            if ids:
+                branches.append(and_(column.in_(sorted(ids)), Trip.trip_datetime.between(start, end)))
+        if not branches:
+            return []
+        return self.db.query(Trip).filter(or_(*branches)).all()
 
     def find_duplicate(
         self, trip_datetime, bus_id: int, route_id: int, driver_id: Optional[int], assistant_id: Optional[int]
@@ -105,7 +85,68 @@ class TripRepository(BaseRepository[Trip]):
         min_seats: Optional[int] = None,
         sort_by: str = "trip_datetime",
         sort_direction: str = "asc",
-    ) -> tuple[list[Trip], int]:
+        count: str = "exact",
+    ) -> tuple[list[Trip], Optional[int]]:
+        """Filtered, paginated trips and the total match count (see ``count_rows``).
+
+        Occupancy comes from the denormalized ``Trip.occupied_seats`` column.
+        Route locations, bus, driver and assistant are eager-loaded, so the
+        page costs a constant number of queries regardless of its size.
+        """
+        query = self._filtered_query(
+            search=search, status=status, route_id=route_id, driver_id=driver_id, bus_id=bus_id,
+            upcoming=upcoming, origin=origin, destination=destination, date_from=date_from,
+            date_to=date_to, min_seats=min_seats,
+        )
+        total = self.count_rows(query, count)
+
+        sort_column = getattr(Trip, sort_by, Trip.trip_datetime)
+        order_func = desc if sort_direction.lower() == "desc" else asc
+        query = query.order_by(order_func(sort_column))
+
+        trips = (
+            query.options(*self._listing_load_options())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return trips, total
+
+    def get_page_with_filters(
+        self,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        count: str = "exact",
+        sort_direction: str = "asc",
+        **filters,
+    ) -> Page[Trip]:
+        """Keyset page of ``get_with_filters``, ordered by ``(trip_datetime, id)``."""
+        query = self._filtered_query(**filters).options(*self._listing_load_options())
+        return self.keyset_page(
+            query,
+            [Trip.trip_datetime, Trip.id],
+            cursor=cursor,
+            limit=limit,
+            count=count,
+            descending=sort_direction.lower() == "desc",
+        )
+
+    def _filtered_query(
+        self,
+        *,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        route_id: Optional[int] = None,
+        driver_id: Optional[int] = None,
+        bus_id: Optional[int] = None,
+        upcoming: bool = False,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        min_seats: Optional[int] = None,
+    ):
         query = self.db.query(Trip)
 
         if upcoming:
@@ -159,25 +200,21 @@ class TripRepository(BaseRepository[Trip]):
             query = query.filter(Trip.bus_id == bus_id)
 
         if min_seats is not None:
-            occupied_seats_subq = self.db.query(
-                Ticket.trip_id,
-                func.count(Ticket.id).label('occupied_count')
-            ).filter(Ticket.state != 'cancelled').group_by(Ticket.trip_id).subquery()
-
-            query = query.join(Bus, Trip.bus_id == Bus.id).outerjoin(
-                occupied_seats_subq, Trip.id == occupied_seats_subq.c.trip_id
-            ).filter(
-                Bus.capacity - func.coalesce(occupied_seats_subq.c.occupied_count, 0) >= min_seats
+            query = query.join(Bus, Trip.bus_id == Bus.id).filter(
+                Bus.capacity - Trip.occupied_seats >= min_seats
             )
-
-        total = query.count()
-
-        sort_column = getattr(Trip, sort_by, Trip.trip_datetime)
-        order_func = desc if sort_direction.lower() == "desc" else asc
-        query = query.order_by(order_func(sort_column))
-
-        trips = query.offset(skip).limit(limit).all()
-        return trips, total
+        return query
+
+    @staticmethod
+    def _listing_load_options() -> list:
+        """Eager-load everything the trip list renders, in a fixed number of queries."""
+        return [
+            joinedload(Trip.route).joinedload(Route.origin_location),
+            joinedload(Trip.route).joinedload(Route.destination_location),
+            joinedload(Trip.bus),
+            selectinload(Trip.driver),
+            selectinload(Trip.assistant),
+        ]
 
     def get_upcoming(self, limit: int = 5) -> list[Trip]:
         return (
@@ -206,6 +243,41 @@ class TripRepository(BaseRepository[Trip]):
     def get_person_by_user_id(self, user_id: int) -> Optional[Person]:
         return self.db.query(Person).filter(Person.user_id == user_id).first()
 
+    def get_departures_by_route(
+        self, route_ids: Iterable[int], start: datetime, end: datetime
+    ) -> set[tuple[int, datetime]]:
+        """``(route_id, trip_datetime)`` of every trip, in any status, in ``[start, end)``."""
+        rows = (
+            self.db.query(Trip.route_id, Trip.trip_datetime)
+            .filter(
+                Trip.route_id.in_(sorted(set(route_ids))),
+                Trip.trip_datetime >= start,
+                Trip.trip_datetime < end,
+            )
+            .all()
+        )
+        return {(route_id, trip_datetime) for route_id, trip_datetime in rows}
+
+    def get_recent_assignments(self, route_ids: Iterable[int], start: datetime, end: datetime) -> list:
+        """Route, departure and crew of the non-cancelled trips in ``[start, end)``, oldest first."""
+        return (
+            self.db.query(Trip.route_id, Trip.trip_datetime, Trip.bus_id, Trip.driver_id, Trip.assistant_id)
+            .filter(
+                Trip.route_id.in_(sorted(set(route_ids))),
+                Trip.trip_datetime >= start,
+                Trip.trip_datetime < end,
+                Trip.status != "cancelled",
+            )
+            .order_by(Trip.trip_datetime, Trip.id)
+            .all()
+        )
+
+    def bulk_create(self, rows: list[dict]) -> int:
+        """Insert many trips with one multi-row INSERT; returns how many."""
+        if rows:
+            self.db.execute(insert(Trip), rows)
+        return len(rows)
+
     def create_trip(self, trip: Trip) -> Trip:
         self.db.add(trip)
         self.db.flush()
@@ -241,6 +313,31 @@ class TripRepository(BaseRepository[Trip]):
             or 0
         )
 
+    def reconcile_occupied_seats(self) -> list[tuple[int, int, int]]:
+        """Reset ``Trip.occupied_seats`` wherever it drifted from the tickets table.
+
+        Returns ``[(trip_id, stored, actual), ...]`` for the trips that were
+        corrected. Flushes only; the caller commits (or rolls back for a dry run).
+        """
+        actual = (
+            self.db.query(func.count(Ticket.id))
+            .filter(Ticket.trip_id == Trip.id, Ticket.state != "cancelled")
+            .correlate(Trip)
+            .scalar_subquery()
+        )
+        drifted = [
+            tuple(row)
+            for row in self.db.query(Trip.id, Trip.occupied_seats, actual)
+            .filter(Trip.occupied_seats != actual)
+            .all()
+        ]
+        for trip_id, _, counted in drifted:
+            self.db.query(Trip).filter(Trip.id == trip_id).update(
+                {Trip.occupied_seats: counted}, synchronize_session=False
+            )
+        self.db.flush()
+        return drifted
+
     def count_packages_by_trip(self, trip_id: int) -> int:
         return (
             self.db.query(func.count(Package.id))
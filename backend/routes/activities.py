@@ -1,5 +1,5 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from typing import List, Optional
@@ -9,6 +9,9 @@ from models.activity import Activity as ActivityModel
 from models.user import User as UserModel
 from schemas.activity import Activity as ActivitySchema, ActivityCreate, ActivityListResponse
 from auth.jwt import get_current_admin_user
+from core.exceptions import AppException
+from repositories.base import BaseRepository
+from routes.pagination import count_query, cursor_query, set_page_headers
 
 router = APIRouter(
     prefix="/activities",
@@ -18,7 +21,7 @@ router = APIRouter(
 logger = logging.getLogger(__name__)
 
 # Helper function to log an activity (puedes llamarla desde otros servicios/rutas)
-async def log_activity(
+def log_activity(
     db: Session,
     activity_type: str,
     details: Optional[str] = None,
@@ -32,21 +35,38 @@ async def log_activity(
     return db_activity
 
 @router.get("/recent", response_model=ActivityListResponse)
-async def get_recent_activities(
+def get_recent_activities(
+    response: Response,
     db: Session = Depends(get_db),
-    limit: int = Query(10, ge=1, le=100, description="Número de actividades recientes a retornar")
+    limit: int = Query(10, ge=1, le=100, description="Número de actividades recientes a retornar"),
+    cursor: Optional[str] = cursor_query(),
+    count: str = count_query("none"),
 ):
     """
     Obtener las actividades más recientes del sistema.
 
     - **limit**: Número máximo de actividades a retornar (por defecto 10, máximo 100).
+    - **cursor**: Paginación por cursor; vacío para la primera página y luego `next_cursor`.
+    - **count**: Conteo total de actividades en `X-Total-Count` (exact, estimated o none).
     """
     try:
-        query = db.query(ActivityModel).order_by(desc(ActivityModel.created_at)).limit(limit)
-        activities = query.all()
+        repo = BaseRepository(ActivityModel, db)
+        if cursor is None:
+            query = db.query(ActivityModel).order_by(desc(ActivityModel.created_at)).limit(limit)
+            activities, total, next_cursor = query.all(), repo.count_rows(db.query(ActivityModel), count), None
+        else:
+            page = repo.get_page(cursor=cursor, limit=limit, count=count)
+            activities, total, next_cursor = page.items, page.total, page.next_cursor
+        set_page_headers(response, total, next_cursor)
         total_activities_in_query = len(activities)
         
-        return ActivityListResponse(activities=[ActivitySchema.model_validate(act) for act in activities], total=total_activities_in_query)
+        return ActivityListResponse(
+            activities=[ActivitySchema.model_validate(act) for act in activities],
+            total=total_activities_in_query,
+            next_cursor=next_cursor,
+        )
+    except AppException:
+        raise
     except Exception as e:
         # Log el error e
         logger.error("Error fetching recent activities: %s", e)
@@ -59,7 +79,7 @@ async def get_recent_activities(
 # Puedes usar la función log_activity directamente en tu código de backend
 # donde necesites registrar una acción, en lugar de llamar a este endpoint.
 @router.post("/", response_model=ActivitySchema, status_code=status.HTTP_201_CREATED)
-async def create_activity_endpoint(
+def create_activity_endpoint(
     activity_in: ActivityCreate,
     db: Session = Depends(get_db),
     current_admin: UserModel = Depends(get_current_admin_user) # Usar la dependencia correcta
@@ -73,5 +93,5 @@ async def create_activity_endpoint(
     # Si quieres asociar la actividad al usuario autenticado (admin en este caso):
     user_id_to_log = current_admin.id if current_admin else activity_in.user_id
     
-    db_activity = await log_activity(db, activity_type=activity_in.activity_type, details=activity_in.details, user_id=user_id_to_log)
+    db_activity = log_activity(db, activity_type=activity_in.activity_type, details=activity_in.details, user_id=user_id_to_log)
     return ActivitySchema.model_validate(db_activity) 
\ No newline at end of file
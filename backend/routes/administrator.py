@@ -24,7 +24,7 @@ def get_person_service(db: Session = Depends(get_db)) -> PersonService:
 
 
 @router.post("", response_model=AdministratorWithUserResponse, status_code=status.HTTP_201_CREATED)
-async def create_administrator_with_user(
+def create_administrator_with_user(
     administrator_data: AdministratorWithUser,
     service: PersonService = Depends(get_person_service),
 ):
@@ -62,7 +62,7 @@ async def create_administrator_with_user(
 
 
 @router.get("", response_model=List[AdministratorSchema])
-async def get_administrators(
+def get_administrators(
     service: AdministratorService = Depends(get_admin_service),
     _: User = Depends(get_current_admin_user),
 ):
@@ -70,7 +70,7 @@ async def get_administrators(
 
 
 @router.get("/{administrator_id}", response_model=AdministratorSchema)
-async def get_administrator(
+def get_administrator(
     administrator_id: int,
     service: AdministratorService = Depends(get_admin_service),
     _: User = Depends(get_current_admin_user),
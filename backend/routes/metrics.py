@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+
+from auth.blacklist import token_blacklist
+from auth.jwt import get_current_admin_user
+from auth.principal_cache import principal_cache
+from core.redis import redis_client
+from core.ws_manager import seat_lock_ws
+from models.user import User
+from services.stats_cache import stats_cache
+
+router = APIRouter(
+    prefix="/admin/metrics",
+    tags=["Admin"]
+)
+
+
+@router.get("")
+def get_runtime_metrics(current_user: User = Depends(get_current_admin_user)):
+    """Métricas internas del proceso: Redis, WebSockets y cachés. Solo administradores."""
+    return {
+        "redis": redis_client.health.metrics(),
+        "websockets": seat_lock_ws.metrics(),
+        "principal_cache": principal_cache.metrics(),
+        "token_blacklist": token_blacklist.metrics(),
+        "stats_cache": stats_cache.metrics(),
+    }
@@ -1,3 +1,5 @@
+from datetime import date
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
@@ -76,11 +78,22 @@ def delete_owner(
 def get_owner_financials(
     owner_id: int,
     bus_id: Optional[int] = Query(None, description="Filtrar por bus"),
+    date_from: Optional[date] = Query(None, description="Viajes desde (fecha de salida)"),
+    date_to: Optional[date] = Query(None, description="Viajes hasta (fecha de salida)"),
+    skip: int = Query(0, ge=0, description="Viajes a omitir"),
+    limit: Optional[int] = Query(None, ge=1, description="Máximo de viajes (todos si se omite)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> List[Dict[str, Any]]:
     service = OwnerFinancialService(db)
-    return service.get_owner_trips_financials(owner_id, bus_id=bus_id)
+    return service.get_owner_trips_financials(
+        owner_id,
+        bus_id=bus_id,
+        date_from=date_from,
+        date_to=date_to,
+        skip=skip,
+        limit=limit,
+    )
 
 
 @router.get("/{owner_id}/buses", response_model=List[BusSchema])
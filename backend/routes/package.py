@@ -4,9 +4,9 @@ Package routes - thin HTTP adapter that delegates to PackageService.
 All business logic lives in services/package_service.py.
 """
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from db.session import get_db
 from schemas.package import (
@@ -25,6 +25,7 @@ from schemas.package_item import (
     PackageItemUpdate,
 )
 from services.package_service import PackageService
+from routes.pagination import count_query, cursor_query, set_page_headers
 
 router = APIRouter(tags=["Packages"])
 
@@ -39,7 +40,7 @@ def get_service(db: Session = Depends(get_db)) -> PackageService:
 
 
 @router.get("/unassigned", response_model=List[PackageSummary])
-async def get_unassigned_packages(
+def get_unassigned_packages(
     skip: int = 0, limit: int = 100, service: PackageService = Depends(get_service)
 ):
     """Get unassigned packages (registered_at_office)."""
@@ -48,7 +49,7 @@ async def get_unassigned_packages(
 
 
 @router.get("/pending-collections", response_model=List[PackageSummary])
-async def get_pending_collections(
+def get_pending_collections(
     office_id: int,
     skip: int = 0,
     limit: int = 100,
@@ -60,19 +61,30 @@ async def get_pending_collections(
 
 
 @router.get("", response_model=List[PackageSummary])
-async def get_packages(
+def get_packages(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: str = None,
+    cursor: Optional[str] = cursor_query(),
+    count: str = count_query("none"),
     service: PackageService = Depends(get_service),
 ):
-    """Get packages list with optional status filter."""
-    packages = service.get_all(skip, limit, status)
+    """Get packages list with optional status filter, newest first.
+
+    With ``cursor`` the list is paged by keyset instead of ``skip``."""
+    if cursor is None:
+        packages = service.get_all(skip, limit, status)
+        set_page_headers(response, service.count(status, count), None)
+    else:
+        page = service.get_page(cursor, limit, status, count)
+        packages = page.items
+        set_page_headers(response, page.total, page.next_cursor)
     return [PackageService.to_summary(pkg) for pkg in packages]
 
 
 @router.get("/search", response_model=List[PackageSummary])
-async def search_packages(
+def search_packages(
     q: str,
     skip: int = 0,
     limit: int = 100,
@@ -84,7 +96,7 @@ async def search_packages(
 
 
 @router.post("", response_model=PackageResponse)
-async def create_package(
+def create_package(
     package: PackageCreate, service: PackageService = Depends(get_service)
 ):
     """Create a new package with items."""
@@ -92,13 +104,13 @@ async def create_package(
 
 
 @router.get("/{package_id}", response_model=PackageResponse)
-async def get_package(package_id: int, service: PackageService = Depends(get_service)):
+def get_package(package_id: int, service: PackageService = Depends(get_service)):
     """Get a package by ID."""
     return service.get_by_id(package_id)
 
 
 @router.get("/tracking/{tracking_number}", response_model=PackageResponse)
-async def get_package_by_tracking(
+def get_package_by_tracking(
     tracking_number: str, service: PackageService = Depends(get_service)
 ):
     """Get a package by tracking number."""
@@ -106,7 +118,7 @@ async def get_package_by_tracking(
 
 
 @router.put("/{package_id}", response_model=PackageResponse)
-async def update_package(
+def update_package(
     package_id: int,
     package: PackageUpdate,
     service: PackageService = Depends(get_service),
@@ -116,7 +128,7 @@ async def update_package(
 
 
 @router.delete("/{package_id}", response_model=Dict[str, str])
-async def delete_package(
+def delete_package(
     package_id: int, service: PackageService = Depends(get_service)
 ):
     """Delete a package and all items."""
@@ -130,7 +142,7 @@ async def delete_package(
 
 
 @router.put("/{package_id}/assign-trip", response_model=PackageResponse)
-async def assign_package_to_trip(
+def assign_package_to_trip(
     package_id: int,
     assign_data: PackageAssignTrip,
     service: PackageService = Depends(get_service),
@@ -140,7 +152,7 @@ async def assign_package_to_trip(
 
 
 @router.put("/{package_id}/unassign-trip", response_model=PackageResponse)
-async def unassign_package_from_trip(
+def unassign_package_from_trip(
     package_id: int, service: PackageService = Depends(get_service)
 ):
     """Remove a package from its assigned trip."""
@@ -148,7 +160,7 @@ async def unassign_package_from_trip(
 
 
 @router.put("/{package_id}/update-status", response_model=PackageResponse)
-async def update_package_status(
+def update_package_status(
     package_id: int,
     status_update: PackageStatusUpdate,
     service: PackageService = Depends(get_service),
@@ -158,7 +170,7 @@ async def update_package_status(
 
 
 @router.put("/{package_id}/cancel", response_model=PackageResponse)
-async def cancel_package(
+def cancel_package(
     package_id: int, service: PackageService = Depends(get_service)
 ):
     """Cancel a package and create reversal if applicable."""
@@ -166,7 +178,7 @@ async def cancel_package(
 
 
 @router.put("/{package_id}/deliver", response_model=PackageResponse)
-async def deliver_package(
+def deliver_package(
     package_id: int,
     deliver_data: PackageDeliverRequest,
     service: PackageService = Depends(get_service),
@@ -183,7 +195,7 @@ async def deliver_package(
 
 
 @router.get("/{package_id}/items", response_model=List[PackageItemResponse])
-async def get_package_items(
+def get_package_items(
     package_id: int, service: PackageService = Depends(get_service)
 ):
     """Get all items for a package."""
@@ -191,7 +203,7 @@ async def get_package_items(
 
 
 @router.post("/{package_id}/items", response_model=PackageItemResponse)
-async def add_package_item(
+def add_package_item(
     package_id: int,
     item: PackageItemCreate,
     service: PackageService = Depends(get_service),
@@ -201,7 +213,7 @@ async def add_package_item(
 
 
 @router.put("/items/{item_id}", response_model=PackageItemResponse)
-async def update_package_item(
+def update_package_item(
     item_id: int,
     item: PackageItemUpdate,
     service: PackageService = Depends(get_service),
@@ -211,7 +223,7 @@ async def update_package_item(
 
 
 @router.delete("/items/{item_id}", response_model=Dict[str, str])
-async def delete_package_item(
+def delete_package_item(
     item_id: int, service: PackageService = Depends(get_service)
 ):
     """Delete a package item."""
@@ -223,7 +235,7 @@ async def delete_package_item(
 
 
 @router.get("/by-sender/{client_id}", response_model=List[PackageSummary])
-async def get_packages_by_sender(
+def get_packages_by_sender(
     client_id: int, service: PackageService = Depends(get_service)
 ):
     """Get packages sent by a client."""
@@ -231,7 +243,7 @@ async def get_packages_by_sender(
 
 
 @router.get("/by-recipient/{client_id}", response_model=List[PackageSummary])
-async def get_packages_by_recipient(
+def get_packages_by_recipient(
     client_id: int, service: PackageService = Depends(get_service)
 ):
     """Get packages received by a client."""
@@ -241,7 +253,7 @@ async def get_packages_by_recipient(
 
 
 @router.get("/by-trip/{trip_id}", response_model=List[PackageSummary])
-async def get_packages_by_trip(
+def get_packages_by_trip(
     trip_id: int, service: PackageService = Depends(get_service)
 ):
     """Get packages for a trip."""
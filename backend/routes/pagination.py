@@ -0,0 +1,35 @@
+"""
+Query parameters and response headers shared by the paginated list endpoints.
+
+Cursor paging is opt-in: send ``cursor=`` (empty) for the first page and then
+the ``X-Next-Cursor`` value of each response; the header is absent on the
+last page. ``count`` picks how ``X-Total-Count`` is obtained.
+"""
+
+from typing import Optional
+
+from fastapi import Query, Response
+
+from repositories.base import COUNT_MODES
+
+
+def cursor_query():
+    return Query(
+        None,
+        description="Cursor de paginación (vacío para la primera página, luego el valor de X-Next-Cursor)",
+    )
+
+
+def count_query(default: str):
+    return Query(
+        default,
+        pattern="^(" + "|".join(COUNT_MODES) + ")$",
+        description="Conteo total: exact, estimated (estimación del planificador) o none",
+    )
+
+
+def set_page_headers(response: Response, total: Optional[int], next_cursor: Optional[str]) -> None:
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
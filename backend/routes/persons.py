@@ -26,7 +26,7 @@ def get_service(db: Session = Depends(get_db)) -> PersonsService:
 
 
 @router.get("/{person_id}", response_model=PersonResponse)
-async def get_person(
+def get_person(
     person_id: int,
     service: PersonsService = Depends(get_service),
     current_user: User = Depends(get_current_user),
@@ -35,7 +35,7 @@ async def get_person(
 
 
 @router.get("/by-user/{user_id}", response_model=PersonResponse)
-async def get_person_by_user_id(
+def get_person_by_user_id(
     user_id: int,
     service: PersonsService = Depends(get_service),
     current_user: User = Depends(get_current_user),
@@ -44,7 +44,7 @@ async def get_person_by_user_id(
 
 
 @router.put("/{person_id}", response_model=PersonResponse)
-async def update_person(
+def update_person(
     person_id: int,
     person_data: PersonUpdate,
     service: PersonsService = Depends(get_service),
@@ -54,7 +54,7 @@ async def update_person(
 
 
 @router.get("/", response_model=List[PersonResponse])
-async def list_persons(
+def list_persons(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     person_type: Optional[PersonType] = Query(None),
@@ -66,7 +66,7 @@ async def list_persons(
 
 
 @router.post("/", response_model=PersonResponse)
-async def create_person(
+def create_person(
     person_data: PersonCreate,
     service: PersonsService = Depends(get_service),
     current_user: User = Depends(get_current_admin_user),
@@ -75,7 +75,7 @@ async def create_person(
 
 
 @router.get("/drivers/", response_model=List[DriverResponse])
-async def list_drivers(
+def list_drivers(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status_filter: Optional[str] = Query(None),
@@ -86,7 +86,7 @@ async def list_drivers(
 
 
 @router.get("/clients/", response_model=List[ClientResponse])
-async def list_clients(
+def list_clients(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     city: Optional[str] = Query(None),
@@ -97,7 +97,7 @@ async def list_clients(
 
 
 @router.get("/secretaries/", response_model=List[SecretaryResponse])
-async def list_secretaries(
+def list_secretaries(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     office_id: Optional[int] = Query(None),
@@ -108,7 +108,7 @@ async def list_secretaries(
 
 
 @router.put("/drivers/{driver_id}", response_model=DriverResponse)
-async def update_driver(
+def update_driver(
     driver_id: int,
     driver_data: DriverUpdate,
     service: PersonsService = Depends(get_service),
@@ -118,7 +118,7 @@ async def update_driver(
 
 
 @router.put("/clients/{client_id}", response_model=ClientResponse)
-async def update_client(
+def update_client(
     client_id: int,
     client_data: ClientUpdate,
     service: PersonsService = Depends(get_service),
@@ -128,7 +128,7 @@ async def update_client(
 
 
 @router.delete("/{person_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_person(
+def delete_person(
     person_id: int,
     service: PersonsService = Depends(get_service),
     current_user: User = Depends(get_current_admin_user),
@@ -137,7 +137,7 @@ async def delete_person(
 
 
 @router.get("/stats/summary", response_model=dict)
-async def get_persons_stats(
+def get_persons_stats(
     service: PersonsService = Depends(get_service),
     current_user: User = Depends(get_current_admin_user),
 ):
@@ -7,7 +7,7 @@ Admin can see all offices; secretary can only see their own office.
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 from db.session import get_db
 from auth.jwt import get_current_user
@@ -39,7 +39,7 @@ def get_service(db: Session = Depends(get_db)) -> ReportService:
 # --- JSON endpoints ---
 
 @router.get("/monthly/tickets", response_model=Dict[str, Any])
-async def monthly_ticket_report(
+def monthly_ticket_report(
     year: int = Query(...),
     month: int = Query(..., ge=1, le=12),
     office_id: Optional[int] = Query(None),
@@ -52,7 +52,7 @@ async def monthly_ticket_report(
 
 
 @router.get("/monthly/packages", response_model=Dict[str, Any])
-async def monthly_package_report(
+def monthly_package_report(
     year: int = Query(...),
     month: int = Query(..., ge=1, le=12),
     office_id: Optional[int] = Query(None),
@@ -65,22 +65,43 @@ async def monthly_package_report(
 
 
 @router.get("/monthly/cash", response_model=Dict[str, Any])
-async def monthly_cash_report(
+def monthly_cash_report(
     year: int = Query(...),
     month: int = Query(..., ge=1, le=12),
     office_id: Optional[int] = Query(None),
+    include_rows: bool = Query(True, description="Incluir el detalle por caja"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     service: ReportService = Depends(get_service),
 ):
     oid = _resolve_office_id(current_user, office_id, db)
-    return service.monthly_cash_report(year, month, oid)
+    return service.monthly_cash_report(year, month, oid, include_rows=include_rows)
 
 
 # --- CSV export endpoints ---
 
+def _csv_response(chunks: Iterator[str], db: Session, filename: str) -> StreamingResponse:
+    """Stream ``chunks`` as a CSV download.
+
+    The body is produced after the endpoint returns, possibly after the
+    request's session dependency has been torn down, so the stream closes
+    the session itself once it is done.
+    """
+    def body():
+        try:
+            yield from chunks
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
 @router.get("/monthly/tickets/csv")
-async def monthly_ticket_report_csv(
+def monthly_ticket_report_csv(
     year: int = Query(...),
     month: int = Query(..., ge=1, le=12),
     office_id: Optional[int] = Query(None),
@@ -89,16 +110,15 @@ async def monthly_ticket_report_csv(
     service: ReportService = Depends(get_service),
 ):
     oid = _resolve_office_id(current_user, office_id, db)
-    content = service.ticket_report_csv(year, month, oid)
-    return StreamingResponse(
-        iter([content]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=boletos_{year}_{month:02d}.csv"},
+    return _csv_response(
+        service.stream_ticket_report_csv(year, month, oid),
+        db,
+        f"boletos_{year}_{month:02d}.csv",
     )
 
 
 @router.get("/monthly/packages/csv")
-async def monthly_package_report_csv(
+def monthly_package_report_csv(
     year: int = Query(...),
     month: int = Query(..., ge=1, le=12),
     office_id: Optional[int] = Query(None),
@@ -107,16 +127,15 @@ async def monthly_package_report_csv(
     service: ReportService = Depends(get_service),
 ):
     oid = _resolve_office_id(current_user, office_id, db)
-    content = service.package_report_csv(year, month, oid)
-    return StreamingResponse(
-        iter([content]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=encomiendas_{year}_{month:02d}.csv"},
+    return _csv_response(
+        service.stream_package_report_csv(year, month, oid),
+        db,
+        f"encomiendas_{year}_{month:02d}.csv",
     )
 
 
 @router.get("/monthly/cash/csv")
-async def monthly_cash_report_csv(
+def monthly_cash_report_csv(
     year: int = Query(...),
     month: int = Query(..., ge=1, le=12),
     office_id: Optional[int] = Query(None),
@@ -125,9 +144,8 @@ async def monthly_cash_report_csv(
     service: ReportService = Depends(get_service),
 ):
     oid = _resolve_office_id(current_user, office_id, db)
-    content = service.cash_report_csv(year, month, oid)
-    return StreamingResponse(
-        iter([content]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=caja_{year}_{month:02d}.csv"},
+    return _csv_response(
+        service.stream_cash_report_csv(year, month, oid),
+        db,
+        f"caja_{year}_{month:02d}.csv",
     )
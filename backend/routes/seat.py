@@ -17,7 +17,7 @@ def get_service(db: Session = Depends(get_db)) -> SeatService:
 
 
 @router.post("", response_model=SeatSchema, status_code=status.HTTP_201_CREATED)
-async def create_seat(
+def create_seat(
     seat: SeatCreate,
     service: SeatService = Depends(get_service),
     current_user: User = Depends(get_current_user),
@@ -26,7 +26,7 @@ async def create_seat(
 
 
 @router.get("", response_model=List[SeatSchema])
-async def get_all_seats(
+def get_all_seats(
     service: SeatService = Depends(get_service),
     current_user: User = Depends(get_current_user),
 ):
@@ -34,7 +34,7 @@ async def get_all_seats(
 
 
 @router.get("/{seat_id}", response_model=SeatSchema)
-async def get_seat(
+def get_seat(
     seat_id: int,
     service: SeatService = Depends(get_service),
     current_user: User = Depends(get_current_user),
@@ -43,7 +43,7 @@ async def get_seat(
 
 
 @router.put("/{seat_id}", response_model=SeatSchema)
-async def update_seat(
+def update_seat(
     seat_id: int,
     seat_update: SeatUpdate,
     service: SeatService = Depends(get_service),
@@ -53,7 +53,7 @@ async def update_seat(
 
 
 @router.delete("/{seat_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_seat(
+def delete_seat(
     seat_id: int,
     service: SeatService = Depends(get_service),
     current_user: User = Depends(get_current_user),
@@ -62,7 +62,7 @@ async def delete_seat(
 
 
 @router.get("/bus/{bus_id}", response_model=List[SeatSchema])
-async def get_seats_by_bus(
+def get_seats_by_bus(
     bus_id: int,
     service: SeatService = Depends(get_service),
     current_user: User = Depends(get_current_user),
@@ -71,7 +71,7 @@ async def get_seats_by_bus(
 
 
 @router.get("/trip/{trip_id}", response_model=List[SeatSchema])
-async def get_seats_by_trip(
+def get_seats_by_trip(
     trip_id: int,
     service: SeatService = Depends(get_service),
     current_user: User = Depends(get_current_user),
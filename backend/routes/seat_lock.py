@@ -2,16 +2,20 @@
 Seat lock routes - Redis-based seat locking endpoints with WebSocket broadcast.
 
 Allows secretaries to temporarily lock seats during the selection process
-to prevent double-selling across multiple offices. Lock/unlock events are
-broadcast in real-time via WebSocket to all clients viewing the same trip.
+to prevent double-selling across multiple offices. SeatLockService publishes
+every lock/unlock/sale as a delta event to all WebSocket clients viewing the
+same trip; the socket sends a full snapshot on connect and on ``resync``.
 """
 
+import json
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status, Query
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 from jose import JWTError, jwt
 from auth.jwt import get_current_user, verify_token
+from auth.principal_cache import principal_cache
 from models.user import User
 from services.seat_lock_service import SeatLockService
 from core.ws_manager import seat_lock_ws
@@ -50,19 +54,52 @@ class LockedSeatInfo(BaseModel):
     ttl: int = 0
 
 
+class SeatBatchLockRequest(BaseModel):
+    trip_id: int
+    seat_ids: list[int] = Field(..., min_length=1, max_length=20)
+
+
+class SeatLockConflict(BaseModel):
+    seat_id: int
+    holder: int
+
+
+class SeatBatchLockResponse(BaseModel):
+    locked: bool
+    seat_ids: list[int]
+    ttl: int | None = None
+    extended: int = 0
+    fallback: bool = False
+    message: str = ""
+
+
 class SeatUnlockRequest(BaseModel):
     trip_id: int
     seat_ids: list[int]
 
 
-async def _broadcast_locks(trip_id: int):
-    """Broadcast current lock state to all WebSocket clients for this trip."""
-    locks = seat_lock_service.get_locked_seats(trip_id)
-    await seat_lock_ws.broadcast(trip_id, {
+def _snapshot_message(trip_id: int) -> dict:
+    snapshot = seat_lock_service.get_snapshot(trip_id)
+    return {
         "type": "seat_locks_updated",
         "trip_id": trip_id,
-        "locks": locks,
-    })
+        "seq": snapshot["seq"],
+        "locks": snapshot["locks"],
+    }
+
+
+def _resolve_ws_user_id(token: str, credentials_exception: HTTPException) -> int:
+    """Verify a WebSocket token and return the active user's id (0 if inactive/unknown)."""
+    token_data = verify_token(token, credentials_exception)
+    cached = principal_cache.get(token_data.email)
+    if cached is not None:
+        return cached["id"] if cached["is_active"] else 0
+    db = SessionLocal()
+    try:
+        user = principal_cache.load_user(db, token_data.email)
+        return user.id if user and user.is_active else 0
+    finally:
+        db.close()
 
 
 @router.get("/ws-token", response_model=WsTokenResponse)
@@ -71,14 +108,14 @@ async def get_ws_token(current_user: User = Depends(get_current_user)):
     from datetime import timedelta
     from auth.jwt import create_access_token
     token = create_access_token(
-        data={"sub": current_user.email, "role": current_user.role, "ws": True},
+        data={"sub": current_user.email, "role": current_user.role.value, "ws": True},
         expires_delta=timedelta(minutes=5),
     )
     return WsTokenResponse(token=token, expires_in=300)
 
 
 @router.post("/lock", response_model=SeatLockResponse)
-async def lock_seat(
+def lock_seat(
     request: SeatLockRequest,
     current_user: User = Depends(get_current_user),
 ):
@@ -95,9 +132,6 @@ async def lock_seat(
             detail="El asiento ya está bloqueado por otro usuario.",
         )
 
-    # Broadcast updated locks to all viewers of this trip
-    await _broadcast_locks(request.trip_id)
-
     return SeatLockResponse(
         locked=True,
         ttl=result.get("ttl"),
@@ -107,8 +141,41 @@ async def lock_seat(
     )
 
 
+@router.post("/lock/batch", response_model=SeatBatchLockResponse)
+def lock_seats(
+    request: SeatBatchLockRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Lock several seats at once (group booking): all of them or none."""
+    seat_ids = list(dict.fromkeys(request.seat_ids))
+    result = seat_lock_service.lock_seats(
+        trip_id=request.trip_id,
+        seat_ids=seat_ids,
+        user_id=current_user.id,
+    )
+
+    if not result.get("locked"):
+        conflicts = [SeatLockConflict(**c).model_dump() for c in result["conflicts"]]
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Uno o más asientos ya están bloqueados por otro usuario.",
+                "conflicts": conflicts,
+            },
+        )
+
+    return SeatBatchLockResponse(
+        locked=True,
+        seat_ids=seat_ids,
+        ttl=result.get("ttl"),
+        extended=result.get("extended", 0),
+        fallback=result.get("fallback", False),
+        message="Asientos bloqueados exitosamente.",
+    )
+
+
 @router.post("/unlock")
-async def unlock_seats(
+def unlock_seats(
     request: SeatUnlockRequest,
     current_user: User = Depends(get_current_user),
 ):
@@ -119,14 +186,11 @@ async def unlock_seats(
         user_id=current_user.id,
     )
 
-    # Broadcast updated locks to all viewers of this trip
-    await _broadcast_locks(request.trip_id)
-
     return {"unlocked": unlocked, "total": len(request.seat_ids)}
 
 
 @router.get("/locks/{trip_id}", response_model=list[LockedSeatInfo])
-async def get_locked_seats(
+def get_locked_seats(
     trip_id: int,
     current_user: User = Depends(get_current_user),
 ):
@@ -139,9 +203,11 @@ async def seat_lock_websocket(ws: WebSocket, trip_id: int):
     """
     WebSocket endpoint for real-time seat lock updates.
 
-    Clients connect to /seats/ws/{trip_id}?token=<jwt> and receive JSON messages
-    whenever locks change for that trip. On disconnect, all locks held by that
-    user for this trip are automatically released.
+    Clients connect to /seats/ws/{trip_id}?token=<jwt>, receive a snapshot
+    (``seat_locks_updated`` with its ``seq``) and then one delta event per
+    change. Sending ``resync`` returns a fresh snapshot, which clients do when
+    an event's ``seq`` skips ahead. On disconnect, all locks held by that user
+    for this trip are automatically released.
     """
     token = ws.query_params.get("token")
     user_id = 0
@@ -151,14 +217,7 @@ async def seat_lock_websocket(ws: WebSocket, trip_id: int):
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token inválido",
             )
-            token_data = verify_token(token, credentials_exception)
-            db = SessionLocal()
-            try:
-                user = db.query(User).filter(User.email == token_data.email).first()
-                if user and user.is_active:
-                    user_id = user.id
-            finally:
-                db.close()
+            user_id = await run_in_threadpool(_resolve_ws_user_id, token, credentials_exception)
         except Exception:
             await ws.close(code=4001, reason="Authentication failed")
             return
@@ -168,19 +227,19 @@ async def seat_lock_websocket(ws: WebSocket, trip_id: int):
 
     conn = await seat_lock_ws.connect(trip_id, ws, user_id)
     try:
-        # Send current state immediately on connect
-        locks = seat_lock_service.get_locked_seats(trip_id)
-        await ws.send_json({
-            "type": "seat_locks_updated",
-            "trip_id": trip_id,
-            "locks": locks,
-        })
-
-        # Keep connection alive, listen for pings
+        # Send current state immediately on connect. Replies go through the
+        # connection's queue too, so they stay ordered with the delta events.
+        snapshot = await run_in_threadpool(_snapshot_message, trip_id)
+        seat_lock_ws.send(conn, json.dumps(snapshot))
+
+        # Keep connection alive, listen for pings and resync requests
         while True:
             data = await ws.receive_text()
             if data == "ping":
-                await ws.send_text("pong")
+                seat_lock_ws.send(conn, "pong")
+            elif data == "resync":
+                snapshot = await run_in_threadpool(_snapshot_message, trip_id)
+                seat_lock_ws.send(conn, json.dumps(snapshot))
     except WebSocketDisconnect:
         pass
     except Exception:
@@ -188,13 +247,14 @@ async def seat_lock_websocket(ws: WebSocket, trip_id: int):
     finally:
         seat_lock_ws.disconnect(trip_id, conn)
 
-        # Release locks only if user has NO other active connections for this trip
-        # (avoids releasing locks during page refresh where new WS connects before old closes)
-        if user_id and not seat_lock_ws.user_has_other_connections(trip_id, user_id):
-            locked = seat_lock_service.get_locked_seats(trip_id)
+        # Release locks only if the user has NO other connection to this trip on
+        # any worker (a page refresh reconnects before the old socket closes,
+        # possibly to another worker)
+        if user_id and not await seat_lock_ws.leave(conn):
+            locked = await run_in_threadpool(seat_lock_service.get_locked_seats, trip_id)
             user_locks = [l["seat_id"] for l in locked if l.get("user_id") == user_id]
             if user_locks:
-                seat_lock_service.unlock_seats_bulk(trip_id, user_locks, user_id)
+                await run_in_threadpool(
+                    seat_lock_service.release_seats, trip_id, user_locks, user_id, "disconnect"
+                )
                 logger.info("Auto-released %d locks for user %d on trip %d (WS disconnect)", len(user_locks), user_id, trip_id)
-                # Broadcast updated state to remaining connections
-                await _broadcast_locks(trip_id)
@@ -28,7 +28,7 @@ def get_person_service(db: Session = Depends(get_db)) -> PersonService:
 
 
 @router.post("", response_model=SecretaryWithUserResponse, status_code=status.HTTP_201_CREATED)
-async def create_secretary_with_user(
+def create_secretary_with_user(
     secretary_data: SecretaryWithUser,
     service: PersonService = Depends(get_person_service),
     _: UserModel = Depends(get_current_admin_user),
@@ -69,14 +69,14 @@ async def create_secretary_with_user(
 
 
 @router.get("", response_model=List[SecretarySchema])
-async def get_secretaries(
+def get_secretaries(
     service: SecretaryService = Depends(get_secretary_service),
 ):
     return service.get_all()
 
 
 @router.get("/{secretary_id}", response_model=SecretarySchema)
-async def get_secretary(
+def get_secretary(
     secretary_id: int,
     service: SecretaryService = Depends(get_secretary_service),
 ):
@@ -84,7 +84,7 @@ async def get_secretary(
 
 
 @router.patch("/{secretary_id}", response_model=SecretarySchema)
-async def update_secretary(
+def update_secretary(
     secretary_id: int,
     data: SecretaryUpdate,
     service: SecretaryService = Depends(get_secretary_service),
@@ -94,7 +94,7 @@ async def update_secretary(
 
 
 @router.get("/{secretary_id}/trips", response_model=List[TripSchema])
-async def get_secretary_trips(
+def get_secretary_trips(
     secretary_id: int,
     service: SecretaryService = Depends(get_secretary_service),
 ):
@@ -102,7 +102,7 @@ async def get_secretary_trips(
 
 
 @router.get("/{secretary_id}/tickets", response_model=List[TicketSchema])
-async def get_secretary_tickets(
+def get_secretary_tickets(
     secretary_id: int,
     service: SecretaryService = Depends(get_secretary_service),
 ):
@@ -110,7 +110,7 @@ async def get_secretary_tickets(
 
 
 @router.delete("/{secretary_id}", response_model=Dict[str, str])
-async def delete_secretary(
+def delete_secretary(
     secretary_id: int,
     service: SecretaryService = Depends(get_secretary_service),
 ):
@@ -118,7 +118,7 @@ async def delete_secretary(
 
 
 @router.get("/{secretary_id}/user", response_model=UserSchema)
-async def get_secretary_user(
+def get_secretary_user(
     secretary_id: int,
     service: SecretaryService = Depends(get_secretary_service),
     _: UserModel = Depends(get_current_user),
@@ -127,7 +127,7 @@ async def get_secretary_user(
 
 
 @router.get("/by-user/{user_id}", response_model=SecretarySchema)
-async def get_secretary_by_user_id(
+def get_secretary_by_user_id(
     user_id: int,
     service: SecretaryService = Depends(get_secretary_service),
 ):
@@ -4,15 +4,14 @@ Ticket routes - thin HTTP adapter that delegates to TicketService.
 All business logic lives in services/ticket_service.py.
 """
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from db.session import get_db
 from schemas.ticket import TicketCreate, Ticket as TicketSchema, TicketUpdate
 from services.ticket_service import TicketService
-from core.ws_manager import seat_lock_ws
-from services.seat_lock_service import SeatLockService
+from routes.pagination import count_query, cursor_query, set_page_headers
 
 router = APIRouter(tags=["Tickets"])
 
@@ -22,13 +21,23 @@ def get_service(db: Session = Depends(get_db)) -> TicketService:
 
 
 @router.get("", response_model=List[TicketSchema])
-async def get_all_tickets(service: TicketService = Depends(get_service)):
-    """Get all tickets."""
-    return service.get_all()
+def get_all_tickets(
+    response: Response,
+    cursor: Optional[str] = cursor_query(),
+    limit: int = 100,
+    count: str = count_query("none"),
+    service: TicketService = Depends(get_service),
+):
+    """Get all tickets, or with ``cursor`` one page of them, newest first."""
+    if cursor is None:
+        return service.get_all()
+    page = service.get_page(cursor, limit, count)
+    set_page_headers(response, page.total, page.next_cursor)
+    return page.items
 
 
 @router.get("/client/{client_id}", response_model=List[TicketSchema])
-async def get_tickets_by_client(
+def get_tickets_by_client(
     client_id: int, service: TicketService = Depends(get_service)
 ):
     """Get tickets by client ID."""
@@ -36,7 +45,7 @@ async def get_tickets_by_client(
 
 
 @router.get("/seat/{seat_id}", response_model=List[TicketSchema])
-async def get_tickets_by_seat(
+def get_tickets_by_seat(
     seat_id: int, service: TicketService = Depends(get_service)
 ):
     """Get tickets by seat ID."""
@@ -44,7 +53,7 @@ async def get_tickets_by_seat(
 
 
 @router.get("/search", response_model=List[TicketSchema])
-async def search_tickets(
+def search_tickets(
     term: str, limit: int = 20, service: TicketService = Depends(get_service)
 ):
     """Search tickets by ID, client name, or document ID."""
@@ -52,7 +61,7 @@ async def search_tickets(
 
 
 @router.get("/trip/{trip_id}", response_model=List[TicketSchema])
-async def get_tickets_by_trip(
+def get_tickets_by_trip(
     trip_id: int, service: TicketService = Depends(get_service)
 ):
     """Get tickets by trip ID."""
@@ -60,32 +69,21 @@ async def get_tickets_by_trip(
 
 
 @router.get("/{ticket_id}", response_model=TicketSchema)
-async def get_ticket(ticket_id: int, service: TicketService = Depends(get_service)):
+def get_ticket(ticket_id: int, service: TicketService = Depends(get_service)):
     """Get a ticket by ID."""
     return service.get_by_id(ticket_id)
 
 
 @router.post("", response_model=TicketSchema, status_code=status.HTTP_201_CREATED)
-async def create_ticket(
+def create_ticket(
     ticket: TicketCreate, service: TicketService = Depends(get_service)
 ):
     """Create a new ticket."""
-    result = service.create_ticket(ticket)
-    # Broadcast updated locks (seat lock was released in service)
-    locks = SeatLockService().get_locked_seats(ticket.trip_id)
-    await seat_lock_ws.broadcast(
-        ticket.trip_id,
-        {
-            "type": "seat_locks_updated",
-            "trip_id": ticket.trip_id,
-            "locks": locks,
-        },
-    )
-    return result
+    return service.create_ticket(ticket)
 
 
 @router.put("/{ticket_id}", response_model=TicketSchema)
-async def update_ticket(
+def update_ticket(
     ticket_id: int,
     ticket_update: TicketUpdate,
     service: TicketService = Depends(get_service),
@@ -95,19 +93,19 @@ async def update_ticket(
 
 
 @router.delete("/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_ticket(ticket_id: int, service: TicketService = Depends(get_service)):
+def delete_ticket(ticket_id: int, service: TicketService = Depends(get_service)):
     """Delete a ticket."""
     service.delete_ticket(ticket_id)
 
 
 @router.put("/{ticket_id}/cancel", response_model=TicketSchema)
-async def cancel_ticket(ticket_id: int, service: TicketService = Depends(get_service)):
+def cancel_ticket(ticket_id: int, service: TicketService = Depends(get_service)):
     """Cancel a ticket."""
     return service.cancel_ticket(ticket_id)
 
 
 @router.put("/{ticket_id}/change-seat/{new_seat_id}", response_model=TicketSchema)
-async def change_ticket_seat(
+def change_ticket_seat(
     ticket_id: int, new_seat_id: int, service: TicketService = Depends(get_service)
 ):
     """Change the seat assignment for a ticket."""
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Body, Depends, status, Query
+from fastapi import APIRouter, Body, Depends, Response, status, Query
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
 from db.session import get_db
-from schemas.trip import TripCreate, TripUpdate, Trip as TripSchema
+from schemas.trip import TripCreate, TripUpdate, Trip as TripSchema, TripConflictCheck, TripConflictReport
 from schemas.driver import Driver as DriverSchema
 from schemas.assistant import Assistant as AssistantSchema
 from services.trip_service import TripService
+from routes.pagination import count_query, cursor_query, set_page_headers
 from auth.jwt import get_current_user
 from models.user import User
 
@@ -19,7 +20,8 @@ def get_service(db: Session = Depends(get_db)) -> TripService:
 
 
 @router.get("/", response_model=Dict[str, Any])
-async def get_trips(
+def get_trips(
+    response: Response,
     skip: int = Query(0, description="Number of records to skip"),
     limit: int = Query(100, description="Maximum number of records to return"),
     upcoming: bool = Query(False, description="Filter for upcoming trips only"),
@@ -32,9 +34,11 @@ async def get_trips(
     min_seats: Optional[int] = Query(None, description="Filter by minimum available seats"),
     sort_by: str = Query("trip_datetime", description="Field to sort by"),
     sort_direction: str = Query("asc", description="Sort direction (asc or desc)"),
+    cursor: Optional[str] = cursor_query(),
+    count: str = count_query("exact"),
     service: TripService = Depends(get_service)
 ):
-    return service.get_trips(
+    result = service.get_trips(
         skip=skip,
         limit=limit,
         search=search,
@@ -46,12 +50,17 @@ async def get_trips(
         date_to=date_to,
         min_seats=min_seats,
         sort_by=sort_by,
-        sort_direction=sort_direction
+        sort_direction=sort_direction,
+        cursor=cursor,
+        count=count,
     )
+    pagination = result["pagination"]
+    set_page_headers(response, pagination["total"], pagination.get("next_cursor"))
+    return result
 
 
 @router.get("/my-trips", response_model=List[Dict[str, Any]])
-async def get_my_trips(
+def get_my_trips(
     status_filter: Optional[str] = Query(None, alias="status", description="Filter by trip status (comma-separated)"),
     current_user: User = Depends(get_current_user),
     service: TripService = Depends(get_service)
@@ -61,10 +70,17 @@ async def get_my_trips(
 
 
 @router.post("/", response_model=TripSchema, status_code=status.HTTP_201_CREATED)
-async def create_trip(trip: TripCreate, service: TripService = Depends(get_service)):
+def create_trip(trip: TripCreate, service: TripService = Depends(get_service)):
     return service.create_trip(trip)
 
 
+@router.post("/conflicts", response_model=TripConflictReport)
+def check_trip_conflicts(check: TripConflictCheck, service: TripService = Depends(get_service)):
+    """Check a batch of planned trips (e.g. a week's schedule) for driver, bus and
+    assistant double bookings, against stored trips and against each other."""
+    return TripConflictReport(conflicts=service.find_conflicts(check.trips))
+
+
 @router.get("/{trip_id}", response_model=Dict[str, Any])
 def get_trip(trip_id: int, service: TripService = Depends(get_service)):
     return service.get_trip_detail(trip_id)
@@ -81,23 +97,23 @@ def get_trip_assistant(trip_id: int, service: TripService = Depends(get_service)
 
 
 @router.get("/{trip_id}/available-seats")
-async def get_available_seats(trip_id: int, service: TripService = Depends(get_service)):
+def get_available_seats(trip_id: int, service: TripService = Depends(get_service)):
     return service.get_available_seats(trip_id)
 
 
 @router.put("/{trip_id}", response_model=Dict[str, Any])
-async def update_trip(trip_id: int, trip_update: TripUpdate, service: TripService = Depends(get_service)):
+def update_trip(trip_id: int, trip_update: TripUpdate, service: TripService = Depends(get_service)):
     service.update_trip(trip_id, trip_update)
     return service.get_trip_detail(trip_id)
 
 
 @router.delete("/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_trip(trip_id: int, service: TripService = Depends(get_service)):
+def delete_trip(trip_id: int, service: TripService = Depends(get_service)):
     service.delete_trip(trip_id)
     return {"message": "Trip deleted successfully", "status_code": status.HTTP_204_NO_CONTENT}
 
 @router.put("/{trip_id}/transition", response_model=Dict[str, Any])
-async def transition_trip(
+def transition_trip(
     trip_id: int,
     action: str = Body(..., embed=True),
     current_user: User = Depends(get_current_user),
@@ -110,16 +126,16 @@ async def transition_trip(
 
 
 @router.post("/{trip_id}/dispatch", response_model=Dict[str, Any])
-async def dispatch_trip(trip_id: int, service: TripService = Depends(get_service)):
+def dispatch_trip(trip_id: int, service: TripService = Depends(get_service)):
     service.dispatch_trip(trip_id)
     return service.get_trip_detail(trip_id)
 
 @router.post("/{trip_id}/finish", response_model=Dict[str, Any])
-async def finish_trip(trip_id: int, service: TripService = Depends(get_service)):
+def finish_trip(trip_id: int, service: TripService = Depends(get_service)):
     service.finish_trip(trip_id)
     return service.get_trip_detail(trip_id)
 
 @router.post("/{trip_id}/cancel", response_model=Dict[str, Any])
-async def cancel_trip(trip_id: int, service: TripService = Depends(get_service)):
+def cancel_trip(trip_id: int, service: TripService = Depends(get_service)):
     service.cancel_trip(trip_id)
     return service.get_trip_detail(trip_id)
@@ -22,4 +22,5 @@ class Activity(ActivityBase):
 # Esquema para la respuesta de la lista de actividades
 class ActivityListResponse(BaseModel):
     activities: list[Activity]
-    total: int 
\ No newline at end of file
+    total: int
+    next_cursor: Optional[str] = None # Cursor de la página siguiente (paginación por cursor) 
\ No newline at end of file
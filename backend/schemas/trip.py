@@ -108,3 +108,31 @@ class Trip(TripBase):
     secretary: Optional[SecretarySchema] = Field(default=..., description="Secretary details")
 
     model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True)
+
+# Schemas for checking planned trips against driver, bus and assistant schedules
+class PlannedTrip(BaseModel):
+    """A trip to check for conflicts; ``trip_id`` marks an existing trip being rescheduled."""
+    trip_datetime: datetime = Field(..., description="Planned departure")
+    bus_id: Optional[int] = Field(None, description="Bus identifier", gt=0)
+    driver_id: Optional[int] = Field(None, description="Driver identifier", gt=0)
+    assistant_id: Optional[int] = Field(None, description="Assistant identifier", gt=0)
+    trip_id: Optional[int] = Field(None, description="Existing trip being rescheduled", gt=0)
+
+
+class TripConflictCheck(BaseModel):
+    trips: list[PlannedTrip] = Field(..., description="Planned trips, e.g. a whole week", max_length=2000)
+
+
+class TripConflict(BaseModel):
+    """A resource booked twice within the conflict buffer."""
+    index: int = Field(..., description="Position of the planned trip in the request")
+    resource: str = Field(..., description="driver, bus or assistant")
+    resource_id: int
+    trip_datetime: datetime
+    conflicting_trip_id: Optional[int] = Field(None, description="Stored trip it collides with")
+    conflicting_index: Optional[int] = Field(None, description="Planned trip of the same request it collides with")
+    conflicting_datetime: datetime
+
+
+class TripConflictReport(BaseModel):
+    conflicts: list[TripConflict]
@@ -11,13 +11,14 @@ from core.exceptions import (
     ValidationException,
 )
 from models.user import User, UserRole
-from core.security import get_password_hash, verify_password
+from core.security import get_password_hash, verify_and_update_password
 from models.secretary import Secretary
 from models.driver import Driver
 from models.assistant import Assistant
 from models.client import Client
 from models.administrator import Administrator
 from auth.jwt import ACCESS_TOKEN_EXPIRE_MINUTES
+from auth.principal_cache import principal_cache
 from repositories.user_repository import UserRepository
 
 logger = logging.getLogger(__name__)
@@ -31,9 +32,17 @@ class AuthService:
 
     def authenticate_user(self, email: str, password: str, client_ip: Optional[str] = None) -> User:
         user = self.repo.get_by_email(email)
-        if not user or user.email != email or not verify_password(password, getattr(user, "hashed_password", "")) or not user.is_active:
+        valid, new_hash = False, None
+        if user and user.email == email:
+            valid, new_hash = verify_and_update_password(password, getattr(user, "hashed_password", ""))
+        if not valid or not user.is_active:
             logger.warning(f"Failed login attempt for {email} from {client_ip or 'unknown'}")
             raise UnauthorizedException("Incorrect email or password")
+        if new_hash:
+            # Hash made with an outdated cost profile: store one with the current settings
+            user.hashed_password = new_hash
+            self.db.commit()
+            logger.info(f"Rehashed password for user {user.id} with current cost settings")
         return user
 
     def get_user_role_info(self, user: User) -> dict:
@@ -164,5 +173,6 @@ class AuthService:
             user.hashed_password = get_password_hash(update_data["password"])
             
         self.db.commit()
+        principal_cache.invalidate(user_id=user.id)
         self.db.refresh(user)
         return user
@@ -12,6 +12,7 @@ from schemas.cash_register import (
     CashRegisterHistoryResponse,
 )
 from repositories.cash_register_repository import CashRegisterRepository
+from repositories.daily_stats_repository import DailyStatsRepository
 from repositories.office_repository import OfficeRepository
 from models.cash_register import CashRegister
 from models.user import User
@@ -22,6 +23,7 @@ class CashRegisterService:
         self.db = db
         self.cash_repo = CashRegisterRepository(db)
         self.office_repo = OfficeRepository(db)
+        self.stats = DailyStatsRepository(db)
 
     def _validate_office(self, office_id: int):
         office = self.office_repo.get_by_id(office_id)
@@ -89,6 +91,7 @@ class CashRegisterService:
             )
 
         transaction = self.cash_repo.create_transaction(data.model_dump())
+        self.stats.record_cash_transaction(transaction)
         self.db.commit()
         return transaction
 
@@ -122,6 +125,7 @@ class CashRegisterService:
         }
 
         transaction = self.cash_repo.create_transaction(transaction_data)
+        self.stats.record_cash_transaction(transaction)
         self.db.commit()
         return transaction
 
@@ -95,8 +95,14 @@ class ClientService:
                 f"Client ID in path ({client_id}) does not match client ID in request body ({ticket_data.get('client_id')})"
             )
         from models.ticket import Ticket
+        from repositories.daily_stats_repository import DailyStatsRepository
+        from repositories.ticket_repository import TicketRepository, occupies_seat
         new_ticket = Ticket(**ticket_data)
-        self.db.add(new_ticket)
+        with DailyStatsRepository(self.db).track(new_ticket):
+            self.db.add(new_ticket)
+            self.db.flush()
+            if occupies_seat(new_ticket.state):
+                TicketRepository(self.db).adjust_trip_occupied_seats(new_ticket.trip_id, 1)
         self.db.commit()
         self.db.refresh(new_ticket)
         return new_ticket
@@ -1,12 +1,11 @@
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from datetime import date
 from collections import defaultdict
 from models.owner_withdrawal import OwnerWithdrawal
 from models.cash_transaction import CashTransaction
 from services.cash_register_service import CashRegisterService
 from repositories.owner_repository import OwnerRepository
-from repositories.package_repository import PackageRepository
-from repositories.ticket_repository import TicketRepository
 from repositories.trip_repository import TripRepository
 from repositories.person_repository import PersonRepository
 from core.exceptions import NotFoundException, ValidationException
@@ -22,7 +21,13 @@ class OwnerFinancialService:
         self.owner_repo = OwnerRepository(db)
 
     def get_owner_trips_financials(
-        self, owner_id: int, bus_id: int = None
+        self,
+        owner_id: int,
+        bus_id: int = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         owner = self.owner_repo.get_by_id_or_none(owner_id)
         if not owner:
@@ -37,134 +42,74 @@ class OwnerFinancialService:
                 raise ValidationException("El bus no pertenece a este socio")
             bus_ids = [bus_id]
 
-        trips = self.owner_repo.get_trips_by_bus_ids(bus_ids)
-        ticket_repo = TicketRepository(self.db)
-        package_repo = PackageRepository(self.db)
+        trips = self.owner_repo.get_trips_for_financials(
+            bus_ids, date_from=date_from, date_to=date_to, skip=skip, limit=limit
+        )
+        return self._trips_financials(owner_id, trips)
+
+    def _trips_financials(self, owner_id: int, trips) -> List[Dict[str, Any]]:
+        """
+        Financial summary of ``trips`` (in the given order) from three grouped
+        queries - tickets, packages and withdrawals per (trip, office) - plus
+        one for office names, however many trips there are.
+        """
+        if not trips:
+            return []
+        trip_ids = [trip.id for trip in trips]
+
+        totals = {trip_id: defaultdict(float) for trip_id in trip_ids}
+        offices = {trip_id: {} for trip_id in trip_ids}
+
+        def _add(trip_id, office_id, field, amount):
+            amount = float(amount or 0)
+            totals[trip_id][field] += amount
+            if office_id:
+                office = offices[trip_id].setdefault(office_id, defaultdict(float))
+                office[field] += amount
+
+        for trip_id, office_id, amount in self.owner_repo.get_ticket_amounts_by_trip_office(trip_ids):
+            _add(trip_id, office_id, "tickets_amount", amount)
+
+        for (
+            trip_id, origin_oid, dest_oid, payment_status, pkg_status, amount
+        ) in self.owner_repo.get_package_amounts_by_trip(trip_ids):
+            pkg_status = (pkg_status or "").lower()
+            if payment_status == "paid_on_send":
+                _add(trip_id, origin_oid, "packages_paid_amount", amount)
+            elif payment_status == "collect_on_delivery":
+                if pkg_status == "delivered":
+                    _add(trip_id, dest_oid, "packages_collected_amount", amount)
+                else:
+                    _add(trip_id, dest_oid, "packages_pending_amount", amount)
+            elif pkg_status in ("delivered", "paid", "pagado"):
+                _add(trip_id, origin_oid, "packages_paid_amount", amount)
+            else:
+                _add(trip_id, dest_oid or origin_oid, "packages_pending_amount", amount)
+
+        for trip_id, office_id, amount in self.owner_repo.get_withdrawal_amounts_by_trip_office(
+            owner_id, trip_ids
+        ):
+            _add(trip_id, office_id, "withdrawn_amount", amount)
+
+        office_names = self.owner_repo.get_office_names(
+            {office_id for trip_offices in offices.values() for office_id in trip_offices}
+        )
 
         financials = []
         for trip in trips:
-            office_data = defaultdict(
-                lambda: {
-                    "office_name": "",
-                    "tickets_amount": 0.0,
-                    "packages_paid_amount": 0.0,
-                    "packages_collected_amount": 0.0,
-                    "packages_pending_amount": 0.0,
-                    "withdrawn_amount": 0.0,
-                }
-            )
-
-            def _ensure_office(oid, name):
-                if not office_data[oid]["office_name"]:
-                    office_data[oid]["office_name"] = name
-
-            tickets = ticket_repo.get_by_trip(trip.id)
-            tickets_total = 0.0
-            for t in tickets:
-                if t.state.lower() in ("confirmed", "completed"):
-                    amt = float(t.price)
-                    tickets_total += amt
-                    if t.secretary and t.secretary.office_id:
-                        oid = t.secretary.office_id
-                        _ensure_office(
-                            oid,
-                            t.secretary.office.name
-                            if t.secretary.office
-                            else f"Oficina {oid}",
-                        )
-                        office_data[oid]["tickets_amount"] += amt
-
-            packages = package_repo.get_by_trip(trip.id)
-            pkg_paid_total = 0.0
-            pkg_collected_total = 0.0
-            pkg_pending_total = 0.0
-
-            for p in packages:
-                amt = float(p.total_amount) if p.total_amount else 0.0
-                if amt <= 0:
-                    continue
-                payment_status = getattr(p, "payment_status", None)
-                pkg_status = getattr(p, "status", "").lower()
-
-                origin_oid = p.origin_office_id
-                origin_name = p.origin_office.name if p.origin_office else None
-                if not origin_oid and p.secretary and p.secretary.office_id:
-                    origin_oid = p.secretary.office_id
-                    origin_name = (
-                        p.secretary.office.name if p.secretary.office else None
-                    )
-                if origin_oid and not origin_name:
-                    origin_name = f"Oficina {origin_oid}"
-
-                dest_oid = p.destination_office_id
-                dest_name = p.destination_office.name if p.destination_office else None
-                if dest_oid and not dest_name:
-                    dest_name = f"Oficina {dest_oid}"
-
-                if payment_status == "paid_on_send":
-                    pkg_paid_total += amt
-                    if origin_oid:
-                        _ensure_office(origin_oid, origin_name)
-                        office_data[origin_oid]["packages_paid_amount"] += amt
-
-                elif payment_status == "collect_on_delivery":
-                    if pkg_status == "delivered":
-                        pkg_collected_total += amt
-                        if dest_oid:
-                            _ensure_office(dest_oid, dest_name)
-                            office_data[dest_oid]["packages_collected_amount"] += amt
-                    else:
-                        pkg_pending_total += amt
-                        if dest_oid:
-                            _ensure_office(dest_oid, dest_name)
-                            office_data[dest_oid]["packages_pending_amount"] += amt
-
-                else:
-                    if pkg_status in ("delivered", "paid", "pagado"):
-                        pkg_paid_total += amt
-                        if origin_oid:
-                            _ensure_office(origin_oid, origin_name)
-                            office_data[origin_oid]["packages_paid_amount"] += amt
-                    else:
-                        pkg_pending_total += amt
-                        fallback_oid = dest_oid or origin_oid
-                        fallback_name = dest_name or origin_name
-                        if fallback_oid:
-                            _ensure_office(fallback_oid, fallback_name)
-                            office_data[fallback_oid]["packages_pending_amount"] += amt
-
-            withdrawals = self.owner_repo.get_withdrawals_by_owner(
-                owner_id, [trip.id]
-            )
-
-            total_withdrawn = 0.0
-            for w in withdrawals:
-                ct = self.owner_repo.get_cash_transaction(w.cash_transaction_id)
-                if ct:
-                    w_amount = float(ct.amount)
-                    total_withdrawn += w_amount
-                    if ct.cash_register and ct.cash_register.office_id:
-                        oid = ct.cash_register.office_id
-                        _ensure_office(
-                            oid,
-                            ct.cash_register.office.name
-                            if ct.cash_register.office
-                            else f"Oficina {oid}",
-                        )
-                        office_data[oid]["withdrawn_amount"] += w_amount
-
-            tickets_total = round(tickets_total, 2)
-            pkg_paid_total = round(pkg_paid_total, 2)
-            pkg_collected_total = round(pkg_collected_total, 2)
-            pkg_pending_total = round(pkg_pending_total, 2)
+            trip_totals = totals[trip.id]
+            tickets_total = round(trip_totals["tickets_amount"], 2)
+            pkg_paid_total = round(trip_totals["packages_paid_amount"], 2)
+            pkg_collected_total = round(trip_totals["packages_collected_amount"], 2)
+            pkg_pending_total = round(trip_totals["packages_pending_amount"], 2)
             total_collected = round(
                 tickets_total + pkg_paid_total + pkg_collected_total, 2
             )
-            total_withdrawn = round(total_withdrawn, 2)
+            total_withdrawn = round(trip_totals["withdrawn_amount"], 2)
             available_balance = round(total_collected - total_withdrawn, 2)
 
             office_breakdown = []
-            for oid, d in office_data.items():
+            for oid, d in offices[trip.id].items():
                 t_amt = round(d["tickets_amount"], 2)
                 pp_amt = round(d["packages_paid_amount"], 2)
                 pc_amt = round(d["packages_collected_amount"], 2)
@@ -174,7 +119,7 @@ class OwnerFinancialService:
                 office_breakdown.append(
                     {
                         "office_id": oid,
-                        "office_name": d["office_name"],
+                        "office_name": office_names.get(oid) or f"Oficina {oid}",
                         "tickets_amount": t_amt,
                         "packages_paid_amount": pp_amt,
                         "packages_collected_amount": pc_amt,
@@ -208,7 +153,6 @@ class OwnerFinancialService:
                 }
             )
 
-        financials.sort(key=lambda x: x["trip_datetime"], reverse=True)
         return financials
 
     def process_owner_withdrawal(
@@ -234,7 +178,7 @@ class OwnerFinancialService:
                 "Este viaje no pertenece a un bus del dueño especificado"
             )
 
-        financials = self.get_owner_trips_financials(owner_id)
+        financials = self._trips_financials(owner_id, [trip])
         trip_fin = next((f for f in financials if f["trip_id"] == trip_id), None)
 
         if not trip_fin:
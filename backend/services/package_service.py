@@ -12,6 +12,8 @@ from core.state_machines import PACKAGE_TRANSITIONS, validate_transition
 from models.package import Package
 from models.package_item import PackageItem
 from models.trip import Trip
+from repositories.base import Page
+from repositories.daily_stats_repository import DailyStatsRepository
 from repositories.package_repository import PackageRepository
 from schemas.package import (
     PackageCreate,
@@ -33,12 +35,21 @@ class PackageService:
     ):
         self.db = db
         self.repo = repo or PackageRepository(db)
+        self.stats = DailyStatsRepository(db)
 
     def get_all(
         self, skip: int = 0, limit: int = 100, status: Optional[str] = None
     ) -> list[Package]:
         return self.repo.get_all_with_filters(skip, limit, status)
 
+    def get_page(
+        self, cursor: str, limit: int = 100, status: Optional[str] = None, count: str = "none"
+    ) -> Page[Package]:
+        return self.repo.get_page_with_filters(status, cursor=cursor, limit=limit, count=count)
+
+    def count(self, status: Optional[str] = None, count: str = "exact") -> Optional[int]:
+        return self.repo.count_with_filters(status, count)
+
     def get_by_id(self, package_id: int) -> Package:
         pkg = self.repo.get_by_id_eager(package_id)
         if not pkg:
@@ -108,17 +119,24 @@ class PackageService:
         package_data["destination_office_id"] = data.destination_office_id
         actual_status = package_data.get("status", "registered_at_office")
         db_package = Package(**package_data)
-        self.repo.create_package(db_package)
+        with self.stats.track(db_package):
+            self.repo.create_package(db_package)
 
-        db_package.tracking_number = f"ENC-{db_package.id:06d}"
+            db_package.tracking_number = f"ENC-{db_package.id:06d}"
+
+            total_amount = 0.0
+            for item_data in data.items:
+                item_dict = item_data.model_dump()
+                item_dict["total_price"] = item_dict["quantity"] * item_dict["unit_price"]
+                item_dict["package_id"] = db_package.id
+                total_amount += item_dict["total_price"]
+                self.repo.create_item(PackageItem(**item_dict))
 
-        total_amount = 0.0
-        for item_data in data.items:
-            item_dict = item_data.model_dump()
-            item_dict["total_price"] = item_dict["quantity"] * item_dict["unit_price"]
-            item_dict["package_id"] = db_package.id
-            total_amount += item_dict["total_price"]
-            self.repo.create_item(PackageItem(**item_dict))
+            self.repo.log_state_change(
+                package_id=db_package.id,
+                old_state=None,
+                new_state=actual_status,
+            )
 
         if (
             data.payment_status == "paid_on_send"
@@ -143,12 +161,6 @@ class PackageService:
                 )
             )
 
-        self.repo.log_state_change(
-            package_id=db_package.id,
-            old_state=None,
-            new_state=actual_status,
-        )
-
         self.db.commit()
 
         result = self.repo.get_by_id_eager(db_package.id)
@@ -178,24 +190,25 @@ class PackageService:
         old_total = float(sum(i.total_price for i in pkg.items))
         old_payment_status = pkg.payment_status
 
-        update_dict = data.model_dump(exclude_unset=True, exclude={"items"})
-        for field, value in update_dict.items():
-            setattr(pkg, field, value)
-
-        new_total = old_total
-        if data.items is not None:
-            pkg.items.clear()
-            self.db.flush()
-            new_total = 0.0
-            for item_data in data.items:
-                item_dict = item_data.model_dump()
-                item_dict.pop("total_price", None)
-                item_dict["total_price"] = (
-                    item_dict["quantity"] * item_dict["unit_price"]
-                )
-                item_dict["package_id"] = pkg.id
-                new_total += item_dict["total_price"]
-                self.repo.create_item(PackageItem(**item_dict))
+        with self.stats.track(pkg):
+            update_dict = data.model_dump(exclude_unset=True, exclude={"items"})
+            for field, value in update_dict.items():
+                setattr(pkg, field, value)
+
+            new_total = old_total
+            if data.items is not None:
+                pkg.items.clear()
+                self.db.flush()
+                new_total = 0.0
+                for item_data in data.items:
+                    item_dict = item_data.model_dump()
+                    item_dict.pop("total_price", None)
+                    item_dict["total_price"] = (
+                        item_dict["quantity"] * item_dict["unit_price"]
+                    )
+                    item_dict["package_id"] = pkg.id
+                    new_total += item_dict["total_price"]
+                    self.repo.create_item(PackageItem(**item_dict))
 
         self._sync_cash_register_on_edit(
             pkg, old_total=old_total, new_total=new_total,
@@ -334,7 +347,8 @@ class PackageService:
     def delete_package(self, package_id: int) -> str:
         pkg = self.repo.get_by_id_or_raise(package_id, "Package")
         tracking = pkg.tracking_number
-        self.repo.delete_package(pkg)
+        with self.stats.track(pkg):
+            self.repo.delete_package(pkg)
         self.db.commit()
         return tracking
 
@@ -353,14 +367,15 @@ class PackageService:
             raise NotFoundException("Viaje no encontrado")
 
         old_status = pkg.status
-        pkg.trip_id = data.trip_id
-        pkg.status = "assigned_to_trip"
-
-        self.repo.log_state_change(
-            package_id=pkg.id,
-            old_state=old_status,
-            new_state="assigned_to_trip",
-        )
+        with self.stats.track(pkg):
+            pkg.trip_id = data.trip_id
+            pkg.status = "assigned_to_trip"
+
+            self.repo.log_state_change(
+                package_id=pkg.id,
+                old_state=old_status,
+                new_state="assigned_to_trip",
+            )
         self.db.commit()
         self.db.refresh(pkg)
         return pkg
@@ -376,14 +391,15 @@ class PackageService:
             )
 
         old_status = pkg.status
-        pkg.trip_id = None
-        pkg.status = "registered_at_office"
-
-        self.repo.log_state_change(
-            package_id=pkg.id,
-            old_state=old_status,
-            new_state="registered_at_office",
-        )
+        with self.stats.track(pkg):
+            pkg.trip_id = None
+            pkg.status = "registered_at_office"
+
+            self.repo.log_state_change(
+                package_id=pkg.id,
+                old_state=old_status,
+                new_state="registered_at_office",
+            )
         self.db.commit()
         self.db.refresh(pkg)
         return pkg
@@ -396,14 +412,15 @@ class PackageService:
         validate_transition("package", PACKAGE_TRANSITIONS, pkg.status, data.new_status)
 
         old_status = pkg.status
-        pkg.status = data.new_status
-
-        self.repo.log_state_change(
-            package_id=pkg.id,
-            old_state=old_status,
-            new_state=data.new_status,
-            changed_by_user_id=data.changed_by_user_id,
-        )
+        with self.stats.track(pkg):
+            pkg.status = data.new_status
+
+            self.repo.log_state_change(
+                package_id=pkg.id,
+                old_state=old_status,
+                new_state=data.new_status,
+                changed_by_user_id=data.changed_by_user_id,
+            )
         self.db.commit()
         self.db.refresh(pkg)
         return pkg
@@ -450,7 +467,14 @@ class PackageService:
         validate_transition("package", PACKAGE_TRANSITIONS, pkg.status, "delivered")
 
         old_status = pkg.status
-        pkg.status = "delivered"
+        with self.stats.track(pkg):
+            pkg.status = "delivered"
+            self.repo.log_state_change(
+                package_id=pkg.id,
+                old_state=old_status,
+                new_state="delivered",
+                changed_by_user_id=changed_by_user_id,
+            )
 
         if delivering_secretary:
             pkg.delivered_by_secretary_id = delivering_secretary.id
@@ -488,12 +512,6 @@ class PackageService:
                     )
                 )
 
-        self.repo.log_state_change(
-            package_id=pkg.id,
-            old_state=old_status,
-            new_state="delivered",
-            changed_by_user_id=changed_by_user_id,
-        )
         self.db.commit()
         self.db.refresh(pkg)
         return pkg
@@ -507,13 +525,14 @@ class PackageService:
             return pkg
 
         old_status = pkg.status
-        pkg.status = "cancelled"
+        with self.stats.track(pkg):
+            pkg.status = "cancelled"
 
-        self.repo.log_state_change(
-            package_id=pkg.id,
-            old_state=old_status,
-            new_state="cancelled",
-        )
+            self.repo.log_state_change(
+                package_id=pkg.id,
+                old_state=old_status,
+                new_state="cancelled",
+            )
 
         self._create_reversal_if_applicable(pkg)
 
@@ -571,12 +590,13 @@ class PackageService:
         return self.repo.get_items(package_id)
 
     def add_item(self, package_id: int, item_data: dict) -> PackageItem:
-        self.repo.get_by_id_or_raise(package_id, "Package")
+        pkg = self.repo.get_by_id_or_raise(package_id, "Package")
         item_dict = item_data.model_dump()
         item_dict["total_price"] = item_dict["quantity"] * item_dict["unit_price"]
         item_dict["package_id"] = package_id
         db_item = PackageItem(**item_dict)
-        self.repo.create_item(db_item)
+        with self.stats.track(pkg):
+            self.repo.create_item(db_item)
         self.db.commit()
         self.db.refresh(db_item)
         return db_item
@@ -586,11 +606,12 @@ class PackageService:
         if not db_item:
             raise NotFoundException("Ítem de encomienda no encontrado")
 
-        for field, value in item_data.model_dump(exclude_unset=True).items():
-            if value is not None:
-                setattr(db_item, field, value)
+        with self.stats.track(db_item.package):
+            for field, value in item_data.model_dump(exclude_unset=True).items():
+                if value is not None:
+                    setattr(db_item, field, value)
 
-        db_item.total_price = db_item.quantity * db_item.unit_price
+            db_item.total_price = db_item.quantity * db_item.unit_price
         self.db.commit()
         self.db.refresh(db_item)
         return db_item
@@ -606,7 +627,8 @@ class PackageService:
                 "No se puede eliminar el último ítem de una encomienda. Elimine la encomienda completa."
             )
 
-        self.repo.delete_item(db_item)
+        with self.stats.track(db_item.package):
+            self.repo.delete_item(db_item)
         self.db.commit()
 
     def search_packages(
@@ -1,13 +1,17 @@
 import csv
 import io
 from datetime import datetime, date
-from typing import Optional, Any, Dict, List
+from decimal import Decimal
+from typing import Optional, Any, Callable, Dict, Iterable, Iterator, List
 from calendar import monthrange
 
 from sqlalchemy.orm import Session
 
 from repositories.report_repository import ReportRepository
 
+# Rows per database batch and per chunk handed to the response
+CSV_CHUNK_ROWS = 500
+
 
 class ReportService:
     def __init__(self, db: Session):
@@ -140,52 +144,63 @@ class ReportService:
         }
 
     def monthly_cash_report(
-        self, year: int, month: int, office_id: Optional[int] = None
+        self, year: int, month: int, office_id: Optional[int] = None, include_rows: bool = True
     ) -> Dict[str, Any]:
+        """Month totals from per (register, type) aggregates; register rows only if ``include_rows``."""
         start, end = self._date_range(year, month)
-        registers = self.repo.get_registers_in_range(start, end, office_id)
 
         total_income = 0.0
         total_withdrawals = 0.0
         by_transaction_type = {}
+        by_register = {}
+
+        for register_id, tx_type, count, total in self.repo.get_transaction_totals_by_register_and_type(
+            start, end, office_id
+        ):
+            amount = float(total or 0)
+            tx_type = tx_type.value if hasattr(tx_type, 'value') else str(tx_type)
+            reg_totals = by_register.setdefault(
+                register_id, {"income": 0.0, "withdrawals": 0.0, "transaction_count": 0}
+            )
+            if tx_type == "withdrawal":
+                reg_totals["withdrawals"] += amount
+                total_withdrawals += amount
+            else:
+                reg_totals["income"] += amount
+                total_income += amount
+            reg_totals["transaction_count"] += count
+
+            if tx_type not in by_transaction_type:
+                by_transaction_type[tx_type] = {"count": 0, "total": 0.0}
+            by_transaction_type[tx_type]["count"] += count
+            by_transaction_type[tx_type]["total"] += amount
 
         rows = []
-        for reg in registers:
-            reg_income = 0.0
-            reg_withdrawals = 0.0
-            for tx in reg.transactions:
-                amount = float(tx.amount)
-                tx_type = tx.type.value if hasattr(tx.type, 'value') else str(tx.type)
-                if tx_type == "withdrawal":
-                    reg_withdrawals += amount
-                    total_withdrawals += amount
-                else:
-                    reg_income += amount
-                    total_income += amount
-
-                if tx_type not in by_transaction_type:
-                    by_transaction_type[tx_type] = {"count": 0, "total": 0.0}
-                by_transaction_type[tx_type]["count"] += 1
-                by_transaction_type[tx_type]["total"] += amount
-
-            status_val = reg.status.value if hasattr(reg.status, 'value') else str(reg.status)
-            rows.append({
-                "id": reg.id,
-                "date": reg.date.isoformat() if reg.date else "",
-                "opened_at": reg.opened_at.strftime("%Y-%m-%d %H:%M") if reg.opened_at else "",
-                "closed_at": reg.closed_at.strftime("%Y-%m-%d %H:%M") if reg.closed_at else "",
-                "status": status_val,
-                "initial_balance": float(reg.initial_balance or 0),
-                "final_balance": float(reg.final_balance or 0),
-                "income": reg_income,
-                "withdrawals": reg_withdrawals,
-                "transaction_count": len(reg.transactions),
-            })
+        if include_rows:
+            registers = self.repo.get_registers_in_range(start, end, office_id)
+            total_registers = len(registers)
+            for reg in registers:
+                reg_totals = by_register.get(reg.id, {})
+                status_val = reg.status.value if hasattr(reg.status, 'value') else str(reg.status)
+                rows.append({
+                    "id": reg.id,
+                    "date": reg.date.isoformat() if reg.date else "",
+                    "opened_at": reg.opened_at.strftime("%Y-%m-%d %H:%M") if reg.opened_at else "",
+                    "closed_at": reg.closed_at.strftime("%Y-%m-%d %H:%M") if reg.closed_at else "",
+                    "status": status_val,
+                    "initial_balance": float(reg.initial_balance or 0),
+                    "final_balance": float(reg.final_balance or 0),
+                    "income": reg_totals.get("income", 0.0),
+                    "withdrawals": reg_totals.get("withdrawals", 0.0),
+                    "transaction_count": reg_totals.get("transaction_count", 0),
+                })
+        else:
+            total_registers = self.repo.count_registers_in_range(start, end, office_id)
 
         return {
             "year": year,
             "month": month,
-            "total_registers": len(registers),
+            "total_registers": total_registers,
             "total_income": total_income,
             "total_withdrawals": total_withdrawals,
             "net": total_income - total_withdrawals,
@@ -193,39 +208,125 @@ class ReportService:
             "rows": rows,
         }
 
-    def ticket_report_csv(self, year: int, month: int, office_id: Optional[int] = None) -> str:
-        report = self.monthly_ticket_report(year, month, office_id)
+    # -- CSV exports ----------------------------------------------------------------
+    #
+    # The stream_* methods are generators of CSV text: rows come from the
+    # database in batches and go out every CSV_CHUNK_ROWS rows, and the totals
+    # are accumulated on the way and written at the end, so memory stays flat
+    # however busy the month was.
+
+    def _csv_chunks(self, header: List[str], rows: Iterable[list], footer: Callable[[], List[list]]) -> Iterator[str]:
         output = io.StringIO()
         writer = csv.writer(output)
-        writer.writerow(["ID", "Fecha", "Cliente", "Ruta", "Estado", "Método de Pago", "Precio (Bs)"])
-        for r in report["rows"]:
-            writer.writerow([r["id"], r["date"], r["client"], r["route"], r["state"], r["payment_method"], r["price"]])
+        writer.writerow(header)
+        for n, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if n % CSV_CHUNK_ROWS == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
         writer.writerow([])
-        writer.writerow(["Total boletos", report["total_count"]])
-        writer.writerow(["Ingresos totales (Bs)", report["total_revenue"]])
-        return output.getvalue()
+        writer.writerows(footer())
+        yield output.getvalue()
+
+    def stream_ticket_report_csv(self, year: int, month: int, office_id: Optional[int] = None) -> Iterator[str]:
+        start, end = self._date_range(year, month)
+        totals = {"count": 0, "revenue": Decimal(0)}
+
+        def rows():
+            for t in self.repo.stream_ticket_rows(start, end, office_id, CSV_CHUNK_ROWS):
+                totals["count"] += 1
+                totals["revenue"] += t.price
+                route_name = ""
+                if t.route_id:
+                    route_name = f"{t.origin or '?'} → {t.destination or '?'}"
+                client_name = f"{t.firstname or ''} {t.lastname or ''}".strip()
+                yield [
+                    t.id,
+                    t.created_at.strftime("%Y-%m-%d %H:%M") if t.created_at else "",
+                    client_name,
+                    route_name,
+                    t.state,
+                    t.payment_method,
+                    float(t.price),
+                ]
+
+        return self._csv_chunks(
+            ["ID", "Fecha", "Cliente", "Ruta", "Estado", "Método de Pago", "Precio (Bs)"],
+            rows(),
+            lambda: [
+                ["Total boletos", totals["count"]],
+                ["Ingresos totales (Bs)", float(totals["revenue"])],
+            ],
+        )
+
+    def stream_package_report_csv(self, year: int, month: int, office_id: Optional[int] = None) -> Iterator[str]:
+        start, end = self._date_range(year, month)
+        totals = {"count": 0, "revenue": 0.0}
+
+        def rows():
+            for p in self.repo.stream_package_rows(start, end, office_id, CSV_CHUNK_ROWS):
+                totals["count"] += 1
+                totals["revenue"] += float(p.amount)
+                yield [
+                    p.id,
+                    p.tracking_number,
+                    p.created_at.strftime("%Y-%m-%d %H:%M") if p.created_at else "",
+                    f"{p.sender_firstname or ''} {p.sender_lastname or ''}".strip(),
+                    f"{p.recipient_firstname or ''} {p.recipient_lastname or ''}".strip(),
+                    p.status,
+                    p.payment_status,
+                    int(p.items_count),
+                    float(p.amount),
+                ]
+
+        return self._csv_chunks(
+            ["ID", "N° Seguimiento", "Fecha", "Remitente", "Destinatario", "Estado", "Estado Pago", "Items", "Monto (Bs)"],
+            rows(),
+            lambda: [
+                ["Total encomiendas", totals["count"]],
+                ["Ingresos totales (Bs)", totals["revenue"]],
+            ],
+        )
+
+    def stream_cash_report_csv(self, year: int, month: int, office_id: Optional[int] = None) -> Iterator[str]:
+        start, end = self._date_range(year, month)
+        totals = {"income": 0.0, "withdrawals": 0.0}
+
+        def rows():
+            for reg in self.repo.stream_register_rows(start, end, office_id, CSV_CHUNK_ROWS):
+                income, withdrawals = float(reg.income), float(reg.withdrawals)
+                totals["income"] += income
+                totals["withdrawals"] += withdrawals
+                status_val = reg.status.value if hasattr(reg.status, 'value') else str(reg.status)
+                yield [
+                    reg.id,
+                    reg.date.isoformat() if reg.date else "",
+                    reg.opened_at.strftime("%Y-%m-%d %H:%M") if reg.opened_at else "",
+                    reg.closed_at.strftime("%Y-%m-%d %H:%M") if reg.closed_at else "",
+                    status_val,
+                    float(reg.initial_balance or 0),
+                    float(reg.final_balance or 0),
+                    income,
+                    withdrawals,
+                    int(reg.transaction_count),
+                ]
+
+        return self._csv_chunks(
+            ["ID", "Fecha", "Abierta", "Cerrada", "Estado", "Balance Inicial (Bs)", "Balance Final (Bs)", "Ingresos (Bs)", "Retiros (Bs)", "Transacciones"],
+            rows(),
+            lambda: [
+                ["Total ingresos (Bs)", totals["income"]],
+                ["Total retiros (Bs)", totals["withdrawals"]],
+                ["Neto (Bs)", totals["income"] - totals["withdrawals"]],
+            ],
+        )
+
+    def ticket_report_csv(self, year: int, month: int, office_id: Optional[int] = None) -> str:
+        return "".join(self.stream_ticket_report_csv(year, month, office_id))
 
     def package_report_csv(self, year: int, month: int, office_id: Optional[int] = None) -> str:
-        report = self.monthly_package_report(year, month, office_id)
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["ID", "N° Seguimiento", "Fecha", "Remitente", "Destinatario", "Estado", "Estado Pago", "Items", "Monto (Bs)"])
-        for r in report["rows"]:
-            writer.writerow([r["id"], r["tracking_number"], r["date"], r["sender"], r["recipient"], r["status"], r["payment_status"], r["items_count"], r["amount"]])
-        writer.writerow([])
-        writer.writerow(["Total encomiendas", report["total_count"]])
-        writer.writerow(["Ingresos totales (Bs)", report["total_revenue"]])
-        return output.getvalue()
+        return "".join(self.stream_package_report_csv(year, month, office_id))
 
     def cash_report_csv(self, year: int, month: int, office_id: Optional[int] = None) -> str:
-        report = self.monthly_cash_report(year, month, office_id)
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["ID", "Fecha", "Abierta", "Cerrada", "Estado", "Balance Inicial (Bs)", "Balance Final (Bs)", "Ingresos (Bs)", "Retiros (Bs)", "Transacciones"])
-        for r in report["rows"]:
-            writer.writerow([r["id"], r["date"], r["opened_at"], r["closed_at"], r["status"], r["initial_balance"], r["final_balance"], r["income"], r["withdrawals"], r["transaction_count"]])
-        writer.writerow([])
-        writer.writerow(["Total ingresos (Bs)", report["total_income"]])
-        writer.writerow(["Total retiros (Bs)", report["total_withdrawals"]])
-        writer.writerow(["Neto (Bs)", report["net"]])
-        return output.getvalue()
+        return "".join(self.stream_cash_report_csv(year, month, office_id))
@@ -1,8 +1,25 @@
 """
 Seat lock service - Redis-based distributed seat locking to prevent double-selling.
 
-Uses Redis SET NX EX for atomic lock acquisition with automatic TTL expiration.
-Falls back gracefully to DB-level conflict detection if Redis is unavailable.
+Each trip keeps its locks in three keys sharing a hash tag (same cluster slot):
+
+    seat_lock:{<trip_id>}      HASH  seat_id -> user_id
+    seat_lock:{<trip_id>}:exp  ZSET  seat_id scored by expiry (epoch ms, Redis clock)
+    seat_lock:{<trip_id>}:seq  INT   version of the trip's lock state
+
+Every operation is a single Lua script, so lock (one seat or a whole group),
+unlock, bulk unlock and the full trip snapshot each cost one atomic round trip.
+Scripts treat seats whose expiry has passed as free, which gives per-seat TTLs
+without one key per seat. Lapsed seats are only removed by ``sweep_expired``
+(driven by the WebSocket manager for trips someone is watching), so every
+expiry is announced as a ``seat_released`` event instead of vanishing silently.
+
+Every change bumps the trip's sequence number inside the same script and is
+published as a delta event (``seat_locked``, ``seat_released``, ``seat_sold``)
+to the WebSocket viewers of the trip; snapshots carry the sequence they were
+taken at, so clients only need a new snapshot when they see a gap.
+Calls go through the shared circuit breaker in core.redis: while Redis is down they
+fail fast from memory and fall back gracefully to DB-level conflict detection.
 """
 
 import logging
@@ -10,24 +27,162 @@ from typing import Optional
 
 from core.redis import redis_client
 from core.config import settings
+from core.ws_manager import seat_lock_ws
 
 logger = logging.getLogger(__name__)
 
 
+# Shared prologue: read the Redis clock; a seat is live while its expiry is ahead.
+# The sequence key outlives the locks by a day so reconnecting clients keep
+# a monotonic counter for the whole selling window.
+_PROLOGUE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local function ttl_of(seat)
+    local expires_at = redis.call('ZSCORE', KEYS[2], seat)
+    if not expires_at or tonumber(expires_at) <= now then return 0 end
+    return math.ceil((tonumber(expires_at) - now) / 1000)
+end
+local function live_holder(seat)
+    local holder = redis.call('HGET', KEYS[1], seat)
+    if holder and ttl_of(seat) > 0 then return holder end
+    return nil
+end
+local function bump_seq()
+    local seq = redis.call('INCR', KEYS[3])
+    redis.call('EXPIRE', KEYS[3], 86400)
+    return seq
+end
+"""
+
+# All-or-nothing over every seat in the call.
+# ARGV: user_id, ttl_ms, seat_id... -> {1, extended_count, seq} | {0, seat_id, holder, ...}
+_LOCK_SCRIPT = _PROLOGUE + """
+local conflicts = {0}
+local extended = 0
+for i = 3, #ARGV do
+    local holder = live_holder(ARGV[i])
+    if holder and holder ~= ARGV[1] then
+        conflicts[#conflicts + 1] = ARGV[i]
+        conflicts[#conflicts + 1] = holder
+    elseif holder then
+        extended = extended + 1
+    end
+end
+if #conflicts > 1 then
+    return conflicts
+end
+local ttl = tonumber(ARGV[2])
+for i = 3, #ARGV do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[1])
+    redis.call('ZADD', KEYS[2], now + ttl, ARGV[i])
+end
+-- Keys outlive their last seat by a minute so the sweeper can announce it
+local keep = ttl + 60000
+if redis.call('PTTL', KEYS[1]) < keep then
+    redis.call('PEXPIRE', KEYS[1], keep)
+    redis.call('PEXPIRE', KEYS[2], keep)
+end
+return {1, extended, bump_seq()}
+"""
+
+# ARGV: user_id, seat_id... -> {free_count, seq, released_seat_id...}
+# free_count counts seats no longer held by anyone else; seq is 0 when
+# nothing was actually released.
+_UNLOCK_SCRIPT = _PROLOGUE + """
+local out = {0, 0}
+for i = 2, #ARGV do
+    local holder = redis.call('HGET', KEYS[1], ARGV[i])
+    if holder == ARGV[1] then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+        redis.call('ZREM', KEYS[2], ARGV[i])
+        out[1] = out[1] + 1
+        out[#out + 1] = ARGV[i]
+    elseif not holder or ttl_of(ARGV[i]) == 0 then
+        out[1] = out[1] + 1
+    end
+end
+if #out > 2 then
+    out[2] = bump_seq()
+end
+return out
+"""
+
+# ARGV: seat_id... -> seq. Drops the seats' locks whoever holds them.
+_SELL_SCRIPT = _PROLOGUE + """
+redis.call('HDEL', KEYS[1], unpack(ARGV))
+redis.call('ZREM', KEYS[2], unpack(ARGV))
+return bump_seq()
+"""
+
+# -> {seq, released_seat_id...} | {0}. Removes every lapsed seat of the trip.
+_SWEEP_SCRIPT = _PROLOGUE + """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+if #expired == 0 then return {0} end
+redis.call('HDEL', KEYS[1], unpack(expired))
+redis.call('ZREM', KEYS[2], unpack(expired))
+local out = {bump_seq()}
+for i = 1, #expired do out[#out + 1] = expired[i] end
+return out
+"""
+
+# -> {seq, seat_id, user_id, ttl, seat_id, user_id, ttl, ...}
+_SNAPSHOT_SCRIPT = _PROLOGUE + """
+local entries = redis.call('HGETALL', KEYS[1])
+local out = {tonumber(redis.call('GET', KEYS[3]) or 0)}
+for i = 1, #entries, 2 do
+    local ttl = ttl_of(entries[i])
+    if ttl > 0 then
+        out[#out + 1] = entries[i]
+        out[#out + 1] = entries[i + 1]
+        out[#out + 1] = ttl
+    end
+end
+return out
+"""
+
+# ARGV: seat_id -> {} | {user_id, ttl}
+_PEEK_SCRIPT = _PROLOGUE + """
+local holder = live_holder(ARGV[1])
+if not holder then return {} end
+return {holder, ttl_of(ARGV[1])}
+"""
+
+
 class SeatLockService:
     """Manages temporary seat locks using Redis."""
 
     KEY_PREFIX = "seat_lock"
 
-    def _key(self, trip_id: int, seat_id: int) -> str:
-        return f"{self.KEY_PREFIX}:{trip_id}:{seat_id}"
+    _SCRIPTS = {
+        "lock": _LOCK_SCRIPT,
+        "unlock": _UNLOCK_SCRIPT,
+        "sell": _SELL_SCRIPT,
+        "sweep": _SWEEP_SCRIPT,
+        "snapshot": _SNAPSHOT_SCRIPT,
+        "peek": _PEEK_SCRIPT,
+    }
 
-    def _is_available(self) -> bool:
-        try:
-            return redis_client.is_connected()
-        except Exception:
-            logger.warning("Redis not available for seat locking")
-            return False
+    def __init__(self, events=seat_lock_ws):
+        self._registered: dict = {}
+        self._events = events
+
+    def _keys(self, trip_id: int) -> list[str]:
+        base = f"{self.KEY_PREFIX}:{{{trip_id}}}"
+        return [base, f"{base}:exp", f"{base}:seq"]
+
+    def _emit(self, trip_id: int, event_type: str, seq: Optional[int], **fields) -> None:
+        """Publish a delta event for the trip's viewers (seq is None while Redis is down)."""
+        self._events.publish(trip_id, {"type": event_type, "trip_id": trip_id, "seq": seq, **fields})
+
+    def _run(self, name: str, trip_id: int, *args) -> list | int:
+        """Run a lock script for ``trip_id`` (EVALSHA, loading it on first use)."""
+        client = redis_client.client
+        script = self._registered.get(name)
+        if script is None or script.registered_client is not client:
+            script = client.register_script(self._SCRIPTS[name])
+            self._registered[name] = script
+        return redis_client.call(script, keys=self._keys(trip_id), args=list(args))
 
     def lock_seat(
         self, trip_id: int, seat_id: int, user_id: int, ttl: int = settings.SEAT_LOCK_TTL_SECONDS
@@ -37,95 +192,150 @@ class SeatLockService:
 
         Returns dict with 'locked' bool and optional 'holder' if already locked by another user.
         """
-        if not self._is_available():
-            return {"locked": True, "fallback": True}
+        result = self.lock_seats(trip_id, [seat_id], user_id, ttl)
+        if result.get("fallback"):
+            return result
+        if not result["locked"]:
+            return {"locked": False, "holder": result["conflicts"][0]["holder"]}
+        if result["extended"]:
+            return {"locked": True, "extended": True, "ttl": ttl}
+        return {"locked": True, "ttl": ttl}
 
-        key = self._key(trip_id, seat_id)
-        value = str(user_id)
+    def lock_seats(
+        self, trip_id: int, seat_ids: list[int], user_id: int, ttl: int = settings.SEAT_LOCK_TTL_SECONDS
+    ) -> dict:
+        """
+        Lock several seats for a user atomically: either all are locked or none.
 
+        Seats the user already holds are extended. Returns
+        ``{"locked": True, "ttl": int, "extended": int, "seq": int}`` on success or
+        ``{"locked": False, "conflicts": [{"seat_id": int, "holder": int}, ...]}``.
+        """
+        seat_ids = list(dict.fromkeys(seat_ids))
+        if not seat_ids:
+            return {"locked": True, "ttl": ttl, "extended": 0, "seq": None}
         try:
-            client = redis_client.client
-            # Check if already locked by same user (extend TTL)
-            current = client.get(key)
-            if current == value:
-                client.expire(key, ttl)
-                return {"locked": True, "extended": True, "ttl": ttl}
-
-            # Atomic set-if-not-exists
-            acquired = client.set(key, value, nx=True, ex=ttl)
-            if acquired:
-                return {"locked": True, "ttl": ttl}
-
-            # Lock held by another user
-            holder = client.get(key)
-            return {"locked": False, "holder": int(holder) if holder else None}
+            result = self._run("lock", trip_id, user_id, ttl * 1000, *seat_ids)
         except Exception as e:
-            logger.error("Redis lock_seat error: %s", e)
+            logger.error("Redis lock_seats error: %s", e)
             return {"locked": True, "fallback": True}
 
+        if not result[0]:
+            pairs = result[1:]
+            return {
+                "locked": False,
+                "conflicts": [
+                    {"seat_id": int(pairs[i]), "holder": int(pairs[i + 1])}
+                    for i in range(0, len(pairs), 2)
+                ],
+            }
+        seq = int(result[2])
+        self._emit(
+            trip_id, "seat_locked", seq,
+            seats=[{"seat_id": seat_id, "user_id": user_id, "ttl": ttl} for seat_id in seat_ids],
+        )
+        return {"locked": True, "ttl": ttl, "extended": int(result[1]), "seq": seq}
+
     def unlock_seat(self, trip_id: int, seat_id: int, user_id: int) -> bool:
         """
         Release a seat lock, only if held by the given user.
 
         Returns True if unlocked, False otherwise.
         """
-        if not self._is_available():
-            return True
+        return self.unlock_seats_bulk(trip_id, [seat_id], user_id) == 1
 
-        key = self._key(trip_id, seat_id)
+    def unlock_seats_bulk(self, trip_id: int, seat_ids: list[int], user_id: int) -> int:
+        """Release multiple seat locks for a user. Returns count of unlocked seats."""
+        return self.release_seats(trip_id, seat_ids, user_id)["free"]
+
+    def release_seats(
+        self, trip_id: int, seat_ids: list[int], user_id: int, reason: str = "unlock"
+    ) -> dict:
+        """
+        Release the given seats held by ``user_id`` and publish ``seat_released``.
+
+        Returns ``{"free": int, "released": [seat_id, ...], "seq": int | None}``:
+        ``free`` counts seats no longer held by anyone else, ``released`` only
+        the ones this call actually unlocked.
+        """
+        if not seat_ids:
+            return {"free": 0, "released": [], "seq": None}
         try:
-            client = redis_client.client
-            current = client.get(key)
-            if current is None:
-                return True
-            if current == str(user_id):
-                client.delete(key)
-                return True
-            return False
+            result = self._run("unlock", trip_id, user_id, *seat_ids)
         except Exception as e:
-            logger.error("Redis unlock_seat error: %s", e)
-            return True
+            logger.error("Redis release_seats error: %s", e)
+            return {"free": len(seat_ids), "released": [], "seq": None}
 
-    def unlock_seats_bulk(self, trip_id: int, seat_ids: list[int], user_id: int) -> int:
-        """Release multiple seat locks for a user. Returns count of unlocked seats."""
-        unlocked = 0
-        for seat_id in seat_ids:
-            if self.unlock_seat(trip_id, seat_id, user_id):
-                unlocked += 1
-        return unlocked
+        released = [int(seat_id) for seat_id in result[2:]]
+        seq = int(result[1]) or None
+        if released:
+            self._emit(trip_id, "seat_released", seq, seat_ids=released, user_id=user_id, reason=reason)
+        return {"free": int(result[0]), "released": released, "seq": seq}
+
+    def mark_sold(self, trip_id: int, seat_ids: list[int]) -> Optional[int]:
+        """
+        Drop the locks of freshly sold seats and publish ``seat_sold``.
+
+        The event goes out even while Redis is down (with ``seq`` None) so other
+        offices still learn about the sale. Returns the new sequence number.
+        """
+        if not seat_ids:
+            return None
+        try:
+            seq = int(self._run("sell", trip_id, *seat_ids))
+        except Exception as e:
+            logger.error("Redis mark_sold error: %s", e)
+            seq = None
+        self._emit(trip_id, "seat_sold", seq, seat_ids=list(seat_ids))
+        return seq
+
+    def sweep_expired(self, trip_ids: list[int]) -> dict[int, list[int]]:
+        """
+        Remove lapsed locks of the given trips and publish ``seat_released`` for them.
+
+        Returns ``{trip_id: [seat_id, ...]}`` for trips that had expired seats.
+        """
+        swept: dict[int, list[int]] = {}
+        for trip_id in trip_ids:
+            try:
+                result = self._run("sweep", trip_id)
+            except Exception as e:
+                logger.error("Redis sweep_expired error: %s", e)
+                break
+            if len(result) < 2:
+                continue
+            seat_ids = [int(seat_id) for seat_id in result[1:]]
+            self._emit(trip_id, "seat_released", int(result[0]), seat_ids=seat_ids, reason="expired")
+            swept[trip_id] = seat_ids
+        return swept
+
+    def _peek(self, trip_id: int, seat_id: int) -> Optional[tuple[int, int]]:
+        """(holder, ttl) of a live lock, or None."""
+        result = self._run("peek", trip_id, seat_id)
+        if not result:
+            return None
+        return int(result[0]), int(result[1])
 
     def is_locked(self, trip_id: int, seat_id: int) -> bool:
         """Check if a seat is currently locked."""
-        if not self._is_available():
-            return False
-
-        key = self._key(trip_id, seat_id)
         try:
-            return redis_client.client.exists(key) > 0
+            return self._peek(trip_id, seat_id) is not None
         except Exception:
             return False
 
     def get_lock_holder(self, trip_id: int, seat_id: int) -> Optional[int]:
         """Get the user_id holding the lock, or None."""
-        if not self._is_available():
-            return None
-
-        key = self._key(trip_id, seat_id)
         try:
-            val = redis_client.client.get(key)
-            return int(val) if val else None
+            lock = self._peek(trip_id, seat_id)
+            return lock[0] if lock else None
         except Exception:
             return None
 
     def get_lock_ttl(self, trip_id: int, seat_id: int) -> int:
         """Get remaining TTL in seconds for a lock. Returns -1 if no lock."""
-        if not self._is_available():
-            return -1
-
-        key = self._key(trip_id, seat_id)
         try:
-            ttl = redis_client.client.ttl(key)
-            return ttl if ttl > 0 else -1
+            lock = self._peek(trip_id, seat_id)
+            return lock[1] if lock and lock[1] > 0 else -1
         except Exception:
             return -1
 
@@ -135,25 +345,29 @@ class SeatLockService:
 
         Returns list of dicts: [{"seat_id": int, "user_id": int, "ttl": int}, ...]
         """
-        if not self._is_available():
-            return []
+        return self.get_snapshot(trip_id)["locks"]
 
-        pattern = f"{self.KEY_PREFIX}:{trip_id}:*"
-        locked = []
+    def get_snapshot(self, trip_id: int) -> dict:
+        """
+        All locked seats of a trip plus the sequence number they reflect.
+
+        Returns ``{"seq": int | None, "locks": [...]}`` (seq is None without Redis).
+        """
         try:
-            client = redis_client.client
-            for key in client.scan_iter(match=pattern, count=100):
-                parts = key.split(":")
-                if len(parts) == 3:
-                    seat_id = int(parts[2])
-                    user_id_str = client.get(key)
-                    ttl = client.ttl(key)
-                    locked.append({
-                        "seat_id": seat_id,
-                        "user_id": int(user_id_str) if user_id_str else None,
-                        "ttl": ttl if ttl > 0 else 0,
-                    })
+            result = self._run("snapshot", trip_id)
         except Exception as e:
-            logger.error("Redis get_locked_seats error: %s", e)
+            logger.error("Redis get_snapshot error: %s", e)
+            return {"seq": None, "locks": []}
 
-        return locked
+        flat = result[1:]
+        return {
+            "seq": int(result[0]),
+            "locks": [
+                {
+                    "seat_id": int(flat[i]),
+                    "user_id": int(flat[i + 1]),
+                    "ttl": max(int(flat[i + 2]), 0),
+                }
+                for i in range(0, len(flat), 3)
+            ],
+        }
@@ -0,0 +1,261 @@
+"""
+Stats response cache - short-TTL cache for the /api/v1/stats endpoints.
+
+Every open dashboard polls the same handful of aggregates, so responses are
+cached per endpoint and query parameters:
+
+    stats_cache:v                 INT     generation, bumped by every committed write
+    stats_cache:e:<endpoint>:<k>  STRING  JSON {"gen", "fresh_until", "value"} (PX = TTL)
+    stats_cache:l:<endpoint>:<k>  STRING  recompute lock (SET NX PX)
+
+An entry is served while its generation is current. Within the last
+``early_seconds`` of its TTL one caller (the one that takes the lock)
+recomputes it while everybody else keeps getting the old value; on a miss
+the lock holder computes and the others wait for its result, so a burst of
+identical requests runs the query once per worker set, not once per request.
+
+Commits that touch tickets, packages, cash transactions, trips or clients bump
+the generation, which invalidates every entry at once. While Redis is down the cache lives in
+the worker's memory and the generation is per worker; other workers then see
+the change within one TTL.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.redis import redis_client
+from models.cash_transaction import CashTransaction
+from models.client import Client
+from models.package import Package
+from models.package_item import PackageItem
+from models.ticket import Ticket
+from models.trip import Trip
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "stats_cache:v"
+_WAIT_STEP_SECONDS = 0.05
+_INVALIDATING_MODELS = (Ticket, Package, PackageItem, CashTransaction, Trip, Client)
+
+
+class StatsCache:
+    def __init__(
+        self,
+        ttl_seconds: float,
+        early_seconds: float,
+        lock_seconds: float,
+        max_entries: int,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.early_seconds = min(early_seconds, ttl_seconds)
+        self.lock_seconds = lock_seconds
+        self.max_entries = max_entries
+        self._local: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._local_generation = 0
+        self._local_refreshing: set[str] = set()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.waits = 0
+
+    @staticmethod
+    def key(endpoint: str, **params) -> str:
+        return endpoint + ":" + ",".join(f"{name}={params[name]}" for name in sorted(params))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Cached JSON-compatible value of ``compute()`` for ``key``."""
+        if self.ttl_seconds <= 0:
+            return jsonable_encoder(compute())
+
+        generation, entry = self._read(key)
+        if entry is not None:
+            if time.time() < entry["fresh_until"]:
+                self.hits += 1
+                return entry["value"]
+            if not self._acquire(key):
+                self.stale_hits += 1  # another caller is already refreshing it
+                return entry["value"]
+            return self._compute_and_store(key, generation, compute)
+
+        with self._key_lock(key):  # one computation per key inside this worker
+            generation, entry = self._read(key)
+            if entry is not None:
+                self.hits += 1
+                return entry["value"]
+            self.misses += 1
+            if self._acquire(key):
+                return self._compute_and_store(key, generation, compute)
+
+            # Another worker is computing it: wait for its result, then give up
+            self.waits += 1
+            deadline = time.monotonic() + self.lock_seconds
+            while time.monotonic() < deadline:
+                time.sleep(_WAIT_STEP_SECONDS)
+                generation, entry = self._read(key)
+                if entry is not None:
+                    return entry["value"]
+            return self._compute_and_store(key, generation, compute, locked=False)
+
+    def _compute_and_store(self, key: str, generation: int, compute: Callable[[], Any], locked: bool = True) -> Any:
+        try:
+            value = jsonable_encoder(compute())
+            now = time.time()
+            entry = {"gen": generation, "fresh_until": now + self.ttl_seconds - self.early_seconds, "value": value}
+            self._write(key, entry)
+            return value
+        finally:
+            if locked:
+                self._release(key)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    # -- Storage: Redis, or this worker's memory while Redis is down -------------
+
+    def _read(self, key: str) -> tuple[int, Optional[dict]]:
+        """Current generation and the entry for ``key`` if it belongs to it."""
+        if redis_client.is_available():
+            try:
+                generation, raw = redis_client.call(
+                    redis_client.client.mget, GENERATION_KEY, "stats_cache:e:" + key
+                )
+                generation = int(generation or 0)
+                entry = json.loads(raw) if raw else None
+                return generation, entry if entry and entry["gen"] == generation else None
+            except Exception as e:
+                logger.debug("Stats cache read failed, using local cache: %s", e)
+
+        with self._lock:
+            generation = self._local_generation
+            cached = self._local.get(key)
+            if cached is None or cached[0] < time.monotonic() or cached[1]["gen"] != generation:
+                return generation, None
+            self._local.move_to_end(key)
+            return generation, cached[1]
+
+    def _write(self, key: str, entry: dict) -> None:
+        if redis_client.is_available():
+            try:
+                redis_client.call(
+                    redis_client.client.set,
+                    "stats_cache:e:" + key,
+                    json.dumps(entry),
+                    px=int(self.ttl_seconds * 1000),
+                )
+                return
+            except Exception as e:
+                logger.debug("Stats cache write failed, using local cache: %s", e)
+
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl_seconds, entry)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def _acquire(self, key: str) -> bool:
+        """Take the recompute lock for ``key`` (cluster wide when Redis is up)."""
+        if redis_client.is_available():
+            try:
+                return bool(redis_client.call(
+                    redis_client.client.set,
+                    "stats_cache:l:" + key,
+                    "1",
+                    nx=True,
+                    px=int(self.lock_seconds * 1000),
+                ))
+            except Exception as e:
+                logger.debug("Stats cache lock failed, locking locally: %s", e)
+        with self._lock:
+            if key in self._local_refreshing:
+                return False
+            self._local_refreshing.add(key)
+            return True
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._local_refreshing.discard(key)
+        if redis_client.is_available():
+            try:
+                redis_client.call(redis_client.client.delete, "stats_cache:l:" + key)
+            except Exception as e:
+                logger.debug("Stats cache unlock failed, lock expires on its own: %s", e)
+
+    # -- Invalidation -------------------------------------------------------------
+
+    def invalidate(self) -> None:
+        """Start a new generation: every cached response is recomputed on next use."""
+        with self._lock:
+            self._local_generation += 1
+        if redis_client.is_available():
+            try:
+                redis_client.call(redis_client.client.incr, GENERATION_KEY)
+            except Exception as e:
+                logger.warning("Stats cache invalidation not shared with other workers: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+            self._local_refreshing.clear()
+        self.invalidate()
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "local_entries": len(self._local),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "waits": self.waits,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+        }
+
+
+# Global cache shared by the /stats routes of this worker
+stats_cache = StatsCache(
+    ttl_seconds=settings.STATS_CACHE_TTL_SECONDS,
+    early_seconds=settings.STATS_CACHE_EARLY_REFRESH_SECONDS,
+    lock_seconds=settings.STATS_CACHE_LOCK_SECONDS,
+    max_entries=settings.STATS_CACHE_MAX_ENTRIES,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_stats_writes(session: Session, flush_context) -> None:
+    if any(
+        isinstance(obj, _INVALIDATING_MODELS)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info["stats_cache_dirty"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_stats_writes(orm_execute_state) -> None:
+    # Bulk INSERT/UPDATE/DELETE statements never show up in session.new/dirty/deleted
+    if (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete) and (
+        orm_execute_state.bind_mapper is not None
+        and orm_execute_state.bind_mapper.class_ in _INVALIDATING_MODELS
+    ):
+        orm_execute_state.session.info["stats_cache_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop("stats_cache_dirty", False):
+        stats_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session: Session) -> None:
+    session.info.pop("stats_cache_dirty", None)
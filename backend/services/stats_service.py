@@ -4,6 +4,8 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from repositories import daily_stats_repository as rollup_metrics
+from repositories.daily_stats_repository import DailyStatsRepository
 from repositories.stats_repository import (
     StatsRepository,
     get_date_range,
@@ -19,33 +21,43 @@ logger = logging.getLogger(__name__)
 
 
 class StatsService:
-    def __init__(self, db: Session, repo: StatsRepository | None = None):
+    def __init__(
+        self,
+        db: Session,
+        repo: StatsRepository | None = None,
+        rollup: DailyStatsRepository | None = None,
+    ):
         self.db = db
         self.repo = repo or StatsRepository(db)
+        # Ticket, package and sales figures come from the daily_stats rollup;
+        # trips and clients are still counted from their own tables.
+        self.rollup = rollup or DailyStatsRepository(db)
+
+    def _totals(self, start_date: date, end_date: date, metric: str) -> tuple[int, float]:
+        return self.rollup.totals(start_date, end_date, [metric])[metric]
 
     def get_ticket_stats(self, period: str) -> dict:
         start_date, end_date, prev_start, prev_end = get_date_range(period)
-        current = self.repo.get_ticket_stats(start_date, end_date)
-        previous = self.repo.get_ticket_stats(prev_start, prev_end)
+        count, amount = self._totals(start_date, end_date, rollup_metrics.TICKETS_CONFIRMED)
+        _, previous_amount = self._totals(prev_start, prev_end, rollup_metrics.TICKETS_CONFIRMED)
 
-        trend = calculate_trend(float(current.amount), float(previous.amount))
+        trend = calculate_trend(amount, previous_amount)
         return {
-            "count": current.count,
-            "amount": float(current.amount),
+            "count": count,
+            "amount": amount,
             "trend": round(trend, 2),
             "period": period,
         }
 
     def get_package_stats(self, period: str) -> dict:
         start_date, end_date, prev_start, prev_end = get_date_range(period)
-        current = self.repo.get_package_stats(start_date, end_date)
-        previous = self.repo.get_package_stats(prev_start, prev_end)
+        count, amount = self._totals(start_date, end_date, rollup_metrics.PACKAGES_CREATED)
+        _, previous_amount = self._totals(prev_start, prev_end, rollup_metrics.PACKAGES_CREATED)
 
-        count_trend = calculate_trend(float(current.count), float(previous.count))
-        amount_trend = calculate_trend(float(current.amount), float(previous.amount))
+        amount_trend = calculate_trend(amount, previous_amount)
         return {
-            "count": current.count,
-            "amount": float(current.amount),
+            "count": count,
+            "amount": amount,
             "trend": round(amount_trend, 2),
             "period": period,
         }
@@ -59,21 +71,39 @@ class StatsService:
         return {"count": current.count, "trend": round(trend, 2), "period": period}
 
     def get_dashboard_stats(self, period: str) -> dict:
+        totals = self.repo.get_dashboard_totals(*get_date_range(period))
+
+        ticket_trend = calculate_trend(totals["ticket_amount"], totals["previous_ticket_amount"])
+        package_trend = calculate_trend(totals["package_amount"], totals["previous_package_amount"])
+        trip_trend = calculate_trend(float(totals["trip_count"]), float(totals["previous_trip_count"]))
         return {
-            "tickets": self.get_ticket_stats(period),
-            "packages": self.get_package_stats(period),
-            "trips": self.get_trip_stats(period),
+            "tickets": {
+                "count": totals["ticket_count"],
+                "amount": totals["ticket_amount"],
+                "trend": round(ticket_trend, 2),
+                "period": period,
+            },
+            "packages": {
+                "count": totals["package_count"],
+                "amount": totals["package_amount"],
+                "trend": round(package_trend, 2),
+                "period": period,
+            },
+            "trips": {"count": totals["trip_count"], "trend": round(trip_trend, 2), "period": period},
         }
 
     def get_tickets_summary(self, period: str) -> dict:
         start_date, end_date, _, _ = get_date_range(period)
-        confirmed, pending, cancelled, total_revenue = self.repo.get_tickets_summary(
-            start_date, end_date
-        )
+        totals = self.rollup.totals(start_date, end_date, [
+            rollup_metrics.TICKETS_CONFIRMED,
+            rollup_metrics.TICKETS_PENDING,
+            rollup_metrics.TICKETS_CANCELLED,
+        ])
+        confirmed, total_revenue = totals[rollup_metrics.TICKETS_CONFIRMED]
         return {
             "confirmed": confirmed,
-            "pending": pending,
-            "cancelled": cancelled,
+            "pending": totals[rollup_metrics.TICKETS_PENDING][0],
+            "cancelled": totals[rollup_metrics.TICKETS_CANCELLED][0],
             "totalRevenue": total_revenue,
             "period": period,
         }
@@ -93,7 +123,7 @@ class StatsService:
                 else "Desconocido"
             )
             total_seats = trip.bus.capacity if trip.bus else 40
-            occupied_seats = self.repo.get_occupied_seats_for_trip(trip.id) or 0
+            occupied_seats = trip.occupied_seats or 0
             result.append({
                 "id": trip.id,
                 "route": {"origin": origin, "destination": destination},
@@ -142,27 +172,26 @@ class StatsService:
     def get_sales_summary(self, period: str) -> dict:
         start_date, end_date, prev_start, prev_end = get_date_range(period)
 
-        current_tickets = self.repo.get_ticket_stats(start_date, end_date)
-        current_packages = self.repo.get_package_stats(start_date, end_date)
-        previous_tickets = self.repo.get_ticket_stats(prev_start, prev_end)
-        previous_packages = self.repo.get_package_stats(prev_start, prev_end)
+        metrics = [rollup_metrics.TICKETS_CONFIRMED, rollup_metrics.PACKAGES_CREATED]
+        current = self.rollup.totals(start_date, end_date, metrics)
+        previous = self.rollup.totals(prev_start, prev_end, metrics)
 
-        current_total = float(current_tickets.amount) + float(current_packages.amount)
-        previous_total = float(previous_tickets.amount) + float(previous_packages.amount)
+        current_total = sum(amount for _, amount in current.values())
+        previous_total = sum(amount for _, amount in previous.values())
         trend = calculate_trend(current_total, previous_total)
 
         return {
             "totalAmount": current_total,
-            "ticketCount": current_tickets.count,
-            "packageCount": current_packages.count,
+            "ticketCount": current[rollup_metrics.TICKETS_CONFIRMED][0],
+            "packageCount": current[rollup_metrics.PACKAGES_CREATED][0],
             "trend": round(trend, 2),
             "period": period,
         }
 
     def get_reserved_ticket_stats(self, period: str) -> dict:
         start_date, end_date, prev_start, prev_end = get_date_range(period)
-        current = self.repo._pending_ticket_count(start_date, end_date)
-        previous = self.repo._pending_ticket_count(prev_start, prev_end)
+        current, _ = self._totals(start_date, end_date, rollup_metrics.TICKETS_PENDING)
+        previous, _ = self._totals(prev_start, prev_end, rollup_metrics.TICKETS_PENDING)
         trend = calculate_trend(float(current), float(previous))
         return {"count": current, "trend": round(trend, 2), "period": period}
 
@@ -184,21 +213,21 @@ class StatsService:
 
     def get_monthly_ticket_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
-        rows = self.repo.get_monthly_confirmed_tickets(start_date)
+        rows = self.rollup.monthly(start_date, rollup_metrics.TICKETS_CONFIRMED)
         data_dict = self._build_monthly_from_rows(rows)
         result_data = build_monthly_series(start_year, start_month, months, data_dict)
         return {"data": result_data, "trend": compute_monthly_trend(result_data)}
 
     def get_monthly_reservation_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
-        rows = self.repo.get_monthly_pending_tickets(start_date)
+        rows = self.rollup.monthly(start_date, rollup_metrics.TICKETS_RESERVED)
         data_dict = self._build_monthly_from_count_only(rows)
         result_data = build_monthly_series(start_year, start_month, months, data_dict)
         return {"data": result_data, "trend": compute_monthly_trend(result_data)}
 
     def get_monthly_package_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
-        rows = self.repo.get_monthly_packages_by_state(start_date, "in_transit")
+        rows = self.rollup.monthly(start_date, rollup_metrics.PACKAGES_IN_TRANSIT)
         data_dict = self._build_monthly_from_count_only(rows)
         result_data = build_monthly_series(start_year, start_month, months, data_dict)
         return {"data": result_data, "trend": compute_monthly_trend(result_data)}
@@ -215,13 +244,13 @@ class StatsService:
     def get_monthly_revenue_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
 
-        ticket_rows = self.repo.get_monthly_ticket_revenue(start_date)
+        ticket_rows = self.rollup.monthly(start_date, rollup_metrics.TICKETS_CONFIRMED)
         ticket_dict = {}
         for row in ticket_rows:
             key = f"{int(row.year)}-{int(row.month)}"
             ticket_dict[key] = float(row.amount)
 
-        package_rows = self.repo.get_monthly_package_revenue(start_date)
+        package_rows = self.rollup.monthly(start_date, rollup_metrics.PACKAGES_REVENUE)
         package_dict = {}
         for row in package_rows:
             key = f"{int(row.year)}-{int(row.month)}"
@@ -245,7 +274,7 @@ class StatsService:
 
     def get_monthly_ticket_revenue_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
-        rows = self.repo.get_monthly_ticket_revenue(start_date)
+        rows = self.rollup.monthly(start_date, rollup_metrics.TICKETS_CONFIRMED)
         data_dict = self._build_monthly_from_rows(rows)
         result_data = build_monthly_series(
             start_year, start_month, months, data_dict, use_amount_as_value=True
@@ -254,7 +283,7 @@ class StatsService:
 
     def get_monthly_package_revenue_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
-        rows = self.repo.get_monthly_package_revenue(start_date)
+        rows = self.rollup.monthly(start_date, rollup_metrics.PACKAGES_REVENUE)
         data_dict = self._build_monthly_from_rows(rows)
         result_data = build_monthly_series(
             start_year, start_month, months, data_dict, use_amount_as_value=True
@@ -263,7 +292,7 @@ class StatsService:
 
     def get_monthly_cancelled_ticket_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
-        rows = self.repo.get_monthly_tickets_by_state(start_date, "cancelled")
+        rows = self.rollup.monthly(start_date, rollup_metrics.TICKETS_CREATED_CANCELLED)
         data_dict = self._build_monthly_from_rows(rows)
         result_data = build_monthly_series(start_year, start_month, months, data_dict)
         return {"data": result_data, "trend": compute_monthly_trend(result_data)}
@@ -284,17 +313,23 @@ class StatsService:
 
     def get_monthly_client_feedback_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
-        rows = self.repo.get_monthly_client_feedback(start_date)
+        created = self.rollup.monthly(start_date, rollup_metrics.TICKETS_CREATED)
+        cancelled = {
+            (int(row.year), int(row.month)): int(row.count)
+            for row in self.rollup.monthly(start_date, rollup_metrics.TICKETS_CREATED_CANCELLED)
+        }
 
         data_dict = {}
-        for row in rows:
+        for row in created:
             key = f"{int(row.year)}-{int(row.month)}"
-            if row.total_tickets > 0:
-                success_rate = row.successful_tickets / row.total_tickets
+            total_tickets = int(row.count)
+            if total_tickets > 0:
+                successful_tickets = total_tickets - cancelled.get((int(row.year), int(row.month)), 0)
+                success_rate = successful_tickets / total_tickets
                 rating = 3.5 + (success_rate * 1.5)
             else:
                 rating = 4.0
-            data_dict[key] = {"rating": round(rating, 1), "count": row.total_tickets}
+            data_dict[key] = {"rating": round(rating, 1), "count": total_tickets}
 
         result_data = []
         for i in range(months):
@@ -338,14 +373,14 @@ class StatsService:
 
     def get_monthly_delivered_packages_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
-        rows = self.repo.get_monthly_packages_by_state(start_date, "delivered")
+        rows = self.rollup.monthly(start_date, rollup_metrics.PACKAGES_DELIVERED)
         data_dict = self._build_monthly_from_count_only(rows)
         result_data = build_monthly_series(start_year, start_month, months, data_dict)
         return {"data": result_data, "trend": compute_monthly_trend(result_data)}
 
     def get_monthly_cancelled_reservation_stats(self, months: int) -> dict:
         start_year, start_month, start_date = compute_monthly_start(months)
-        rows = self.repo.get_monthly_tickets_by_state(start_date, "cancelled")
+        rows = self.rollup.monthly(start_date, rollup_metrics.TICKETS_CREATED_CANCELLED)
         data_dict = self._build_monthly_from_rows(rows)
         result_data = build_monthly_series(start_year, start_month, months, data_dict)
         return {"data": result_data, "trend": compute_monthly_trend(result_data)}
@@ -1,7 +1,9 @@
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from core.exceptions import (
@@ -14,7 +16,10 @@ from core.exceptions import (
 from models.ticket import Ticket
 from models.seat import Seat
 from models.user import User
-from repositories.ticket_repository import TicketRepository
+from repositories.base import Page
+from repositories.cash_register_repository import CashRegisterRepository
+from repositories.daily_stats_repository import DailyStatsRepository
+from repositories.ticket_repository import TicketRepository, occupies_seat, seat_already_booked
 from schemas.ticket import TicketCreate, TicketUpdate
 from services.seat_lock_service import SeatLockService
 
@@ -32,10 +37,14 @@ class TicketService:
         self.db = db
         self.repo = repo or TicketRepository(db)
         self.lock_service = lock_service or SeatLockService()
+        self.stats = DailyStatsRepository(db)
 
     def get_all(self) -> list[Ticket]:
         return self.repo.get_all_tickets()
 
+    def get_page(self, cursor: str, limit: int = 100, count: str = "none") -> Page[Ticket]:
+        return self.repo.get_page(cursor=cursor, limit=limit, count=count)
+
     def get_by_id(self, ticket_id: int) -> Ticket:
         ticket = self.repo.get_by_id_eager(ticket_id)
         if not ticket:
@@ -55,29 +64,46 @@ class TicketService:
         return self.repo.search(term, limit)
 
     def create_ticket(self, data: TicketCreate) -> Ticket:
+        """Sell a seat.
+
+        Seat, trip, client, the operator's secretary and the office's open
+        cash register are read in one query; the ticket, its history entry and
+        the cash transaction are committed together. Two sales of the same
+        seat are settled by the ``uq_tickets_trip_active_seat`` index.
+        """
         logger.debug("Creating ticket with data: %s", data)
 
-        seat = self.repo.get_seat_by_id(data.seat_id)
-        if not seat:
-            raise NotFoundException(f"Seat with id {data.seat_id} not found")
+        valid_states = ["pending", "confirmed", "cancelled", "completed", "reserved"]
+        if data.state.lower() not in valid_states:
+            raise ValidationException(
+                f"Invalid ticket state: {data.state}. Valid states are: {', '.join(valid_states)}"
+            )
 
-        client = self.repo.get_client_by_id(data.client_id)
-        if not client:
+        sale = self.repo.get_sale_context(data.seat_id, data.trip_id, data.client_id, data.operator_user_id)
+        if sale.seat_bus_id is None:
+            raise NotFoundException(f"Seat with id {data.seat_id} not found")
+        if sale.client_id is None:
             raise NotFoundException(f"Client with id {data.client_id} not found")
-
-        trip = self.repo.get_trip_by_id(data.trip_id)
-        if not trip:
+        if sale.trip_datetime is None:
             raise NotFoundException(f"Trip with id {data.trip_id} not found")
 
-        actual_secretary_id = self._resolve_secretary(data.operator_user_id)
-
-        if trip.trip_datetime < datetime.now():
+        if sale.secretary_id is not None:
+            actual_secretary_id, register_id = sale.secretary_id, sale.register_id
+        else:
+            # Admins without a secretary profile sell on behalf of another secretary
+            actual_secretary_id = self._resolve_secretary(data.operator_user_id)
+            secretary = self.repo.get_secretary_by_id(actual_secretary_id)
+            office_id = secretary.office_id if secretary and secretary.office_id else 1
+            register = CashRegisterRepository(self.db).get_open_register_by_office(office_id)
+            register_id = register.id if register else None
+
+        if sale.trip_datetime < datetime.now():
             logger.warning(
                 "Creating ticket for departed trip (trip_datetime: %s)",
-                trip.trip_datetime,
+                sale.trip_datetime,
             )
 
-        if seat.bus_id != trip.bus_id:
+        if sale.seat_bus_id != sale.trip_bus_id:
             raise ValidationException(
                 f"Seat with id {data.seat_id} does not belong to the bus assigned to trip {data.trip_id}"
             )
@@ -88,33 +114,13 @@ class TicketService:
                 f"El asiento está temporalmente bloqueado por otro usuario."
             )
 
-        existing = self.repo.get_active_by_seat_and_trip(data.seat_id, data.trip_id)
-        if existing:
+        # Fast rejection only; concurrent sales are settled by the unique index
+        if sale.booked_ticket_id is not None:
             raise ConflictException(
                 f"Seat with id {data.seat_id} is already booked for trip {data.trip_id}"
             )
 
-        valid_states = ["pending", "confirmed", "cancelled", "completed", "reserved"]
-        if data.state.lower() not in valid_states:
-            raise ValidationException(
-                f"Invalid ticket state: {data.state}. Valid states are: {', '.join(valid_states)}"
-            )
-
-        from services.cash_register_service import CashRegisterService
-        from schemas.cash_register import CashTransactionCreate
-        from core.enums import CashTransactionType, PaymentMethod
-
-        cash_service = CashRegisterService(self.db)
-        secretary = self.repo.get_secretary_by_id(actual_secretary_id)
-
-        office_id = secretary.office_id if secretary and secretary.office_id else 1
-        if not office_id:
-            raise ValidationException(
-                "El usuario no tiene una oficina asignada para abrir caja."
-            )
-
-        current_register = cash_service.get_current_register(office_id)
-        if not current_register:
+        if register_id is None:
             raise ValidationException(
                 "No hay caja abierta para su oficina. Debe abrir caja antes de realizar ventas."
             )
@@ -129,42 +135,65 @@ class TicketService:
             price=data.price,
             payment_method=data.payment_method.lower() if data.payment_method else None,
         )
-        self.repo.create_ticket(new_ticket)
-        self.db.commit()
-        self.db.refresh(new_ticket)
-
-        self.repo.log_state_change(
-            ticket_id=new_ticket.id,
-            new_state=new_ticket.state,
-            old_state=None,
-            changed_by_user_id=data.operator_user_id,
-        )
-        self.db.commit()
-
-        if new_ticket.state in ["completed", "confirmed"] and new_ticket.price > 0:
-            payment_enum = PaymentMethod.CASH
-            if data.payment_method:
-                try:
-                    payment_enum = PaymentMethod(data.payment_method.lower())
-                except ValueError:
-                    payment_enum = PaymentMethod.CASH
-
-            cash_service.record_transaction(
-                CashTransactionCreate(
-                    cash_register_id=current_register.id,
-                    type=CashTransactionType.TICKET_SALE,
-                    amount=new_ticket.price,
-                    payment_method=payment_enum,
-                    reference_id=new_ticket.id,
-                    reference_type="ticket",
-                    description=f"Venta de boleto {new_ticket.id} para viaje {data.trip_id}",
+        with self._seat_uniqueness(data.seat_id, data.trip_id):
+            with self.stats.track(new_ticket):
+                self.repo.create_ticket(new_ticket)
+                if occupies_seat(new_ticket.state):
+                    self.repo.adjust_trip_occupied_seats(new_ticket.trip_id, 1)
+                self.repo.log_state_change(
+                    ticket_id=new_ticket.id,
+                    new_state=new_ticket.state,
+                    old_state=None,
+                    changed_by_user_id=data.operator_user_id,
                 )
-            )
 
-        self.lock_service.unlock_seat(data.trip_id, data.seat_id, data.operator_user_id)
+            if new_ticket.state in ["completed", "confirmed"] and new_ticket.price > 0:
+                self._add_sale_transaction(new_ticket, register_id, data.payment_method)
+            self.db.commit()
+
+        # The sale consumes the operator's lock and tells every viewer the seat is gone
+        self.lock_service.mark_sold(data.trip_id, [data.seat_id])
 
         logger.debug("Ticket created successfully: %d", new_ticket.id)
-        return new_ticket
+        return self.repo.get_by_id_eager(new_ticket.id)
+
+    def _add_sale_transaction(self, ticket: Ticket, register_id: int, payment_method: Optional[str]) -> None:
+        """Add the TICKET_SALE cash transaction to the sale's transaction. Flushes; the caller commits."""
+        from schemas.cash_register import CashTransactionCreate
+        from core.enums import CashTransactionType, PaymentMethod
+
+        payment_enum = PaymentMethod.CASH
+        if payment_method:
+            try:
+                payment_enum = PaymentMethod(payment_method.lower())
+            except ValueError:
+                payment_enum = PaymentMethod.CASH
+
+        transaction = CashRegisterRepository(self.db).create_transaction(
+            CashTransactionCreate(
+                cash_register_id=register_id,
+                type=CashTransactionType.TICKET_SALE,
+                amount=ticket.price,
+                payment_method=payment_enum,
+                reference_id=ticket.id,
+                reference_type="ticket",
+                description=f"Venta de boleto {ticket.id} para viaje {ticket.trip_id}",
+            ).model_dump()
+        )
+        self.stats.record_cash_transaction(transaction)
+
+    @contextmanager
+    def _seat_uniqueness(self, seat_id: int, trip_id: int):
+        """Turn a violation of the one-active-ticket-per-seat index into a 409."""
+        try:
+            yield
+        except IntegrityError as exc:
+            self.db.rollback()
+            if not seat_already_booked(exc):
+                raise
+            raise ConflictException(
+                f"Seat with id {seat_id} is already booked for trip {trip_id}"
+            ) from None
 
     def update_ticket(self, ticket_id: int, data: TicketUpdate) -> Ticket:
         db_ticket = self.repo.get_by_id_or_raise(ticket_id, "Ticket")
@@ -206,13 +235,6 @@ class TicketService:
                 raise ValidationException(
                     f"Seat with id {data.seat_id} does not belong to the bus assigned to trip {db_ticket.trip_id}"
                 )
-            existing = self.repo.get_active_by_seat_and_trip(
-                data.seat_id, db_ticket.trip_id, exclude_ticket_id=ticket_id
-            )
-            if existing:
-                raise ConflictException(
-                    f"Seat with id {data.seat_id} is already booked for trip {db_ticket.trip_id}"
-                )
 
         if data.client_id and data.client_id != db_ticket.client_id:
             client = self.repo.get_client_by_id(data.client_id)
@@ -230,19 +252,32 @@ class TicketService:
         if "state" in update_data:
             update_data["state"] = update_data["state"].lower()
 
-        for field, value in update_data.items():
-            setattr(db_ticket, field, value)
+        counted_before = occupies_seat(db_ticket.state)
+        trip_before = db_ticket.trip_id
+        seat_after = update_data.get("seat_id", db_ticket.seat_id)
+        trip_after = update_data.get("trip_id", trip_before)
+
+        with self._seat_uniqueness(seat_after, trip_after):
+            with self.stats.track(db_ticket):
+                for field, value in update_data.items():
+                    setattr(db_ticket, field, value)
+
+                counted_after = occupies_seat(db_ticket.state)
+                if trip_before != db_ticket.trip_id:
+                    self.repo.adjust_trip_occupied_seats(trip_before, -int(counted_before))
+                    self.repo.adjust_trip_occupied_seats(db_ticket.trip_id, int(counted_after))
+                else:
+                    self.repo.adjust_trip_occupied_seats(trip_before, int(counted_after) - int(counted_before))
+
+                if old_state and db_ticket.state != old_state:
+                    self.repo.log_state_change(
+                        ticket_id=db_ticket.id,
+                        new_state=db_ticket.state,
+                        old_state=old_state,
+                    )
 
-        self.db.commit()
-        self.db.refresh(db_ticket)
-
-        if old_state and db_ticket.state != old_state:
-            self.repo.log_state_change(
-                ticket_id=db_ticket.id,
-                new_state=db_ticket.state,
-                old_state=old_state,
-            )
             self.db.commit()
+        self.db.refresh(db_ticket)
 
         if old_state == "pending" and db_ticket.state == "confirmed" and db_ticket.price and db_ticket.price > 0:
             self._record_confirmation_transaction(db_ticket)
@@ -347,7 +382,10 @@ class TicketService:
 
     def delete_ticket(self, ticket_id: int) -> None:
         ticket = self.repo.get_by_id_or_raise(ticket_id, "Ticket")
-        self.repo.delete_ticket(ticket)
+        with self.stats.track(ticket):
+            if occupies_seat(ticket.state):
+                self.repo.adjust_trip_occupied_seats(ticket.trip_id, -1)
+            self.repo.delete_ticket(ticket)
         self.db.commit()
 
     def cancel_ticket(self, ticket_id: int) -> Ticket:
@@ -357,15 +395,14 @@ class TicketService:
             return ticket
 
         old_state = ticket.state
-        ticket.state = "cancelled"
-        self.db.commit()
-        self.db.refresh(ticket)
-
-        self.repo.log_state_change(
-            ticket_id=ticket.id,
-            new_state="cancelled",
-            old_state=old_state,
-        )
+        with self.stats.track(ticket):
+            ticket.state = "cancelled"
+            self.repo.adjust_trip_occupied_seats(ticket.trip_id, -1)
+            self.repo.log_state_change(
+                ticket_id=ticket.id,
+                new_state="cancelled",
+                old_state=old_state,
+            )
 
         self._create_reversal_if_applicable(ticket)
 
@@ -440,8 +477,9 @@ class TicketService:
         old_seat = self.repo.get_seat_by_id(ticket.seat_id)
         old_seat_number = old_seat.seat_number if old_seat else "N/A"
 
-        ticket.seat_id = new_seat_id
-        self.db.commit()
+        with self._seat_uniqueness(new_seat_id, ticket.trip_id):
+            ticket.seat_id = new_seat_id
+            self.db.commit()
         self.db.refresh(ticket)
 
         self.repo.log_state_change(
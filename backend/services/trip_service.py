@@ -1,5 +1,6 @@
 import logging
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 from typing import Optional, Any, Dict
 
 from sqlalchemy.orm import Session
@@ -10,21 +11,42 @@ from core.exceptions import (
     ConflictException,
     ValidationException,
 )
+from models.package import Package
+from models.ticket import Ticket
 from models.trip import Trip
 from models.user import User
 from schemas.driver import Driver as DriverSchema
 from schemas.assistant import Assistant as AssistantSchema
 from repositories.trip_repository import TripRepository
+from repositories.daily_stats_repository import DailyStatsRepository
 from repositories.package_repository import PackageRepository
-from repositories.ticket_repository import TicketRepository
-from schemas.trip import TripCreate, TripUpdate
-from core.state_machines import validate_transition, TRIP_TRANSITIONS, TICKET_TRANSITIONS
+from repositories.route_repository import RouteRepository
+from repositories.ticket_repository import TicketRepository, occupies_seat
+from schemas.trip import PlannedTrip, TripConflict, TripCreate, TripUpdate
+from core.state_machines import (
+    validate_transition,
+    PACKAGE_TRANSITIONS,
+    TICKET_TRANSITIONS,
+    TRIP_TRANSITIONS,
+)
 from core.enums import TripStatus, PackageStatus, TicketState
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# How far back schedule materialization looks for a departure's last crew
+CARRY_OVER_LOOKBACK_DAYS = 14
+MAX_MATERIALIZE_DAYS = 92
+
+# Schedulable resources: (name, Trip column, article and noun for messages)
+CONFLICT_RESOURCES = (
+    ("driver", "driver_id", "El conductor"),
+    ("bus", "bus_id", "El bus"),
+    ("assistant", "assistant_id", "El ayudante"),
+)
+
+
 class TripService:
 
     def __init__(
@@ -34,6 +56,7 @@ class TripService:
     ):
         self.db = db
         self.repo = repo or TripRepository(db)
+        self.stats = DailyStatsRepository(db)
 
     def get_trips(
         self,
@@ -53,10 +76,12 @@ class TripService:
         min_seats: Optional[int] = None,
         sort_by: str = "trip_datetime",
         sort_direction: str = "asc",
+        cursor: Optional[str] = None,
+        count: str = "exact",
     ) -> Dict[str, Any]:
-        trips, total = self.repo.get_with_filters(
-            skip=skip,
-            limit=limit,
+        """Trip listing page. Offset paging by default; passing ``cursor`` (empty
+        for the first page) switches to keyset paging over departure time."""
+        filters = dict(
             search=search,
             status=status,
             route_id=route_id,
@@ -68,12 +93,28 @@ class TripService:
             date_from=date_from,
             date_to=date_to,
             min_seats=min_seats,
-            sort_by=sort_by,
-            sort_direction=sort_direction,
         )
+        next_cursor = None
+        if cursor is not None:
+            if sort_by != "trip_datetime":
+                raise ValidationException("La paginación por cursor solo ordena por trip_datetime")
+            page = self.repo.get_page_with_filters(
+                cursor=cursor, limit=limit, count=count, sort_direction=sort_direction, **filters
+            )
+            trips, total, next_cursor = page.items, page.total, page.next_cursor
+        else:
+            trips, total = self.repo.get_with_filters(
+                skip=skip,
+                limit=limit,
+                sort_by=sort_by,
+                sort_direction=sort_direction,
+                count=count,
+                **filters,
+            )
 
         processed_trips = []
         for trip in trips:
+            occupied_seats_count = trip.occupied_seats or 0
             origin_name = (
                 trip.route.origin_location.name
                 if trip.route and trip.route.origin_location
@@ -88,8 +129,6 @@ class TripService:
 
             total_seats = trip.bus.capacity if trip.bus else 0
 
-            occupied_seats_count = self.repo.count_occupied_seats(trip.id)
-
             available_seats = total_seats - occupied_seats_count
 
             driver_info = None
@@ -136,15 +175,13 @@ class TripService:
                 }
             )
 
-        return {
-            "trips": processed_trips,
-            "pagination": {
-                "total": total,
-                "skip": skip,
-                "limit": limit,
-                "pages": (total + limit - 1) // limit if limit > 0 else 0,
-            },
-        }
+        pages = None
+        if total is not None:
+            pages = (total + limit - 1) // limit if limit > 0 else 0
+        pagination = {"total": total, "skip": skip, "limit": limit, "pages": pages}
+        if cursor is not None:
+            pagination["next_cursor"] = next_cursor
+        return {"trips": processed_trips, "pagination": pagination}
 
     def get_trip_detail(self, trip_id: int) -> Dict[str, Any]:
         trip = self.repo.get_by_id_or_raise(trip_id, "Trip")
@@ -318,26 +355,9 @@ class TripService:
             raise NotFoundException(f"Ayudante con id {data.assistant_id} no encontrado")
 
         trip_dt = data.trip_datetime.replace(tzinfo=None)
-
-        if data.driver_id:
-            conflict = self.repo.find_driver_conflict(data.driver_id, trip_dt)
-            if conflict:
-                raise ConflictException(
-                    f"El conductor {data.driver_id} ya está asignado al viaje id {conflict.id} en {conflict.trip_datetime}"
-                )
-
-        conflict = self.repo.find_bus_conflict(data.bus_id, trip_dt)
-        if conflict:
-            raise ConflictException(
-                f"El bus {data.bus_id} ya está asignado al viaje id {conflict.id} en {conflict.trip_datetime}"
-            )
-
-        if data.assistant_id:
-            conflict = self.repo.find_assistant_conflict(data.assistant_id, trip_dt)
-            if conflict:
-                raise ConflictException(
-                    f"El ayudante {data.assistant_id} ya está asignado al viaje id {conflict.id} en {conflict.trip_datetime}"
-                )
+        self._raise_on_conflict(PlannedTrip(
+            trip_datetime=trip_dt, driver_id=data.driver_id, bus_id=data.bus_id, assistant_id=data.assistant_id,
+        ))
 
         conflict = self.repo.find_duplicate(
             trip_dt, data.bus_id, data.route_id, data.driver_id, data.assistant_id
@@ -359,57 +379,197 @@ class TripService:
 
         return new_trip
 
+    def find_conflicts(
+        self, planned: list[PlannedTrip], buffer_hours: Optional[int] = None
+    ) -> list[TripConflict]:
+        """Every driver, bus or assistant of ``planned`` booked twice within the buffer.
+
+        Planned trips are checked against stored trips and against each other,
+        with one query for the whole batch. A planned trip with ``trip_id``
+        replaces that stored trip.
+        """
+        if not planned:
+            return []
+        buffer = timedelta(
+            hours=buffer_hours if buffer_hours is not None else settings.TRIP_CONFLICT_BUFFER_HOURS
+        )
+        departures = [p.trip_datetime.replace(tzinfo=None) for p in planned]
+        stored = self.repo.get_trips_sharing_resources(
+            min(departures) - buffer,
+            max(departures) + buffer,
+            **{
+                f"{column}s": [getattr(p, column) for p in planned if getattr(p, column)]
+                for _, column, _ in CONFLICT_RESOURCES
+            },
+        )
+
+        # (resource, id) -> [(departure, stored trip id, planned index)]
+        bookings = defaultdict(list)
+        rescheduled = {p.trip_id for p in planned if p.trip_id}
+        for trip in stored:
+            if trip.id in rescheduled:
+                continue
+            for resource, column, _ in CONFLICT_RESOURCES:
+                if getattr(trip, column):
+                    bookings[resource, getattr(trip, column)].append((trip.trip_datetime, trip.id, None))
+        for index, (p, departure) in enumerate(zip(planned, departures)):
+            for resource, column, _ in CONFLICT_RESOURCES:
+                if getattr(p, column):
+                    bookings[resource, getattr(p, column)].append((departure, p.trip_id, index))
+
+        conflicts = []
+        order = {resource: n for n, (resource, _, _) in enumerate(CONFLICT_RESOURCES)}
+        for (resource, resource_id), entries in bookings.items():
+            entries.sort(key=lambda e: e[0])
+            for i, first in enumerate(entries):
+                for second in entries[i + 1:]:
+                    if second[0] - first[0] > buffer:
+                        break
+                    for this, other in ((first, second), (second, first)):
+                        if this[2] is not None:
+                            conflicts.append(TripConflict(
+                                index=this[2],
+                                resource=resource,
+                                resource_id=resource_id,
+                                trip_datetime=this[0],
+                                conflicting_trip_id=other[1],
+                                conflicting_index=other[2],
+                                conflicting_datetime=other[0],
+                            ))
+        conflicts.sort(key=lambda c: (c.index, order[c.resource], c.conflicting_datetime))
+        return conflicts
+
+    def materialize_schedules(
+        self,
+        date_from: date,
+        date_to: date,
+        secretary_id: int,
+        *,
+        carry_over: bool = True,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """Create the trips of every active route schedule from ``date_from`` to ``date_to``.
+
+        Departures that already have a trip on that route (in any status) are
+        skipped, so re-running over the same range creates nothing new. With
+        ``carry_over`` each trip gets the bus, driver and assistant of the last
+        trip with the same route and departure time; any of them that would
+        be double-booked is left unassigned and reported. All trips go in with
+        one multi-row INSERT and one commit.
+        """
+        if date_to < date_from:
+            raise ValidationException("La fecha final debe ser posterior a la inicial")
+        if (date_to - date_from).days >= MAX_MATERIALIZE_DAYS:
+            raise ValidationException(f"El rango no puede superar {MAX_MATERIALIZE_DAYS} días")
+        if not self.repo.get_secretary_by_id(secretary_id):
+            raise NotFoundException(f"Secretaria con id {secretary_id} no encontrada")
+
+        schedules = RouteRepository(self.db).lock_active_schedules()
+        route_ids = {s.route_id for s in schedules}
+        start = datetime.combine(date_from, datetime.min.time())
+        end = datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+        now = datetime.now()
+        existing = self.repo.get_departures_by_route(route_ids, start, end) if route_ids else set()
+
+        departures, skipped = [], 0
+        for day in range((date_to - date_from).days + 1):
+            for schedule in schedules:
+                departure = datetime.combine(date_from + timedelta(days=day), schedule.departure_time)
+                if (schedule.route_id, departure) in existing:
+                    skipped += 1
+                elif departure >= now:
+                    departures.append((schedule.route_id, departure))
+
+        crews = {}
+        if carry_over and departures:
+            lookback = start - timedelta(days=CARRY_OVER_LOOKBACK_DAYS)
+            for row in self.repo.get_recent_assignments(route_ids, lookback, start):
+                crews[row.route_id, row.trip_datetime.time()] = row  # latest wins
+
+        planned = []
+        for route_id, departure in departures:
+            crew = crews.get((route_id, departure.time()))
+            planned.append(PlannedTrip(
+                trip_datetime=departure,
+                **{column: getattr(crew, column) if crew else None for _, column, _ in CONFLICT_RESOURCES},
+            ))
+        # Greedy, in planned order: a clash with a stored trip always frees the
+        # resource; of two planned trips, the later one yields, and only while
+        # the earlier still holds it (each pair is reported from both sides).
+        unassigned = {}
+        for conflict in sorted(self.find_conflicts(planned), key=lambda c: c.index):
+            column = next(column for resource, column, _ in CONFLICT_RESOURCES if resource == conflict.resource)
+            if conflict.conflicting_index is not None and (
+                conflict.conflicting_index > conflict.index
+                or getattr(planned[conflict.conflicting_index], column) != conflict.resource_id
+            ):
+                continue
+            setattr(planned[conflict.index], column, None)
+            unassigned.setdefault((conflict.index, conflict.resource), {
+                "route_id": departures[conflict.index][0],
+                "trip_datetime": conflict.trip_datetime,
+                "resource": conflict.resource,
+                "resource_id": conflict.resource_id,
+            })
+
+        rows = [
+            {
+                "trip_datetime": p.trip_datetime,
+                "route_id": route_id,
+                "bus_id": p.bus_id,
+                "driver_id": p.driver_id,
+                "assistant_id": p.assistant_id,
+                "secretary_id": secretary_id,
+                "status": TripStatus.SCHEDULED.value,
+            }
+            for (route_id, _), p in zip(departures, planned)
+        ]
+        if not dry_run:
+            self.repo.bulk_create(rows)
+            self.db.commit()
+        else:
+            self.db.rollback()
+
+        return {
+            "created": len(rows),
+            "existing": skipped,
+            "unassigned": list(unassigned.values()),
+            "dry_run": dry_run,
+        }
+
+    def _raise_on_conflict(self, planned: PlannedTrip) -> None:
+        conflicts = self.find_conflicts([planned])
+        if conflicts:
+            conflict = conflicts[0]
+            label = next(label for resource, _, label in CONFLICT_RESOURCES if resource == conflict.resource)
+            raise ConflictException(
+                f"{label} {conflict.resource_id} ya está asignado al viaje id {conflict.conflicting_trip_id} en {conflict.conflicting_datetime}"
+            )
+
     def update_trip(self, trip_id: int, data: TripUpdate) -> Trip:
         trip = self.repo.get_by_id_or_raise(trip_id, "Trip")
         update_data = data.model_dump(exclude_unset=True)
 
-        if "driver_id" in update_data and update_data["driver_id"]:
-            if not self.repo.get_driver_by_id(update_data["driver_id"]):
-                raise NotFoundException(
-                    f"Conductor con id {update_data['driver_id']} no encontrado"
-                )
-            trip_dt = update_data.get("trip_datetime", trip.trip_datetime).replace(
-                tzinfo=None
-            )
-            conflict = self.repo.find_driver_conflict(
-                update_data["driver_id"], trip_dt, exclude_trip_id=trip_id
+        if update_data.get("driver_id") and not self.repo.get_driver_by_id(update_data["driver_id"]):
+            raise NotFoundException(
+                f"Conductor con id {update_data['driver_id']} no encontrado"
             )
-            if conflict:
-                raise ConflictException(
-                    f"El conductor {update_data['driver_id']} ya está asignado al viaje id {conflict.id} en {conflict.trip_datetime}"
-                )
-
-        if "bus_id" in update_data and update_data["bus_id"]:
-            if not self.repo.get_bus_by_id(update_data["bus_id"]):
-                raise NotFoundException(
-                    f"Bus con id {update_data['bus_id']} no encontrado"
-                )
-            trip_dt = update_data.get("trip_datetime", trip.trip_datetime).replace(
-                tzinfo=None
+        if update_data.get("bus_id") and not self.repo.get_bus_by_id(update_data["bus_id"]):
+            raise NotFoundException(
+                f"Bus con id {update_data['bus_id']} no encontrado"
             )
-            conflict = self.repo.find_bus_conflict(
-                update_data["bus_id"], trip_dt, exclude_trip_id=trip_id
+        if update_data.get("assistant_id") and not self.repo.get_assistant_by_id(update_data["assistant_id"]):
+            raise NotFoundException(
+                f"Ayudante con id {update_data['assistant_id']} no encontrado"
             )
-            if conflict:
-                raise ConflictException(
-                    f"El bus {update_data['bus_id']} ya está asignado al viaje id {conflict.id} en {conflict.trip_datetime}"
-                )
 
-        if "assistant_id" in update_data and update_data["assistant_id"]:
-            if not self.repo.get_assistant_by_id(update_data["assistant_id"]):
-                raise NotFoundException(
-                    f"Ayudante con id {update_data['assistant_id']} no encontrado"
-                )
-            trip_dt = update_data.get("trip_datetime", trip.trip_datetime).replace(
-                tzinfo=None
-            )
-            conflict = self.repo.find_assistant_conflict(
-                update_data["assistant_id"], trip_dt, exclude_trip_id=trip_id
-            )
-            if conflict:
-                raise ConflictException(
-                    f"El ayudante {update_data['assistant_id']} ya está asignado al viaje id {conflict.id} en {conflict.trip_datetime}"
-                )
+        # Only newly assigned resources are checked, at the new or current time
+        trip_dt = (update_data.get("trip_datetime") or trip.trip_datetime).replace(tzinfo=None)
+        self._raise_on_conflict(PlannedTrip(
+            trip_datetime=trip_dt,
+            trip_id=trip_id,
+            **{column: update_data.get(column) for _, column, _ in CONFLICT_RESOURCES},
+        ))
 
         if "route_id" in update_data and update_data["route_id"]:
             if not self.repo.get_route_by_id(update_data["route_id"]):
@@ -462,30 +622,25 @@ class TripService:
     def _bulk_transition_packages(
         self, trip_id: int, from_status: str, to_status: str
     ) -> None:
+        validate_transition("package", PACKAGE_TRANSITIONS, from_status, to_status)
         package_repo = PackageRepository(self.db)
-        packages = self.repo.get_packages_by_trip_and_status(trip_id, from_status)
+        packages = package_repo.lock_statuses_by_trip(trip_id, from_status)
 
-        for pkg in packages:
-            old_status = pkg.status
-            pkg.status = to_status
-            package_repo.log_state_change(
-                package_id=pkg.id, old_state=old_status, new_state=to_status
-            )
+        with self.stats.track_rows(Package, [package_id for package_id, _ in packages]):
+            package_repo.bulk_change_status(trip_id, packages, to_status)
 
     def _bulk_transition_tickets(
         self, trip_id: int, from_state: str, to_state: str
     ) -> None:
+        validate_transition("ticket", TICKET_TRANSITIONS, from_state, to_state)
         ticket_repo = TicketRepository(self.db)
-        tickets = ticket_repo.get_active_by_trip(trip_id)
-        matching = [t for t in tickets if t.state == from_state]
-
-        for t in matching:
-            validate_transition("ticket", TICKET_TRANSITIONS, t.state, to_state)
-            old_state = t.state
-            t.state = to_state
-            ticket_repo.log_state_change(
-                ticket_id=t.id, old_state=old_state, new_state=to_state
-            )
+        ticket_ids = ticket_repo.lock_ids_by_trip_and_state(trip_id, from_state)
+
+        with self.stats.track_rows(Ticket, ticket_ids):
+            ticket_repo.bulk_change_state(trip_id, ticket_ids, from_state, to_state)
+
+        per_ticket = int(occupies_seat(to_state)) - int(occupies_seat(from_state))
+        ticket_repo.adjust_trip_occupied_seats(trip_id, per_ticket * len(ticket_ids))
 
     def dispatch_trip(self, trip_id: int) -> Trip:
         trip = self.repo.get_by_id_or_raise(trip_id, "Trip")
@@ -535,7 +690,7 @@ class TripService:
             )
 
             total_seats = trip.bus.capacity if trip.bus else 0
-            ticket_count = self.repo.count_occupied_seats(trip.id)
+            ticket_count = trip.occupied_seats or 0
 
             package_count = self.repo.count_packages_by_trip(trip.id)
 
@@ -665,16 +820,11 @@ class TripService:
 
         trip.status = TripStatus.CANCELLED
         package_repo = PackageRepository(self.db)
-        packages = self.repo.get_packages_by_trip(trip_id)
-
-        for pkg in packages:
-            old_status = pkg.status
-            pkg.status = PackageStatus.REGISTERED_AT_OFFICE
-            pkg.trip_id = None
-            package_repo.log_state_change(
-                package_id=pkg.id,
-                old_state=old_status,
-                new_state=PackageStatus.REGISTERED_AT_OFFICE,
+        packages = package_repo.lock_statuses_by_trip(trip_id)
+
+        with self.stats.track_rows(Package, [package_id for package_id, _ in packages]):
+            package_repo.bulk_change_status(
+                trip_id, packages, PackageStatus.REGISTERED_AT_OFFICE, values={"trip_id": None}
             )
 
         self.db.commit()
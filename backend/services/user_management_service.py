@@ -10,6 +10,7 @@ from core.exceptions import (
     ForbiddenException,
 )
 from core.security import get_password_hash
+from auth.principal_cache import principal_cache
 from models.user import User, UserRole
 from models.secretary import Secretary
 from models.administrator import Administrator
@@ -120,6 +121,7 @@ class UserManagementService:
                 setattr(user, field, value)
 
         self.db.commit()
+        principal_cache.invalidate(user_id=user.id)
         self.db.refresh(user)
         return user
 
@@ -129,11 +131,13 @@ class UserManagementService:
         user = self.repo.get_by_id_or_raise(user_id, "User")
         self.repo.delete_user(user)
         self.db.commit()
+        principal_cache.invalidate(user_id=user_id)
 
     def activate_user(self, user_id: int) -> User:
         user = self.repo.get_by_id_or_raise(user_id, "User")
         user.is_active = True
         self.db.commit()
+        principal_cache.invalidate(user_id=user.id)
         self.db.refresh(user)
         return user
 
@@ -143,6 +147,7 @@ class UserManagementService:
         user = self.repo.get_by_id_or_raise(user_id, "User")
         user.is_active = False
         self.db.commit()
+        principal_cache.invalidate(user_id=user.id)
         self.db.refresh(user)
         return user
 
@@ -261,6 +266,7 @@ class UserManagementService:
 
         if user_updated:
             self.db.commit()
+            principal_cache.invalidate(user_id=current_user.id)
             self.db.refresh(current_user)
 
         person_entity = self._get_person_entity(current_user)
@@ -8,6 +8,8 @@ import pytest
 
 # Establecer que estamos en modo testing
 os.environ["TESTING"] = "true"
+os.environ.setdefault("WS_BACKPLANE", "memory")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -49,9 +51,13 @@ def db_session(test_engine):
 @pytest.fixture(scope="function")
 def client(db_session):
     """Crea un cliente de prueba para la API."""
-    # Limpiar blacklist de tokens antes de cada test
+    # Limpiar blacklist de tokens y cachés (usuarios, estadísticas) antes de cada test
     from auth.blacklist import token_blacklist
+    from auth.principal_cache import principal_cache
+    from services.stats_cache import stats_cache
     token_blacklist.clear_blacklist()
+    principal_cache.clear()
+    stats_cache.clear()
     
     def override_get_db():
         try:
@@ -64,8 +70,10 @@ def client(db_session):
         yield test_client
     app.dependency_overrides.clear()
     
-    # Limpiar blacklist después de cada test
+    # Limpiar blacklist y cachés después de cada test
     token_blacklist.clear_blacklist()
+    principal_cache.clear()
+    stats_cache.clear()
 
 @pytest.fixture(scope="function")
 def test_user(db_session):
@@ -6,6 +6,7 @@ from datetime import date, datetime
 
 from services.cash_register_service import CashRegisterService
 from repositories.cash_register_repository import CashRegisterRepository
+from repositories.daily_stats_repository import DailyStatsRepository
 from repositories.office_repository import OfficeRepository
 from core.enums import CashRegisterStatus, CashTransactionType, PaymentMethod
 from core.exceptions import NotFoundException, ValidationException, ConflictException
@@ -16,6 +17,7 @@ def _make_service(mock_db, *, cash_repo=None, office_repo=None):
     service.db = mock_db
     service.cash_repo = cash_repo or create_autospec(CashRegisterRepository, instance=True)
     service.office_repo = office_repo or create_autospec(OfficeRepository, instance=True)
+    service.stats = create_autospec(DailyStatsRepository, instance=True)
     return service
 
 
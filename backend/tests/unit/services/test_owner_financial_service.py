@@ -1,4 +1,5 @@
 import pytest
+from datetime import date, datetime
 from unittest.mock import MagicMock
 from services.owner_financial_service import OwnerFinancialService
 from core.exceptions import NotFoundException, ValidationException
@@ -58,85 +59,48 @@ def _setup_service(mock_db):
     return OwnerFinancialService(mock_db)
 
 
+def _stub_owner_repo(owner, trips, tickets=(), packages=(), withdrawals=(), office_names=None):
+    repo = MagicMock()
+    repo.get_by_id_or_none.return_value = owner
+    repo.get_trips_for_financials.return_value = trips
+    repo.get_ticket_amounts_by_trip_office.return_value = list(tickets)
+    repo.get_package_amounts_by_trip.return_value = list(packages)
+    repo.get_withdrawal_amounts_by_trip_office.return_value = list(withdrawals)
+    repo.get_office_names.return_value = office_names or {}
+    return repo
+
+
 @pytest.mark.unit
 class TestGetOwnerTripsFinancialsBusId:
     def test_no_bus_id_returns_all_trips(self, mock_db):
-        owner = _make_owner(id=1, bus_ids=[10, 20])
-        trip1 = _make_trip(id=100, bus_id=10)
-        trip2 = _make_trip(id=200, bus_id=20)
-
-        query_owner = MagicMock()
-        query_owner.filter.return_value.first.return_value = owner
-
-        query_trips = MagicMock()
-        query_trips.filter.return_value.all.return_value = [trip1, trip2]
-
-        query_tickets = MagicMock()
-        query_tickets.filter.return_value.all.return_value = []
-
-        query_packages = MagicMock()
-        query_packages.filter.return_value.all.return_value = []
-
-        query_withdrawals = MagicMock()
-        query_withdrawals.filter.return_value.all.return_value = []
-
-        call_count = [0]
-
-        def query_side_effect(model):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                return query_owner
-            if call_count[0] == 2:
-                return query_trips
-            if call_count[0] % 3 == 0:
-                return query_tickets
-            if call_count[0] % 3 == 1:
-                return query_packages
-            return query_withdrawals
-
-        mock_db.query.side_effect = query_side_effect
         service = _setup_service(mock_db)
-        result = service.get_owner_trips_financials(1)
-        assert len(result) == 2
+        service.owner_repo = _stub_owner_repo(
+            _make_owner(id=1, bus_ids=[10, 20]),
+            [_make_trip(id=200, bus_id=20), _make_trip(id=100, bus_id=10)],
+        )
 
-    def test_bus_id_filters_to_single_bus(self, mock_db):
-        owner = _make_owner(id=1, bus_ids=[10, 20])
-        trip_a = _make_trip(id=100, bus_id=10)
-
-        query_owner = MagicMock()
-        query_owner.filter.return_value.first.return_value = owner
-
-        query_trips = MagicMock()
-        query_trips.filter.return_value.all.return_value = [trip_a]
-
-        query_tickets = MagicMock()
-        query_tickets.filter.return_value.all.return_value = []
-
-        query_packages = MagicMock()
-        query_packages.filter.return_value.all.return_value = []
+        result = service.get_owner_trips_financials(1)
 
-        query_withdrawals = MagicMock()
-        query_withdrawals.filter.return_value.all.return_value = []
+        assert [r["trip_id"] for r in result] == [200, 100]
+        service.owner_repo.get_trips_for_financials.assert_called_once_with(
+            [10, 20], date_from=None, date_to=None, skip=0, limit=None
+        )
 
-        call_count = [0]
+    def test_bus_id_filters_to_single_bus(self, mock_db):
+        service = _setup_service(mock_db)
+        service.owner_repo = _stub_owner_repo(
+            _make_owner(id=1, bus_ids=[10, 20]), [_make_trip(id=100, bus_id=10)]
+        )
 
-        def query_side_effect(model):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                return query_owner
-            if call_count[0] == 2:
-                return query_trips
-            if call_count[0] % 3 == 0:
-                return query_tickets
-            if call_count[0] % 3 == 1:
-                return query_packages
-            return query_withdrawals
+        result = service.get_owner_trips_financials(
+            1, bus_id=10, date_from=date(2025, 1, 1), limit=20
+        )
 
-        mock_db.query.side_effect = query_side_effect
-        service = _setup_service(mock_db)
-        result = service.get_owner_trips_financials(1, bus_id=10)
         assert len(result) == 1
         assert result[0]["trip_id"] == 100
+        service.owner_repo.get_trips_for_financials.assert_called_once_with(
+            [10], date_from=date(2025, 1, 1), date_to=None, skip=0, limit=20
+        )
 
     def test_bus_id_not_owned_raises(self, mock_db):
         owner = _make_owner(id=1, bus_ids=[10])
@@ -156,6 +120,127 @@ class TestGetOwnerTripsFinancialsBusId:
             service.get_owner_trips_financials(999)
 
 
+@pytest.mark.unit
+class TestTripsFinancialsFromAggregates:
+    def test_package_rows_are_attributed_by_payment_and_status(self, mock_db):
+        service = _setup_service(mock_db)
+        service.owner_repo = _stub_owner_repo(
+            _make_owner(id=1, bus_ids=[10]),
+            [_make_trip(id=100, bus_id=10)],
+            tickets=[(100, 1, 120.0), (100, None, 30.0)],
+            packages=[
+                (100, 1, 2, "paid_on_send", "in_transit", 50.0),
+                (100, 1, 2, "collect_on_delivery", "delivered", 40.0),
+                (100, 1, 2, "collect_on_delivery", "in_transit", 25.0),
+                (100, 1, 2, "other", "Pagado", 10.0),
+                (100, 1, None, "other", "registered", 5.0),
+            ],
+            withdrawals=[(100, 1, 100.0)],
+            office_names={1: "Santa Cruz", 2: "Cochabamba"},
+        )
+
+        [trip] = service.get_owner_trips_financials(1)
+
+        assert trip["tickets_amount"] == 150.0
+        assert trip["packages_paid_amount"] == 60.0
+        assert trip["packages_collected_amount"] == 40.0
+        assert trip["packages_pending_amount"] == 30.0
+        assert trip["total_collected"] == 250.0
+        assert trip["total_withdrawn"] == 100.0
+        assert trip["available_balance"] == 150.0
+        destination, origin = trip["office_breakdown"]
+        assert destination["office_name"] == "Cochabamba"
+        assert destination["packages_collected_amount"] == 40.0
+        assert destination["packages_pending_amount"] == 25.0
+        assert origin["office_name"] == "Santa Cruz"
+        assert origin["tickets_amount"] == 120.0
+        assert origin["packages_paid_amount"] == 60.0
+        assert origin["packages_pending_amount"] == 5.0
+        assert origin["available"] == 80.0
+
+    def test_unnamed_office_gets_placeholder(self, mock_db):
+        service = _setup_service(mock_db)
+        service.owner_repo = _stub_owner_repo(
+            _make_owner(id=1, bus_ids=[10]),
+            [_make_trip(id=100, bus_id=10)],
+            tickets=[(100, 7, 10.0)],
+        )
+
+        [trip] = service.get_owner_trips_financials(1)
+
+        assert trip["office_breakdown"][0]["office_name"] == "Oficina 7"
+
+
+@pytest.mark.integration
+def test_owner_repository_aggregates_group_by_trip_and_office(db_session):
+    from core.enums import CashTransactionType, PaymentMethod
+    from models.cash_register import CashRegister
+    from models.cash_transaction import CashTransaction
+    from models.office import Office
+    from models.owner_withdrawal import OwnerWithdrawal
+    from models.package import Package
+    from models.package_item import PackageItem
+    from models.secretary import Secretary
+    from models.ticket import Ticket
+    from repositories.owner_repository import OwnerRepository
+
+    office = Office(name="Oficina Agregados")
+    db_session.add(office)
+    db_session.flush()
+    secretary = Secretary(user_id=990_001, firstname="Ana", office_id=office.id)
+    db_session.add(secretary)
+    db_session.flush()
+    trip_id = 990_100
+
+    for seat_id, (state, price) in enumerate(
+        (("confirmed", 40), ("Completed", 60), ("pending", 99), ("cancelled", 99)), start=1
+    ):
+        db_session.add(Ticket(
+            state=state, seat_id=seat_id, client_id=1, trip_id=trip_id,
+            secretary_id=secretary.id, price=price, payment_method="cash",
+        ))
+    for n, (payment_status, totals) in enumerate(
+        (("paid_on_send", [10, 15]), ("paid_on_send", [5]), ("collect_on_delivery", [0]))
+    ):
+        package = Package(
+            tracking_number=f"TEST-OWNFIN-{n}", status="in_transit", payment_status=payment_status,
+            sender_id=1, recipient_id=1, secretary_id=secretary.id, trip_id=trip_id,
+        )
+        db_session.add(package)
+        db_session.flush()
+        for total in totals:
+            db_session.add(PackageItem(
+                package_id=package.id, quantity=1, description="caja", unit_price=total, total_price=total,
+            ))
+    register = CashRegister(office_id=office.id, date=date(2032, 1, 1), opened_by_id=1)
+    db_session.add(register)
+    db_session.flush()
+    for amount in (20.0, 5.0):
+        tx = CashTransaction(
+            cash_register_id=register.id, type=CashTransactionType.WITHDRAWAL, amount=amount,
+            payment_method=PaymentMethod.CASH,
+            created_at=datetime(2032, 1, 1, 10, 0),
+        )
+        db_session.add(tx)
+        db_session.flush()
+        db_session.add(OwnerWithdrawal(
+            owner_id=990_002, trip_id=trip_id, cash_transaction_id=tx.id, secretary_id=secretary.id,
+        ))
+    db_session.flush()
+
+    repo = OwnerRepository(db_session)
+    assert [tuple(r) for r in repo.get_ticket_amounts_by_trip_office([trip_id])] == [
+        (trip_id, office.id, 100.0)
+    ]
+    assert [tuple(r) for r in repo.get_package_amounts_by_trip([trip_id])] == [
+        (trip_id, office.id, None, "paid_on_send", "in_transit", 30.0)
+    ]
+    assert [tuple(r) for r in repo.get_withdrawal_amounts_by_trip_office(990_002, [trip_id])] == [
+        (trip_id, office.id, 25.0)
+    ]
+    assert repo.get_office_names({office.id}) == {office.id: "Oficina Agregados"}
+
+
 @pytest.mark.unit
 class TestGetOwnerWithdrawals:
     def test_returns_withdrawals_list(self, mock_db):
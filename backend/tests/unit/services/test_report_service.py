@@ -0,0 +1,171 @@
+"""
+Streaming CSV exports: same content as the in-memory monthly reports, sent in
+chunks. Nothing is committed; the session rolls back.
+"""
+
+import csv
+import io
+from datetime import date, datetime
+
+import pytest
+
+from core.enums import CashRegisterStatus, CashTransactionType, PaymentMethod
+from models.cash_register import CashRegister
+from models.cash_transaction import CashTransaction
+from models.client import Client
+from models.location import Location
+from models.package import Package
+from models.package_item import PackageItem
+from models.route import Route
+from models.ticket import Ticket
+from models.trip import Trip
+from services import report_service
+from services.report_service import ReportService
+
+YEAR, MONTH = 2033, 5
+
+
+def _in_month(day: int, hour: int = 10) -> datetime:
+    return datetime(YEAR, MONTH, day, hour, 0)
+
+
+@pytest.fixture
+def month_data(db_session):
+    origin = Location(name="Comarapa", latitude=-17.9, longitude=-64.5)
+    destination = Location(name="Santa Cruz", latitude=-17.8, longitude=-63.2)
+    db_session.add_all([origin, destination])
+    db_session.flush()
+    route = Route(
+        origin_location_id=origin.id, destination_location_id=destination.id,
+        distance=240.0, duration=5.0, price=50.0,
+    )
+    client = Client(user_id=991_001, firstname="Rosa", lastname="Vaca")
+    db_session.add_all([route, client])
+    db_session.flush()
+    trip = Trip(trip_datetime=_in_month(20), bus_id=1, route_id=route.id, secretary_id=1)
+    db_session.add(trip)
+    db_session.flush()
+
+    for day, (state, price) in enumerate(
+        [("confirmed", "50.10"), ("pending", "45.20"), ("cancelled", "99.00"), ("completed", "30.30")], 1
+    ):
+        db_session.add(Ticket(
+            state=state, seat_id=day, client_id=client.id, trip_id=trip.id, secretary_id=1,
+            price=price, payment_method="cash", created_at=_in_month(day),
+        ))
+    db_session.add(Ticket(
+        state="confirmed", seat_id=9, client_id=client.id, trip_id=999_999, secretary_id=1,
+        price="12.00", payment_method="qr", created_at=_in_month(5),
+    ))
+
+    for n, prices in enumerate([[10.0, 2.5], [], [7.25]]):
+        package = Package(
+            tracking_number=f"TEST-CSV-{n}", status="delivered", payment_status="paid_on_send",
+            sender_id=client.id, recipient_id=client.id, secretary_id=1, created_at=_in_month(n + 1),
+        )
+        db_session.add(package)
+        db_session.flush()
+        for price in prices:
+            db_session.add(PackageItem(
+                package_id=package.id, quantity=2, description="caja", unit_price=price / 2, total_price=price,
+            ))
+
+    for day, amounts in ((3, [(CashTransactionType.TICKET_SALE, 50.1), (CashTransactionType.WITHDRAWAL, 20.0)]), (4, [])):
+        register = CashRegister(
+            office_id=1, date=date(YEAR, MONTH, day), opened_by_id=1, initial_balance=100.0,
+            status=CashRegisterStatus.OPEN, opened_at=_in_month(day, 7),
+        )
+        db_session.add(register)
+        db_session.flush()
+        for tx_type, amount in amounts:
+            db_session.add(CashTransaction(
+                cash_register_id=register.id, type=tx_type, amount=amount, payment_method=PaymentMethod.CASH,
+            ))
+    db_session.flush()
+    db_session.expire_all()
+
+
+def _rows(text: str) -> list[list[str]]:
+    return list(csv.reader(io.StringIO(text)))
+
+
+@pytest.mark.integration
+class TestStreamingCsv:
+    def test_ticket_csv_matches_monthly_report(self, db_session, month_data):
+        service = ReportService(db_session)
+        report = service.monthly_ticket_report(YEAR, MONTH)
+
+        rows = _rows(service.ticket_report_csv(YEAR, MONTH))
+
+        expected = [
+            [str(r["id"]), r["date"], r["client"], r["route"], r["state"], r["payment_method"], str(r["price"])]
+            for r in sorted(report["rows"], key=lambda r: r["id"])
+        ]
+        assert rows[1:-3] == expected
+        assert ["4", "2033-05-04 10:00", "Rosa Vaca", "Comarapa → Santa Cruz", "completed", "cash", "30.3"] in expected
+        assert rows[-2:] == [
+            ["Total boletos", str(report["total_count"])],
+            ["Ingresos totales (Bs)", str(report["total_revenue"])],
+        ]
+
+    def test_package_csv_matches_monthly_report(self, db_session, month_data):
+        service = ReportService(db_session)
+        report = service.monthly_package_report(YEAR, MONTH)
+
+        rows = _rows(service.package_report_csv(YEAR, MONTH))
+
+        expected = [
+            [str(r["id"]), r["tracking_number"], r["date"], r["sender"], r["recipient"], r["status"],
+             r["payment_status"], str(r["items_count"]), str(r["amount"])]
+            for r in report["rows"]
+        ]
+        assert rows[1:-3] == expected
+        assert [row[-2:] for row in expected] == [["4", "12.5"], ["0", "0.0"], ["2", "7.25"]]
+        assert rows[-2:] == [
+            ["Total encomiendas", "3"],
+            ["Ingresos totales (Bs)", str(report["total_revenue"])],
+        ]
+
+    def test_cash_csv_matches_monthly_report(self, db_session, month_data):
+        service = ReportService(db_session)
+        report = service.monthly_cash_report(YEAR, MONTH)
+
+        rows = _rows(service.cash_report_csv(YEAR, MONTH))
+
+        expected = [
+            [str(r["id"]), r["date"], r["opened_at"], r["closed_at"], r["status"], str(r["initial_balance"]),
+             str(r["final_balance"]), str(r["income"]), str(r["withdrawals"]), str(r["transaction_count"])]
+            for r in report["rows"]
+        ]
+        assert rows[1:-4] == expected
+        assert [row[-3:] for row in expected] == [["50.1", "20.0", "2"], ["0.0", "0.0", "0"]]
+        assert rows[-3:] == [
+            ["Total ingresos (Bs)", str(report["total_income"])],
+            ["Total retiros (Bs)", str(report["total_withdrawals"])],
+            ["Neto (Bs)", str(report["net"])],
+        ]
+
+    def test_cash_totals_without_register_rows(self, db_session, month_data):
+        service = ReportService(db_session)
+
+        report = service.monthly_cash_report(YEAR, MONTH, include_rows=False)
+
+        assert report["rows"] == []
+        assert report["total_registers"] == 2
+        assert report["total_income"] == 50.1
+        assert report["total_withdrawals"] == 20.0
+        assert report["by_transaction_type"] == {
+            "ticket_sale": {"count": 1, "total": 50.1},
+            "withdrawal": {"count": 1, "total": 20.0},
+        }
+
+    def test_rows_are_sent_in_chunks_with_totals_last(self, db_session, month_data, monkeypatch):
+        monkeypatch.setattr(report_service, "CSV_CHUNK_ROWS", 2)
+        service = ReportService(db_session)
+
+        chunks = list(service.stream_ticket_report_csv(YEAR, MONTH))
+
+        assert len(chunks) == 3  # four tickets, two per chunk, then the totals
+        assert len(_rows(chunks[0])) == 3  # header and the first two tickets
+        assert _rows(chunks[2])[1:] == [["Total boletos", "4"], ["Ingresos totales (Bs)", "137.6"]]
+        assert "".join(chunks) == service.ticket_report_csv(YEAR, MONTH)
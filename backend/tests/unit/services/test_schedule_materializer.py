@@ -0,0 +1,141 @@
+"""
+Trips generated from route schedules for a date range. Commits are turned
+into flushes so the session rollback discards everything.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from core.exceptions import ValidationException
+from models.route import Route
+from models.route_schedule import RouteSchedule
+from models.secretary import Secretary
+from models.trip import Trip
+from services.trip_service import TripService
+
+START = date(2036, 7, 1)
+END = START + timedelta(days=2)
+BUS, DRIVER = 9201, 9202
+
+
+@pytest.fixture
+def service(db_session, monkeypatch):
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+    monkeypatch.setattr(db_session, "rollback", lambda: None)
+    return TripService(db_session)
+
+
+@pytest.fixture
+def route(db_session):
+    route = Route(origin_location_id=1, destination_location_id=2, distance=240.0, duration=5.0, price=50.0)
+    db_session.add(route)
+    db_session.flush()
+    db_session.add_all([
+        RouteSchedule(route_id=route.id, departure_time=time(8, 0)),
+        RouteSchedule(route_id=route.id, departure_time=time(15, 30)),
+        RouteSchedule(route_id=route.id, departure_time=time(20, 0), is_active=False),
+    ])
+    db_session.flush()
+    return route
+
+
+@pytest.fixture
+def secretary(db_session):
+    secretary = Secretary(user_id=992_001, firstname="Ana", lastname="Rojas")
+    db_session.add(secretary)
+    db_session.flush()
+    return secretary
+
+
+def _trips(db_session, route) -> list[tuple]:
+    return [
+        (t.trip_datetime, t.bus_id, t.driver_id)
+        for t in db_session.query(Trip).filter(Trip.route_id == route.id).order_by(Trip.trip_datetime)
+    ]
+
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(START + timedelta(days=day), time(hour, minute))
+
+
+@pytest.mark.integration
+class TestMaterializeSchedules:
+    def test_creates_each_active_departure_once(self, db_session, service, route, secretary):
+        db_session.add(Trip(trip_datetime=_at(1, 8), route_id=route.id, secretary_id=secretary.id))
+        db_session.flush()
+
+        result = service.materialize_schedules(START, END, secretary.id, carry_over=False)
+
+        assert result["existing"] >= 1
+        assert [when for when, _, _ in _trips(db_session, route)] == [
+            _at(0, 8), _at(0, 15, 30), _at(1, 8), _at(1, 15, 30), _at(2, 8), _at(2, 15, 30)
+        ]
+        assert service.materialize_schedules(START, END, secretary.id)["created"] == 0
+
+    def test_carries_over_the_last_crew_and_leaves_double_bookings_unassigned(
+        self, db_session, service, route, secretary
+    ):
+        db_session.add_all([
+            Trip(trip_datetime=_at(-1, 8), route_id=route.id, bus_id=BUS, driver_id=DRIVER, secretary_id=secretary.id),
+            # The driver already drives another route on the second morning
+            Trip(trip_datetime=_at(1, 9), route_id=route.id + 1, driver_id=DRIVER, bus_id=1, secretary_id=secretary.id),
+        ])
+        db_session.flush()
+
+        result = service.materialize_schedules(START, END, secretary.id)
+
+        assert [t for t in _trips(db_session, route) if t[0].hour == 8][1:] == [
+            (_at(0, 8), BUS, DRIVER), (_at(1, 8), BUS, None), (_at(2, 8), BUS, DRIVER)
+        ]
+        assert {(u["trip_datetime"], u["resource"], u["resource_id"]) for u in result["unassigned"]} >= {
+            (_at(1, 8), "driver", DRIVER)
+        }
+
+    def test_colliding_carried_over_crews_leave_the_first_departure_staffed(
+        self, db_session, service, route, secretary
+    ):
+        other = Route(origin_location_id=2, destination_location_id=1, distance=240.0, duration=5.0, price=50.0)
+        db_session.add(other)
+        db_session.flush()
+        db_session.add_all([
+            RouteSchedule(route_id=other.id, departure_time=time(9, 0)),
+            # The same crew drove each route on a different day
+            Trip(trip_datetime=_at(-1, 8), route_id=route.id, bus_id=BUS, driver_id=DRIVER, secretary_id=secretary.id),
+            Trip(trip_datetime=_at(-2, 9), route_id=other.id, bus_id=BUS, driver_id=DRIVER, secretary_id=secretary.id),
+        ])
+        db_session.flush()
+
+        result = service.materialize_schedules(START, START, secretary.id)
+
+        assert _trips(db_session, route)[1] == (_at(0, 8), BUS, DRIVER)
+        assert _trips(db_session, other)[1] == (_at(0, 9), None, None)
+        assert sorted((u["route_id"], u["resource"]) for u in result["unassigned"]) == [
+            (other.id, "bus"), (other.id, "driver")
+        ]
+
+    def test_inserts_with_a_fixed_number_of_statements(self, db_session, service, route, secretary):
+        statements = []
+        count = lambda *args: statements.append(1)  # noqa: E731
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            result = service.materialize_schedules(START, START + timedelta(days=30), secretary.id)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert result["created"] >= 62
+        assert len(statements) <= 8
+
+    def test_dry_run_writes_nothing(self, db_session, service, route, secretary):
+        result = service.materialize_schedules(START, END, secretary.id, dry_run=True)
+
+        assert result["created"] >= 6
+        assert _trips(db_session, route) == []
+
+    def test_rejects_reversed_and_oversized_ranges(self, service, secretary):
+        with pytest.raises(ValidationException):
+            service.materialize_schedules(END, START, secretary.id)
+        with pytest.raises(ValidationException):
+            service.materialize_schedules(START, START + timedelta(days=365), secretary.id)
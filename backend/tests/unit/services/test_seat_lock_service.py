@@ -3,53 +3,60 @@
 import pytest
 from unittest.mock import MagicMock, patch
 
+from redis.exceptions import ConnectionError as RedisConnectionError
+
 from services.seat_lock_service import SeatLockService
 
 
-def _make_service(redis_available=True):
-    service = SeatLockService()
-    return service
+KEYS = ["seat_lock:{1}", "seat_lock:{1}:exp", "seat_lock:{1}:seq"]
+
+
+def _make_service():
+    return SeatLockService(events=MagicMock())
 
 
-def _mock_redis_client(connected=True):
+def _mock_redis_client(script_result=None, error=None):
+    """Redis client whose registered scripts all return ``script_result`` (or raise ``error``)."""
     mock = MagicMock()
-    mock.is_connected.return_value = connected
-    mock.client = MagicMock()
-    return mock
+    script = MagicMock()
+    if error is not None:
+        script.side_effect = error
+    else:
+        script.return_value = script_result
+    script.registered_client = mock.client
+    mock.client.register_script.return_value = script
+    mock.call.side_effect = lambda fn, *args, **kwargs: fn(*args, **kwargs)
+    return mock, script
 
 
 @pytest.mark.unit
 class TestLockSeat:
     def test_lock_new_seat_succeeds(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.get.return_value = None
-        mock_redis.client.set.return_value = True
+        mock_redis, script = _mock_redis_client([1, 0, 7])
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             result = service.lock_seat(trip_id=1, seat_id=5, user_id=10)
 
         assert result["locked"] is True
         assert result["ttl"] == 300
-        mock_redis.client.set.assert_called_once()
+        script.assert_called_once_with(
+            keys=KEYS, args=[10, 300_000, 5]
+        )
 
     def test_lock_same_user_extends_ttl(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.get.return_value = "10"  # Same user
+        mock_redis, _ = _mock_redis_client([1, 1, 7])
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             result = service.lock_seat(trip_id=1, seat_id=5, user_id=10)
 
         assert result["locked"] is True
         assert result["extended"] is True
-        mock_redis.client.expire.assert_called_once()
 
     def test_lock_different_user_fails(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.get.side_effect = [None, "20"]  # First get: not same user, second: holder
-        mock_redis.client.set.return_value = False  # NX fails
+        mock_redis, _ = _mock_redis_client([0, "5", "20"])
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             result = service.lock_seat(trip_id=1, seat_id=5, user_id=10)
@@ -59,7 +66,7 @@ class TestLockSeat:
 
     def test_lock_fallback_without_redis(self):
         service = _make_service()
-        mock_redis = _mock_redis_client(connected=False)
+        mock_redis, _ = _mock_redis_client(error=RedisConnectionError("down"))
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             result = service.lock_seat(trip_id=1, seat_id=5, user_id=10)
@@ -67,44 +74,91 @@ class TestLockSeat:
         assert result["locked"] is True
         assert result["fallback"] is True
 
+    def test_scripts_registered_once_per_client(self):
+        service = _make_service()
+        mock_redis, _ = _mock_redis_client([1, 0, 7])
+
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            service.lock_seat(trip_id=1, seat_id=5, user_id=10)
+            service.lock_seat(trip_id=2, seat_id=6, user_id=10)
+
+        mock_redis.client.register_script.assert_called_once()
+
 
 @pytest.mark.unit
-class TestUnlockSeat:
-    def test_unlock_own_seat(self):
+class TestLockSeatsBatch:
+    def test_locks_all_seats_in_one_round_trip(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.get.return_value = "10"
+        mock_redis, script = _mock_redis_client([1, 1, 7])
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
-            result = service.unlock_seat(trip_id=1, seat_id=5, user_id=10)
+            result = service.lock_seats(trip_id=1, seat_ids=[4, 5, 4, 6], user_id=10)
+
+        assert result == {"locked": True, "ttl": 300, "extended": 1, "seq": 7}
+        script.assert_called_once_with(
+            keys=KEYS, args=[10, 300_000, 4, 5, 6]
+        )
+        service._events.publish.assert_called_once_with(1, {
+            "type": "seat_locked",
+            "trip_id": 1,
+            "seq": 7,
+            "seats": [
+                {"seat_id": 4, "user_id": 10, "ttl": 300},
+                {"seat_id": 5, "user_id": 10, "ttl": 300},
+                {"seat_id": 6, "user_id": 10, "ttl": 300},
+            ],
+        })
+
+    def test_reports_every_conflict(self):
+        service = _make_service()
+        mock_redis, _ = _mock_redis_client([0, "5", "20", "6", "30"])
 
-        assert result is True
-        mock_redis.client.delete.assert_called_once()
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            result = service.lock_seats(trip_id=1, seat_ids=[4, 5, 6], user_id=10)
 
-    def test_unlock_other_users_seat_fails(self):
+        assert result == {
+            "locked": False,
+            "conflicts": [{"seat_id": 5, "holder": 20}, {"seat_id": 6, "holder": 30}],
+        }
+        service._events.publish.assert_not_called()
+
+    def test_fallback_without_redis(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.get.return_value = "20"
+        mock_redis, _ = _mock_redis_client(error=RedisConnectionError("down"))
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
-            result = service.unlock_seat(trip_id=1, seat_id=5, user_id=10)
+            result = service.lock_seats(trip_id=1, seat_ids=[4, 5], user_id=10)
+
+        assert result == {"locked": True, "fallback": True}
 
-        assert result is False
-        mock_redis.client.delete.assert_not_called()
 
-    def test_unlock_nonexistent_lock_returns_true(self):
+@pytest.mark.unit
+class TestUnlockSeat:
+    def test_unlock_own_seat(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.get.return_value = None
+        mock_redis, script = _mock_redis_client([1, 8, "5"])
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             result = service.unlock_seat(trip_id=1, seat_id=5, user_id=10)
 
         assert result is True
+        script.assert_called_once_with(
+            keys=KEYS, args=[10, 5]
+        )
+
+    def test_unlock_other_users_seat_fails(self):
+        service = _make_service()
+        mock_redis, _ = _mock_redis_client([0, 0])
+
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            result = service.unlock_seat(trip_id=1, seat_id=5, user_id=10)
+
+        assert result is False
+        service._events.publish.assert_not_called()
 
     def test_unlock_fallback_without_redis(self):
         service = _make_service()
-        mock_redis = _mock_redis_client(connected=False)
+        mock_redis, _ = _mock_redis_client(error=RedisConnectionError("down"))
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             result = service.unlock_seat(trip_id=1, seat_id=5, user_id=10)
@@ -114,37 +168,72 @@ class TestUnlockSeat:
 
 @pytest.mark.unit
 class TestUnlockBulk:
-    def test_bulk_unlock_multiple_seats(self):
+    def test_bulk_unlock_is_one_round_trip(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.get.return_value = "10"
+        mock_redis, script = _mock_redis_client([3, 0])
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             result = service.unlock_seats_bulk(trip_id=1, seat_ids=[1, 2, 3], user_id=10)
 
         assert result == 3
+        script.assert_called_once_with(
+            keys=KEYS, args=[10, 1, 2, 3]
+        )
+
+    def test_release_publishes_only_seats_actually_released(self):
+        service = _make_service()
+        mock_redis, _ = _mock_redis_client([3, 9, "2", "3"])
+
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            result = service.release_seats(trip_id=1, seat_ids=[1, 2, 3], user_id=10, reason="disconnect")
+
+        assert result == {"free": 3, "released": [2, 3], "seq": 9}
+        service._events.publish.assert_called_once_with(1, {
+            "type": "seat_released",
+            "trip_id": 1,
+            "seq": 9,
+            "seat_ids": [2, 3],
+            "user_id": 10,
+            "reason": "disconnect",
+        })
+
+    def test_bulk_unlock_empty_skips_redis(self):
+        service = _make_service()
+        mock_redis, script = _mock_redis_client(0)
+
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            assert service.unlock_seats_bulk(trip_id=1, seat_ids=[], user_id=10) == 0
+
+        script.assert_not_called()
 
 
 @pytest.mark.unit
 class TestGetLockedSeats:
     def test_returns_locked_seats(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.scan_iter.return_value = ["seat_lock:1:5", "seat_lock:1:8"]
-        mock_redis.client.get.side_effect = ["10", "20"]
-        mock_redis.client.ttl.side_effect = [250, 100]
+        mock_redis, script = _mock_redis_client([4, "5", "10", 250, "8", "20", 100])
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             result = service.get_locked_seats(trip_id=1)
 
-        assert len(result) == 2
-        assert result[0]["seat_id"] == 5
-        assert result[0]["user_id"] == 10
-        assert result[1]["seat_id"] == 8
+        assert result == [
+            {"seat_id": 5, "user_id": 10, "ttl": 250},
+            {"seat_id": 8, "user_id": 20, "ttl": 100},
+        ]
+        script.assert_called_once()
+
+    def test_snapshot_carries_sequence(self):
+        service = _make_service()
+        mock_redis, _ = _mock_redis_client([4, "5", "10", 250])
+
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            result = service.get_snapshot(trip_id=1)
+
+        assert result == {"seq": 4, "locks": [{"seat_id": 5, "user_id": 10, "ttl": 250}]}
 
     def test_returns_empty_without_redis(self):
         service = _make_service()
-        mock_redis = _mock_redis_client(connected=False)
+        mock_redis, _ = _mock_redis_client(error=RedisConnectionError("down"))
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             result = service.get_locked_seats(trip_id=1)
@@ -152,27 +241,83 @@ class TestGetLockedSeats:
         assert result == []
 
 
+@pytest.mark.unit
+class TestMarkSold:
+    def test_publishes_seat_sold_with_sequence(self):
+        service = _make_service()
+        mock_redis, script = _mock_redis_client(12)
+
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            assert service.mark_sold(trip_id=1, seat_ids=[5]) == 12
+
+        script.assert_called_once_with(keys=KEYS, args=[5])
+        service._events.publish.assert_called_once_with(
+            1, {"type": "seat_sold", "trip_id": 1, "seq": 12, "seat_ids": [5]}
+        )
+
+    def test_publishes_without_sequence_when_redis_is_down(self):
+        service = _make_service()
+        mock_redis, _ = _mock_redis_client(error=RedisConnectionError("down"))
+
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            assert service.mark_sold(trip_id=1, seat_ids=[5]) is None
+
+        service._events.publish.assert_called_once_with(
+            1, {"type": "seat_sold", "trip_id": 1, "seq": None, "seat_ids": [5]}
+        )
+
+
+@pytest.mark.unit
+class TestSweepExpired:
+    def test_publishes_released_seats_per_trip(self):
+        service = _make_service()
+        mock_redis, script = _mock_redis_client()
+        script.side_effect = [[14, "3", "9"], [0]]
+
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            assert service.sweep_expired([1, 2]) == {1: [3, 9]}
+
+        service._events.publish.assert_called_once_with(1, {
+            "type": "seat_released",
+            "trip_id": 1,
+            "seq": 14,
+            "seat_ids": [3, 9],
+            "reason": "expired",
+        })
+
+    def test_stops_when_redis_is_down(self):
+        service = _make_service()
+        mock_redis, script = _mock_redis_client(error=RedisConnectionError("down"))
+
+        with patch("services.seat_lock_service.redis_client", mock_redis):
+            assert service.sweep_expired([1, 2]) == {}
+
+        script.assert_called_once()
+
+
 @pytest.mark.unit
 class TestIsLocked:
     def test_locked_seat_returns_true(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.exists.return_value = 1
+        mock_redis, _ = _mock_redis_client(["10", 120])
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             assert service.is_locked(trip_id=1, seat_id=5) is True
+            assert service.get_lock_holder(trip_id=1, seat_id=5) == 10
+            assert service.get_lock_ttl(trip_id=1, seat_id=5) == 120
 
     def test_unlocked_seat_returns_false(self):
         service = _make_service()
-        mock_redis = _mock_redis_client()
-        mock_redis.client.exists.return_value = 0
+        mock_redis, _ = _mock_redis_client([])
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             assert service.is_locked(trip_id=1, seat_id=5) is False
+            assert service.get_lock_holder(trip_id=1, seat_id=5) is None
+            assert service.get_lock_ttl(trip_id=1, seat_id=5) == -1
 
     def test_fallback_returns_false(self):
         service = _make_service()
-        mock_redis = _mock_redis_client(connected=False)
+        mock_redis, _ = _mock_redis_client(error=RedisConnectionError("down"))
 
         with patch("services.seat_lock_service.redis_client", mock_redis):
             assert service.is_locked(trip_id=1, seat_id=5) is False
@@ -113,6 +113,24 @@ class TestComputeMonthlyTrend:
         assert compute_monthly_trend(data) == -50.0
 
 
+class TestStatsServiceDashboard:
+    def test_builds_schema_from_one_repository_call(self, service, mock_repo):
+        mock_repo.get_dashboard_totals.return_value = {
+            "ticket_count": 3, "ticket_amount": 150.0,
+            "previous_ticket_count": 2, "previous_ticket_amount": 100.0,
+            "package_count": 1, "package_amount": 20.0,
+            "previous_package_count": 0, "previous_package_amount": 0.0,
+            "trip_count": 4, "previous_trip_count": 8,
+        }
+
+        result = service.get_dashboard_stats("week")
+
+        mock_repo.get_dashboard_totals.assert_called_once_with(*get_date_range("week"))
+        assert result["tickets"] == {"count": 3, "amount": 150.0, "trend": 50.0, "period": "week"}
+        assert result["packages"] == {"count": 1, "amount": 20.0, "trend": 100, "period": "week"}
+        assert result["trips"] == {"count": 4, "trend": -50.0, "period": "week"}
+
+
 class TestStatsServiceCashSummary:
     def test_non_admin_raises_forbidden(self, service):
         user = MagicMock()
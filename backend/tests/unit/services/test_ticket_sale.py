@@ -0,0 +1,142 @@
+"""
+The ticket sale path: one prefetch query, one commit, and seat uniqueness
+enforced by the database. Commits are turned into flushes so the session
+rollback discards everything.
+"""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import create_autospec
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from core.enums import CashRegisterStatus
+from core.exceptions import ConflictException, ValidationException
+from models.bus import Bus
+from models.cash_register import CashRegister
+from models.cash_transaction import CashTransaction
+from models.client import Client
+from models.office import Office
+from models.seat import Seat
+from models.secretary import Secretary
+from models.ticket import Ticket
+from models.trip import Trip
+from repositories.ticket_repository import seat_already_booked
+from schemas.ticket import TicketCreate
+from services.seat_lock_service import SeatLockService
+from services.ticket_service import TicketService
+
+OPERATOR = 993_001
+
+
+@pytest.fixture
+def sale(db_session):
+    """A trip on a two-seat bus sold by a secretary whose office has an open register."""
+    office = Office(name="Sale Office", location_id=1)
+    bus = Bus(license_plate="SALE-01", capacity=2, model="Bench", brand="Bench", floors=1)
+    client = Client(user_id=OPERATOR + 1, firstname="Luis", lastname="Vaca")
+    db_session.add_all([office, bus, client])
+    db_session.flush()
+    secretary = Secretary(user_id=OPERATOR, firstname="Ana", lastname="Rojas", office_id=office.id)
+    seats = [Seat(bus_id=bus.id, seat_number=n, deck="FIRST", row=1, column=n) for n in (1, 2)]
+    trip = Trip(trip_datetime=datetime.now() + timedelta(days=1), bus_id=bus.id, route_id=1, secretary_id=1)
+    register = CashRegister(
+        office_id=office.id, date=date.today(), opened_by_id=OPERATOR, status=CashRegisterStatus.OPEN
+    )
+    db_session.add_all([secretary, *seats, trip, register])
+    db_session.flush()
+    return {"trip": trip, "seats": seats, "client": client, "secretary": secretary, "register": register}
+
+
+@pytest.fixture
+def service(db_session, monkeypatch):
+    commits = []
+    monkeypatch.setattr(db_session, "commit", lambda: (commits.append(1), db_session.flush()))
+    lock_service = create_autospec(SeatLockService, instance=True)
+    lock_service.get_lock_holder.return_value = None
+    service = TicketService(db_session, lock_service=lock_service)
+    service.commits = commits
+    return service
+
+
+def _order(sale, seat: int = 0, state: str = "confirmed") -> TicketCreate:
+    return TicketCreate(
+        state=state,
+        seat_id=sale["seats"][seat].id,
+        client_id=sale["client"].id,
+        trip_id=sale["trip"].id,
+        price=50.0,
+        payment_method="cash",
+        operator_user_id=OPERATOR,
+    )
+
+
+@pytest.mark.integration
+class TestTicketSale:
+    def test_checks_are_one_query_and_the_sale_one_commit(self, db_session, service, sale):
+        statements = []
+        record = lambda conn, cursor, sql, *args: statements.append(sql.lstrip().split()[0].upper())  # noqa: E731
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            ticket = service.create_ticket(_order(sale))
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert statements.index("INSERT") == 1
+        assert service.commits == [1]
+        assert ticket.secretary_id == sale["secretary"].id
+        assert [h.new_state for h in ticket.state_history] == ["confirmed"]
+        transaction = db_session.query(CashTransaction).filter(CashTransaction.reference_id == ticket.id).one()
+        assert (transaction.cash_register_id, transaction.amount) == (sale["register"].id, 50.0)
+        service.lock_service.mark_sold.assert_called_once_with(sale["trip"].id, [sale["seats"][0].id])
+
+    def test_a_booked_seat_is_rejected_and_a_cancelled_one_is_free(self, db_session, service, sale):
+        first = service.create_ticket(_order(sale, state="pending"))
+
+        with pytest.raises(ConflictException, match="already booked"):
+            service.create_ticket(_order(sale))
+
+        first.state = "cancelled"
+        db_session.flush()
+        assert service.create_ticket(_order(sale)).state == "confirmed"
+
+    def test_concurrent_sale_is_settled_by_the_unique_index(self, db_session, service, sale, monkeypatch):
+        service.create_ticket(_order(sale))
+        # The competing sale read its context before the first one committed
+        stale = service.repo.get_sale_context
+        monkeypatch.setattr(
+            service.repo, "get_sale_context",
+            lambda *args: type("Sale", (), {**stale(*args)._asdict(), "booked_ticket_id": None}),
+        )
+
+        with pytest.raises(ConflictException, match="already booked"):
+            service.create_ticket(_order(sale))
+
+    def test_no_open_register_writes_nothing(self, db_session, service, sale):
+        sale["register"].status = CashRegisterStatus.CLOSED
+        db_session.flush()
+
+        with pytest.raises(ValidationException, match="No hay caja abierta"):
+            service.create_ticket(_order(sale))
+
+        assert db_session.query(Ticket).filter(Ticket.trip_id == sale["trip"].id).count() == 0
+        assert service.commits == []
+
+
+@pytest.mark.integration
+def test_unique_index_ignores_inactive_tickets(db_session, sale):
+    def ticket(state):
+        return Ticket(
+            state=state, seat_id=sale["seats"][1].id, client_id=sale["client"].id, trip_id=sale["trip"].id,
+            secretary_id=sale["secretary"].id, price=50.0, payment_method="cash",
+        )
+
+    db_session.add_all([ticket("cancelled"), ticket("cancelled"), ticket("completed"), ticket("pending")])
+    db_session.flush()
+    db_session.add(ticket("confirmed"))
+
+    with pytest.raises(IntegrityError) as error:
+        db_session.flush()
+    assert seat_already_booked(error.value)
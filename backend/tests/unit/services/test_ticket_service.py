@@ -52,3 +52,54 @@ class TestTicketServiceGetById:
 
         assert result == ticket
         mock_repo.get_by_id_or_raise.assert_called_once_with(ticket.id, "Ticket")
+
+
+@pytest.mark.unit
+class TestTicketServiceOccupancyCounter:
+    """Every ticket write keeps Trip.occupied_seats in step, in the same transaction."""
+
+    def test_cancel_decrements_counter(self, mock_db):
+        mock_repo = create_autospec(TicketRepository, instance=True)
+        ticket = TicketFactory(state="confirmed", trip_id=7)
+        mock_repo.get_by_id_or_raise.return_value = ticket
+        mock_repo.get_cash_balance_for_ticket.return_value = 0.0
+        service = TicketService(mock_db, repo=mock_repo)
+
+        service.cancel_ticket(ticket.id)
+
+        mock_repo.adjust_trip_occupied_seats.assert_called_once_with(7, -1)
+
+    def test_delete_cancelled_ticket_leaves_counter(self, mock_db):
+        mock_repo = create_autospec(TicketRepository, instance=True)
+        ticket = TicketFactory(state="cancelled")
+        mock_repo.get_by_id_or_raise.return_value = ticket
+        service = TicketService(mock_db, repo=mock_repo)
+
+        service.delete_ticket(ticket.id)
+
+        mock_repo.adjust_trip_occupied_seats.assert_not_called()
+        mock_db.commit.assert_called_once()
+
+    def test_delete_active_ticket_decrements_counter(self, mock_db):
+        mock_repo = create_autospec(TicketRepository, instance=True)
+        ticket = TicketFactory(state="pending", trip_id=3)
+        mock_repo.get_by_id_or_raise.return_value = ticket
+        service = TicketService(mock_db, repo=mock_repo)
+
+        service.delete_ticket(ticket.id)
+
+        mock_repo.adjust_trip_occupied_seats.assert_called_once_with(3, -1)
+
+    def test_update_moving_trip_shifts_counter(self, mock_db):
+        from schemas.ticket import TicketUpdate
+
+        mock_repo = create_autospec(TicketRepository, instance=True)
+        ticket = TicketFactory(state="confirmed", trip_id=1)
+        mock_repo.get_by_id_or_raise.return_value = ticket
+        mock_repo.get_trip_by_id.return_value = MagicMock(status="scheduled")
+        service = TicketService(mock_db, repo=mock_repo)
+
+        service.update_ticket(ticket.id, TicketUpdate(trip_id=2))
+
+        calls = [c.args for c in mock_repo.adjust_trip_occupied_seats.call_args_list]
+        assert calls == [(1, -1), (2, 1)]
@@ -0,0 +1,144 @@
+"""
+Set-based package/ticket transitions on dispatch, finish and cancel. Commits
+are turned into flushes so the session rollback discards everything.
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event
+
+from core.enums import PackageStatus, TicketState, TripStatus
+from core.exceptions import InvalidStateTransitionException
+from models.package import Package
+from models.package_item import PackageItem
+from models.package_state_history import PackageStateHistory
+from models.ticket import Ticket
+from models.ticket_state_history import TicketStateHistory
+from models.trip import Trip
+from repositories import daily_stats_repository as metrics
+from repositories.daily_stats_repository import DailyStatsRepository
+from services.trip_service import TripService
+
+CREATED = datetime(2032, 4, 2, 9, 0)
+
+
+@pytest.fixture
+def service(db_session, monkeypatch):
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+    return TripService(db_session)
+
+
+def _trip(db_session, status=TripStatus.SCHEDULED) -> Trip:
+    trip = Trip(trip_datetime=datetime(2032, 4, 3, 8, 0), status=status, bus_id=1, route_id=1, secretary_id=1)
+    db_session.add(trip)
+    db_session.flush()
+    return trip
+
+
+def _packages(db_session, trip: Trip, statuses) -> list[Package]:
+    packages = []
+    for status in statuses:
+        package = Package(
+            tracking_number=f"TB-{uuid.uuid4().hex[:12]}", status=status, sender_id=1,
+            recipient_id=1, secretary_id=1, origin_office_id=3, trip_id=trip.id, created_at=CREATED,
+        )
+        db_session.add(package)
+        db_session.flush()
+        db_session.add(PackageItem(package_id=package.id, quantity=1, description="caja", unit_price=10, total_price=10))
+        packages.append(package)
+    db_session.flush()
+    return packages
+
+
+def _history(db_session, model, fk, ids) -> list[tuple]:
+    return sorted(
+        (getattr(h, fk), h.old_state, h.new_state)
+        for h in db_session.query(model).filter(getattr(model, fk).in_(ids))
+    )
+
+
+@pytest.mark.integration
+class TestBulkTransitions:
+    def test_dispatch_moves_assigned_packages_with_history_and_rollup(self, db_session, service):
+        trip = _trip(db_session)
+        assigned = _packages(db_session, trip, [PackageStatus.ASSIGNED_TO_TRIP] * 3)
+        [other] = _packages(db_session, trip, [PackageStatus.REGISTERED_AT_OFFICE])
+        stats = DailyStatsRepository(db_session)
+        today = datetime.now(timezone.utc).date()  # history timestamps are UTC
+        in_transit_before = stats.totals(today, today).get(metrics.PACKAGES_IN_TRANSIT, (0, 0.0))[0]
+
+        service.dispatch_trip(trip.id)
+
+        db_session.expire_all()
+        assert trip.status == TripStatus.DEPARTED
+        assert {p.status for p in assigned} == {PackageStatus.IN_TRANSIT}
+        assert other.status == PackageStatus.REGISTERED_AT_OFFICE
+        assert _history(db_session, PackageStateHistory, "package_id", [p.id for p in assigned + [other]]) == [
+            (p.id, "assigned_to_trip", "in_transit") for p in assigned
+        ]
+        assert stats.totals(today, today)[metrics.PACKAGES_IN_TRANSIT][0] == in_transit_before + 3
+        assert stats.totals(CREATED.date(), CREATED.date())[metrics.PACKAGES_REVENUE] == (3, 30.0)
+
+    def test_finish_completes_confirmed_tickets_only(self, db_session, service):
+        trip = _trip(db_session, TripStatus.DEPARTED)
+        tickets = [
+            Ticket(state=state, seat_id=n, client_id=1, trip_id=trip.id, secretary_id=1, price=20,
+                   payment_method="cash", created_at=CREATED)
+            for n, state in enumerate([TicketState.CONFIRMED, TicketState.CONFIRMED, TicketState.PENDING], 1)
+        ]
+        db_session.add_all(tickets)
+        trip.occupied_seats = 3
+        db_session.flush()
+
+        service.finish_trip(trip.id)
+
+        db_session.expire_all()
+        assert [t.state for t in tickets] == ["completed", "completed", "pending"]
+        assert trip.occupied_seats == 3
+        assert _history(db_session, TicketStateHistory, "ticket_id", [t.id for t in tickets]) == [
+            (t.id, "confirmed", "completed") for t in tickets[:2]
+        ]
+
+    def test_cancel_returns_every_package_to_the_office(self, db_session, service):
+        trip = _trip(db_session)
+        packages = _packages(
+            db_session, trip, [PackageStatus.ASSIGNED_TO_TRIP, PackageStatus.REGISTERED_AT_OFFICE]
+        )
+
+        service.cancel_trip(trip.id)
+
+        db_session.expire_all()
+        assert [(p.status, p.trip_id) for p in packages] == [("registered_at_office", None)] * 2
+        assert _history(db_session, PackageStateHistory, "package_id", [p.id for p in packages]) == [
+            (packages[0].id, "assigned_to_trip", "registered_at_office"),
+            (packages[1].id, "registered_at_office", "registered_at_office"),
+        ]
+
+    def test_invalid_transition_is_rejected_before_any_write(self, db_session, service):
+        trip = _trip(db_session, TripStatus.DEPARTED)
+
+        with pytest.raises(InvalidStateTransitionException):
+            service._bulk_transition_tickets(trip.id, TicketState.COMPLETED, TicketState.CONFIRMED)
+
+    def test_statement_count_does_not_grow_with_packages(self, db_session, service):
+        statements = []
+
+        def count(*args):
+            statements.append(1)
+
+        engine = db_session.get_bind()
+        counts = []
+        for size in (2, 20):
+            trip = _trip(db_session)
+            _packages(db_session, trip, [PackageStatus.ASSIGNED_TO_TRIP] * size)
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", count)
+            try:
+                service.dispatch_trip(trip.id)
+            finally:
+                event.remove(engine, "before_cursor_execute", count)
+            counts.append(len(statements))
+
+        assert counts[0] == counts[1]
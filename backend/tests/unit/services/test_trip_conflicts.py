@@ -0,0 +1,96 @@
+"""
+Combined driver/bus/assistant conflict checks for single trips and planned
+batches. Nothing is committed; the session rolls back.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from core.exceptions import ConflictException
+from models.trip import Trip
+from schemas.trip import PlannedTrip
+from services.trip_service import TripService
+
+MONDAY = datetime(2035, 3, 5, 8, 0)
+DRIVER, BUS, ASSISTANT = 9101, 9102, 9103
+
+
+@pytest.fixture
+def stored(db_session):
+    """Tuesday 08:00 with the driver, Thursday 08:00 with the bus and assistant."""
+    trips = [
+        Trip(trip_datetime=MONDAY + timedelta(days=1), driver_id=DRIVER, bus_id=1, route_id=1, secretary_id=1),
+        Trip(trip_datetime=MONDAY + timedelta(days=3), bus_id=BUS, assistant_id=ASSISTANT, route_id=1, secretary_id=1),
+    ]
+    db_session.add_all(trips)
+    db_session.flush()
+    return trips
+
+
+def _summary(conflicts) -> list[tuple]:
+    return [(c.index, c.resource, c.conflicting_trip_id, c.conflicting_index) for c in conflicts]
+
+
+@pytest.mark.integration
+class TestFindConflicts:
+    def test_week_is_checked_against_stored_trips_and_itself_in_one_query(self, db_session, stored):
+        week = [
+            PlannedTrip(trip_datetime=MONDAY + timedelta(days=1, hours=1), driver_id=DRIVER, bus_id=2),
+            PlannedTrip(trip_datetime=MONDAY + timedelta(days=2), bus_id=BUS, driver_id=9104),
+            PlannedTrip(trip_datetime=MONDAY + timedelta(days=2, hours=2), bus_id=BUS),
+            PlannedTrip(trip_datetime=MONDAY + timedelta(days=3, hours=-3), assistant_id=ASSISTANT, bus_id=3),
+            PlannedTrip(trip_datetime=MONDAY + timedelta(days=3, hours=2), bus_id=BUS, assistant_id=ASSISTANT),
+        ]
+        statements = []
+        count = lambda *args: statements.append(1)  # noqa: E731
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            conflicts = TripService(db_session).find_conflicts(week)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert len(statements) == 1
+        assert _summary(conflicts) == [
+            (0, "driver", stored[0].id, None),
+            (1, "bus", None, 2),
+            (2, "bus", None, 1),
+            (4, "bus", stored[1].id, None),
+            (4, "assistant", stored[1].id, None),
+        ]
+
+    def test_rescheduled_trip_does_not_conflict_with_itself(self, db_session, stored):
+        moved = PlannedTrip(
+            trip_datetime=stored[0].trip_datetime + timedelta(hours=1), driver_id=DRIVER, trip_id=stored[0].id
+        )
+
+        assert TripService(db_session).find_conflicts([moved]) == []
+
+    def test_buffer_bounds_are_inclusive(self, db_session, stored):
+        edge = PlannedTrip(trip_datetime=stored[0].trip_datetime + timedelta(hours=2), driver_id=DRIVER)
+
+        assert _summary(TripService(db_session).find_conflicts([edge], buffer_hours=2)) == [
+            (0, "driver", stored[0].id, None)
+        ]
+        assert TripService(db_session).find_conflicts([edge], buffer_hours=1) == []
+
+    def test_single_trip_conflict_keeps_the_error_message(self, db_session, stored):
+        planned = PlannedTrip(trip_datetime=MONDAY + timedelta(days=3), bus_id=BUS, assistant_id=ASSISTANT)
+
+        with pytest.raises(ConflictException, match=f"El bus {BUS} ya está asignado al viaje id {stored[1].id}"):
+            TripService(db_session)._raise_on_conflict(planned)
+
+
+@pytest.mark.integration
+def test_conflicts_endpoint_reports_the_batch(client, stored):
+    response = client.post("/api/v1/trips/conflicts", json={"trips": [
+        {"trip_datetime": (MONDAY + timedelta(days=1)).isoformat(), "driver_id": DRIVER},
+        {"trip_datetime": (MONDAY + timedelta(days=5)).isoformat(), "driver_id": DRIVER},
+    ]})
+
+    assert response.status_code == 200
+    assert [(c["index"], c["resource"], c["conflicting_trip_id"]) for c in response.json()["conflicts"]] == [
+        (0, "driver", stored[0].id)
+    ]
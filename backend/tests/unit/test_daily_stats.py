@@ -0,0 +1,159 @@
+"""
+The daily_stats rollup: tracked writes must leave it exactly where a rebuild
+from the raw tables would. Nothing is committed; the session rolls back.
+"""
+
+from datetime import date, datetime
+from itertools import count
+
+import pytest
+
+from models.daily_stat import DailyStat
+from models.package import Package
+from models.package_item import PackageItem
+from models.package_state_history import PackageStateHistory
+from models.ticket import Ticket
+from models.ticket_state_history import TicketStateHistory
+from repositories import daily_stats_repository as metrics
+from repositories.daily_stats_repository import DailyStatsRepository
+from repositories.stats_repository import StatsRepository
+
+MARCH = (date(2032, 3, 1), date(2032, 3, 31))
+_seats = count(1)  # one active ticket per seat and trip
+
+
+def _ticket(**overrides) -> Ticket:
+    fields = dict(
+        state="pending", seat_id=next(_seats), client_id=1, trip_id=1, secretary_id=999_001,
+        price=50, payment_method="cash", created_at=datetime(2032, 3, 1, 9, 0),
+    )
+    fields.update(overrides)
+    return Ticket(**fields)
+
+
+def _nonzero(totals: dict) -> dict:
+    return {metric: value for metric, value in totals.items() if value != (0, 0.0)}
+
+
+def _assert_matches_rebuild(repo: DailyStatsRepository) -> dict:
+    """Rebuild March and check nothing moved; returns the totals (zeros included)."""
+    tracked = repo.totals(*MARCH)
+    repo.rebuild(MARCH[0])
+    assert _nonzero(repo.totals(*MARCH)) == _nonzero(tracked)
+    return tracked
+
+
+@pytest.mark.integration
+class TestDailyStatsTracking:
+    def test_ticket_lifecycle_moves_cells_between_metrics(self, db_session):
+        repo = DailyStatsRepository(db_session)
+        ticket = _ticket()
+
+        with repo.track(ticket):
+            db_session.add(ticket)
+            db_session.flush()
+            db_session.add(TicketStateHistory(
+                ticket_id=ticket.id, new_state="pending", changed_at=datetime(2032, 3, 1, 9, 0)
+            ))
+        day_one = repo.totals(date(2032, 3, 1), date(2032, 3, 1))
+        assert day_one[metrics.TICKETS_CREATED] == (1, 50.0)
+        assert day_one[metrics.TICKETS_PENDING] == (1, 50.0)
+        assert day_one[metrics.TICKETS_RESERVED] == (1, 0.0)
+
+        with repo.track(ticket):
+            ticket.state = "confirmed"
+            db_session.add(TicketStateHistory(
+                ticket_id=ticket.id, new_state="confirmed", changed_at=datetime(2032, 3, 2, 10, 0)
+            ))
+        totals = _assert_matches_rebuild(repo)
+        assert totals[metrics.TICKETS_PENDING] == (0, 0.0)
+        assert totals[metrics.TICKETS_CONFIRMED] == (1, 50.0)
+
+        with repo.track(ticket):
+            ticket.state = "cancelled"
+            db_session.add(TicketStateHistory(
+                ticket_id=ticket.id, new_state="cancelled", changed_at=datetime(2032, 3, 3, 11, 0)
+            ))
+        totals = _assert_matches_rebuild(repo)
+        assert totals[metrics.TICKETS_CONFIRMED] == (0, 0.0)
+        assert totals[metrics.TICKETS_CANCELLED] == (1, 50.0)
+        assert totals[metrics.TICKETS_CREATED_CANCELLED] == (1, 50.0)
+
+        with repo.track(ticket):
+            db_session.query(TicketStateHistory).filter_by(ticket_id=ticket.id).delete()
+            db_session.delete(ticket)
+        assert all(count == 0 for count, _ in repo.totals(*MARCH).values())
+
+    def test_package_items_and_transitions(self, db_session):
+        repo = DailyStatsRepository(db_session)
+        package = Package(
+            tracking_number="TEST-ROLLUP-1", status="registered", sender_id=1, recipient_id=1,
+            secretary_id=1, origin_office_id=7, created_at=datetime(2032, 3, 5, 8, 0),
+        )
+
+        with repo.track(package):
+            db_session.add(package)
+            db_session.flush()
+            db_session.add(PackageItem(package_id=package.id, quantity=2, description="caja", unit_price=10, total_price=20))
+        with repo.track(package):
+            db_session.add(PackageItem(package_id=package.id, quantity=1, description="sobre", unit_price=5, total_price=5))
+        totals = _assert_matches_rebuild(repo)
+        assert totals[metrics.PACKAGES_CREATED] == (1, 25.0)
+        assert totals[metrics.PACKAGES_REVENUE] == (2, 25.0)
+
+        with repo.track(package):
+            package.status = "in_transit"
+            db_session.add(PackageStateHistory(
+                package_id=package.id, new_state="in_transit", changed_at=datetime(2032, 3, 6, 7, 0)
+            ))
+        with repo.track(package):
+            package.status = "delivered"
+            db_session.add(PackageStateHistory(
+                package_id=package.id, new_state="delivered", changed_at=datetime(2032, 3, 7, 18, 0)
+            ))
+        totals = _assert_matches_rebuild(repo)
+        assert totals[metrics.PACKAGES_IN_TRANSIT] == (1, 0.0)
+        assert totals[metrics.PACKAGES_DELIVERED] == (1, 0.0)
+        assert totals[metrics.PACKAGES_REVENUE] == (2, 25.0)
+        # Kept per origin office
+        offices = db_session.query(DailyStat.office_id).filter(
+            DailyStat.metric == metrics.PACKAGES_CREATED, DailyStat.day == date(2032, 3, 5)
+        )
+        assert [office_id for office_id, in offices] == [7]
+
+    def test_monthly_series_sums_days(self, db_session):
+        repo = DailyStatsRepository(db_session)
+        for day in (1, 15, 31):
+            ticket = _ticket(created_at=datetime(2032, 3, day, 12, 0))
+            with repo.track(ticket):
+                db_session.add(ticket)
+
+        march = [row for row in repo.monthly(MARCH[0], metrics.TICKETS_CREATED)
+                 if (int(row.year), int(row.month)) == (2032, 3)]
+
+        assert len(march) == 1
+        assert march[0].count == 3
+        assert float(march[0].amount) == 150.0
+
+
+@pytest.mark.integration
+def test_dashboard_totals_split_current_and_previous_period(db_session):
+    DailyStatsRepository(db_session).apply({}, {
+        (date(2032, 3, 10), 0, metrics.TICKETS_CONFIRMED): [2, 100.0],
+        (date(2032, 3, 11), 3, metrics.TICKETS_CONFIRMED): [1, 30.0],
+        (date(2032, 3, 11), 3, metrics.PACKAGES_CREATED): [1, 25.0],
+        (date(2032, 2, 10), 0, metrics.TICKETS_CONFIRMED): [1, 40.0],
+        (date(2032, 1, 5), 0, metrics.TICKETS_CONFIRMED): [9, 999.0],  # outside both
+    })
+
+    totals = StatsRepository(db_session).get_dashboard_totals(
+        date(2032, 3, 1), date(2032, 3, 31), date(2032, 2, 1), date(2032, 2, 29)
+    )
+
+    assert totals == {
+        "ticket_count": 3, "ticket_amount": 130.0,
+        "package_count": 1, "package_amount": 25.0,
+        "previous_ticket_count": 1, "previous_ticket_amount": 40.0,
+        "previous_package_count": 0, "previous_package_amount": 0.0,
+        "trip_count": 0, "previous_trip_count": 0,
+    }
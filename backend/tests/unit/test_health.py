@@ -0,0 +1,23 @@
+"""/health stays public and minimal; runtime metrics are admin-only."""
+
+import pytest
+
+
+@pytest.mark.unit
+def test_health_reports_only_status_database_and_version(client):
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"status", "database", "version"}
+
+
+@pytest.mark.unit
+def test_metrics_require_an_admin(client, user_token, admin_token):
+    assert client.get("/api/v1/admin/metrics").status_code == 401
+
+    response = client.get("/api/v1/admin/metrics", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 403
+
+    response = client.get("/api/v1/admin/metrics", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"redis", "websockets", "principal_cache", "token_blacklist", "stats_cache"}
@@ -0,0 +1,158 @@
+"""
+Keyset (cursor) pagination of the list endpoints. Nothing is committed; the
+session rolls back.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects.mysql import pymysql
+
+from core.exceptions import ValidationException
+from models.package import Package
+from models.trip import Trip
+from repositories.base import decode_cursor, encode_cursor, explain_statement
+from repositories.trip_repository import TripRepository
+from services.package_service import PackageService
+from services.trip_service import TripService
+
+DAY = datetime(2034, 2, 1)
+
+
+@pytest.fixture
+def trips(db_session):
+    """Seven trips on one day, three of them sharing a departure time."""
+    departures = [DAY + timedelta(hours=h) for h in (6, 8, 8, 8, 10, 12, 14)]
+    created = [
+        Trip(trip_datetime=when, status="scheduled", bus_id=1, route_id=1, secretary_id=1)
+        for when in departures
+    ]
+    db_session.add_all(created)
+    db_session.flush()
+    return sorted(created, key=lambda t: (t.trip_datetime, t.id))
+
+
+def _walk(service: TripService, limit: int, **kwargs) -> list[dict]:
+    pages, cursor = [], ""
+    while cursor is not None:
+        result = service.get_trips(
+            cursor=cursor, limit=limit, date_from=DAY, date_to=DAY + timedelta(days=1), **kwargs
+        )
+        pages.append(result)
+        cursor = result["pagination"]["next_cursor"]
+    return pages
+
+
+@pytest.mark.integration
+class TestTripCursorPagination:
+    def test_pages_cover_every_trip_once_in_order(self, db_session, trips):
+        pages = _walk(TripService(db_session), limit=2)
+
+        assert [len(p["trips"]) for p in pages] == [2, 2, 2, 1]
+        assert [t["id"] for p in pages for t in p["trips"]] == [t.id for t in trips]
+        assert {p["pagination"]["total"] for p in pages} == {7}
+
+    def test_descending_order_and_no_count(self, db_session, trips):
+        pages = _walk(TripService(db_session), limit=3, sort_direction="desc", count="none")
+
+        assert [t["id"] for p in pages for t in p["trips"]] == [t.id for t in reversed(trips)]
+        assert pages[0]["pagination"]["total"] is None
+        assert pages[0]["pagination"]["pages"] is None
+
+    def test_estimated_count_falls_back_to_exact_without_planner_support(self, db_session, trips):
+        result = TripService(db_session).get_trips(
+            cursor="", limit=2, date_from=DAY, date_to=DAY + timedelta(days=1), count="estimated"
+        )
+
+        assert result["pagination"]["total"] == 7
+
+    def test_offset_paging_is_unchanged(self, db_session, trips):
+        result = TripService(db_session).get_trips(skip=2, limit=2, date_from=DAY, date_to=DAY + timedelta(days=1))
+
+        assert result["pagination"] == {"total": 7, "skip": 2, "limit": 2, "pages": 4}
+
+    def test_cursor_mode_only_sorts_by_departure(self, db_session):
+        with pytest.raises(ValidationException):
+            TripService(db_session).get_trips(cursor="", sort_by="status")
+
+    @pytest.mark.parametrize("limit", [0, 501])
+    def test_cursor_page_size_is_bounded(self, db_session, limit):
+        with pytest.raises(ValidationException):
+            TripService(db_session).get_trips(cursor="", limit=limit)
+
+
+@pytest.mark.integration
+def test_rows_without_a_sort_key_are_skipped_not_fatal(db_session):
+    status = f"kn-{uuid.uuid4().hex[:8]}"
+    db_session.add_all(
+        Package(
+            tracking_number=f"{status}-{n}", status=status, sender_id=1, recipient_id=1, secretary_id=1,
+            created_at=DAY + timedelta(minutes=n),
+        )
+        for n in range(4)
+    )
+    db_session.flush()
+    # Legacy rows written before created_at had a default
+    db_session.query(Package).filter(Package.tracking_number == f"{status}-1").update({Package.created_at: None})
+    service = PackageService(db_session)
+
+    first = service.get_page("", limit=2, status=status, count="exact")
+    second = service.get_page(first.next_cursor, limit=2, status=status)
+
+    assert [p.tracking_number for p in first.items + second.items] == [f"{status}-3", f"{status}-2", f"{status}-0"]
+    assert first.total == 3
+    assert second.next_cursor is None
+
+
+@pytest.mark.unit
+class TestCursorEncoding:
+    def test_round_trip(self):
+        key = (datetime(2034, 2, 1, 8, 30), 42)
+
+        assert decode_cursor(encode_cursor(key), [Trip.trip_datetime, Trip.id]) == key
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor((1,)), encode_cursor(("x", 1))])
+    def test_malformed_cursor_is_rejected(self, cursor):
+        with pytest.raises(ValidationException):
+            decode_cursor(cursor, [Trip.trip_datetime, Trip.id])
+
+
+@pytest.mark.unit
+def test_estimated_count_binds_positionally_on_mysql(db_session):
+    query = TripRepository(db_session)._filtered_query(
+        status="scheduled", route_id=3, date_from=DAY, date_to=DAY + timedelta(days=1)
+    )
+
+    sql, params = explain_statement(query, pymysql.dialect())
+
+    assert sql.startswith("EXPLAIN SELECT")
+    assert isinstance(params, tuple)
+    assert sorted(params, key=str) == sorted(("scheduled", 3, DAY, DAY + timedelta(days=1)), key=str)
+    assert sql.count("%s") == len(params)
+    sql % tuple(repr(p) for p in params)  # the driver formats it the same way
+
+
+@pytest.mark.integration
+def test_package_list_sends_cursor_and_count_headers(client, db_session):
+    tag = uuid.uuid4().hex[:8]
+    status = f"kp-{tag}"
+    db_session.add_all(
+        Package(
+            tracking_number=f"KP-{tag}-{n}", status=status, sender_id=1, recipient_id=1,
+            secretary_id=1, created_at=DAY + timedelta(minutes=n),
+        )
+        for n in range(3)
+    )
+    db_session.flush()
+
+    first = client.get("/api/v1/packages", params={"status": status, "cursor": "", "limit": 2, "count": "exact"})
+    second = client.get("/api/v1/packages", params={"status": status, "cursor": first.headers["X-Next-Cursor"], "limit": 2})
+
+    assert first.status_code == 200
+    assert [p["tracking_number"] for p in first.json()] == [f"KP-{tag}-2", f"KP-{tag}-1"]
+    assert first.headers["X-Total-Count"] == "3"
+    assert [p["tracking_number"] for p in second.json()] == [f"KP-{tag}-0"]
+    assert "X-Next-Cursor" not in second.headers
+    assert client.get("/api/v1/packages", params={"cursor": "bogus"}).status_code == 422
+    assert client.get("/api/v1/packages", params={"cursor": "", "limit": 0}).status_code == 422
@@ -0,0 +1,54 @@
+"""Tests for the password hashing executor and rehash-on-login."""
+
+import pytest
+
+from passlib.context import CryptContext
+
+from core.exceptions import ServiceUnavailableException
+from core.security import PasswordHasher, _hash, _verify_and_update, get_password_hash
+from services.auth_service import AuthService
+
+
+@pytest.mark.unit
+def test_process_pool_hashes_and_verifies():
+    hasher = PasswordHasher(workers=1, max_pending=2, queue_timeout=30)
+    try:
+        hashed = hasher.run(_hash, "secret123")
+        assert hasher.run(_verify_and_update, "secret123", hashed) == (True, None)
+        assert hasher.run(_verify_and_update, "wrong", hashed) == (False, None)
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.unit
+def test_saturated_executor_rejects_with_503():
+    hasher = PasswordHasher(workers=1, max_pending=1, queue_timeout=0.01)
+    hasher._slots.acquire()  # another login holds the only slot
+
+    with pytest.raises(ServiceUnavailableException):
+        hasher.run(_hash, "secret123")
+    assert hasher.rejected_total == 1
+
+
+@pytest.mark.integration
+def test_login_upgrades_hash_from_outdated_cost(db_session, test_user):
+    weak = CryptContext(schemes=["sha256_crypt"], sha256_crypt__default_rounds=1000)
+    test_user.hashed_password = weak.hash("password123")
+    db_session.commit()
+
+    user = AuthService(db_session).authenticate_user(test_user.email, "password123")
+
+    assert user.hashed_password.startswith("$5$rounds=80000$")
+    # The upgraded hash still verifies, and is not rewritten again
+    db_session.expire_all()
+    stored = user.hashed_password
+    AuthService(db_session).authenticate_user(test_user.email, "password123")
+    assert user.hashed_password == stored
+
+
+@pytest.mark.integration
+def test_current_hash_is_not_rewritten(db_session, test_user):
+    stored = test_user.hashed_password
+    AuthService(db_session).authenticate_user(test_user.email, "password123")
+    assert test_user.hashed_password == stored
+    assert get_password_hash("password123") != stored  # fresh salt each time
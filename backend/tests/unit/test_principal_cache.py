@@ -0,0 +1,81 @@
+"""Tests for the authenticated-user cache used by get_current_user."""
+
+import time
+
+import pytest
+from sqlalchemy import event
+
+from auth.principal_cache import PrincipalCache
+from models.user import User
+
+
+def _count_selects(db_session):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_execute)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", before_execute)
+
+
+@pytest.mark.integration
+def test_hit_attaches_user_without_select(db_session, test_user):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    assert cache.load_user(db_session, test_user.email).id == test_user.id
+    db_session.expunge_all()
+
+    statements, stop = _count_selects(db_session)
+    try:
+        user = cache.load_user(db_session, test_user.email)
+        assert (user.id, user.role, user.is_active) == (test_user.id, test_user.role, True)
+    finally:
+        stop()
+
+    assert statements == []
+    assert user in db_session
+    assert cache.metrics() == {"entries": 1, "hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+
+@pytest.mark.integration
+def test_cached_user_can_still_be_updated(db_session, test_user):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    cache.load_user(db_session, test_user.email)
+    db_session.expunge_all()
+
+    user = cache.load_user(db_session, test_user.email)
+    user.firstname = "Renamed"
+    db_session.commit()
+    db_session.expunge_all()
+
+    assert db_session.get(User, test_user.id).firstname == "Renamed"
+    # The password hash is not cached; it is loaded on demand
+    assert cache.load_user(db_session, test_user.email).hashed_password == test_user.hashed_password
+
+
+@pytest.mark.integration
+def test_invalidate_by_id_forces_reload(db_session, test_user):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    cache.load_user(db_session, test_user.email)
+
+    cache.invalidate(user_id=test_user.id)
+
+    assert cache.get(test_user.email) is None
+    assert cache.load_user(db_session, test_user.email).id == test_user.id
+
+
+@pytest.mark.unit
+def test_expired_and_evicted_entries_miss():
+    expired = PrincipalCache(ttl_seconds=0.01, max_entries=10)
+    user = User(id=1, email="a@example.com", username="a", is_active=True)
+    expired.put(user)
+    time.sleep(0.02)
+    assert expired.get("a@example.com") is None
+
+    small = PrincipalCache(ttl_seconds=60, max_entries=1)
+    small.put(user)
+    small.put(User(id=2, email="b@example.com", username="b", is_active=True))
+    assert small.get("a@example.com") is None
+    assert small.get("b@example.com")["id"] == 2
@@ -0,0 +1,83 @@
+"""Unit tests for the Redis circuit breaker in core.redis - no Redis required."""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError
+
+from core.redis import RedisHealth, RedisUnavailableError, redis_client
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.mark.unit
+class TestRedisHealth:
+    def test_opens_after_consecutive_failures(self):
+        health = RedisHealth(MagicMock(side_effect=RedisConnectionError("down")), failure_threshold=3, backoff_seconds=60)
+
+        health.record_failure(RedisConnectionError("down"))
+        health.record_failure(RedisConnectionError("down"))
+        assert health.allow_request() is True
+
+        health.record_failure(RedisConnectionError("down"))
+        assert health.allow_request() is False
+        assert health.metrics()["opened_total"] == 1
+
+    def test_success_resets_failure_streak(self):
+        health = RedisHealth(MagicMock(), failure_threshold=2, backoff_seconds=60)
+
+        health.record_failure(RedisConnectionError("down"))
+        health.record_success()
+        health.record_failure(RedisConnectionError("down"))
+
+        assert health.allow_request() is True
+
+    def test_background_probe_closes_circuit_with_backoff(self):
+        probe = MagicMock(side_effect=[RedisConnectionError("down"), RedisConnectionError("down"), None])
+        health = RedisHealth(probe, failure_threshold=1, backoff_seconds=0.01, backoff_max_seconds=0.02)
+
+        health.trip(RedisConnectionError("down"))
+
+        assert _wait_for(health.allow_request)
+        metrics = health.metrics()
+        assert probe.call_count == 3
+        assert metrics["probe_failures_total"] == 2
+        assert metrics["closed_total"] == 1
+        assert metrics["consecutive_failures"] == 0
+
+
+@pytest.mark.unit
+class TestRedisClientCall:
+    def test_open_circuit_fails_fast_without_calling_redis(self, monkeypatch):
+        health = RedisHealth(MagicMock(side_effect=RedisConnectionError("down")), backoff_seconds=60)
+        health.trip(RedisConnectionError("down"))
+        monkeypatch.setattr(redis_client, "health", health)
+        command = MagicMock()
+
+        with pytest.raises(RedisUnavailableError):
+            redis_client.call(command, "key")
+
+        command.assert_not_called()
+
+    def test_connection_errors_count_but_command_errors_do_not(self, monkeypatch):
+        health = RedisHealth(MagicMock(), failure_threshold=5, backoff_seconds=60)
+        monkeypatch.setattr(redis_client, "health", health)
+
+        with pytest.raises(ResponseError):
+            redis_client.call(MagicMock(side_effect=ResponseError("WRONGTYPE")))
+        assert health.consecutive_failures == 0
+
+        with pytest.raises(RedisConnectionError):
+            redis_client.call(MagicMock(side_effect=RedisConnectionError("reset")))
+        assert health.consecutive_failures == 1
+
+        assert redis_client.call(MagicMock(return_value="OK")) == "OK"
+        assert health.consecutive_failures == 0
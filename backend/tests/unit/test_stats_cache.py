@@ -0,0 +1,151 @@
+"""Tests for the /stats response cache (single flight, early refresh, invalidation)."""
+
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from core.redis import redis_client
+from models.ticket import Ticket
+from models.trip import Trip
+from services.stats_cache import StatsCache
+
+
+@pytest.fixture(params=["redis", "local"])
+def cache(request, monkeypatch):
+    if request.param == "redis" and not redis_client.is_connected():
+        pytest.skip("Redis not available")
+    if request.param == "local":
+        monkeypatch.setattr(redis_client, "is_available", lambda: False)
+    return StatsCache(ttl_seconds=30, early_seconds=5, lock_seconds=5, max_entries=100)
+
+
+def _key() -> str:
+    return StatsCache.key("test_" + uuid.uuid4().hex, period="today")
+
+
+@pytest.mark.unit
+def test_concurrent_misses_compute_once(cache):
+    key = _key()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"count": 7, "at": datetime(2030, 1, 1)}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute(key, compute)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"count": 7, "at": "2030-01-01T00:00:00"}] * 8
+
+
+@pytest.mark.unit
+def test_early_refresh_serves_stale_copy_while_one_caller_recomputes(cache):
+    cache.ttl_seconds, cache.early_seconds = 30, 30  # entries are due for refresh at once
+    key = _key()
+    assert cache.get_or_compute(key, lambda: 1) == 1
+
+    cache._acquire(key)  # another request is already recomputing
+    assert cache.get_or_compute(key, lambda: 2) == 1
+    cache._release(key)
+
+    assert cache.get_or_compute(key, lambda: 3) == 3
+    assert cache.stale_hits == 1
+
+
+@pytest.mark.unit
+def test_invalidate_starts_a_new_generation(cache):
+    key = _key()
+    cache.get_or_compute(key, lambda: "old")
+    assert cache.get_or_compute(key, lambda: "unused") == "old"
+
+    cache.invalidate()
+
+    assert cache.get_or_compute(key, lambda: "new") == "new"
+
+
+@pytest.mark.integration
+def test_committed_ticket_writes_invalidate_the_shared_cache(db_session):
+    from services.stats_cache import stats_cache
+
+    key = _key()
+    stats_cache.get_or_compute(key, lambda: "before")
+    def new_ticket():
+        return Ticket(
+            state="pending", seat_id=1, client_id=1, trip_id=1, secretary_id=1,
+            price=10, payment_method="cash",
+        )
+
+    db_session.add(new_ticket())
+    db_session.flush()
+    db_session.rollback()
+    assert stats_cache.get_or_compute(key, lambda: "after") == "before"
+
+    # A fresh object: the rolled-back one still carries its generated active_seat_id
+    ticket = new_ticket()
+    db_session.add(ticket)
+    db_session.commit()
+    try:
+        assert stats_cache.get_or_compute(key, lambda: "after") == "after"
+    finally:
+        db_session.delete(ticket)
+        db_session.commit()
+
+
+@pytest.mark.integration
+def test_committed_bulk_update_invalidates_the_shared_cache(db_session):
+    from services.stats_cache import stats_cache
+
+    key = _key()
+    stats_cache.get_or_compute(key, lambda: "before")
+
+    db_session.query(Ticket).filter(Ticket.id == -1).update({"state": "cancelled"}, synchronize_session=False)
+    db_session.commit()
+
+    assert stats_cache.get_or_compute(key, lambda: "after") == "after"
+
+
+@pytest.mark.integration
+def test_committed_trip_writes_invalidate_the_shared_cache(db_session):
+    from services.stats_cache import stats_cache
+
+    key = _key()
+    stats_cache.get_or_compute(key, lambda: "before")
+    trip = Trip(trip_datetime=datetime(2036, 1, 1, 8, 0), route_id=1, secretary_id=1)
+
+    db_session.add(trip)
+    db_session.commit()
+    try:
+        assert stats_cache.get_or_compute(key, lambda: "after") == "after"
+    finally:
+        db_session.delete(trip)
+        db_session.commit()
+
+
+@pytest.mark.integration
+def test_committed_bulk_insert_invalidates_the_shared_cache(db_session):
+    from services.stats_cache import stats_cache
+
+    key = _key()
+    stats_cache.get_or_compute(key, lambda: "before")
+    when = datetime(2036, 1, 2, 8, 0)
+
+    db_session.execute(insert(Trip), [{"trip_datetime": when, "route_id": 1, "secretary_id": 1}])
+    db_session.commit()
+    try:
+        assert stats_cache.get_or_compute(key, lambda: "after") == "after"
+    finally:
+        db_session.query(Trip).filter(Trip.trip_datetime == when).delete(synchronize_session=False)
+        db_session.commit()
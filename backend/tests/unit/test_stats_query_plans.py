@@ -0,0 +1,133 @@
+"""
+EXPLAIN-based checks that the dashboard stats range queries, the daily_stats
+reads and the rollup rebuild use the date-range indexes (works on the SQLite
+and MySQL test databases).
+"""
+
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, event, insert
+
+from models.package_state_history import PackageStateHistory
+from models.ticket_state_history import TicketStateHistory
+from models.trip import Trip
+from repositories import daily_stats_repository as metrics
+from repositories.daily_stats_repository import DailyStatsRepository
+from repositories.stats_repository import StatsRepository, in_date_range
+
+SEED_START = datetime(2031, 1, 1, 8, 0)
+
+
+@pytest.fixture
+def seeded_history(db_session):
+    """400 days of ticket/package state changes, one ticket change every 6 hours."""
+    states = ["pending", "confirmed", "cancelled", "completed"]
+    db_session.execute(insert(TicketStateHistory), [
+        {"ticket_id": n + 1, "new_state": states[n % 4], "changed_at": SEED_START + timedelta(hours=6 * n)}
+        for n in range(1600)
+    ])
+    db_session.execute(insert(PackageStateHistory), [
+        {"package_id": n + 1, "new_state": "delivered", "changed_at": SEED_START + timedelta(days=n)}
+        for n in range(400)
+    ])
+    db_session.commit()
+    yield
+    db_session.execute(delete(TicketStateHistory).where(TicketStateHistory.changed_at >= SEED_START))
+    db_session.execute(delete(PackageStateHistory).where(PackageStateHistory.changed_at >= SEED_START))
+    db_session.commit()
+
+
+def _indexes_used(db_session, call) -> list[set[str]]:
+    """Run ``call`` and return, per SELECT it issued, the index names in its EXPLAIN plan."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    cursor = db_session.connection().connection.cursor()
+    sqlite = engine.dialect.name == "sqlite"
+    used = []
+    for sql, params in statements:
+        cursor.execute(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + sql, params)
+        rows = cursor.fetchall()
+        if sqlite:
+            used.append({m for row in rows for m in re.findall(r"INDEX (\w+)", row[-1])})
+        else:
+            key = [d[0] for d in cursor.description].index("key")
+            used.append({row[key] for row in rows if row[key]})
+    return used
+
+
+@pytest.mark.unit
+def test_in_date_range_is_half_open_over_whole_days():
+    clause = in_date_range(Trip.trip_datetime, date(2025, 3, 1), date(2025, 3, 31))
+
+    assert sorted(clause.compile().params.values()) == [datetime(2025, 3, 1), datetime(2025, 4, 1)]
+    assert "CAST" not in str(clause).upper()
+
+
+@pytest.mark.integration
+@pytest.mark.usefixtures("seeded_history")
+class TestStatsQueryPlans:
+    def test_rollup_totals_use_the_metric_day_index(self, db_session):
+        repo = DailyStatsRepository(db_session)
+
+        used, = _indexes_used(db_session, lambda: repo.totals(
+            date(2031, 6, 1), date(2031, 6, 30), [metrics.TICKETS_CONFIRMED, metrics.TICKETS_PENDING]
+        ))
+
+        assert used & {"ix_daily_stats_metric_day", "uq_daily_stats_day_office_metric"}
+
+    def test_rollup_rebuild_scans_tickets_by_state_and_date(self, db_session):
+        queries = DailyStatsRepository(db_session)._ticket_queries(datetime(2031, 6, 1))
+
+        used = {metric: _indexes_used(db_session, query.all)[0] for metric, query in queries}
+
+        assert "ix_tickets_created_at_id" in used[metrics.TICKETS_CREATED]
+        for metric in (metrics.TICKETS_CREATED_CANCELLED, metrics.TICKETS_PENDING):
+            assert "ix_tickets_state_created_at" in used[metric]
+        for metric in (metrics.TICKETS_CONFIRMED, metrics.TICKETS_CANCELLED, metrics.TICKETS_RESERVED):
+            assert "ix_ticket_state_history_state_changed_at" in used[metric]
+
+    def test_rollup_rebuild_and_trip_counts_use_date_indexes(self, db_session):
+        queries = DailyStatsRepository(db_session)._package_queries(datetime(2031, 6, 1))
+        package_used = {metric: _indexes_used(db_session, query.all)[0] for metric, query in queries}
+        trip_used, = _indexes_used(
+            db_session, lambda: StatsRepository(db_session).get_trip_stats(date(2031, 6, 1), date(2031, 6, 30))
+        )
+
+        assert "ix_packages_created_at_id" in package_used[metrics.PACKAGES_CREATED]
+        for metric in (metrics.PACKAGES_IN_TRANSIT, metrics.PACKAGES_DELIVERED):
+            assert "ix_package_state_history_state_changed_at" in package_used[metric]
+        assert "ix_trips_trip_datetime_id" in trip_used
+
+    def test_dashboard_totals_take_two_indexed_statements(self, db_session):
+        repo = StatsRepository(db_session)
+
+        rollup_used, trip_used = _indexes_used(db_session, lambda: repo.get_dashboard_totals(
+            date(2031, 6, 1), date(2031, 6, 30), date(2031, 5, 2), date(2031, 5, 31)
+        ))
+
+        assert rollup_used & {"ix_daily_stats_metric_day", "uq_daily_stats_day_office_metric"}
+        assert "ix_trips_trip_datetime_id" in trip_used
+
+    def test_ranges_still_cover_whole_days(self, db_session):
+        def changes(start, end):
+            return db_session.query(TicketStateHistory).filter(
+                in_date_range(TicketStateHistory.changed_at, start, end)
+            ).count()
+
+        # From 08:00 on the first day: 3 changes that day, 4 on every later day
+        assert changes(date(2031, 1, 1), date(2031, 1, 1)) == 3
+        assert changes(date(2031, 1, 1), date(2031, 1, 2)) == 7
+        assert changes(date(2031, 1, 2), date(2031, 1, 2)) == 4
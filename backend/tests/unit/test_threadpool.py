@@ -0,0 +1,42 @@
+"""Guards for the event-loop execution model of the HTTP layer.
+
+Route handlers call synchronous SQLAlchemy services and Redis clients, so they
+must be plain ``def`` (served from the thread pool) unless they explicitly
+offload blocking work with ``run_in_threadpool``.
+"""
+
+import inspect
+
+import anyio.to_thread
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from core.config import settings
+from main import app
+
+# Async handlers that never block (token minting only).
+ASYNC_HANDLERS_ALLOWED = {
+    "get_ws_token",
+}
+
+
+@pytest.mark.unit
+def test_only_allowlisted_handlers_are_coroutines():
+    async_handlers = {
+        route.endpoint.__name__
+        for route in app.routes
+        if isinstance(route, APIRoute) and inspect.iscoroutinefunction(route.endpoint)
+    }
+    assert async_handlers <= ASYNC_HANDLERS_ALLOWED, (
+        f"Blocking async handlers: {sorted(async_handlers - ASYNC_HANDLERS_ALLOWED)}"
+    )
+
+
+@pytest.mark.unit
+def test_lifespan_sizes_thread_limiter():
+    with TestClient(app) as client:
+        tokens = client.portal.call(
+            lambda: anyio.to_thread.current_default_thread_limiter().total_tokens
+        )
+    assert tokens == settings.API_THREADPOOL_SIZE
@@ -0,0 +1,121 @@
+"""Unit tests for the JWT blacklist local filter mode - Redis mocked out."""
+
+import json
+import time
+import uuid
+
+import pytest
+
+from unittest.mock import MagicMock, patch
+
+from auth.blacklist import REVOKED_CHANNEL, BloomFilter, TokenBlacklist
+
+
+def _blacklist(**kwargs) -> TokenBlacklist:
+    blacklist = TokenBlacklist(mode="local", filter_capacity=1000, filter_fp_rate=0.01, **kwargs)
+    # No sync thread: tests drive sync()/handle_message() directly
+    blacklist._ensure_sync = lambda: None
+    return blacklist
+
+
+@pytest.mark.unit
+class TestBloomFilter:
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(capacity=1000, fp_rate=0.01)
+        added = [str(uuid.uuid4()) for _ in range(1000)]
+        for jti in added:
+            bloom.add(jti)
+
+        assert all(jti in bloom for jti in added)
+        false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+        assert false_positives < 300  # ~1% expected
+
+
+@pytest.mark.unit
+class TestLocalMode:
+    def test_unknown_token_is_answered_without_redis(self):
+        blacklist = _blacklist()
+        blacklist.sync([("revoked", time.time() + 60)])
+
+        with patch("auth.blacklist.redis_client") as mock_redis:
+            assert blacklist.is_token_blacklisted("some-other-jti") is False
+            mock_redis.call.assert_not_called()
+        assert blacklist.metrics()["local_answers"] == 1
+
+    def test_recent_revocation_is_answered_without_redis(self):
+        blacklist = _blacklist()
+        blacklist.sync([])
+        blacklist.handle_message({
+            "type": "message", "channel": REVOKED_CHANNEL,
+            "data": json.dumps({"jti": "abc", "exp": time.time() + 60}),
+        })
+
+        with patch("auth.blacklist.redis_client") as mock_redis:
+            assert blacklist.is_token_blacklisted("abc") is True
+            mock_redis.call.assert_not_called()
+
+    def test_filter_hit_outside_recent_is_confirmed_with_redis(self):
+        blacklist = _blacklist()
+        blacklist.sync([("old", time.time() + 60)])
+
+        with patch("auth.blacklist.redis_client") as mock_redis:
+            mock_redis.call.return_value = None  # expired in Redis meanwhile
+            assert blacklist.is_token_blacklisted("old") is False
+        assert blacklist.metrics()["false_positives"] == 1
+
+    def test_filter_hit_is_revoked_when_fallback_disabled(self):
+        blacklist = _blacklist(fp_fallback=False)
+        blacklist.sync([("old", time.time() + 60)])
+
+        with patch("auth.blacklist.redis_client") as mock_redis:
+            assert blacklist.is_token_blacklisted("old") is True
+            mock_redis.call.assert_not_called()
+
+    def test_checks_go_to_redis_until_first_sync(self):
+        blacklist = _blacklist()
+
+        with patch("auth.blacklist.redis_client") as mock_redis:
+            mock_redis.call.return_value = "blacklisted"
+            assert blacklist.is_token_blacklisted("abc") is True
+            mock_redis.call.assert_called_once()
+
+    def test_local_revocation_survives_a_concurrent_rebuild(self):
+        blacklist = _blacklist()
+        blacklist.sync([])
+        with patch("auth.blacklist.redis_client"):
+            blacklist.add_token_to_blacklist("fresh")
+        # Index read before "fresh" reached Redis
+        blacklist.sync([])
+
+        assert blacklist.is_token_blacklisted("fresh") is True
+
+
+@pytest.mark.unit
+def test_add_publishes_revocation_and_indexes_expiry():
+    blacklist = _blacklist()
+    with patch("auth.blacklist.redis_client") as mock_redis:
+        pipe = mock_redis.client.pipeline.return_value
+        blacklist.add_token_to_blacklist("abc")
+
+    pipe.setex.assert_called_once()
+    pipe.zadd.assert_called_once()
+    channel, payload = pipe.publish.call_args.args
+    assert channel == REVOKED_CHANNEL
+    assert json.loads(payload)["jti"] == "abc"
+
+
+@pytest.mark.unit
+def test_clear_blacklist_scans_instead_of_keys():
+    blacklist = TokenBlacklist(mode="redis")
+    client = MagicMock()
+    client.scan.side_effect = [(7, ["blacklist:token:a"]), (0, ["blacklist:token:b"])]
+    client.unlink.return_value = 1
+
+    with patch("auth.blacklist.redis_client") as mock_redis:
+        mock_redis.client = client
+        mock_redis.call.side_effect = lambda fn, *args, **kwargs: fn(*args, **kwargs)
+        blacklist.clear_blacklist()
+
+    client.keys.assert_not_called()
+    assert [c.args[0] for c in client.scan.call_args_list] == [0, 7]
+    assert client.unlink.call_count == 3  # two batches + the expiry index
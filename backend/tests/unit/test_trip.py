@@ -233,3 +233,135 @@ def test_get_trip(db_session, setup_trip_data, admin_token, client):
     trip_data = response.json()
     assert trip_data["id"] == trip.id
     assert trip_data["driver_id"] == data["driver"].id
+
+
+def _count_statements(session, fn):
+    """Run fn() and return (result, number of SQL statements it executed)."""
+    from sqlalchemy import event
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return result, len(statements)
+
+
+@pytest.mark.integration
+def test_trip_listing_query_count_is_constant(db_session, setup_trip_data):
+    """La lista de viajes no debe hacer consultas por fila (N+1)."""
+    from models.client import Client
+    from models.seat import Seat
+    from repositories.ticket_repository import TicketRepository
+    from services.trip_service import TripService
+
+    data = setup_trip_data
+    seat = Seat(bus_id=data["bus"].id, seat_number=1, deck="FIRST", row=1, column=1)
+    client_user = User(
+        username="listing_client",
+        email="listing_client@example.com",
+        hashed_password="!",
+        role=UserRole.CLIENT,
+    )
+    db_session.add_all([seat, client_user])
+    db_session.flush()
+    client = Client(user_id=client_user.id, firstname="Cliente", lastname="Lista")
+    db_session.add(client)
+    db_session.flush()
+
+    def add_trips(count):
+        base = datetime.now() + timedelta(days=1)
+        trips = [
+            Trip(
+                trip_datetime=base + timedelta(hours=i),
+                driver_id=data["driver"].id,
+                assistant_id=data["assistant"].id,
+                bus_id=data["bus"].id,
+                route_id=data["route"].id,
+                secretary_id=data["secretary"].id,
+            )
+            for i in range(count)
+        ]
+        db_session.add_all(trips)
+        db_session.flush()
+        return trips
+
+    first = add_trips(2)
+    db_session.add(Ticket(
+        state="confirmed", seat_id=seat.id, client_id=client.id, trip_id=first[0].id,
+        secretary_id=data["secretary"].id, price=50, payment_method="cash",
+    ))
+    TicketRepository(db_session).adjust_trip_occupied_seats(first[0].id, 1)
+    db_session.commit()
+
+    service = TripService(db_session)
+
+    db_session.expire_all()
+    small, small_queries = _count_statements(db_session, lambda: service.get_trips(limit=100))
+
+    add_trips(10)
+    db_session.commit()
+    db_session.expire_all()
+    large, large_queries = _count_statements(db_session, lambda: service.get_trips(limit=100))
+
+    assert len(small["trips"]) == 2
+    assert len(large["trips"]) == 12
+    assert large_queries == small_queries
+    assert large_queries <= 5
+
+    by_id = {t["id"]: t for t in large["trips"]}
+    assert by_id[first[0].id]["occupied_seats"] == 1
+    assert by_id[first[0].id]["available_seats"] == 39
+    assert by_id[first[0].id]["route"]["origin"] == "Ciudad A"
+    assert by_id[first[0].id]["driver"]["firstname"] == "Driver"
+    assert by_id[first[1].id]["occupied_seats"] == 0
+
+
+@pytest.mark.integration
+def test_reconcile_occupied_seats_fixes_drift(db_session, setup_trip_data):
+    """Tickets written behind the service's back are picked up by the reconcile pass."""
+    from models.client import Client
+    from models.seat import Seat
+    from repositories.trip_repository import TripRepository
+
+    data = setup_trip_data
+    seats = [
+        Seat(bus_id=data["bus"].id, seat_number=n, deck="FIRST", row=1, column=n)
+        for n in (1, 2, 3)
+    ]
+    client_user = User(
+        username="reconcile_client",
+        email="reconcile_client@example.com",
+        hashed_password="!",
+        role=UserRole.CLIENT,
+    )
+    db_session.add_all([*seats, client_user])
+    db_session.flush()
+    client = Client(user_id=client_user.id, firstname="Cliente", lastname="Deriva")
+    trip = Trip(
+        trip_datetime=datetime.now() + timedelta(days=1),
+        bus_id=data["bus"].id,
+        route_id=data["route"].id,
+        secretary_id=data["secretary"].id,
+    )
+    db_session.add_all([client, trip])
+    db_session.flush()
+    for seat, state in zip(seats, ("confirmed", "pending", "cancelled")):
+        db_session.add(Ticket(
+            state=state, seat_id=seat.id, client_id=client.id, trip_id=trip.id,
+            secretary_id=data["secretary"].id, price=50, payment_method="cash",
+        ))
+    db_session.commit()
+
+    repo = TripRepository(db_session)
+    assert repo.reconcile_occupied_seats() == [(trip.id, 0, 2)]
+    db_session.commit()
+    db_session.refresh(trip)
+    assert trip.occupied_seats == 2
+    assert repo.reconcile_occupied_seats() == []
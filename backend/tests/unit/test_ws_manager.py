@@ -0,0 +1,272 @@
+"""Unit tests for the seat lock WebSocket manager - fake sockets, no server."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from unittest.mock import patch
+
+from core.redis import RedisUnavailableError
+from core.ws_backplane import EXPIRED_EVENTS_PATTERN, InMemoryBackplane, RedisBackplane
+from core.ws_manager import SLOW_CONSUMER_CLOSE_CODE, SeatLockWSManager
+
+
+class FakeWebSocket:
+    def __init__(self, fail=False, stall: asyncio.Event | None = None):
+        self.sent: list[str] = []
+        self.fail = fail
+        self.stall = stall
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload: str):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        if self.stall is not None:
+            await self.stall.wait()
+        self.sent.append(payload)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+def _manager(**kwargs) -> SeatLockWSManager:
+    return SeatLockWSManager(backplane=kwargs.pop("backplane", None) or InMemoryBackplane(), **kwargs)
+
+
+async def _settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.unit
+class TestPublish:
+    def test_events_from_worker_threads_reach_viewers_in_order(self):
+        async def scenario():
+            manager = _manager()
+            first, second, other_trip = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+            await manager.connect(1, first, user_id=10)
+            await manager.connect(1, second, user_id=20)
+            await manager.connect(2, other_trip, user_id=30)
+
+            def worker():
+                for seq in (1, 2, 3):
+                    manager.publish(1, {"type": "seat_locked", "trip_id": 1, "seq": seq})
+
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+            await _settle()
+            return manager, first, second, other_trip
+
+        manager, first, second, other_trip = asyncio.run(scenario())
+
+        assert [json.loads(p)["seq"] for p in first.sent] == [1, 2, 3]
+        # One encoding per event: every viewer gets the very same string object
+        assert all(a is b for a, b in zip(first.sent, second.sent))
+        assert other_trip.sent == []
+        assert manager.metrics()["sent_total"] == 6
+
+    def test_publish_without_viewers_is_a_noop(self):
+        manager = _manager()
+        manager.publish(1, {"type": "seat_sold", "trip_id": 1, "seq": 1})
+        assert manager.metrics()["sent_total"] == 0
+
+    def test_dead_connections_are_pruned(self):
+        async def scenario():
+            manager = _manager()
+            alive, dead = FakeWebSocket(), FakeWebSocket(fail=True)
+            await manager.connect(1, alive, user_id=10)
+            await manager.connect(1, dead, user_id=20)
+            manager.broadcast_text(1, '{"type":"seat_released"}')
+            await _settle()
+            return manager, alive
+
+        manager, alive = asyncio.run(scenario())
+
+        assert len(alive.sent) == 1
+        assert manager.user_has_other_connections(1, 20) is False
+        assert manager.user_has_other_connections(1, 10) is True
+
+
+@pytest.mark.unit
+class TestSlowConsumers:
+    def test_stalled_viewer_does_not_delay_others(self):
+        async def scenario():
+            manager = _manager(queue_size=8, send_timeout=60)
+            fast, slow = FakeWebSocket(), FakeWebSocket(stall=asyncio.Event())
+            await manager.connect(1, fast, user_id=10)
+            await manager.connect(1, slow, user_id=20)
+            for seq in range(3):
+                manager.broadcast_text(1, json.dumps({"seq": seq}))
+            await _settle()
+            metrics = manager.metrics()
+            slow.stall.set()
+            await _settle()
+            return fast, slow, metrics
+
+        fast, slow, metrics = asyncio.run(scenario())
+
+        assert len(fast.sent) == 3
+        assert metrics["queue_depth_max"] == 2  # one in flight on the stalled socket
+        assert len(slow.sent) == 3
+
+    def test_full_queue_collapses_into_stale_hint(self):
+        async def scenario():
+            manager = _manager(queue_size=4, send_timeout=60)
+            slow = FakeWebSocket(stall=asyncio.Event())
+            conn = await manager.connect(1, slow, user_id=20)
+            for seq in range(6):
+                manager.broadcast_text(1, json.dumps({"seq": seq}))
+            await _settle()
+            slow.stall.set()
+            await _settle()
+            return manager, conn, slow
+
+        manager, conn, slow = asyncio.run(scenario())
+
+        # 0-3 filled the queue and 4 overflowed it; later events queue behind the hint
+        assert [json.loads(p) for p in slow.sent] == [
+            {"type": "seat_locks_stale", "trip_id": 1},
+            {"seq": 5},
+        ]
+        assert conn.dropped == 5
+        assert manager.metrics()["dropped_total"] == 5
+        assert manager.metrics()["stale_hints_total"] == 1
+
+    def test_send_timeout_disconnects_slow_consumer(self):
+        async def scenario():
+            manager = _manager(send_timeout=0.05)
+            slow = FakeWebSocket(stall=asyncio.Event())
+            await manager.connect(1, slow, user_id=20)
+            manager.broadcast_text(1, "{}")
+            await asyncio.sleep(0.2)
+            return manager, slow
+
+        manager, slow = asyncio.run(scenario())
+
+        assert slow.close_code == SLOW_CONSUMER_CLOSE_CODE
+        assert manager.user_has_other_connections(1, 20) is False
+        assert manager.metrics()["slow_consumers_total"] == 1
+
+
+@pytest.mark.unit
+class TestBackplane:
+    def test_event_published_on_one_worker_reaches_the_other(self):
+        async def scenario():
+            backplane = InMemoryBackplane()
+            worker_a, worker_b = _manager(backplane=backplane), _manager(backplane=backplane)
+            viewer_a, viewer_b = FakeWebSocket(), FakeWebSocket()
+            await worker_a.connect(1, viewer_a, user_id=10)
+            await worker_b.connect(1, viewer_b, user_id=20)
+
+            worker_a.publish(1, {"type": "seat_sold", "trip_id": 1, "seq": 3, "seat_ids": [7]})
+            await _settle()
+            return viewer_a, viewer_b
+
+        viewer_a, viewer_b = asyncio.run(scenario())
+
+        assert viewer_a.sent == viewer_b.sent
+        assert json.loads(viewer_b.sent[0])["seat_ids"] == [7]
+
+    def test_refresh_onto_another_worker_keeps_the_user_present(self):
+        async def scenario():
+            backplane = InMemoryBackplane()
+            worker_a, worker_b = _manager(backplane=backplane), _manager(backplane=backplane)
+            old = await worker_a.connect(1, FakeWebSocket(), user_id=10)
+            new = await worker_b.connect(1, FakeWebSocket(), user_id=10)
+
+            worker_a.disconnect(1, old)
+            after_refresh = await worker_a.leave(old)
+            worker_b.disconnect(1, new)
+            after_close = await worker_b.leave(new)
+            return worker_a, after_refresh, after_close
+
+        worker_a, after_refresh, after_close = asyncio.run(scenario())
+
+        assert worker_a.user_has_other_connections(1, 10) is False  # nothing left locally...
+        assert after_refresh is True  # ...but the user is still on worker B
+        assert after_close is False
+
+    def test_redis_presence_is_shared_and_fails_safe(self):
+        from core.redis import redis_client
+
+        if not redis_client.is_connected():
+            pytest.skip("Redis not available")
+        worker_a, worker_b = RedisBackplane(), RedisBackplane()
+        redis_client.client.delete(RedisBackplane.presence_key(987_654))
+
+        worker_a.join(987_654, 10)
+        worker_b.join(987_654, 10)
+        assert worker_a.leave(987_654, 10) is True
+        assert worker_b.leave(987_654, 10) is False
+        assert redis_client.client.hget(RedisBackplane.presence_key(987_654), "10") is None
+
+        with patch("core.ws_backplane.redis_client") as mock_redis:
+            mock_redis.call.side_effect = RedisUnavailableError("Redis circuit is open")
+            assert worker_a.leave(987_654, 10) is True
+
+    def test_redis_messages_are_routed_by_trip_channel(self):
+        backplane = RedisBackplane()
+        delivered = []
+
+        async def scenario():
+            backplane._subscribers.add(asyncio.get_running_loop(), lambda t, p: delivered.append((t, p)))
+            backplane.handle_message({
+                "type": "pmessage", "pattern": "seat_lock_events:*",
+                "channel": "seat_lock_events:42", "data": '{"seq":1}',
+            })
+            backplane.handle_message({
+                "type": "pmessage", "pattern": EXPIRED_EVENTS_PATTERN,
+                "channel": "__keyevent@0__:expired", "data": "seat_lock:{42}",
+            })
+            # Only the trip's lock hash matters; its companion keys are ignored
+            backplane.handle_message({
+                "type": "pmessage", "pattern": EXPIRED_EVENTS_PATTERN,
+                "channel": "__keyevent@0__:expired", "data": "seat_lock:{42}:exp",
+            })
+            await _settle()
+
+        asyncio.run(scenario())
+
+        assert delivered == [
+            (42, '{"seq":1}'),
+            (42, json.dumps({"type": "seat_locks_stale", "trip_id": 42})),
+        ]
+
+    def test_redis_publish_falls_back_to_local_delivery(self):
+        backplane = RedisBackplane()
+        delivered = []
+
+        async def scenario():
+            backplane._subscribers.add(asyncio.get_running_loop(), lambda t, p: delivered.append((t, p)))
+            with patch("core.ws_backplane.redis_client") as mock_redis:
+                mock_redis.call.side_effect = RedisUnavailableError("Redis circuit is open")
+                backplane.publish(5, "{}")
+            await _settle()
+
+        asyncio.run(scenario())
+
+        assert delivered == [(5, "{}")]
+
+
+@pytest.mark.unit
+class TestExpirySweeper:
+    def test_sweeps_only_trips_with_local_viewers(self):
+        swept = []
+
+        async def scenario():
+            manager = _manager()
+            idle = asyncio.create_task(manager.sweep_expired_locks(swept.append, interval=0.01))
+            await asyncio.sleep(0.05)
+            await manager.connect(7, FakeWebSocket(), user_id=10)
+            await asyncio.sleep(0.05)
+            idle.cancel()
+
+        asyncio.run(scenario())
+
+        assert swept and all(trip_ids == [7] for trip_ids in swept)
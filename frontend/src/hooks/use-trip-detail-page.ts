@@ -53,7 +53,10 @@ export function useTripDetailPage(tripId: number) {
     const assistants = useAppSelector(selectAssistants) as Person[]
 
     const { soldTickets, reservedSeatNumbers, fetchSoldTickets, formatDate } = useTripDetails()
-    const { lockedSeats, fetchLockedSeats, lockAnnouncement } = useTripSeatLocks(tripId)
+    const { lockedSeats, fetchLockedSeats, lockAnnouncement } = useTripSeatLocks(
+        tripId,
+        () => fetchSoldTickets(tripId),
+    )
     const { fetchPackages, panel: packagesPanel } = useTripPackagesPanel(tripId)
 
     // ── Global refresh ────────────────────────────────────────────────────
@@ -241,12 +244,21 @@ export function useTripDetailPage(tripId: number) {
         const newIds = new Set(seats.map(s => s.id))
 
         const added = seats.filter(s => !prevIds.has(s.id))
-        for (const seat of added) {
+        if (added.length === 1) {
             try {
-                await seatService.lockSeat(tripId, seat.id)
+                await seatService.lockSeat(tripId, added[0].id)
             } catch {
                 toast.error('No se pudo bloquear el asiento', { description: 'Otro usuario ya lo seleccionó.' })
-                seats = seats.filter(s => s.id !== seat.id)
+                seats = seats.filter(s => s.id !== added[0].id)
+            }
+        } else if (added.length > 1) {
+            // Group selection: lock all seats in one request, all or nothing
+            try {
+                await seatService.lockSeats(tripId, added.map(s => s.id))
+            } catch {
+                toast.error('No se pudieron bloquear los asientos', { description: 'Otro usuario ya seleccionó alguno de ellos.' })
+                const addedIds = new Set(added.map(s => s.id))
+                seats = seats.filter(s => !addedIds.has(s.id))
             }
         }
 
@@ -5,10 +5,23 @@ import { seatService, type LockedSeatInfo } from '@/services/seat.service'
 import { API_BASE_URL } from '@/lib/constants'
 import { TIMING } from '@/lib/timing'
 
-export function useTripSeatLocks(tripId: number) {
+interface SeatLockMessage {
+    type: string
+    seq: number | null
+    locks?: LockedSeatInfo[]
+    seats?: LockedSeatInfo[]
+    seat_ids?: number[]
+}
+
+export function useTripSeatLocks(tripId: number, onSeatSold?: (seatIds: number[]) => void) {
     const currentUser = useAppSelector(selectUser)
     const [lockedSeats, setLockedSeats] = useState<LockedSeatInfo[]>([])
     const wsRef = useRef<WebSocket | null>(null)
+    const onSeatSoldRef = useRef(onSeatSold)
+
+    useEffect(() => {
+        onSeatSoldRef.current = onSeatSold
+    }, [onSeatSold])
     const wsReconnectRef = useRef<ReturnType<typeof setTimeout> | null>(null)
     const pollRef = useRef<ReturnType<typeof setInterval> | null>(null)
 
@@ -64,6 +77,9 @@ export function useTripSeatLocks(tripId: number) {
             }
             wsRef.current = ws
             let wsConnected = false
+            // Sequence of the last applied snapshot/event; null until the first snapshot arrives
+            let lastSeq: number | null = null
+            let awaitingSnapshot = true
 
             ws.onopen = () => {
                 wsConnected = true
@@ -71,12 +87,45 @@ export function useTripSeatLocks(tripId: number) {
             }
 
             ws.onmessage = (event) => {
+                let data: SeatLockMessage
                 try {
-                    const data = JSON.parse(event.data)
-                    if (data.type === 'seat_locks_updated' && data.locks) {
-                        setLockedSeats(data.locks)
+                    data = JSON.parse(event.data)
+                } catch { return /* ignore non-JSON (pong) */ }
+
+                if (data.type === 'seat_locks_updated' && data.locks) {
+                    setLockedSeats(data.locks)
+                    lastSeq = data.seq
+                    awaitingSnapshot = false
+                    return
+                }
+                if (data.type === 'seat_locks_stale') {
+                    // Server dropped our backlog (slow link): start over from a snapshot
+                    awaitingSnapshot = true
+                    ws.send('resync')
+                    return
+                }
+                if (awaitingSnapshot) return
+
+                if (data.seq != null && lastSeq != null) {
+                    if (data.seq <= lastSeq) return
+                    if (data.seq > lastSeq + 1) {
+                        // Missed an event: ask for a fresh snapshot instead of guessing
+                        awaitingSnapshot = true
+                        ws.send('resync')
+                        return
                     }
-                } catch { /* ignore non-JSON */ }
+                }
+                if (data.seq != null) lastSeq = data.seq
+
+                if (data.type === 'seat_locked' && data.seats) {
+                    const seats = data.seats
+                    const ids = new Set(seats.map(s => s.seat_id))
+                    setLockedSeats(prev => [...prev.filter(s => !ids.has(s.seat_id)), ...seats])
+                } else if ((data.type === 'seat_released' || data.type === 'seat_sold') && data.seat_ids) {
+                    const ids = new Set(data.seat_ids)
+                    setLockedSeats(prev => prev.filter(s => !ids.has(s.seat_id)))
+                    if (data.type === 'seat_sold') onSeatSoldRef.current?.(data.seat_ids)
+                }
             }
 
             ws.onclose = () => {
@@ -8,6 +8,15 @@ export interface SeatLockResult {
     message?: string
 }
 
+export interface SeatBatchLockResult {
+    locked: boolean
+    seat_ids: number[]
+    ttl?: number
+    extended?: number
+    fallback?: boolean
+    message?: string
+}
+
 export interface LockedSeatInfo {
     seat_id: number
     user_id: number | null
@@ -42,6 +51,13 @@ export const seatService = {
         })
     },
 
+    lockSeats(tripId: number, seatIds: number[]): Promise<SeatBatchLockResult> {
+        return apiFetch('/seats/lock/batch', {
+            method: 'POST',
+            body: { trip_id: tripId, seat_ids: seatIds },
+        })
+    },
+
     unlockSeats(tripId: number, seatIds: number[]): Promise<{ unlocked: number }> {
         return apiFetch('/seats/unlock', {
             method: 'POST',